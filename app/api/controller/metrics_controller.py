@@ -0,0 +1,27 @@
+"""
+metrics_controller.py
+
+This module defines the endpoint that exposes the application's metrics to a Prometheus scraper.
+
+Endpoints:
+- GET /metrics: Render every registered counter and histogram in the Prometheus text exposition format.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.helpers.metrics import REGISTRY
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+"""str: Content type of the Prometheus text exposition format."""
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Report the FFmpeg, storage and HTTP request metrics recorded by this process.
+
+    Returns:
+        PlainTextResponse: The metrics in the Prometheus text exposition format.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -11,26 +11,57 @@ Dependencies:
 - app.api.models: A module defining request and response models for the API.
 - app.helpers.time: A helper module for time-related functionalities.
 - app.helpers.video: A helper module for video validation functionalities.
+- app.helpers.stream: A helper module for reading uploaded files in chunks.
+- app.helpers.http: A helper module for HTTP conditional request handling.
+- app.helpers.ffmpeg: A helper module for running FFmpeg with bounded concurrency.
+- app.jobs.job_queue: A module providing the durable background job queue.
 
 Available Routes:
 - POST /upload: Upload a video file and return a response with the video's filename and unique identifier. Only supports specific video formats.
+- POST /upload/initiate: Start a direct upload, returning the video's unique identifier and presigned URLs to upload it to storage without passing it through the API.
+- PUT /upload/local: Receive the body of a direct upload to local storage through a signed URL returned by /upload/initiate.
+- POST /upload/complete: Verify a direct upload once the video is in storage and register it, returning the video's filename and unique identifier.
+- GET /video/{file_id}/metadata: Retrieve the metadata recorded for a video at upload, such as its duration, codec and dimensions.
 - POST /generate-thumbnail: Generate a thumbnail for a given video at a specific timestamp and resolution, returning the thumbnail's unique identifier.
-- GET /get-thumbnail/{thumbnail_id}: Retrieve a thumbnail image by its unique identifier.
+- POST /generate-thumbnails: Generate several thumbnails for a given video in a single FFmpeg pass, returning their unique identifiers in request order.
+- GET /get-thumbnail/{thumbnail_id}: Retrieve a thumbnail image by its unique identifier, in the format that best matches the Accept header, from its file for local storage or optionally by redirect to a presigned URL for S3. Supports conditional requests with If-None-Match.
+- POST /generate-sprite: Generate a sprite sheet of seek-bar preview tiles and its WebVTT index in a single FFmpeg pass, returning the sprite's unique identifier.
+- GET /get-sprite/{file_name}: Retrieve a sprite sheet ({sprite_id}.jpg) or its WebVTT index ({sprite_id}.vtt). Supports conditional requests with If-None-Match.
+- GET /ffmpeg-stats: Report the load and wait-time accounting of the FFmpeg process pool.
+- POST /jobs/generate-thumbnail: Queue a thumbnail generation as a background job, returning the job's unique identifier immediately.
+- GET /jobs/{job_id}: Report the status of a background job and, once it has succeeded, the thumbnail's unique identifier.
+
+Routes that run FFmpeg respond with 429 Too Many Requests and a Retry-After header when the FFmpeg wait queue is full.
 """
 
-from fastapi import APIRouter, File, UploadFile, HTTPException, status
-from fastapi.responses import StreamingResponse
-from app.api.service.video_service import VideoService
-from app.api.models import VideoUploadResponse, ThumbnailResponse, ThumbnailRequest
-from app.helpers.video import is_supported_video_format, is_valid_resolution, is_valid_seconds, seconds_to_timestamp
+import os
+from typing import Optional
+from fastapi import APIRouter, File, UploadFile, HTTPException, Header, Request, status
+from fastapi.responses import FileResponse, RedirectResponse, Response
+from starlette.background import BackgroundTask
+from app.api.service.video_service import VideoService, TimestampOutOfRangeError, UploadIncompleteError
+from app.api.models import VideoUploadResponse, UploadInitiateRequest, UploadInitiateResponse, UploadCompleteRequest, VideoMetadataResponse, ThumbnailResponse, ThumbnailRequest, BatchThumbnailRequest, BatchThumbnailResponse, SpriteRequest, SpriteResponse, JobResponse
+from app.helpers.video import is_supported_video_format, is_valid_resolution, is_valid_seconds, is_valid_seek_accuracy, seconds_to_timestamp
+from app.helpers.stream import iter_upload_file
+from app.helpers.http import etag_matches
+from app.helpers.image import image_content_type, image_extension, is_valid_image_format, is_valid_quality, supported_image_formats
+from app.helpers.ffmpeg import FFmpegBusyError
+from app.jobs.job_queue import Job
+from app.config import get_config
 
 router = APIRouter()
 
+THUMBNAIL_CACHE_CONTROL = "public, max-age=31536000, immutable"
+"""str: Cache-Control header for thumbnails. A thumbnail identifier always refers to the same image, so clients may cache it indefinitely."""
+
 @router.post("/upload", response_model=VideoUploadResponse)
 async def upload_video(file: UploadFile = File(...)):
     """
     Handle video file uploads. Validates the file format before uploading.
 
+    The file is streamed to storage in chunks of `UPLOAD_CHUNK_SIZE` bytes, so the whole video is never
+    held in memory.
+
     Args:
         file (UploadFile): The video file to be uploaded, wrapped in FastAPI's File class for form data.
 
@@ -39,6 +70,7 @@ async def upload_video(file: UploadFile = File(...)):
 
     Raises:
         HTTPException: An HTTP 400 error for unsupported video formats.
+        HTTPException: An HTTP 429 error with a Retry-After header if too many FFmpeg processes are queued to probe the video.
         HTTPException: An HTTP 500 error indicating the video upload failed.
     """
 
@@ -46,12 +78,142 @@ async def upload_video(file: UploadFile = File(...)):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported video format: {file.filename}")
     
     try:
-        file_data = await file.read()
-        file_name, file_id = await VideoService.upload_video(file_name=file.filename, file_data=file_data)
+        file_data = iter_upload_file(file, get_config().UPLOAD_CHUNK_SIZE)
+        file_name, file_id = await VideoService.upload_video(file_name=file.filename, file_data=file_data, content_type=file.content_type)
         return VideoUploadResponse(filename=file_name, file_id=file_id)
+    except FFmpegBusyError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Video upload failed")
+
+@router.post("/upload/initiate", response_model=UploadInitiateResponse)
+async def initiate_upload(request: UploadInitiateRequest):
+    """
+    Start a direct upload, so that the video goes from the client to storage without passing through the API.
+
+    With S3 storage, videos up to `PRESIGNED_PUT_MAX_SIZE` bytes are uploaded with a single PUT to `url`, larger
+    videos in parts of `part_size` bytes, each PUT to its URL in `part_urls`. With local storage, `url` points to
+    PUT /upload/local. Once uploaded, the video is registered with POST /upload/complete.
+
+    Args:
+        request (UploadInitiateRequest): The name, size and MIME type of the video.
+
+    Returns:
+        UploadInitiateResponse: The video's unique identifier and the URLs to upload it to.
+
+    Raises:
+        HTTPException: An HTTP 400 error for unsupported video formats.
+        HTTPException: An HTTP 500 error if the upload URLs could not be created.
+    """
+    if not is_supported_video_format(request.filename):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported video format: {request.filename}")
+
+    try:
+        file_id, target = await VideoService.initiate_upload(request.filename, request.size, request.content_type)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to initiate upload")
+
+    return UploadInitiateResponse(
+        file_id=file_id,
+        url=target.url,
+        upload_id=target.upload_id,
+        part_urls=target.part_urls,
+        part_size=target.part_size,
+        expires_in=get_config().UPLOAD_URL_EXPIRATION
+    )
+
+@router.put("/upload/local", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_local(request: Request, path: str, expires: int, signature: str):
+    """
+    Receive a direct upload to local storage through a signed URL, standing in for a presigned S3 PUT URL.
+
+    The request body is streamed to storage as it arrives.
+
+    Args:
+        request (Request): The request, whose body is the video.
+        path (str): The storage path the URL was signed for.
+        expires (int): The expiry time of the URL as a UNIX timestamp.
+        signature (str): The signature of the URL.
+
+    Returns:
+        Response: An empty 204 response once the video is stored.
+
+    Raises:
+        HTTPException: An HTTP 403 error if the signature is invalid or has expired.
+        HTTPException: An HTTP 500 error if the video could not be stored.
+    """
+    try:
+        await VideoService.write_signed_upload(path, expires, signature, request.stream())
+    except PermissionError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Video upload failed")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.post("/upload/complete", response_model=VideoUploadResponse)
+async def complete_upload(request: UploadCompleteRequest):
+    """
+    Complete a direct upload: assemble its parts if it was uploaded in parts, check that the whole video is in
+    storage, then probe and register it as POST /upload does.
+
+    Args:
+        request (UploadCompleteRequest): The video's unique identifier and, for multipart uploads, the ETags of its parts.
+
+    Returns:
+        VideoUploadResponse: An object containing the uploaded video's filename and unique identifier.
+
+    Raises:
+        HTTPException: An HTTP 404 error if no upload of the video is pending.
+        HTTPException: An HTTP 409 error if the video has not been fully uploaded.
+        HTTPException: An HTTP 429 error with a Retry-After header if too many FFmpeg processes are queued to probe the video.
+        HTTPException: An HTTP 500 error for any other server-side error.
+    """
+    try:
+        file_name, file_id = await VideoService.complete_upload(request.file_id, request.part_etags)
+        return VideoUploadResponse(filename=file_name, file_id=file_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    except UploadIncompleteError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except FFmpegBusyError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Video upload failed")
 
+@router.get("/video/{file_id}/metadata", response_model=VideoMetadataResponse)
+async def get_video_metadata(file_id: str):
+    """
+    Retrieve the metadata recorded for a video at upload. The video itself is not read.
+
+    Args:
+        file_id (str): The unique identifier of the video.
+
+    Returns:
+        VideoMetadataResponse: An object containing the size, content type and upload time of the video, and the
+                               duration, codec, dimensions, frame rate and container reported by ffprobe. Fields
+                               that could not be probed are null.
+
+    Raises:
+        HTTPException: An HTTP 404 error if the video file is not found.
+    """
+    try:
+        record = await VideoService.get_video_metadata(file_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Video file not found")
+
+    return VideoMetadataResponse(
+        file_id=record.file_id,
+        size=record.size,
+        content_type=record.content_type,
+        uploaded_at=record.uploaded_at,
+        duration=record.duration,
+        codec=record.codec,
+        width=record.width,
+        height=record.height,
+        frame_rate=record.frame_rate,
+        container=record.container
+    )
+
 @router.post("/generate-thumbnail", response_model=ThumbnailResponse)
 async def generate_thumbnail(request: ThumbnailRequest):
     """
@@ -59,14 +221,15 @@ async def generate_thumbnail(request: ThumbnailRequest):
 
     Args:
         request (ThumbnailRequest): A request object containing the video file's ID, the timestamp for the thumbnail,
-                                    and optionally the resolution of the thumbnail.
+                                    and optionally the resolution, seek accuracy, image format and quality of the thumbnail.
 
     Returns:
         ThumbnailResponse: An object containing the unique identifier of the generated thumbnail.
 
     Raises:
-        HTTPException: An HTTP 400 error for unsupported video resolutions or timestamps.
+        HTTPException: An HTTP 400 error for unsupported video resolutions, timestamps, seek accuracies, image formats or qualities, or timestamps past the end of the video.
         HTTPException: An HTTP 404 error if the video file is not found.
+        HTTPException: An HTTP 429 error with a Retry-After header if too many FFmpeg processes are queued.
         HTTPException: An HTTP 500 error for any other server-side error.
     """
     if not is_valid_resolution(request.resolution):
@@ -75,39 +238,344 @@ async def generate_thumbnail(request: ThumbnailRequest):
     if not is_valid_seconds(request.timestamp):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported timestamp format: {request.timestamp}")
 
+    if not is_valid_seek_accuracy(request.accuracy):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported seek accuracy: {request.accuracy}")
+
+    if not is_valid_image_format(request.format):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported image format: {request.format}")
+
+    if not is_valid_quality(request.quality):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported quality: {request.quality}")
+
     try:
-        thumbnail_id = await VideoService.generate_thumbnail(request.file_id, seconds_to_timestamp(request.timestamp), request.resolution)
+        thumbnail_id = await VideoService.generate_thumbnail(
+            request.file_id, seconds_to_timestamp(request.timestamp), request.resolution, request.accuracy, request.format, request.quality
+        )
         return ThumbnailResponse(thumbnail_id=thumbnail_id)
     except FileNotFoundError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Video file not found")
+    except TimestampOutOfRangeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except FFmpegBusyError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.post("/generate-thumbnails", response_model=BatchThumbnailResponse)
+async def generate_thumbnails(request: BatchThumbnailRequest):
+    """
+    Generate several thumbnails for a video with a single FFmpeg invocation. Validates every resolution and timestamp
+    before processing.
+
+    Args:
+        request (BatchThumbnailRequest): A request object containing the video file's ID and the timestamps and
+                                         resolutions of the thumbnails, at most `BATCH_MAX_THUMBNAILS` of them.
+
+    Returns:
+        BatchThumbnailResponse: An object containing the unique identifiers of the thumbnails, in request order.
+
+    Raises:
+        HTTPException: An HTTP 400 error for too many thumbnails, unsupported video resolutions, timestamps, seek accuracies, image formats or qualities, or timestamps past
+                       the end of the video.
+        HTTPException: An HTTP 404 error if the video file is not found.
+        HTTPException: An HTTP 429 error with a Retry-After header if too many FFmpeg processes are queued.
+        HTTPException: An HTTP 500 error for any other server-side error.
+    """
+    max_thumbnails = get_config().BATCH_MAX_THUMBNAILS
+    if len(request.thumbnails) > max_thumbnails:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Too many thumbnails requested, the maximum is {max_thumbnails}")
+
+    if not is_valid_seek_accuracy(request.accuracy):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported seek accuracy: {request.accuracy}")
+
+    if not is_valid_image_format(request.format):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported image format: {request.format}")
+
+    if not is_valid_quality(request.quality):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported quality: {request.quality}")
+
+    for thumbnail in request.thumbnails:
+        if not is_valid_resolution(thumbnail.resolution):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported video resolution: {thumbnail.resolution}")
+
+        if not is_valid_seconds(thumbnail.timestamp):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported timestamp format: {thumbnail.timestamp}")
+
+    try:
+        thumbnails = [(seconds_to_timestamp(thumbnail.timestamp), thumbnail.resolution) for thumbnail in request.thumbnails]
+        thumbnail_ids = await VideoService.generate_thumbnails(request.file_id, thumbnails, request.accuracy, request.format, request.quality)
+        return BatchThumbnailResponse(thumbnail_ids=thumbnail_ids)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Video file not found")
+    except TimestampOutOfRangeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except FFmpegBusyError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+def thumbnail_etag(thumbnail_id: str, image_format: str) -> str:
+    """
+    Returns the strong ETag of a thumbnail variant.
+
+    JPEG thumbnails keep the ETag they had before other formats were supported.
+
+    Args:
+        thumbnail_id (str): The unique identifier of the thumbnail.
+        image_format (str): The image format of the variant.
+
+    Returns:
+        str: The quoted entity tag.
+    """
+    if image_format == "jpeg":
+        return f'"{thumbnail_id}"'
+    return f'"{thumbnail_id}.{image_extension(image_format)}"'
+
 @router.get("/get-thumbnail/{thumbnail_id}")
-async def get_thumbnail(thumbnail_id: str):
+async def get_thumbnail(thumbnail_id: str, accept: Optional[str] = Header(None), if_none_match: Optional[str] = Header(None)):
     """
     Retrieve a thumbnail image by its unique identifier.
 
+    A thumbnail may be stored in several image formats. The variant is picked by the client's Accept header,
+    preferring smaller formats among those the client rates equally, and the response varies by Accept.
+
+    Thumbnail identifiers are derived from the parameters of the render, so the identifier and format double as a
+    strong ETag. A request whose If-None-Match header lists the ETag of a variant is answered with 304 Not
+    Modified without reading storage. If-None-Match: * only matches once a stored variant has been found.
+
+    Thumbnails in local storage are sent from their file rather than read into memory first. When
+    `THUMBNAIL_DELIVERY` is "redirect", thumbnails in S3 are answered with a 302 to a short-lived presigned URL,
+    so the image never passes through the API. The redirect itself is not cacheable, since the URL expires.
+
     Args:
         thumbnail_id (str): The unique identifier of the thumbnail to retrieve.
+        accept (Optional[str]): The Accept request header, if present.
+        if_none_match (Optional[str]): The If-None-Match request header, if present.
 
     Returns:
-        StreamingResponse: A streaming response containing the thumbnail image.
+        Response: A response containing the thumbnail image, a redirect to it, or an empty 304 response if the
+            client's copy is current.
 
     Raises:
         HTTPException: An HTTP 404 error if the thumbnail file is not found.
         HTTPException: An HTTP 500 error for any other server-side error.
     """
+    # "*" matches any current representation, so it cannot be answered before one has been found
+    if if_none_match is not None and if_none_match.strip() != "*":
+        for image_format in supported_image_formats():
+            etag = thumbnail_etag(thumbnail_id, image_format)
+            if etag_matches(if_none_match, etag):
+                headers = {"ETag": etag, "Cache-Control": THUMBNAIL_CACHE_CONTROL, "Vary": "Accept"}
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
     try:
-        file_content, file_name = await VideoService.get_thumbnail(thumbnail_id)
+        image_format = await VideoService.find_thumbnail_format(thumbnail_id, accept)
+        etag = thumbnail_etag(thumbnail_id, image_format)
+        if if_none_match is not None and etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": THUMBNAIL_CACHE_CONTROL, "Vary": "Accept"})
+        media_type = image_content_type(image_format)
+
+        location = await VideoService.get_thumbnail_location(thumbnail_id, image_format, allow_url=get_config().THUMBNAIL_DELIVERY == "redirect")
+        if location is not None and not os.path.isfile(location):
+            return RedirectResponse(location, status_code=status.HTTP_302_FOUND, headers={"ETag": etag, "Cache-Control": "no-store", "Vary": "Accept"})
 
         headers = {
-            "Content-Disposition": f"attachment; filename={file_name}",
-            "Content-Type": "image/jpeg",
+            "Content-Disposition": f"attachment; filename={VideoService.thumbnail_file_name(thumbnail_id, image_format)}",
+            "ETag": etag,
+            "Cache-Control": THUMBNAIL_CACHE_CONTROL,
+            "Vary": "Accept",
         }
 
-        return StreamingResponse(iter([file_content]), headers=headers)
+        if location is not None:
+            # The file stays pinned in the storage cache until it has been sent
+            release = BackgroundTask(VideoService.release_thumbnail_location, thumbnail_id, image_format, location)
+            return FileResponse(location, media_type=media_type, headers=headers, background=release)
+
+        file_content, _ = await VideoService.get_thumbnail(thumbnail_id, image_format)
+        return Response(file_content, media_type=media_type, headers=headers)
     except FileNotFoundError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Thumbnail not found")
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.post("/generate-sprite", response_model=SpriteResponse)
+async def generate_sprite(request: SpriteRequest):
+    """
+    Generate a sprite sheet of seek-bar preview tiles for a video, along with a WebVTT index mapping time ranges to tiles.
+    Validates the interval and the tile layout before processing.
+
+    Args:
+        request (SpriteRequest): A request object containing the video file's ID, the interval between tiles, the number
+                                 of columns and rows, and the size of a tile.
+
+    Returns:
+        SpriteResponse: An object containing the unique identifier of the sprite sheet. The sheet and its index are
+                        retrieved from /get-sprite/{sprite_id}.jpg and /get-sprite/{sprite_id}.vtt.
+
+    Raises:
+        HTTPException: An HTTP 400 error for an unsupported interval or tile layout.
+        HTTPException: An HTTP 404 error if the video file is not found.
+        HTTPException: An HTTP 429 error with a Retry-After header if too many FFmpeg processes are queued.
+        HTTPException: An HTTP 500 error for any other server-side error.
+    """
+    config = get_config()
+
+    if request.interval <= 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported interval: {request.interval}")
+
+    if request.columns <= 0 or request.rows <= 0 or request.columns * request.rows > config.SPRITE_MAX_TILES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported tile layout: {request.columns}x{request.rows}, at most {config.SPRITE_MAX_TILES} tiles are allowed")
+
+    if not (0 < request.tile_width <= config.SPRITE_MAX_TILE_SIZE and 0 < request.tile_height <= config.SPRITE_MAX_TILE_SIZE):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported tile size: {request.tile_width}x{request.tile_height}")
+
+    try:
+        sprite_id = await VideoService.generate_sprite(request.file_id, request.interval, request.columns, request.rows, request.tile_width, request.tile_height)
+        return SpriteResponse(sprite_id=sprite_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Video file not found")
+    except FFmpegBusyError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/get-sprite/{file_name}")
+async def get_sprite(file_name: str, if_none_match: Optional[str] = Header(None)):
+    """
+    Retrieve a sprite sheet or its WebVTT index by file name.
+
+    As with thumbnails, sprite identifiers are derived from the parameters of the render, so the file name doubles
+    as a strong ETag.
+
+    Args:
+        file_name (str): The file name of the sprite sheet ({sprite_id}.jpg) or of its index ({sprite_id}.vtt).
+        if_none_match (Optional[str]): The If-None-Match request header, if present.
+
+    Returns:
+        Response: A response containing the sprite sheet or index, or an empty 304 response if the client's copy is current.
+
+    Raises:
+        HTTPException: An HTTP 404 error if the sprite file is not found.
+        HTTPException: An HTTP 500 error for any other server-side error.
+    """
+    etag = f'"{file_name}"'
+    cache_headers = {
+        "ETag": etag,
+        "Cache-Control": THUMBNAIL_CACHE_CONTROL,
+    }
+
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+    try:
+        file_content = await VideoService.get_sprite(file_name)
+        media_type = "text/vtt" if file_name.endswith(".vtt") else "image/jpeg"
+        return Response(file_content, media_type=media_type, headers=cache_headers)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sprite not found")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/ffmpeg-stats")
+async def ffmpeg_stats():
+    """
+    Report the limits, current load and wait-time accounting of the FFmpeg process pool, for sizing instances.
+
+    Returns:
+        dict: The process and queue limits, the number of running and queued FFmpeg commands, the number of completed
+              and rejected commands, and the mean and maximum time commands waited for a process in seconds.
+    """
+    return VideoService.ffmpeg_executor.stats()
+
+def job_response(job: Job) -> JobResponse:
+    """
+    Converts a thumbnail job into its API representation.
+
+    Args:
+        job (Job): The job to convert.
+
+    Returns:
+        JobResponse: The status of the job, with the thumbnail ID once it has succeeded.
+    """
+    return JobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        thumbnail_id=(job.result or {}).get("thumbnail_id"),
+        error=job.error
+    )
+
+@router.post("/jobs/generate-thumbnail", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_thumbnail_job(request: ThumbnailRequest):
+    """
+    Queue the generation of a thumbnail as a background job. Validates the resolution and timestamp, and that the
+    video exists and is long enough, before queueing.
+
+    The job is persisted before the response is sent, so it survives a restart. Poll /jobs/{job_id} for the result.
+
+    Args:
+        request (ThumbnailRequest): A request object containing the video file's ID, the timestamp for the thumbnail,
+                                    and optionally the resolution, seek accuracy, image format and quality of the thumbnail.
+
+    Returns:
+        JobResponse: An object containing the unique identifier and status of the queued job.
+
+    Raises:
+        HTTPException: An HTTP 400 error for unsupported video resolutions, timestamps, seek accuracies, image formats or qualities, or timestamps past the end of the video.
+        HTTPException: An HTTP 404 error if the video file is not found.
+        HTTPException: An HTTP 500 error for any other server-side error.
+    """
+    if not is_valid_resolution(request.resolution):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported video resolution: {request.resolution}")
+
+    if not is_valid_seconds(request.timestamp):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported timestamp format: {request.timestamp}")
+
+    if not is_valid_seek_accuracy(request.accuracy):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported seek accuracy: {request.accuracy}")
+
+    if not is_valid_image_format(request.format):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported image format: {request.format}")
+
+    if not is_valid_quality(request.quality):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported quality: {request.quality}")
+
+    try:
+        record = await VideoService.get_video_metadata(request.file_id)
+        timestamp = seconds_to_timestamp(request.timestamp)
+        VideoService.check_timestamp(record, timestamp)
+
+        job = await VideoService.job_queue.submit("thumbnail", {
+            "file_id": request.file_id,
+            "timestamp": timestamp,
+            "resolution": request.resolution,
+            "accuracy": request.accuracy,
+            "format": request.format,
+            "quality": request.quality,
+        })
+        return job_response(job)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Video file not found")
+    except TimestampOutOfRangeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """
+    Report the status of a background job.
+
+    Args:
+        job_id (str): The unique identifier of the job.
+
+    Returns:
+        JobResponse: An object containing the status of the job, the thumbnail's unique identifier once the job has
+                     succeeded, and the reason it failed if it has.
+
+    Raises:
+        HTTPException: An HTTP 404 error if the job is not found.
+    """
+    job = await VideoService.job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job_response(job)
@@ -1,10 +1,39 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 class VideoUploadResponse(BaseModel):
     filename: str = Field(..., description="Original name of the uploaded video file")
     file_id: str = Field(..., description="Generated unique ID for the uploaded video file")
     
+class UploadInitiateRequest(BaseModel):
+    filename: str = Field(..., description="Original name of the video file")
+    size: int = Field(..., gt=0, description="Size of the video file in bytes")
+    content_type: Optional[str] = Field(None, description="MIME type of the video file")
+
+class UploadInitiateResponse(BaseModel):
+    file_id: str = Field(..., description="Generated unique ID for the video file, to pass to /upload/complete")
+    url: Optional[str] = Field(None, description="URL to PUT the whole file to, for single-request uploads")
+    upload_id: Optional[str] = Field(None, description="ID of the multipart upload, for multipart uploads")
+    part_urls: List[str] = Field([], description="URLs to PUT each part to in order, for multipart uploads")
+    part_size: Optional[int] = Field(None, description="Size in bytes of every part but the last, for multipart uploads")
+    expires_in: int = Field(..., description="Seconds the URLs stay valid")
+
+class UploadCompleteRequest(BaseModel):
+    file_id: str
+    part_etags: Optional[List[str]] = Field(None, description="ETag response header of each uploaded part in order, for multipart uploads")
+
+class VideoMetadataResponse(BaseModel):
+    file_id: str = Field(..., description="Unique ID of the video file")
+    size: int = Field(..., description="Size of the video file in bytes")
+    content_type: Optional[str] = Field(None, description="MIME type of the video file")
+    uploaded_at: float = Field(..., description="Upload time as a UNIX timestamp")
+    duration: Optional[float] = Field(None, description="Length of the video in seconds")
+    codec: Optional[str] = Field(None, description="Codec of the video stream")
+    width: Optional[int] = Field(None, description="Width of the video stream in pixels")
+    height: Optional[int] = Field(None, description="Height of the video stream in pixels")
+    frame_rate: Optional[float] = Field(None, description="Average frame rate in frames per second")
+    container: Optional[str] = Field(None, description="Container format names reported by ffprobe")
+
 class ThumbnailResponse(BaseModel):
     thumbnail_id: str
 
@@ -12,3 +41,37 @@ class ThumbnailRequest(BaseModel):
     file_id: str
     timestamp: int
     resolution: Optional[str] = "320x240"
+    accuracy: Optional[str] = Field("exact", description="'exact' for the frame at the timestamp, 'fast' for the nearest keyframe before it")
+    format: Optional[str] = Field("jpeg", description="Image format of the thumbnail: 'jpeg', 'webp', 'avif' or 'png'")
+    quality: Optional[int] = Field(None, description="Encoding quality from 1 to 100, or the encoder's default if omitted")
+
+class ThumbnailSpec(BaseModel):
+    timestamp: int
+    resolution: Optional[str] = "320x240"
+
+class BatchThumbnailRequest(BaseModel):
+    file_id: str
+    thumbnails: List[ThumbnailSpec] = Field(..., min_length=1, description="Thumbnails to extract from the video")
+    accuracy: Optional[str] = Field("exact", description="'exact' for the frames at the timestamps, 'fast' for the nearest keyframes before them")
+    format: Optional[str] = Field("jpeg", description="Image format of the thumbnails: 'jpeg', 'webp', 'avif' or 'png'")
+    quality: Optional[int] = Field(None, description="Encoding quality from 1 to 100, or the encoder's default if omitted")
+
+class BatchThumbnailResponse(BaseModel):
+    thumbnail_ids: List[str] = Field(..., description="IDs of the generated thumbnails, in request order")
+
+class SpriteRequest(BaseModel):
+    file_id: str
+    interval: int = Field(10, description="Seconds between consecutive tiles")
+    columns: int = Field(10, description="Number of tiles per row")
+    rows: int = Field(10, description="Number of rows of tiles")
+    tile_width: int = Field(160, description="Width of a tile in pixels")
+    tile_height: int = Field(90, description="Height of a tile in pixels")
+
+class SpriteResponse(BaseModel):
+    sprite_id: str = Field(..., description="ID of the sprite sheet and of its WebVTT index")
+
+class JobResponse(BaseModel):
+    job_id: str = Field(..., description="ID of the background job")
+    status: str = Field(..., description="Status of the job: queued, running, succeeded or failed")
+    thumbnail_id: Optional[str] = Field(None, description="ID of the generated thumbnail, once the job has succeeded")
+    error: Optional[str] = Field(None, description="Reason the job failed, if it has")
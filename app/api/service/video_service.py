@@ -1,12 +1,44 @@
-from typing import Tuple
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 from app.storage.storage_service import StorageService
 from app.storage.storage_factory import get_storage_service
-from app.helpers.video import supported_video_formats
+from app.metadata.video_index import PendingUpload, VideoIndex, VideoRecord
+from app.metadata.probe import VideoMetadata, probe_video
+from app.metadata.keyframes import KeyframeIndex, build_keyframe_index, supports_partial_decoding
+from app.jobs.job_queue import JobQueue
+from app.helpers.single_flight import SingleFlight
+from app.helpers.cache import LRUByteCache
+from app.helpers.webvtt import build_sprite_vtt
+from app.helpers.ffmpeg import FFmpegBusyError, FFmpegExecutor
+from app.extraction.extraction_engine import ExtractionEngine
+from app.extraction.engine_factory import get_extraction_engine
+from app.helpers.video import master_frame_resolution, pregeneration_timestamps, seconds_to_timestamp, seek_input_args, seek_output_args, timestamp_to_seconds
+from app.helpers.signing import verify_upload_signature
+from app.helpers.http import rank_media_types
+from app.helpers.timing import phase
+from app.helpers.image import image_content_type, image_encoder_args, image_extension, resize_frame, supported_image_formats
+from app.storage.storage_provider import UploadTarget
+from app.config import get_config
 
 import os
+import time
 import uuid
-import subprocess
 import asyncio
+import contextvars
+import tempfile
+import aiofiles
+import aiofiles.os
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+
+class TimestampOutOfRangeError(ValueError):
+    """
+    Raised when a thumbnail is requested at a timestamp at or beyond the end of the video.
+    """
+
+class UploadIncompleteError(ValueError):
+    """
+    Raised when a direct upload is completed before the whole video has reached storage.
+    """
 
 class VideoService:
     """
@@ -20,100 +52,1067 @@ class VideoService:
     THUMBNAIL_DIR = "thumbnails"
     """str: Directory to store generated thumbnail images."""
 
+    SPRITE_DIR = "sprites"
+    """str: Directory to store generated sprite sheets and their WebVTT indexes."""
+
+    THUMBNAIL_NAMESPACE = uuid.UUID("6f1c3b52-8a4e-4f0e-9d0a-3c5e2b7a9f41")
+    """uuid.UUID: Namespace from which deterministic thumbnail identifiers are derived."""
+
     storage_service: StorageService = get_storage_service()
 
+    video_index: VideoIndex = VideoIndex(get_config().VIDEO_INDEX_PATH)
+
+    job_queue: JobQueue = JobQueue(get_config().JOB_QUEUE_PATH, get_config().JOB_LEASE_SECONDS)
+    """JobQueue: Durable queue of background thumbnail jobs."""
+
+    thumbnail_renders: SingleFlight = SingleFlight()
+    """SingleFlight: Coalesces concurrent renders of the same thumbnail."""
+
+    pregenerations: Dict[str, asyncio.Task] = {}
+    """Dict[str, asyncio.Task]: The running pregeneration of each thumbnail file being pregenerated after an upload."""
+
+    keyframe_index_builds: Dict[str, asyncio.Task] = {}
+    """Dict[str, asyncio.Task]: The running background build of the keyframe index of each video."""
+
+    thumbnail_cache: LRUByteCache = LRUByteCache(get_config().THUMBNAIL_CACHE_MAX_BYTES, get_config().THUMBNAIL_CACHE_TTL)
+    """LRUByteCache: In-memory cache of thumbnail contents keyed by file name."""
+
+    master_frame_cache: LRUByteCache = LRUByteCache(get_config().MASTER_FRAME_CACHE_MAX_BYTES)
+    """LRUByteCache: In-memory cache of decoded raw RGB frames keyed by video, timestamp, seek accuracy and resolution."""
+
+    keyframe_index_cache: LRUByteCache = LRUByteCache(get_config().KEYFRAME_INDEX_CACHE_MAX_BYTES)
+    """LRUByteCache: In-memory cache of serialized keyframe indexes keyed by file identifier."""
+
+    ffmpeg_executor: FFmpegExecutor = FFmpegExecutor(
+        get_config().FFMPEG_MAX_PROCESSES, get_config().FFMPEG_MAX_QUEUE, get_config().FFMPEG_THREADS, get_config().FFMPEG_RETRY_AFTER
+    )
+    """FFmpegExecutor: Bounds the number of FFmpeg processes run by the service and queues the rest."""
+
+    extraction_engine: ExtractionEngine = get_extraction_engine(ffmpeg_executor)
+    """ExtractionEngine: Extracts single thumbnails, by running FFmpeg or in-process, as set by `THUMBNAIL_ENGINE`."""
+
     @staticmethod
-    async def upload_video(file_name: str, file_data: bytes) -> dict:
+    async def upload_video(file_name: str, file_data: Union[bytes, AsyncIterator[bytes]], content_type: Optional[str] = None) -> Tuple[str, str]:
         """
-        Handles the uploading of a video file.
+        Handles the uploading of a video file and records it in the video index.
+
+        Once stored, the video is probed with ffprobe, and its duration, codec, dimensions, frame rate and
+        container are recorded alongside it. Videos that cannot be probed are recorded without them. Thumbnails
+        may then be pregenerated in the background, see `schedule_pregeneration`.
 
         Args:
-            file (UploadFile): The video file to be uploaded.
+            file_name (str): The original name of the uploaded video file.
+            file_data (Union[bytes, AsyncIterator[bytes]]): The content of the video, either as bytes or as an
+                async iterator of chunks. Chunks are streamed to storage without buffering the whole video.
+            content_type (Optional[str], optional): The MIME type of the video, if known. Defaults to None.
 
         Returns:
-            VideoUploadResponse: An object containing the filename and unique identifier of the uploaded video.
+            Tuple[str, str]: A tuple containing the original file name and the unique identifier of the uploaded video.
+
+        Raises:
+            FFmpegBusyError: If every FFmpeg process slot is taken and the wait queue is full. The stored video is
+                deleted, so that the upload can be retried.
         """
         file_id = str(uuid.uuid4())
         file_extension = os.path.splitext(file_name)[1]
         file_location = os.path.join(VideoService.UPLOAD_DIR, f"{file_id}{file_extension}")
 
-        success = await VideoService.storage_service.write_file(file_location, file_data)
+        if isinstance(file_data, (bytes, bytearray)):
+            size = len(file_data)
+            success = await VideoService.storage_service.write_file(file_location, file_data)
+        else:
+            size = 0
+
+            async def count_chunks():
+                nonlocal size
+                async for chunk in file_data:
+                    size += len(chunk)
+                    yield chunk
+
+            success = await VideoService.storage_service.write_stream(file_location, count_chunks())
 
         if not success:
             raise Exception("Failed to save video file")
 
+        try:
+            await VideoService._register_video(file_id, file_location, size, content_type)
+        except Exception:
+            # A retried upload is stored under a new identifier, so this copy would never be registered
+            await VideoService.storage_service.delete_file(file_location)
+            raise
         return file_name, file_id
 
     @staticmethod
-    async def generate_thumbnail(file_id: str, timestamp: str = "00:00:01", resolution: str = "320x240") -> str:
+    async def _register_video(file_id: str, file_location: str, size: int, content_type: Optional[str]) -> None:
+        """
+        Probes a stored video and records it in the video index.
+
+        The keyframe index is not built here, since it only serves videos that are not on local disk; see
+        `schedule_keyframe_index`.
+
+        Thumbnails are then pregenerated in the background if `PREGENERATE_THUMBNAILS` is set, see
+        `schedule_pregeneration`.
+
+        Args:
+            file_id (str): Unique identifier of the video file.
+            file_location (str): The storage path of the video file.
+            size (int): The size of the video in bytes.
+            content_type (Optional[str]): The MIME type of the video, if known.
+
+        Raises:
+            FFmpegBusyError: If every FFmpeg process slot is taken and the wait queue is full.
+        """
+        metadata = await VideoService._probe(file_location) or VideoMetadata()
+
+        await VideoService.video_index.add(VideoRecord(
+            file_id=file_id,
+            extension=os.path.splitext(file_location)[1].lstrip('.').lower(),
+            storage_key=file_location,
+            size=size,
+            content_type=content_type,
+            uploaded_at=time.time(),
+            **asdict(metadata)
+        ))
+
+        if get_config().PREGENERATE_THUMBNAILS:
+            VideoService.schedule_pregeneration(file_id, metadata.duration)
+
+    @staticmethod
+    def schedule_pregeneration(file_id: str, duration: Optional[float]) -> asyncio.Task:
+        """
+        Starts rendering the thumbnails most videos are asked for right after upload, in the background.
+
+        A poster frame at `PREGENERATE_POSTER_OFFSET` seconds and `PREGENERATE_FRAME_COUNT` evenly spaced frames
+        are rendered at each of `PREGENERATE_RESOLUTIONS` in a single FFmpeg pass with `generate_thumbnails`, as
+        exact-seek JPEGs at the default quality. Their identifiers are those of the matching thumbnail requests,
+        so those requests are then served from storage, and requests made during the pregeneration wait for it.
+        Failures are logged and leave the thumbnails to be rendered on request.
+
+        Args:
+            file_id (str): Unique identifier of the video file.
+            duration (Optional[float]): The length of the video in seconds, if known. Without it, only the poster
+                frame is pregenerated.
+
+        Returns:
+            asyncio.Task: The pregeneration, registered in `pregenerations` until it completes.
+        """
+        config = get_config()
+        thumbnails = [
+            (seconds_to_timestamp(seconds), resolution)
+            for seconds in pregeneration_timestamps(duration, config.PREGENERATE_POSTER_OFFSET, config.PREGENERATE_FRAME_COUNT)
+            for resolution in config.PREGENERATE_RESOLUTIONS
+        ]
+        file_names = [
+            VideoService.thumbnail_file_name(VideoService.thumbnail_id_for(file_id, timestamp, resolution), "jpeg")
+            for timestamp, resolution in thumbnails
+        ]
+
+        async def pregenerate() -> None:
+            try:
+                await VideoService.generate_thumbnails(file_id, thumbnails)
+            except Exception as e:
+                print(f"Failed to pregenerate thumbnails for {file_id}: {str(e)}")
+
+        # Started in an empty context, so its phases are not reported as part of the upload request
+        task = asyncio.create_task(pregenerate(), context=contextvars.Context())
+        for file_name in file_names:
+            VideoService.pregenerations[file_name] = task
+
+        def forget(done: asyncio.Task) -> None:
+            for file_name in file_names:
+                if VideoService.pregenerations.get(file_name) is done:
+                    del VideoService.pregenerations[file_name]
+
+        task.add_done_callback(forget)
+        return task
+
+    @staticmethod
+    async def initiate_upload(file_name: str, size: int, content_type: Optional[str] = None) -> Tuple[str, UploadTarget]:
+        """
+        Starts a direct upload, in which the client sends the video to storage itself instead of through the API.
+
+        A file identifier is allocated and the upload is recorded as pending until `complete_upload` is called.
+
+        Args:
+            file_name (str): The original name of the video file.
+            size (int): The size of the video in bytes.
+            content_type (Optional[str], optional): The MIME type of the video, if known. Defaults to None.
+
+        Returns:
+            Tuple[str, UploadTarget]: The unique identifier of the video and the URLs to upload it to, valid for
+                `UPLOAD_URL_EXPIRATION` seconds.
+
+        Raises:
+            Exception: If the storage provider could not create the upload URLs.
+        """
+        file_id = str(uuid.uuid4())
+        file_location = os.path.join(VideoService.UPLOAD_DIR, f"{file_id}{os.path.splitext(file_name)[1]}")
+
+        target = await VideoService.storage_service.create_upload_target(
+            file_location, size, content_type, get_config().UPLOAD_URL_EXPIRATION
+        )
+        if target is None:
+            raise Exception("Failed to create upload URLs")
+
+        await VideoService.video_index.add_pending(PendingUpload(
+            file_id, file_name, file_location, size, content_type, target.upload_id, time.time()
+        ))
+        return file_id, target
+
+    @staticmethod
+    async def complete_upload(file_id: str, part_etags: Optional[List[str]] = None) -> Tuple[str, str]:
+        """
+        Completes a direct upload once the client has sent the video to storage, and registers the video.
+
+        The video is probed and indexed exactly as if it had been uploaded through `upload_video`.
+
+        Args:
+            file_id (str): Unique identifier returned by `initiate_upload`.
+            part_etags (Optional[List[str]], optional): The ETag returned by storage for each part, in part order.
+                Required for multipart uploads. Defaults to None.
+
+        Returns:
+            Tuple[str, str]: A tuple containing the original file name and the unique identifier of the video.
+
+        Raises:
+            FileNotFoundError: If no upload of the video is pending.
+            UploadIncompleteError: If the parts could not be assembled, or the stored video is missing or does not
+                have the declared size.
+            FFmpegBusyError: If every FFmpeg process slot is taken and the wait queue is full. The upload stays
+                pending, so that it can be completed again.
+        """
+        upload = await VideoService.video_index.get_pending(file_id)
+        if upload is None:
+            raise FileNotFoundError("Upload not found")
+
+        if upload.upload_id is not None:
+            if not part_etags or not await VideoService.storage_service.complete_upload(upload.storage_key, upload.upload_id, part_etags):
+                raise UploadIncompleteError("The uploaded parts could not be assembled")
+
+        size = await VideoService.storage_service.file_size(upload.storage_key)
+        if size is None:
+            raise UploadIncompleteError("The video has not been uploaded")
+        if size != upload.size:
+            raise UploadIncompleteError(f"The uploaded video has {size} bytes instead of {upload.size}")
+
+        await VideoService._register_video(file_id, upload.storage_key, size, upload.content_type)
+        await VideoService.video_index.remove_pending(file_id)
+        return upload.file_name, file_id
+
+    @staticmethod
+    async def write_signed_upload(file_path: str, expires: int, signature: str, chunks: AsyncIterator[bytes]) -> None:
+        """
+        Writes the body of a signed direct upload to local storage.
+
+        This is the local counterpart of a presigned S3 PUT URL, for URLs created by `LocalStorage`. The URL is only
+        accepted while the upload is pending, so a completed video cannot be overwritten. A partially written video
+        is removed, so that the upload cannot be completed with it.
+
+        Args:
+            file_path (str): The storage path the URL was signed for.
+            expires (int): The expiry time the URL was signed with, as a UNIX timestamp.
+            signature (str): The signature of the URL.
+            chunks (AsyncIterator[bytes]): The body of the upload.
+
+        Raises:
+            PermissionError: If the signature is invalid or has expired, or the upload is no longer pending.
+            Exception: If the video could not be written.
+        """
+        if not verify_upload_signature(file_path, expires, signature, get_config().UPLOAD_SIGNING_KEY):
+            raise PermissionError("Invalid or expired upload signature")
+
+        file_id = os.path.splitext(os.path.basename(file_path))[0]
+        upload = await VideoService.video_index.get_pending(file_id)
+        if upload is None or upload.storage_key != file_path:
+            raise PermissionError("Upload is no longer pending")
+
+        if not await VideoService.storage_service.write_stream(file_path, chunks):
+            await VideoService.storage_service.delete_file(file_path)
+            raise Exception("Failed to save video file")
+
+    @staticmethod
+    async def _probe(video_path: str) -> Optional[VideoMetadata]:
+        """
+        Probes a stored video with ffprobe.
+
+        Args:
+            video_path (str): The storage path of the video file.
+
+        Returns:
+            Optional[VideoMetadata]: The metadata of the video, or None if it could not be probed.
+
+        Raises:
+            FFmpegBusyError: If every FFmpeg process slot is taken and the wait queue is full.
+        """
+        try:
+            async with VideoService._open_video_source(video_path) as source:
+                return await probe_video(source, VideoService.ffmpeg_executor)
+        except FFmpegBusyError:
+            # The video is probeable, so it is not recorded without metadata
+            raise
+        except Exception as e:
+            print("Failed to probe video:", e)
+            return None
+
+    @staticmethod
+    def keyframe_index_path(file_id: str) -> str:
+        """
+        Returns the storage path of the keyframe index of a video.
+
+        Args:
+            file_id (str): Unique identifier of the video file.
+
+        Returns:
+            str: The storage path of the index, next to the uploaded video.
+        """
+        return os.path.join(VideoService.UPLOAD_DIR, f"{file_id}.keyframes")
+
+    @staticmethod
+    async def _build_keyframe_index(file_id: str, video_path: str, size: int) -> Optional[KeyframeIndex]:
+        """
+        Builds the keyframe index of a stored MP4 or MOV video and stores it next to the video.
+
+        Failures are logged and otherwise ignored, since thumbnails of a video without an index are rendered
+        from the whole video. A saturated FFmpeg queue is not a failure of the video, so it is raised instead.
+
+        Args:
+            file_id (str): Unique identifier of the video file.
+            video_path (str): The storage path of the video file.
+            size (int): The size of the video in bytes.
+
+        Returns:
+            Optional[KeyframeIndex]: The stored index, or None if it could not be built or stored.
+
+        Raises:
+            FFmpegBusyError: If every FFmpeg process slot is taken and the wait queue is full.
+        """
+        try:
+            async with VideoService._open_video_source(video_path) as source:
+                index = await build_keyframe_index(
+                    source,
+                    lambda start, end: VideoService.storage_service.read_range(video_path, start, end),
+                    size,
+                    VideoService.ffmpeg_executor
+                )
+            if index is None:
+                return None
+            data = index.to_bytes()
+            if not await VideoService.storage_service.write_file(VideoService.keyframe_index_path(file_id), data):
+                print("Failed to save keyframe index")
+                return None
+            VideoService.keyframe_index_cache.set(file_id, data)
+            return index
+        except FFmpegBusyError:
+            raise
+        except Exception as e:
+            print("Failed to build keyframe index:", e)
+            return None
+
+    @staticmethod
+    def schedule_keyframe_index(record: VideoRecord) -> asyncio.Task:
+        """
+        Starts building the keyframe index of a video in the background, unless it is being built already.
+
+        Indexes are built on the first thumbnail request that reads a video from remote storage, rather than at
+        upload, so that videos served from local disk never pay for the extra ffprobe pass. Failures, including a
+        saturated FFmpeg queue, are logged and leave the index to be built on a later request.
+
+        Args:
+            record (VideoRecord): The recorded metadata of the video.
+
+        Returns:
+            asyncio.Task: The build, registered in `keyframe_index_builds` until it completes.
+        """
+        task = VideoService.keyframe_index_builds.get(record.file_id)
+        if task is not None:
+            return task
+
+        async def build() -> None:
+            try:
+                await VideoService._build_keyframe_index(record.file_id, record.storage_key, record.size)
+            except Exception as e:
+                print(f"Failed to build keyframe index for {record.file_id}: {str(e)}")
+
+        # Started in an empty context, so its phases are not reported as part of the request that started it
+        task = asyncio.create_task(build(), context=contextvars.Context())
+        VideoService.keyframe_index_builds[record.file_id] = task
+        task.add_done_callback(lambda _: VideoService.keyframe_index_builds.pop(record.file_id, None))
+        return task
+
+    @staticmethod
+    async def _get_keyframe_index(file_id: str) -> Optional[KeyframeIndex]:
+        """
+        Loads the keyframe index of a video, from memory if it was loaded recently.
+
+        Args:
+            file_id (str): Unique identifier of the video file.
+
+        Returns:
+            Optional[KeyframeIndex]: The index, or None if the video has none or it is unreadable.
+        """
+        data = VideoService.keyframe_index_cache.get(file_id)
+        if data is None:
+            index_path = VideoService.keyframe_index_path(file_id)
+            if not await VideoService.storage_service.file_exists(index_path):
+                return None
+            data = await VideoService.storage_service.read_file(index_path)
+
+        try:
+            index = KeyframeIndex.from_bytes(data)
+        except ValueError as e:
+            print("Failed to load keyframe index:", e)
+            return None
+        VideoService.keyframe_index_cache.set(file_id, data)
+        return index
+
+    @staticmethod
+    async def get_video_metadata(file_id: str) -> VideoRecord:
+        """
+        Retrieves the recorded metadata of a video from the index, without reading the video itself.
+
+        Args:
+            file_id (str): Unique identifier of the video file.
+
+        Returns:
+            VideoRecord: The recorded metadata of the video.
+
+        Raises:
+            FileNotFoundError: If the video file is not found.
+        """
+        record = await VideoService.video_index.get(file_id)
+        if record is None:
+            raise FileNotFoundError("Video file not found")
+        return record
+
+    @staticmethod
+    def check_timestamp(record: VideoRecord, timestamp: str) -> None:
+        """
+        Checks that a timestamp lies within a video, using the duration recorded at upload.
+
+        Videos whose duration is unknown are not checked.
+
+        Args:
+            record (VideoRecord): The recorded metadata of the video.
+            timestamp (str): The timestamp to check.
+
+        Raises:
+            TimestampOutOfRangeError: If the timestamp is at or beyond the end of the video.
+        """
+        if record.duration is not None and timestamp_to_seconds(timestamp) >= record.duration:
+            raise TimestampOutOfRangeError(f"Timestamp {timestamp} is beyond the end of the video ({record.duration:.3f}s)")
+
+    @staticmethod
+    def thumbnail_id_for(file_id: str, timestamp: str, resolution: str, accuracy: str = "exact", quality: Optional[int] = None) -> str:
+        """
+        Derives the deterministic identifier of a thumbnail from its request parameters.
+
+        The image format is not part of the identifier: the same thumbnail in different formats is stored as
+        variants under the same identifier, with different file extensions.
+
+        Args:
+            file_id (str): Unique identifier of the video file.
+            timestamp (str): Timestamp of the thumbnail.
+            resolution (str): Resolution of the thumbnail.
+            accuracy (str, optional): Seek accuracy of the thumbnail. Defaults to "exact".
+            quality (Optional[int], optional): Encoding quality of the thumbnail, or None for the encoder's default.
+
+        Returns:
+            str: A UUID string that is identical for identical parameters.
+        """
+        # Thumbnails with default options keep the identifiers they had before those options were introduced
+        name = f"{file_id}|{timestamp}|{resolution}"
+        if accuracy != "exact":
+            name += f"|{accuracy}"
+        if quality is not None:
+            name += f"|q{quality}"
+        return str(uuid.uuid5(VideoService.THUMBNAIL_NAMESPACE, name))
+
+    @staticmethod
+    def thumbnail_file_name(thumbnail_id: str, image_format: str = "jpeg") -> str:
+        """
+        Returns the file name of a thumbnail variant.
+
+        Args:
+            thumbnail_id (str): The unique identifier of the thumbnail.
+            image_format (str, optional): The image format of the variant. Defaults to "jpeg".
+
+        Returns:
+            str: The file name, e.g. "{thumbnail_id}.webp".
+        """
+        return f"{thumbnail_id}.{image_extension(image_format)}"
+
+    @staticmethod
+    async def generate_thumbnail(
+        file_id: str,
+        timestamp: str = "00:00:01",
+        resolution: str = "320x240",
+        accuracy: str = "exact",
+        image_format: str = "jpeg",
+        quality: Optional[int] = None
+    ) -> str:
         """
         Generates a thumbnail image for a given video file.
 
+        Thumbnail identifiers are derived from the request parameters, so a thumbnail that was
+        already rendered is returned without running FFmpeg again. Concurrent requests for the
+        same thumbnail share a single render, and requests for a thumbnail that is being pregenerated
+        after upload wait for the pregeneration.
+
+        The frame decoded for a thumbnail is kept in memory as a master frame. Thumbnails of the same video,
+        timestamp and accuracy at another resolution, format or quality are then scaled and encoded from it in a
+        worker thread, without running FFmpeg.
+
         Args:
             file_id (str): Unique identifier of the video file.
             timestamp (str, optional): Timestamp to capture the thumbnail. Defaults to "00:00:01".
             resolution (str, optional): Resolution of the generated thumbnail. Defaults to "320x240".
+            accuracy (str, optional): "exact" captures the frame at the timestamp, "fast" the nearest keyframe
+                at or before it, which only needs the keyframe decoded. Defaults to "exact".
+            image_format (str, optional): The image format of the thumbnail: "jpeg", "webp", "avif" or "png".
+                Each format is stored as a variant of the same thumbnail identifier. Defaults to "jpeg".
+            quality (Optional[int], optional): The quality from 1 to 100, or None for the encoder's default.
 
         Returns:
             str: The unique identifier of the generated thumbnail.
 
         Raises:
             FileNotFoundError: If the video file is not found.
+            TimestampOutOfRangeError: If the timestamp is at or beyond the end of the video.
+            FFmpegBusyError: If every FFmpeg process slot is taken and the wait queue is full.
+            Exception: If FFmpeg fails to generate the thumbnail.
+        """
+        thumbnail_id = VideoService.thumbnail_id_for(file_id, timestamp, resolution, accuracy, quality)
+        file_name = VideoService.thumbnail_file_name(thumbnail_id, image_format)
+        pregeneration = VideoService.pregenerations.get(file_name)
+        if pregeneration is not None:
+            # Wait for the pregeneration to store the thumbnail rather than running FFmpeg for it a second time
+            await asyncio.wait([pregeneration])
+        return await VideoService.thumbnail_renders.do(
+            file_name,
+            lambda: VideoService._render_thumbnail(thumbnail_id, file_id, timestamp, resolution, accuracy, image_format, quality)
+        )
+
+    @staticmethod
+    async def _render_thumbnail(
+        thumbnail_id: str,
+        file_id: str,
+        timestamp: str,
+        resolution: str,
+        accuracy: str = "exact",
+        image_format: str = "jpeg",
+        quality: Optional[int] = None
+    ) -> str:
+        """
+        Renders a thumbnail variant and saves it, unless it has already been saved.
+
+        Args:
+            thumbnail_id (str): The deterministic identifier of the thumbnail.
+            file_id (str): Unique identifier of the video file.
+            timestamp (str): Timestamp to capture the thumbnail.
+            resolution (str): Resolution of the generated thumbnail.
+            accuracy (str, optional): Seek accuracy of the thumbnail. Defaults to "exact".
+            image_format (str, optional): Image format of the variant. Defaults to "jpeg".
+            quality (Optional[int], optional): Encoding quality of the thumbnail. Defaults to None.
+
+        Returns:
+            str: The identifier of the thumbnail.
+
+        Raises:
+            FileNotFoundError: If the video file is not found.
+            TimestampOutOfRangeError: If the timestamp is at or beyond the end of the video.
             Exception: If FFmpeg fails to generate the thumbnail.
         """
-        # Search for the video file in the supported formats
-        video_bytes = None
-        file_extension = None
-        for extension in supported_video_formats():
-            potential_path = os.path.join(VideoService.UPLOAD_DIR, f"{file_id}.{extension}")
-            if await VideoService.storage_service.file_exists(potential_path):
-                video_bytes = await VideoService.storage_service.read_file(potential_path)
-                file_extension = extension
-                break
-        if video_bytes is None:
+        file_name = VideoService.thumbnail_file_name(thumbnail_id, image_format)
+        thumbnail_path = os.path.join(VideoService.THUMBNAIL_DIR, file_name)
+        if await VideoService.storage_service.file_exists(thumbnail_path):
+            return thumbnail_id
+
+        # Resolve the video file through the index, and reject timestamps past its end before starting FFmpeg
+        with phase("index"):
+            record = await VideoService.video_index.get(file_id)
+        if record is None:
             raise FileNotFoundError("Video file not found")
+        VideoService.check_timestamp(record, timestamp)
 
-        # Generate a unique identifier for the thumbnail
-        thumbnail_id = str(uuid.uuid4())
-        thumbnail_path = os.path.join(VideoService.THUMBNAIL_DIR, thumbnail_id + '.jpg')
-
-        # Prepare FFmpeg command to generate thumbnail and output to stdout
-        ffmpeg_cmd = [
-            "ffmpeg",
-            "-f", file_extension,
-            "-i", "pipe:0",
-            "-ss", timestamp,
-            "-vframes", "1",
-            "-s", resolution,
-            "-f", "image2pipe",
-            "-c:v", "mjpeg",
-            "pipe:1"
-        ]
+        # Derive the thumbnail from a master frame of the same timestamp if one has been decoded
+        master_resolution = master_frame_resolution(record.width, record.height)
+        master_key = (file_id, timestamp, accuracy, master_resolution)
+        master_size = tuple(int(value) for value in master_resolution.split("x"))
+        frame = VideoService.master_frame_cache.get(master_key)
+        if frame is not None:
+            with phase("resize"):
+                content = await asyncio.to_thread(resize_frame, frame, master_size, resolution, image_format, quality)
+        else:
+            content, frame = await VideoService._extract_thumbnail(
+                record, timestamp, resolution, accuracy, image_format, quality,
+                master_resolution if VideoService.master_frame_cache.max_bytes > 0 else None
+            )
+            if frame is not None and len(frame) == master_size[0] * master_size[1] * 3:
+                VideoService.master_frame_cache.set(master_key, frame)
+
+        # Save thumbnail to storage and keep it in memory for the retrieval that usually follows
+        if not await VideoService.storage_service.write_file(thumbnail_path, content):
+            raise Exception("Failed to save thumbnail")
+        VideoService.thumbnail_cache.set(file_name, content)
+        await VideoService.video_index.add_thumbnail_formats(thumbnail_id, [image_format])
+
+        return thumbnail_id
+
+    @staticmethod
+    async def _extract_thumbnail(
+        record: VideoRecord,
+        timestamp: str,
+        resolution: str,
+        accuracy: str,
+        image_format: str,
+        quality: Optional[int],
+        master_resolution: Optional[str] = None
+    ) -> Tuple[bytes, Optional[bytes]]:
+        """
+        Extracts a thumbnail image with the configured extraction engine, optionally along with a raw master frame
+        from the same decode.
+
+        Args:
+            record (VideoRecord): The index record of the video.
+            timestamp (str): Timestamp to capture the thumbnail.
+            resolution (str): Resolution of the thumbnail.
+            accuracy (str): Seek accuracy of the thumbnail.
+            image_format (str): Image format of the thumbnail.
+            quality (Optional[int]): Encoding quality of the thumbnail.
+            master_resolution (Optional[str], optional): Resolution of the raw RGB master frame to extract, or None
+                to extract the thumbnail only. Defaults to None.
+
+        Returns:
+            Tuple[bytes, Optional[bytes]]: The encoded thumbnail and the master frame, or None if it was not
+                requested or not written.
+
+        Raises:
+            FFmpegBusyError: If every FFmpeg process slot is taken and the wait queue is full.
+            Exception: If the thumbnail could not be extracted.
+        """
+        with phase("extract"):
+            async with VideoService._open_thumbnail_source(record, timestamp) as (source, partial):
+                try:
+                    return await VideoService.extraction_engine.extract(
+                        source, timestamp, resolution, accuracy, image_format, quality, master_resolution
+                    )
+                except FFmpegBusyError:
+                    raise
+                except Exception as e:
+                    if not partial:
+                        raise
+                    # The index may not match the video, e.g. if it was built by an older version
+                    print("Failed to extract thumbnail from a single GOP, retrying with the whole video:", e)
+
+            async with VideoService._open_video_source(record.storage_key) as source:
+                return await VideoService.extraction_engine.extract(
+                    source, timestamp, resolution, accuracy, image_format, quality, master_resolution
+                )
+
+    @staticmethod
+    async def generate_thumbnails(
+        file_id: str,
+        thumbnails: List[Tuple[str, str]],
+        accuracy: str = "exact",
+        image_format: str = "jpeg",
+        quality: Optional[int] = None
+    ) -> List[str]:
+        """
+        Generates several thumbnail images for a given video file with a single FFmpeg invocation.
+
+        Every missing thumbnail becomes a separate input of one FFmpeg process that seeks directly to its
+        timestamp, so the video is opened once per process and only the frames around each timestamp are
+        decoded. Thumbnails that were already rendered are skipped and duplicates are rendered once.
+
+        Args:
+            file_id (str): Unique identifier of the video file.
+            thumbnails (List[Tuple[str, str]]): The (timestamp, resolution) pairs of the thumbnails to generate.
+            accuracy (str, optional): Seek accuracy of every thumbnail, as for generate_thumbnail. Defaults to "exact".
+            image_format (str, optional): Image format of every thumbnail, as for generate_thumbnail. Defaults to "jpeg".
+            quality (Optional[int], optional): Encoding quality of every thumbnail. Defaults to None.
+
+        Returns:
+            List[str]: The unique identifiers of the thumbnails, in the order they were requested.
+
+        Raises:
+            FileNotFoundError: If the video file is not found.
+            TimestampOutOfRangeError: If a timestamp is at or beyond the end of the video.
+            FFmpegBusyError: If every FFmpeg process slot is taken and the wait queue is full.
+            Exception: If FFmpeg fails to generate the thumbnails.
+        """
+        thumbnail_ids = [VideoService.thumbnail_id_for(file_id, timestamp, resolution, accuracy, quality) for timestamp, resolution in thumbnails]
+
+        # Deduplicate while keeping request order, then drop thumbnails that are already stored
+        requested = dict(zip(thumbnail_ids, thumbnails))
+        exists = await asyncio.gather(*(
+            VideoService.storage_service.file_exists(
+                os.path.join(VideoService.THUMBNAIL_DIR, VideoService.thumbnail_file_name(thumbnail_id, image_format))
+            )
+            for thumbnail_id in requested
+        ))
+        missing = [(thumbnail_id, spec) for (thumbnail_id, spec), stored in zip(requested.items(), exists) if not stored]
+        if not missing:
+            return thumbnail_ids
+
+        record = await VideoService.video_index.get(file_id)
+        if record is None:
+            raise FileNotFoundError("Video file not found")
+        for _, (timestamp, _) in missing:
+            VideoService.check_timestamp(record, timestamp)
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            async with VideoService._open_video_source(record.storage_key) as source:
+                # One input per thumbnail, each seeking on its own, and one output mapped to each input
+                ffmpeg_cmd = ["ffmpeg"]
+                for _, (timestamp, _) in missing:
+                    ffmpeg_cmd += [*seek_input_args(timestamp, accuracy), "-i", source]
+                for index, (thumbnail_id, (_, resolution)) in enumerate(missing):
+                    ffmpeg_cmd += [
+                        "-map", f"{index}:v:0",
+                        "-frames:v", "1",
+                        *seek_output_args(accuracy),
+                        "-s", resolution,
+                        *image_encoder_args(image_format, quality),
+                        os.path.join(output_dir, VideoService.thumbnail_file_name(thumbnail_id, image_format))
+                    ]
+
+                returncode, _, stderr = await VideoService.ffmpeg_executor.run(ffmpeg_cmd)
+
+            if returncode != 0:
+                print("FFmpeg failed:", stderr.decode())
+                raise Exception("FFmpeg failed to generate thumbnails")
 
-        # Run FFmpeg command asynchronously
-        process = await asyncio.create_subprocess_exec(*ffmpeg_cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        stdout, stderr = await process.communicate(input=video_bytes)
+            async def save(thumbnail_id: str) -> None:
+                file_name = VideoService.thumbnail_file_name(thumbnail_id, image_format)
+                output_path = os.path.join(output_dir, file_name)
+                if not await aiofiles.os.path.exists(output_path):
+                    raise Exception("FFmpeg failed to generate thumbnails")
+                async with aiofiles.open(output_path, "rb") as f:
+                    content = await f.read()
+                if not content:
+                    raise Exception("FFmpeg failed to generate thumbnails")
+                if not await VideoService.storage_service.write_file(os.path.join(VideoService.THUMBNAIL_DIR, file_name), content):
+                    raise Exception("Failed to save thumbnail")
+                VideoService.thumbnail_cache.set(file_name, content)
+                await VideoService.video_index.add_thumbnail_formats(thumbnail_id, [image_format])
 
-        # Check if FFmpeg command was successful
-        if process.returncode != 0 or len(stdout) <= 0:
+            await asyncio.gather(*(save(thumbnail_id) for thumbnail_id, _ in missing))
+
+        return thumbnail_ids
+
+    @staticmethod
+    def sprite_id_for(file_id: str, interval: int, columns: int, rows: int, tile_width: int, tile_height: int) -> str:
+        """
+        Derives the deterministic identifier of a sprite sheet from its request parameters.
+
+        Args:
+            file_id (str): Unique identifier of the video file.
+            interval (int): Seconds between consecutive tiles.
+            columns (int): Number of tiles per row.
+            rows (int): Number of rows of tiles.
+            tile_width (int): Width of a tile in pixels.
+            tile_height (int): Height of a tile in pixels.
+
+        Returns:
+            str: A UUID string that is identical for identical parameters.
+        """
+        return str(uuid.uuid5(VideoService.THUMBNAIL_NAMESPACE, f"sprite|{file_id}|{interval}|{columns}x{rows}|{tile_width}x{tile_height}"))
+
+    @staticmethod
+    async def generate_sprite(file_id: str, interval: int = 10, columns: int = 10, rows: int = 10, tile_width: int = 160, tile_height: int = 90) -> str:
+        """
+        Generates a sprite sheet of preview tiles for a given video file, along with a WebVTT index of the tiles.
+
+        A single FFmpeg pass samples one frame every `interval` seconds, scales it to the tile size and
+        tiles the frames row by row into a `columns` x `rows` grid, starting at the beginning of the video.
+        Frames past the last tile are not included, and tiles past the end of the video get no cue. The sprite is stored as `{sprite_id}.jpg` and the index
+        as `{sprite_id}.vtt`, whose cues reference the sprite by relative URL.
+
+        Like thumbnails, sprite identifiers are derived from the request parameters, so an existing sprite is
+        returned without running FFmpeg again and concurrent requests for the same sprite share a single render.
+
+        Args:
+            file_id (str): Unique identifier of the video file.
+            interval (int, optional): Seconds between consecutive tiles. Defaults to 10.
+            columns (int, optional): Number of tiles per row. Defaults to 10.
+            rows (int, optional): Number of rows of tiles. Defaults to 10.
+            tile_width (int, optional): Width of a tile in pixels. Defaults to 160.
+            tile_height (int, optional): Height of a tile in pixels. Defaults to 90.
+
+        Returns:
+            str: The unique identifier of the generated sprite sheet.
+
+        Raises:
+            FileNotFoundError: If the video file is not found.
+            FFmpegBusyError: If every FFmpeg process slot is taken and the wait queue is full.
+            Exception: If FFmpeg fails to generate the sprite sheet.
+        """
+        sprite_id = VideoService.sprite_id_for(file_id, interval, columns, rows, tile_width, tile_height)
+        return await VideoService.thumbnail_renders.do(
+            sprite_id,
+            lambda: VideoService._render_sprite(sprite_id, file_id, interval, columns, rows, tile_width, tile_height)
+        )
+
+    @staticmethod
+    async def _render_sprite(sprite_id: str, file_id: str, interval: int, columns: int, rows: int, tile_width: int, tile_height: int) -> str:
+        """
+        Renders a sprite sheet with FFmpeg and saves it with its WebVTT index, unless both have already been saved.
+
+        Args:
+            sprite_id (str): The deterministic identifier of the sprite sheet.
+            file_id (str): Unique identifier of the video file.
+            interval (int): Seconds between consecutive tiles.
+            columns (int): Number of tiles per row.
+            rows (int): Number of rows of tiles.
+            tile_width (int): Width of a tile in pixels.
+            tile_height (int): Height of a tile in pixels.
+
+        Returns:
+            str: The identifier of the sprite sheet.
+
+        Raises:
+            FileNotFoundError: If the video file is not found.
+            Exception: If FFmpeg fails to generate the sprite sheet.
+        """
+        sprite_path = os.path.join(VideoService.SPRITE_DIR, sprite_id + '.jpg')
+        vtt_path = os.path.join(VideoService.SPRITE_DIR, sprite_id + '.vtt')
+        if all(await asyncio.gather(VideoService.storage_service.file_exists(sprite_path), VideoService.storage_service.file_exists(vtt_path))):
+            return sprite_id
+
+        record = await VideoService.video_index.get(file_id)
+        if record is None:
+            raise FileNotFoundError("Video file not found")
+
+        async with VideoService._open_video_source(record.storage_key) as source:
+            # Sample, scale and tile in one filter chain. The tile filter emits the sheet once it is full or the
+            # video ends, and FFmpeg stops reading after that first frame.
+            ffmpeg_cmd = [
+                "ffmpeg",
+                "-i", source,
+                "-vf", f"fps=1/{interval},scale={tile_width}:{tile_height},tile={columns}x{rows}",
+                "-frames:v", "1",
+                "-f", "image2pipe",
+                "-c:v", "mjpeg",
+                "pipe:1"
+            ]
+
+            returncode, stdout, stderr = await VideoService.ffmpeg_executor.run(ffmpeg_cmd)
+
+        if returncode != 0 or len(stdout) <= 0:
             print("FFmpeg failed:", stderr.decode())
-            raise Exception("FFmpeg failed to generate thumbnail")
+            raise Exception("FFmpeg failed to generate sprite sheet")
+
+        vtt = build_sprite_vtt(os.path.basename(sprite_path), interval, columns, rows, tile_width, tile_height, record.duration)
+        saved = await asyncio.gather(
+            VideoService.storage_service.write_file(sprite_path, stdout),
+            VideoService.storage_service.write_file(vtt_path, vtt.encode())
+        )
+        if not all(saved):
+            raise Exception("Failed to save sprite sheet")
+
+        return sprite_id
+
+    @staticmethod
+    async def get_sprite(file_name: str) -> bytes:
+        """
+        Retrieves a sprite sheet or its WebVTT index by file name.
+
+        Args:
+            file_name (str): The file name of the sprite sheet (`{sprite_id}.jpg`) or of its index (`{sprite_id}.vtt`).
+
+        Returns:
+            bytes: The file content.
+
+        Raises:
+            FileNotFoundError: If the file is not found or is not a sprite sheet or index.
+        """
+        if os.path.basename(file_name) != file_name or os.path.splitext(file_name)[1] not in (".jpg", ".vtt"):
+            raise FileNotFoundError("Sprite file not found")
+
+        sprite_path = os.path.join(VideoService.SPRITE_DIR, file_name)
+        if not await VideoService.storage_service.file_exists(sprite_path):
+            raise FileNotFoundError("Sprite file not found")
+
+        return await VideoService.storage_service.read_file(sprite_path)
 
-        # Save thumbnail to storage
+    @staticmethod
+    @asynccontextmanager
+    async def _open_video_source(video_path: str) -> AsyncIterator[str]:
+        """
+        Provides a path or URL that FFmpeg can open and seek within for a stored video.
+
+        The storage provider's seekable source is used when available, and released once the context exits.
+        Otherwise the video is streamed to a temporary file, which is removed once the context exits.
+
+        Args:
+            video_path (str): The storage path of the video file.
+
+        Yields:
+            str: A local path or URL for the video.
+        """
+        async with VideoService.storage_service.open_seekable_source(video_path) as source:
+            if source is not None:
+                yield source
+                return
+
+        fd, temp_path = tempfile.mkstemp(suffix=os.path.splitext(video_path)[1])
+        os.close(fd)
         try:
-            await VideoService.storage_service.write_file(thumbnail_path, stdout)
-        except Exception as e:
-            raise Exception(f"Failed to save thumbnail: {str(e)}")
+            async with aiofiles.open(temp_path, "wb") as f:
+                async for chunk in VideoService.storage_service.open_read_stream(video_path):
+                    await f.write(chunk)
+            yield temp_path
+        finally:
+            await aiofiles.os.remove(temp_path)
 
-        return thumbnail_id
+    @staticmethod
+    @asynccontextmanager
+    async def _open_thumbnail_source(record: VideoRecord, timestamp: str) -> AsyncIterator[Tuple[str, bool]]:
+        """
+        Provides a path or URL from which FFmpeg can extract the frame at a timestamp of a stored video.
+
+        A video that is stored locally is opened in place. For other videos, the keyframe index is used to find
+        the GOP that covers the timestamp, and only the container header and that GOP are fetched from storage
+        into a sparse temporary file at their original offsets. The bytes fetched, and so the latency, depend on
+        the length of a GOP rather than on the size of the video or the position of the timestamp. Videos
+        without an index are opened with `_open_video_source`, and the index of MP4 and MOV videos is built in
+        the background for later requests.
+
+        Args:
+            record (VideoRecord): The recorded metadata of the video.
+            timestamp (str): The timestamp of the frame to extract.
+
+        Yields:
+            Tuple[str, bool]: A local path or URL for the video, and whether it holds a single GOP only.
+        """
+        async with VideoService.storage_service.open_seekable_source(record.storage_key) as source:
+            if source is not None and os.path.isfile(source):
+                yield source, False
+                return
+
+        index = await VideoService._get_keyframe_index(record.file_id)
+        if index is None and supports_partial_decoding(record.container):
+            VideoService.schedule_keyframe_index(record)
+        gop = index.gop_range(timestamp_to_seconds(timestamp)) if index is not None else None
+        if gop is not None:
+            ranges = index.header_ranges + [gop]
+            contents = await asyncio.gather(*(
+                VideoService.storage_service.read_range(record.storage_key, start, end) for start, end in ranges
+            ))
+        if gop is None or any(len(content) != end - start for (start, end), content in zip(ranges, contents)):
+            async with VideoService._open_video_source(record.storage_key) as source:
+                yield source, False
+            return
+
+        fd, temp_path = tempfile.mkstemp(suffix=os.path.splitext(record.storage_key)[1])
+        os.close(fd)
+        try:
+            async with aiofiles.open(temp_path, "r+b") as f:
+                for (start, _), content in zip(ranges, contents):
+                    await f.seek(start)
+                    await f.write(content)
+                # Leave the unfetched media data as a hole, so offsets in the header still point past the GOP
+                await f.truncate(record.size)
+            yield temp_path, True
+        finally:
+            await aiofiles.os.remove(temp_path)
+
+    @staticmethod
+    async def get_thumbnail_location(thumbnail_id: str, image_format: str = "jpeg", allow_url: bool = False) -> Optional[str]:
+        """
+        Finds where a stored thumbnail can be served from without reading it into memory.
+
+        Thumbnails in local storage are served from their file, which the server can send without copying it
+        through Python. Thumbnails in remote storage can be fetched by clients directly from a presigned URL.
+        The variant is not checked for existence again, so its format should come from `find_thumbnail_format`.
+
+        Args:
+            thumbnail_id (str): The unique identifier of the thumbnail.
+            image_format (str, optional): The image format of the variant. Defaults to "jpeg".
+            allow_url (bool, optional): Whether a URL of the remote storage may be returned. Defaults to False.
+
+        Returns:
+            Optional[str]: The local path of the thumbnail file, or its URL if allowed, or
+                None if the thumbnail has to be read with get_thumbnail, which also reports missing thumbnails. A
+                local path must be passed to `release_thumbnail_location` once it has been sent.
+        """
+        thumbnail_path = os.path.join(VideoService.THUMBNAIL_DIR, VideoService.thumbnail_file_name(thumbnail_id, image_format))
+        source = await VideoService.storage_service.get_seekable_source(thumbnail_path)
+        if source is None:
+            return None
+        if os.path.isfile(source):
+            return source
+        await VideoService.storage_service.release_seekable_source(thumbnail_path, source)
+        return source if allow_url else None
 
     @staticmethod
-    async def get_thumbnail(thumbnail_id: str) -> Tuple[bytes, str]:
+    async def release_thumbnail_location(thumbnail_id: str, image_format: str, location: str) -> None:
+        """
+        Releases a local path returned by `get_thumbnail_location` once the thumbnail has been sent, so that a
+        cached copy can be evicted again.
+
+        Args:
+            thumbnail_id (str): The unique identifier of the thumbnail.
+            image_format (str): The image format of the variant.
+            location (str): The local path returned for the thumbnail.
+        """
+        thumbnail_path = os.path.join(VideoService.THUMBNAIL_DIR, VideoService.thumbnail_file_name(thumbnail_id, image_format))
+        await VideoService.storage_service.release_seekable_source(thumbnail_path, location)
+
+    @staticmethod
+    async def find_thumbnail_format(thumbnail_id: str, accept: Optional[str] = None) -> str:
+        """
+        Picks the stored variant of a thumbnail that best matches a client's Accept header.
+
+        Formats are tried in the client's order of preference, and among formats the client rates equally, from
+        the smallest typical output to the largest, until a stored variant is found. If no acceptable variant is
+        stored, the smallest stored variant is picked anyway, so that clients that send a generic Accept header
+        such as "application/json" keep receiving thumbnails.
+
+        The stored variants are looked up in the video index. Only thumbnails without recorded variants, such as
+        those stored before variants were recorded, are probed in storage, and the variants found are recorded.
+
+        Args:
+            thumbnail_id (str): The unique identifier of the thumbnail.
+            accept (Optional[str], optional): The Accept request header. None accepts every format. Defaults to None.
+
+        Returns:
+            str: The image format of the picked variant.
+
+        Raises:
+            FileNotFoundError: If no variant of the thumbnail is stored.
+        """
+        formats = {image_content_type(image_format): image_format for image_format in supported_image_formats()}
+        ranked = [formats[content_type] for content_type in rank_media_types(accept, list(formats))]
+        ranked += [image_format for image_format in supported_image_formats() if image_format not in ranked]
+
+        stored = set(await VideoService.video_index.get_thumbnail_formats(thumbnail_id))
+        if not stored:
+            exists = await asyncio.gather(*(
+                VideoService.storage_service.file_exists(
+                    os.path.join(VideoService.THUMBNAIL_DIR, VideoService.thumbnail_file_name(thumbnail_id, image_format))
+                )
+                for image_format in ranked
+            ))
+            stored = {image_format for image_format, found in zip(ranked, exists) if found}
+            if stored:
+                await VideoService.video_index.add_thumbnail_formats(thumbnail_id, sorted(stored))
+
+        for image_format in ranked:
+            if image_format in stored:
+                return image_format
+        raise FileNotFoundError("Thumbnail file not found")
+
+    @staticmethod
+    async def get_thumbnail(thumbnail_id: str, image_format: str = "jpeg") -> Tuple[bytes, str]:
         """
         Retrieves a thumbnail image by its identifier.
 
+        Recently retrieved thumbnails are served from an in-memory LRU cache without touching storage.
+
         Args:
             thumbnail_id (str): The unique identifier of the thumbnail.
+            image_format (str, optional): The image format of the variant to retrieve. Defaults to "jpeg".
 
         Returns:
             Tuple[bytes, str]: A tuple containing the file content as bytes and the file name.
@@ -122,13 +1121,18 @@ class VideoService:
             FileNotFoundError: If the thumbnail file is not found.
         """
         # Construct the full file path of the thumbnail image
-        file_name = f"{thumbnail_id}.jpg"
+        file_name = VideoService.thumbnail_file_name(thumbnail_id, image_format)
         thumbnail_path = os.path.join(VideoService.THUMBNAIL_DIR, file_name)
 
+        file_content = VideoService.thumbnail_cache.get(file_name)
+        if file_content is not None:
+            return file_content, file_name
+
         # Check if the thumbnail file exists
         if not await VideoService.storage_service.file_exists(thumbnail_path):
             raise FileNotFoundError("Thumbnail file not found")
 
         # Read the file content
         file_content = await VideoService.storage_service.read_file(thumbnail_path)
+        VideoService.thumbnail_cache.set(file_name, file_content)
         return file_content, file_name
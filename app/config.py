@@ -1,4 +1,5 @@
 import os
+import secrets
 
 
 class Config:
@@ -11,6 +12,46 @@ class Config:
     ENV = "development"  # Default environment
     ORIGINS = []  # Default allowed origins for CORS
     BUCKET_NAME = os.getenv("BUCKET_NAME", "video-thumbnail-generator").lower()
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))  # Bytes read from an upload per chunk
+    S3_MULTIPART_PART_SIZE = int(os.getenv("S3_MULTIPART_PART_SIZE", 8 * 1024 * 1024))  # S3 requires parts >= 5 MiB
+    PRESIGNED_URL_EXPIRATION = int(os.getenv("PRESIGNED_URL_EXPIRATION", 300))  # Seconds a presigned URL stays valid
+    UPLOAD_URL_EXPIRATION = int(os.getenv("UPLOAD_URL_EXPIRATION", 3600))  # Seconds a presigned upload URL stays valid
+    PRESIGNED_PUT_MAX_SIZE = int(os.getenv("PRESIGNED_PUT_MAX_SIZE", 100 * 1024 * 1024))  # Larger direct uploads use presigned multipart URLs
+    UPLOAD_SIGNING_KEY = os.getenv("UPLOAD_SIGNING_KEY") or secrets.token_hex(32)  # Signs local upload URLs; set it when running several processes
+    LOCAL_UPLOAD_URL = os.getenv("LOCAL_UPLOAD_URL", "/video/v1/upload/local")  # Endpoint that receives signed uploads for local storage
+    S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")  # Custom S3 endpoint, e.g. a local S3 stand-in; None uses AWS
+    S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", 50))  # Size of the shared S3 connection pool
+    S3_KEEPALIVE_TIMEOUT = float(os.getenv("S3_KEEPALIVE_TIMEOUT", 60))  # Seconds an idle pooled connection is kept
+    DATA_DIR = os.getenv("DATA_DIR", "data")  # Directory for local application state
+    VIDEO_INDEX_PATH = os.getenv("VIDEO_INDEX_PATH", os.path.join(DATA_DIR, "video_index.db"))  # SQLite metadata index
+    STORAGE_CACHE_DIR = os.getenv("STORAGE_CACHE_DIR", os.path.join(DATA_DIR, "storage_cache"))  # Local disk copies of files in remote storage
+    STORAGE_CACHE_MAX_BYTES = int(os.getenv("STORAGE_CACHE_MAX_BYTES", 0))  # Disk budget for copies of remote files; 0 disables the cache
+    THUMBNAIL_CACHE_MAX_BYTES = int(os.getenv("THUMBNAIL_CACHE_MAX_BYTES", 64 * 1024 * 1024))  # In-memory thumbnail cache budget
+    THUMBNAIL_CACHE_TTL = float(os.getenv("THUMBNAIL_CACHE_TTL", 3600))  # Seconds a cached thumbnail is kept; 0 disables expiry
+    THUMBNAIL_DELIVERY = os.getenv("THUMBNAIL_DELIVERY", "proxy").lower()  # "redirect" sends clients to a presigned URL instead of proxying S3 thumbnails
+    MASTER_FRAME_CACHE_MAX_BYTES = int(os.getenv("MASTER_FRAME_CACHE_MAX_BYTES", 128 * 1024 * 1024))  # In-memory budget for decoded frames other resolutions are derived from; 0 disables
+    KEYFRAME_INDEX_CACHE_MAX_BYTES = int(os.getenv("KEYFRAME_INDEX_CACHE_MAX_BYTES", 16 * 1024 * 1024))  # In-memory keyframe index cache budget
+    SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() == "true"  # Report per-request phase timings in a Server-Timing header
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))  # Fraction of requests profiled with cProfile; 0 disables sampling
+    PROFILE_HEADER_ENABLED = os.getenv("PROFILE_HEADER_ENABLED", "false").lower() == "true"  # Profile requests sent with "X-Profile: 1"
+    PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(DATA_DIR, "profiles"))  # Directory the .pstats files of profiled requests are written to
+    PREGENERATE_THUMBNAILS = os.getenv("PREGENERATE_THUMBNAILS", "false").lower() == "true"  # Render a poster and evenly spaced thumbnails in the background after each upload
+    PREGENERATE_POSTER_OFFSET = int(os.getenv("PREGENERATE_POSTER_OFFSET", 1))  # Second of the pregenerated poster frame
+    PREGENERATE_FRAME_COUNT = int(os.getenv("PREGENERATE_FRAME_COUNT", 4))  # Evenly spaced frames pregenerated besides the poster
+    PREGENERATE_RESOLUTIONS = os.getenv("PREGENERATE_RESOLUTIONS", "320x240").split(",")  # Comma-separated resolutions pregenerated for every frame
+    BATCH_MAX_THUMBNAILS = int(os.getenv("BATCH_MAX_THUMBNAILS", 100))  # Maximum thumbnails per batch request
+    SPRITE_MAX_TILES = int(os.getenv("SPRITE_MAX_TILES", 400))  # Maximum tiles (columns x rows) per sprite sheet
+    SPRITE_MAX_TILE_SIZE = int(os.getenv("SPRITE_MAX_TILE_SIZE", 640))  # Maximum width and height of a sprite tile
+    THUMBNAIL_ENGINE = os.getenv("THUMBNAIL_ENGINE", "subprocess").lower()  # "subprocess" runs an FFmpeg process per thumbnail, "pyav" decodes in-process
+    FFMPEG_MAX_PROCESSES = int(os.getenv("FFMPEG_MAX_PROCESSES", os.cpu_count() or 1))  # Concurrent FFmpeg processes
+    FFMPEG_MAX_QUEUE = int(os.getenv("FFMPEG_MAX_QUEUE", 64))  # FFmpeg commands waiting for a process before 429s
+    FFMPEG_THREADS = int(os.getenv("FFMPEG_THREADS", 1))  # Threads per FFmpeg process; 0 lets FFmpeg decide
+    FFMPEG_RETRY_AFTER = int(os.getenv("FFMPEG_RETRY_AFTER", 1))  # Retry-After seconds sent when FFmpeg is saturated
+    JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", os.path.join(DATA_DIR, "jobs.db"))  # SQLite background job queue
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))  # Job workers run inside the API process; 0 leaves jobs to worker processes
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 0.5))  # Seconds an idle worker waits before polling again
+    JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 300))  # Seconds without a lease renewal before a running job is assumed abandoned
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))  # Claims after which an abandoned job is failed
 
 
 class DevelopmentConfig(Config):
@@ -0,0 +1,29 @@
+from app.config import get_config
+from app.extraction.extraction_engine import ExtractionEngine
+from app.extraction.subprocess_engine import SubprocessEngine
+from app.helpers.ffmpeg import FFmpegExecutor
+
+def get_extraction_engine(executor: FFmpegExecutor) -> ExtractionEngine:
+    """
+    Get the thumbnail extraction engine selected by the `THUMBNAIL_ENGINE` setting.
+
+    The PyAV engine is only imported when it is selected.
+
+    Args:
+        executor (FFmpegExecutor): The executor that bounds the number of concurrent decodes.
+
+    Returns:
+        ExtractionEngine: The subprocess engine for "subprocess", or the PyAV engine for "pyav".
+
+    Raises:
+        ValueError: If the setting names an unknown engine.
+    """
+    engine = get_config().THUMBNAIL_ENGINE
+
+    if engine == "subprocess":
+        return SubprocessEngine(executor)
+    if engine == "pyav":
+        from app.extraction.pyav_engine import PyAVEngine
+        return PyAVEngine(executor)
+    else:
+        raise ValueError(f"Unsupported thumbnail engine: {engine}")
@@ -0,0 +1,48 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+
+class ExtractionEngine(ABC):
+    """
+    An abstract base class defining the interface for extracting a single thumbnail from a video.
+
+    Concrete implementations decode the frame at a timestamp and encode it as an image, either by running an
+    FFmpeg process or in-process. Resolving and opening the video is left to the caller.
+    """
+
+    name: str = ""
+    """str: The name the engine is selected by in the `THUMBNAIL_ENGINE` setting."""
+
+    @abstractmethod
+    async def extract(
+        self,
+        source: str,
+        timestamp: str,
+        resolution: str,
+        accuracy: str = "exact",
+        image_format: str = "jpeg",
+        quality: Optional[int] = None,
+        master_resolution: Optional[str] = None
+    ) -> Tuple[bytes, Optional[bytes]]:
+        """
+        Extracts a thumbnail image, optionally along with a raw master frame from the same decode.
+
+        Args:
+            source (str): A local path or URL of the video.
+            timestamp (str): Timestamp to capture the thumbnail, e.g. "00:00:05".
+            resolution (str): Resolution of the thumbnail, e.g. "320x240".
+            accuracy (str, optional): "exact" for the frame at the timestamp, or "fast" for the nearest
+                keyframe at or before it. Defaults to "exact".
+            image_format (str, optional): Image format of the thumbnail. Defaults to "jpeg".
+            quality (Optional[int], optional): The quality from 1 to 100, or None for the encoder's default.
+            master_resolution (Optional[str], optional): Resolution of the raw RGB master frame to extract, or None
+                to extract the thumbnail only. Defaults to None.
+
+        Returns:
+            Tuple[bytes, Optional[bytes]]: The encoded thumbnail and the master frame as packed 8-bit RGB pixels,
+                or None if it was not requested or not extracted.
+
+        Raises:
+            FFmpegBusyError: If every decoding slot is taken and the wait queue is full.
+            Exception: If the thumbnail could not be extracted.
+        """
+        raise NotImplementedError
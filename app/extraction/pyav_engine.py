@@ -0,0 +1,96 @@
+from typing import Optional, Tuple
+import av
+from PIL import Image
+from app.extraction.extraction_engine import ExtractionEngine
+from app.helpers.ffmpeg import FFmpegExecutor
+from app.helpers.image import encode_image
+from app.helpers.video import timestamp_to_seconds
+
+class PyAVEngine(ExtractionEngine):
+    """
+    Extracts thumbnails in-process with PyAV, which binds the FFmpeg libraries directly.
+
+    This avoids starting a process, copying the image through a pipe and initializing the demuxer and decoder
+    from scratch for every thumbnail, which dominates the cost of thumbnails from short videos. Decodes run in
+    worker threads, bounded by the same slots and wait queue as FFmpeg processes. Images are scaled and encoded
+    with Pillow.
+
+    Attributes:
+        executor (FFmpegExecutor): The executor whose slots bound the number of concurrent decodes.
+    """
+
+    name = "pyav"
+
+    def __init__(self, executor: FFmpegExecutor):
+        """
+        Initializes the engine.
+
+        Args:
+            executor (FFmpegExecutor): The executor whose slots bound the number of concurrent decodes.
+        """
+        self.executor = executor
+
+    async def extract(
+        self,
+        source: str,
+        timestamp: str,
+        resolution: str,
+        accuracy: str = "exact",
+        image_format: str = "jpeg",
+        quality: Optional[int] = None,
+        master_resolution: Optional[str] = None
+    ) -> Tuple[bytes, Optional[bytes]]:
+        return await self.executor.run_in_thread(
+            self._extract, source, timestamp_to_seconds(timestamp), resolution, accuracy, image_format, quality, master_resolution
+        )
+
+    def _extract(
+        self,
+        source: str,
+        seconds: float,
+        resolution: str,
+        accuracy: str,
+        image_format: str,
+        quality: Optional[int],
+        master_resolution: Optional[str]
+    ) -> Tuple[bytes, Optional[bytes]]:
+        """
+        Decodes the frame at a timestamp and encodes it, blocking the calling thread.
+        """
+        try:
+            with av.open(source) as container:
+                frame = self._decode_frame(container, seconds, accuracy)
+        except av.FFmpegError as e:
+            print("PyAV failed:", e)
+            raise Exception("FFmpeg failed to generate thumbnail")
+        if frame is None:
+            raise Exception("FFmpeg failed to generate thumbnail")
+
+        image = frame.to_image()
+        master = None
+        if master_resolution is not None:
+            width, height = (int(value) for value in master_resolution.split("x"))
+            master = (image if image.size == (width, height) else image.resize((width, height), Image.BICUBIC)).tobytes()
+        return encode_image(image, resolution, image_format, quality), master
+
+    def _decode_frame(self, container: "av.container.InputContainer", seconds: float, accuracy: str) -> Optional["av.VideoFrame"]:
+        """
+        Seeks to the keyframe at or before a timestamp and decodes the frame to capture.
+
+        As with FFmpeg's input seeking, an exact seek returns the first frame presented at or after the timestamp,
+        or the last frame if the video ends first, and a fast seek returns the keyframe itself.
+        """
+        stream = container.streams.video[0]
+        stream.codec_context.thread_count = self.executor.threads
+        if accuracy == "fast":
+            stream.codec_context.skip_frame = "NONKEY"
+
+        # Timestamps are relative to the start of the video, while stream and frame times are absolute
+        start_time = stream.start_time or 0
+        start_seconds = float(start_time * stream.time_base)
+        container.seek(int(seconds / stream.time_base) + start_time, stream=stream, backward=True)
+        frame = None
+        for frame in container.decode(stream):
+            if accuracy == "fast" or frame.time is None or frame.time - start_seconds >= seconds:
+                break
+        return frame
@@ -0,0 +1,129 @@
+import os
+import tempfile
+from typing import List, Optional, Tuple
+import aiofiles
+import aiofiles.os
+from app.extraction.extraction_engine import ExtractionEngine
+from app.helpers.ffmpeg import FFmpegExecutor
+from app.helpers.image import image_encoder_args, image_extension, requires_seekable_output
+from app.helpers.video import seek_input_args, seek_output_args
+
+def thumbnail_command(
+    source: str,
+    timestamp: str,
+    resolution: str,
+    accuracy: str = "exact",
+    image_format: str = "jpeg",
+    quality: Optional[int] = None,
+    output: str = "pipe:1"
+) -> List[str]:
+    """
+    Builds the FFmpeg command that extracts a single thumbnail image, by default to standard output.
+
+    Placing the seek options before -i lets FFmpeg seek in the demuxer instead of decoding
+    everything up to the timestamp.
+
+    Args:
+        source (str): A local path or URL of the video.
+        timestamp (str): Timestamp to capture the thumbnail.
+        resolution (str): Resolution of the thumbnail.
+        accuracy (str, optional): "exact" for the frame at the timestamp, or "fast" for the nearest
+            keyframe at or before it. Defaults to "exact".
+        image_format (str, optional): The image format of the thumbnail. Defaults to "jpeg".
+        quality (Optional[int], optional): The quality from 1 to 100, or None for the encoder's default.
+        output (str, optional): Where FFmpeg writes the image. Defaults to standard output, which
+            formats that require seekable output cannot use.
+
+    Returns:
+        List[str]: The command, starting with the FFmpeg executable.
+    """
+    return [
+        "ffmpeg",
+        *seek_input_args(timestamp, accuracy),
+        "-i", source,
+        "-vframes", "1",
+        *seek_output_args(accuracy),
+        "-s", resolution,
+        *image_encoder_args(image_format, quality),
+        output
+    ]
+
+def master_frame_args(resolution: str, accuracy: str, output: str) -> List[str]:
+    """
+    Builds the FFmpeg output options that write the decoded frame as raw RGB pixels next to a thumbnail.
+
+    Placed after the thumbnail's output, they make the same decode produce a master frame from which other
+    resolutions of the thumbnail can be derived without running FFmpeg again.
+
+    Args:
+        resolution (str): The resolution of the master frame.
+        accuracy (str): Seek accuracy of the thumbnail.
+        output (str): The file the frame is written to.
+
+    Returns:
+        List[str]: The FFmpeg arguments, including the output.
+    """
+    return [
+        "-frames:v", "1",
+        *seek_output_args(accuracy),
+        "-s", resolution,
+        "-f", "rawvideo",
+        "-pix_fmt", "rgb24",
+        output
+    ]
+
+class SubprocessEngine(ExtractionEngine):
+    """
+    Extracts thumbnails by running an FFmpeg process per thumbnail.
+
+    Attributes:
+        executor (FFmpegExecutor): The executor that bounds the number of concurrent FFmpeg processes.
+    """
+
+    name = "subprocess"
+
+    def __init__(self, executor: FFmpegExecutor):
+        """
+        Initializes the engine.
+
+        Args:
+            executor (FFmpegExecutor): The executor that bounds the number of concurrent FFmpeg processes.
+        """
+        self.executor = executor
+
+    async def extract(
+        self,
+        source: str,
+        timestamp: str,
+        resolution: str,
+        accuracy: str = "exact",
+        image_format: str = "jpeg",
+        quality: Optional[int] = None,
+        master_resolution: Optional[str] = None
+    ) -> Tuple[bytes, Optional[bytes]]:
+        frame = None
+        with tempfile.TemporaryDirectory() as output_dir:
+            # Output to stdout, or to a temporary file for formats that cannot be written to a pipe
+            output_path = os.path.join(output_dir, f"thumbnail.{image_extension(image_format)}") if requires_seekable_output(image_format) else None
+            master_path = os.path.join(output_dir, "master.rgb")
+
+            ffmpeg_cmd = thumbnail_command(source, timestamp, resolution, accuracy, image_format, quality, output_path or "pipe:1")
+            if master_resolution is not None:
+                ffmpeg_cmd += master_frame_args(master_resolution, accuracy, master_path)
+
+            # Run FFmpeg command asynchronously once a process slot is free
+            returncode, stdout, stderr = await self.executor.run(ffmpeg_cmd)
+
+            if returncode == 0 and output_path is not None and await aiofiles.os.path.exists(output_path):
+                async with aiofiles.open(output_path, "rb") as f:
+                    stdout = await f.read()
+            if returncode == 0 and master_resolution is not None and await aiofiles.os.path.exists(master_path):
+                async with aiofiles.open(master_path, "rb") as f:
+                    frame = await f.read()
+
+        # Check if FFmpeg command was successful
+        if returncode != 0 or len(stdout) <= 0:
+            print("FFmpeg failed:", stderr.decode())
+            raise Exception("FFmpeg failed to generate thumbnail")
+
+        return stdout, frame
@@ -4,9 +4,34 @@ factory.py
 This module provides a factory function to create and configure an instance of the FastAPI application.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.middleware import add_middleware
 from app.api.controller.video_controller import router as video_router
+from app.api.controller.metrics_controller import router as metrics_router
+from app.api.service.video_service import VideoService
+from app.jobs.worker import create_worker_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Manage resources that live as long as the application, such as the shared storage client, the
+    video index connection and the background job workers.
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+    """
+    await VideoService.storage_service.open()
+    await VideoService.video_index.initialize()
+    worker_pool = create_worker_pool()
+    worker_pool.start()
+    try:
+        yield
+    finally:
+        await worker_pool.stop()
+        await VideoService.video_index.close()
+        await VideoService.storage_service.close()
 
 
 def create_app() -> FastAPI:
@@ -14,10 +39,10 @@ def create_app() -> FastAPI:
     Create a new instance of the FastAPI application.
 
     Returns:
-        FastAPI: A new FastAPI application instance with added middleware.
+        FastAPI: A new FastAPI application instance with added middleware and lifespan hooks.
     """
 
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
 
     # Add middlewares to the app
     add_middleware(app)
@@ -25,4 +50,7 @@ def create_app() -> FastAPI:
     # Include the video router
     app.include_router(video_router, prefix="/video/v1")
 
+    # Include the metrics router at the root, where scrapers expect it
+    app.include_router(metrics_router)
+
     return app
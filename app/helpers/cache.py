@@ -0,0 +1,106 @@
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+class LRUByteCache:
+    """
+    An in-memory least-recently-used cache of byte strings, bounded by the total size of its values.
+
+    Entries optionally expire after a time-to-live. When adding an entry would exceed the byte
+    budget, the least recently used entries are evicted first.
+
+    Attributes:
+        max_bytes (int): The maximum total size in bytes of the cached values.
+        ttl (Optional[float]): Seconds after which an entry expires, or None for no expiry.
+        current_bytes (int): The total size in bytes of the cached values.
+        hits (int): The number of lookups that found a live entry.
+        misses (int): The number of lookups that found no live entry.
+    """
+
+    def __init__(self, max_bytes: int, ttl: Optional[float] = None):
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_bytes (int): The maximum total size in bytes of the cached values.
+            ttl (Optional[float], optional): Seconds after which an entry expires. None or 0 disables expiry.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl or None
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[bytes, Optional[float]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """
+        Returns the cached value for a key and marks it as most recently used.
+
+        Args:
+            key (Hashable): The key to look up.
+
+        Returns:
+            Optional[bytes]: The cached value, or None if the key is missing or its entry has expired.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            self.delete(key)
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: Hashable, value: bytes) -> bool:
+        """
+        Caches a value, evicting least recently used entries as needed to stay within the byte budget.
+
+        Args:
+            key (Hashable): The key to cache the value under.
+            value (bytes): The value to cache.
+
+        Returns:
+            bool: True if the value was cached, False if it is larger than the whole budget.
+        """
+        if len(value) > self.max_bytes:
+            return False
+
+        self.delete(key)
+        while self.current_bytes + len(value) > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.current_bytes -= len(evicted)
+
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (value, expires_at)
+        self.current_bytes += len(value)
+        return True
+
+    def delete(self, key: Hashable) -> bool:
+        """
+        Removes a key from the cache.
+
+        Args:
+            key (Hashable): The key to remove.
+
+        Returns:
+            bool: True if the key was cached, False otherwise.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.current_bytes -= len(entry[0])
+        return True
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache.
+        """
+        self._entries.clear()
+        self.current_bytes = 0
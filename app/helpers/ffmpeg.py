@@ -0,0 +1,220 @@
+import asyncio
+import os
+import subprocess
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Tuple
+from app.helpers.metrics import BYTES_BUCKETS, REGISTRY
+from app.helpers.timing import record_phase
+
+FFMPEG_DURATION = REGISTRY.histogram("ffmpeg_duration_seconds", "Wall time of FFmpeg commands and in-process decodes, excluding the wait for a slot.", ["tool"])
+FFMPEG_QUEUE_WAIT = REGISTRY.histogram("ffmpeg_queue_wait_seconds", "Time spent waiting for a free FFmpeg slot.")
+FFMPEG_OUTPUT_BYTES = REGISTRY.histogram("ffmpeg_output_bytes", "Bytes read from the standard output of FFmpeg commands.", ["tool"], BYTES_BUCKETS)
+FFMPEG_REJECTED = REGISTRY.counter("ffmpeg_rejected_total", "FFmpeg commands rejected because the wait queue was full.")
+
+class FFmpegBusyError(Exception):
+    """
+    Raised when an FFmpeg process cannot be started because every process slot is taken and the wait queue is full.
+
+    Attributes:
+        retry_after (int): Suggested number of seconds to wait before retrying.
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__("Too many FFmpeg processes queued, retry later")
+        self.retry_after = retry_after
+
+class FFmpegExecutor:
+    """
+    Runs FFmpeg commands with a bounded number of concurrent processes and a bounded wait queue.
+
+    Commands beyond `max_processes` wait in FIFO order for a free slot. When `max_queue` commands are
+    already waiting, further commands are rejected with FFmpegBusyError instead of queueing without limit.
+    Each process decodes and filters with at most `threads` threads, so the total thread count stays close to the core count.
+
+    Attributes:
+        max_processes (int): The maximum number of FFmpeg processes running at once.
+        max_queue (int): The maximum number of commands waiting for a free slot.
+        threads (int): The number of threads per process, or 0 to let FFmpeg decide.
+        retry_after (int): Seconds suggested to rejected callers before retrying.
+        running (int): The number of processes currently running.
+        completed (int): The number of commands that have finished, successfully or not.
+        rejected (int): The number of commands rejected because the queue was full.
+        total_wait (float): The total seconds commands have spent waiting for a slot.
+        max_wait (float): The longest a single command has waited for a slot, in seconds.
+    """
+
+    def __init__(self, max_processes: int, max_queue: int, threads: int = 0, retry_after: int = 1):
+        """
+        Initializes an idle executor.
+
+        Args:
+            max_processes (int): The maximum number of FFmpeg processes running at once. Must be positive.
+            max_queue (int): The maximum number of commands waiting for a free slot. 0 rejects whenever every slot is taken.
+            threads (int, optional): The number of threads per process, or 0 to let FFmpeg decide. Defaults to 0.
+            retry_after (int, optional): Seconds suggested to rejected callers before retrying. Defaults to 1.
+
+        Raises:
+            ValueError: If max_processes is not positive or max_queue or threads is negative.
+        """
+        if max_processes <= 0:
+            raise ValueError("max_processes must be positive")
+        if max_queue < 0 or threads < 0:
+            raise ValueError("max_queue and threads must not be negative")
+
+        self.max_processes = max_processes
+        self.max_queue = max_queue
+        self.threads = threads
+        self.retry_after = retry_after
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        """
+        int: The number of commands currently waiting for a free slot.
+        """
+        return len(self._waiters)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns a snapshot of the executor's limits, load and wait-time accounting.
+
+        Returns:
+            Dict[str, float]: The limits, the current number of running and queued commands, the number of completed
+                and rejected commands, and the mean and maximum wait for a slot in seconds.
+        """
+        started = self.completed + self.running
+        return {
+            "max_processes": self.max_processes,
+            "max_queue": self.max_queue,
+            "threads": self.threads,
+            "running": self.running,
+            "queued": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "mean_wait_seconds": self.total_wait / started if started else 0.0,
+            "max_wait_seconds": self.max_wait,
+        }
+
+    async def run(self, cmd: List[str], limit_threads: bool = True) -> Tuple[int, bytes, bytes]:
+        """
+        Runs an FFmpeg command once a process slot is free and collects its output.
+
+        Args:
+            cmd (List[str]): The command, starting with the FFmpeg executable.
+            limit_threads (bool, optional): Whether to add the per-process thread limit to the command. Disable it for
+                tools such as ffprobe that do not accept FFmpeg's threading options. Defaults to True.
+
+        Returns:
+            Tuple[int, bytes, bytes]: The return code, standard output and standard error of the process.
+
+        Raises:
+            FFmpegBusyError: If every slot is taken and the wait queue is full.
+        """
+        tool = os.path.basename(cmd[0])
+        start = time.perf_counter()
+        await self._acquire()
+        started = time.perf_counter()
+        FFMPEG_QUEUE_WAIT.observe(started - start)
+        record_phase("ffmpeg-queue", started - start)
+        try:
+            process = await asyncio.create_subprocess_exec(*(self._with_threads(cmd) if limit_threads else cmd), stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                stdout, stderr = await process.communicate()
+            except asyncio.CancelledError:
+                # Do not leave an orphaned FFmpeg process holding CPU after the caller gave up
+                process.kill()
+                await process.wait()
+                raise
+            FFMPEG_OUTPUT_BYTES.labels(tool).observe(len(stdout))
+            return process.returncode, stdout, stderr
+        finally:
+            FFMPEG_DURATION.labels(tool).observe(time.perf_counter() - started)
+            record_phase(tool, time.perf_counter() - started)
+            self.completed += 1
+            self._release()
+
+    async def run_in_thread(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Runs a blocking function in a worker thread once a slot is free, for decoding in-process instead of in an
+        FFmpeg process. In-process decodes share the slots, wait queue and accounting of FFmpeg processes.
+
+        Args:
+            func (Callable[..., Any]): The function to run.
+            *args (Any): The arguments of the function.
+
+        Returns:
+            Any: The return value of the function.
+
+        Raises:
+            FFmpegBusyError: If every slot is taken and the wait queue is full.
+        """
+        start = time.perf_counter()
+        await self._acquire()
+        started = time.perf_counter()
+        FFMPEG_QUEUE_WAIT.observe(started - start)
+        record_phase("ffmpeg-queue", started - start)
+        try:
+            return await asyncio.to_thread(func, *args)
+        finally:
+            FFMPEG_DURATION.labels("thread").observe(time.perf_counter() - started)
+            record_phase("decode", time.perf_counter() - started)
+            self.completed += 1
+            self._release()
+
+    def _with_threads(self, cmd: List[str]) -> List[str]:
+        """
+        Adds the per-process thread limit to a command, for the decoder of every input and for the filter graph.
+        """
+        if not self.threads:
+            return cmd
+
+        threads = str(self.threads)
+        limited = [cmd[0], "-filter_threads", threads]
+        for arg in cmd[1:]:
+            # Options placed before an input apply to its decoder
+            if arg == "-i":
+                limited += ["-threads", threads]
+            limited.append(arg)
+        return limited
+
+    async def _acquire(self) -> None:
+        if self.running < self.max_processes and not self._waiters:
+            self.running += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            FFMPEG_REJECTED.inc()
+            raise FFmpegBusyError(self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        start = time.monotonic()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation; pass it on
+                self._release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+        waited = time.monotonic() - start
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def _release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot straight to the next waiter, so running stays unchanged
+                waiter.set_result(None)
+                return
+        self.running -= 1
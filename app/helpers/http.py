@@ -0,0 +1,83 @@
+from typing import List, Optional
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Checks whether an If-None-Match header matches an entity tag.
+
+    Entity tags are compared with the weak comparison required for If-None-Match, so a `W/`
+    prefix on either side is ignored.
+
+    Args:
+        if_none_match (str): The value of the If-None-Match request header, e.g. '"a", W/"b"' or '*'.
+        etag (str): The quoted entity tag of the current representation.
+
+    Returns:
+        bool: True if the header lists the entity tag or is '*', False otherwise.
+    """
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return opaque(etag) in {opaque(candidate) for candidate in if_none_match.split(",")}
+
+def accept_quality(accept: str, media_type: str) -> float:
+    """
+    Returns the quality value an Accept header assigns to a media type.
+
+    The most specific matching media range applies: "type/subtype" over "type/*" over "*/*".
+    Media range parameters other than q are ignored.
+
+    Args:
+        accept (str): The value of the Accept request header, e.g. 'image/webp,image/*;q=0.8'.
+        media_type (str): The media type to rate, e.g. "image/webp".
+
+    Returns:
+        float: The quality value from 0 to 1, where 0 means the media type is not acceptable.
+    """
+    main_type = media_type.split("/", 1)[0]
+    best_specificity, best_quality = -1, 0.0
+    for media_range in accept.split(","):
+        name, *params = [part.strip() for part in media_range.split(";")]
+        name = name.lower()
+        if name == media_type:
+            specificity = 2
+        elif name == f"{main_type}/*":
+            specificity = 1
+        elif name == "*/*":
+            specificity = 0
+        else:
+            continue
+
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    quality = 0.0
+        if specificity > best_specificity:
+            best_specificity, best_quality = specificity, quality
+    return best_quality
+
+def rank_media_types(accept: Optional[str], media_types: List[str]) -> List[str]:
+    """
+    Orders the media types a server can produce by the client's preference, dropping those it does not accept.
+
+    Types the client rates equally keep the server's order, so the server's preference breaks ties.
+
+    Args:
+        accept (Optional[str]): The value of the Accept request header. A missing header accepts every type.
+        media_types (List[str]): The media types the server can produce, in the server's order of preference.
+
+    Returns:
+        List[str]: The acceptable media types, most preferred first.
+    """
+    if accept is None or not accept.strip():
+        return list(media_types)
+
+    qualities = {media_type: accept_quality(accept, media_type) for media_type in media_types}
+    return sorted((media_type for media_type in media_types if qualities[media_type] > 0), key=lambda media_type: -qualities[media_type])
@@ -0,0 +1,189 @@
+import io
+from typing import List, Optional, Tuple
+from PIL import Image
+
+IMAGE_FORMATS = {
+    "avif": ("avif", "image/avif"),
+    "webp": ("webp", "image/webp"),
+    "jpeg": ("jpg", "image/jpeg"),
+    "png": ("png", "image/png"),
+}
+"""dict: The file extension and MIME type of each supported thumbnail format, from the smallest typical output to the largest."""
+
+def supported_image_formats() -> list:
+    """
+    Returns a list of supported thumbnail image formats.
+
+    The formats are listed from the smallest typical output at the same visual quality to the largest, which is
+    also the order in which they are preferred when a client accepts several.
+
+    Returns:
+        list: A list of strings, where each string is an image format.
+    """
+    return list(IMAGE_FORMATS)
+
+def is_valid_image_format(image_format: str) -> bool:
+    """
+    Checks if the given thumbnail image format is supported.
+
+    Args:
+        image_format (str): The image format, e.g. "webp".
+
+    Returns:
+        bool: True if the format is in the list of supported image formats, False otherwise.
+    """
+    return image_format in IMAGE_FORMATS
+
+def is_valid_quality(quality: Optional[int]) -> bool:
+    """
+    Checks if the given thumbnail quality is within range. A missing quality selects the encoder's default.
+
+    Args:
+        quality (Optional[int]): The quality from 1 (smallest) to 100 (best), or None.
+
+    Returns:
+        bool: True if the quality is None or between 1 and 100, False otherwise.
+    """
+    return quality is None or (isinstance(quality, int) and 1 <= quality <= 100)
+
+def image_extension(image_format: str) -> str:
+    """
+    Returns the file extension of thumbnails in an image format.
+
+    Args:
+        image_format (str): One of the supported image formats.
+
+    Returns:
+        str: The extension, without the leading dot, e.g. "jpg".
+    """
+    return IMAGE_FORMATS[image_format][0]
+
+def image_content_type(image_format: str) -> str:
+    """
+    Returns the MIME type of thumbnails in an image format.
+
+    Args:
+        image_format (str): One of the supported image formats.
+
+    Returns:
+        str: The MIME type, e.g. "image/webp".
+    """
+    return IMAGE_FORMATS[image_format][1]
+
+def requires_seekable_output(image_format: str) -> bool:
+    """
+    Checks whether FFmpeg must write an image format to a file rather than to a pipe.
+
+    AVIF images are ISOBMFF files whose header is written after the image data.
+
+    Args:
+        image_format (str): One of the supported image formats.
+
+    Returns:
+        bool: True if the output must be seekable, False otherwise.
+    """
+    return image_format == "avif"
+
+def image_encoder_args(image_format: str = "jpeg", quality: Optional[int] = None) -> List[str]:
+    """
+    Returns the FFmpeg output options that encode a single frame in an image format.
+
+    The quality, from 1 to 100, is mapped onto the scale of each encoder. PNG is lossless and ignores it.
+
+    Args:
+        image_format (str, optional): One of the supported image formats. Defaults to "jpeg".
+        quality (Optional[int], optional): The quality from 1 to 100, or None for the encoder's default.
+
+    Returns:
+        List[str]: The FFmpeg arguments, including the muxer, to be placed before the output they apply to.
+
+    Raises:
+        ValueError: If the format is not supported.
+
+    Examples:
+        >>> image_encoder_args("webp", 75)
+        ['-c:v', 'libwebp', '-quality', '75', '-f', 'webp']
+    """
+    if image_format == "jpeg":
+        # MJPEG quantizer scale: 2 is the best quality and 31 the worst
+        args = ["-c:v", "mjpeg"]
+        if quality is not None:
+            args += ["-q:v", str(round(31 - (quality - 1) * 29 / 99))]
+        return args + ["-f", "image2pipe"]
+    if image_format == "webp":
+        return ["-c:v", "libwebp", *(["-quality", str(quality)] if quality is not None else []), "-f", "webp"]
+    if image_format == "avif":
+        # AV1 constant rate factor: 0 is lossless and 63 the worst
+        crf = 32 if quality is None else round((100 - quality) * 63 / 99)
+        return ["-c:v", "libaom-av1", "-still-picture", "1", "-cpu-used", "6", "-crf", str(crf), "-pix_fmt", "yuv420p", "-f", "avif"]
+    if image_format == "png":
+        return ["-c:v", "png", "-f", "image2pipe"]
+    raise ValueError(f"Unsupported image format: {image_format}")
+
+def pillow_save_options(image_format: str = "jpeg", quality: Optional[int] = None) -> dict:
+    """
+    Returns the Pillow save options that encode an image like image_encoder_args does with FFmpeg.
+
+    Qualities are passed through unchanged, and the defaults follow FFmpeg's encoders, so a thumbnail encoded
+    by Pillow is comparable in size and quality to one encoded by FFmpeg.
+
+    Args:
+        image_format (str, optional): One of the supported image formats. Defaults to "jpeg".
+        quality (Optional[int], optional): The quality from 1 to 100, or None for the encoder's default.
+
+    Returns:
+        dict: The keyword arguments of Image.save, including the format.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if image_format == "jpeg":
+        return {"format": "JPEG", "quality": quality or 85}
+    if image_format == "webp":
+        return {"format": "WEBP", "quality": quality or 75}
+    if image_format == "avif":
+        # The same default as the AV1 constant rate factor of 32 used by FFmpeg
+        return {"format": "AVIF", "quality": quality or 50, "speed": 6}
+    if image_format == "png":
+        return {"format": "PNG"}
+    raise ValueError(f"Unsupported image format: {image_format}")
+
+def encode_image(image: Image.Image, resolution: str, image_format: str = "jpeg", quality: Optional[int] = None) -> bytes:
+    """
+    Scales an image to a resolution and encodes it.
+
+    The image is scaled with a bicubic filter, as FFmpeg does by default. This is CPU-bound and releases the GIL
+    while Pillow works, so it is meant to run in a worker thread.
+
+    Args:
+        image (Image.Image): The RGB image.
+        resolution (str): The resolution of the encoded image, e.g. "320x240".
+        image_format (str, optional): One of the supported image formats. Defaults to "jpeg".
+        quality (Optional[int], optional): The quality from 1 to 100, or None for the encoder's default.
+
+    Returns:
+        bytes: The encoded image.
+    """
+    width, height = (int(value) for value in resolution.split("x"))
+    if image.size != (width, height):
+        image = image.resize((width, height), Image.BICUBIC)
+
+    output = io.BytesIO()
+    image.save(output, **pillow_save_options(image_format, quality))
+    return output.getvalue()
+
+def resize_frame(frame: bytes, frame_size: Tuple[int, int], resolution: str, image_format: str = "jpeg", quality: Optional[int] = None) -> bytes:
+    """
+    Scales a raw RGB frame to a resolution and encodes it as an image, as encode_image does.
+
+    Args:
+        frame (bytes): The frame as packed 8-bit RGB pixels, row by row.
+        frame_size (Tuple[int, int]): The width and height of the frame in pixels.
+        resolution (str): The resolution of the image, e.g. "320x240".
+        image_format (str, optional): One of the supported image formats. Defaults to "jpeg".
+        quality (Optional[int], optional): The quality from 1 to 100, or None for the encoder's default.
+
+    Returns:
+        bytes: The encoded image.
+    """
+    return encode_image(Image.frombuffer("RGB", frame_size, frame, "raw", "RGB", 0, 1), resolution, image_format, quality)
@@ -0,0 +1,262 @@
+"""
+metrics.py
+
+This module provides a small in-process metrics registry with counters and histograms, rendered in the
+Prometheus text exposition format.
+
+Recording is designed for hot paths: a labelled series is looked up once per call in a dictionary keyed by its
+label values, and observing a value is a binary search over the bucket bounds and a few additions, a few
+microseconds in total. Metrics are recorded from the event loop thread and are not locked.
+"""
+
+import math
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+"""tuple: Default histogram bucket upper bounds for durations in seconds."""
+
+BYTES_BUCKETS = tuple(1024 * 4 ** exponent for exponent in range(10))
+"""tuple: Histogram bucket upper bounds for sizes in bytes, from 1 KiB to 256 MiB."""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _CounterSeries:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """
+        Increases the counter.
+
+        Args:
+            amount (float, optional): The amount to add. Must not be negative. Defaults to 1.
+        """
+        self.value += amount
+
+
+class _HistogramSeries:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Records a value in the first bucket whose upper bound is at least the value.
+
+        Args:
+            value (float): The value to record.
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric:
+    """
+    A named metric with a fixed set of label names, holding one series per combination of label values.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """
+        Returns the series for a combination of label values, creating it on first use.
+
+        Args:
+            *values (str): The label values, in the order of the label names.
+
+        Returns:
+            The series, which records values with `inc` for counters or `observe` for histograms.
+
+        Raises:
+            ValueError: If the number of values does not match the number of label names.
+        """
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            series = self._series[values] = self._new_series()
+        return series
+
+    def render(self) -> List[str]:
+        """
+        Renders the metric in the Prometheus text exposition format.
+
+        Returns:
+            List[str]: The lines of the metric, including its HELP and TYPE lines.
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, series in sorted(self._series.items()):
+            lines += self._render_series(values, series)
+        return lines
+
+    def _render_series(self, values: Tuple[str, ...], series) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    A monotonically increasing count, such as the number of requests served.
+    """
+
+    kind = "counter"
+
+    def _new_series(self) -> _CounterSeries:
+        return _CounterSeries()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """
+        Increases the counter of a metric without labels.
+
+        Args:
+            amount (float, optional): The amount to add. Defaults to 1.
+        """
+        self.labels().inc(amount)
+
+    def _render_series(self, values: Tuple[str, ...], series: _CounterSeries) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(series.value)}"]
+
+
+class Histogram(_Metric):
+    """
+    A distribution of observed values, such as request durations, counted in cumulative buckets.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        """
+        Initializes the histogram.
+
+        Args:
+            name (str): The name of the metric.
+            documentation (str): The description shown in the HELP line.
+            labelnames (Sequence[str], optional): The names of the labels. Defaults to none.
+            buckets (Sequence[float], optional): The bucket upper bounds in ascending order, without +Inf.
+                Defaults to LATENCY_BUCKETS.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_series(self) -> _HistogramSeries:
+        return _HistogramSeries(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """
+        Records a value in a metric without labels.
+
+        Args:
+            value (float): The value to record.
+        """
+        self.labels().observe(value)
+
+    def _render_series(self, values: Tuple[str, ...], series: _HistogramSeries) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), series.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames + ("le",), values + (_format_value(bound),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(series.sum)}")
+        lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    A collection of metrics rendered together by the /metrics endpoint.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """
+        Creates and registers a counter.
+
+        Args:
+            name (str): The name of the metric, conventionally ending in "_total".
+            documentation (str): The description shown in the HELP line.
+            labelnames (Sequence[str], optional): The names of the labels. Defaults to none.
+
+        Returns:
+            Counter: The counter.
+
+        Raises:
+            ValueError: If a metric with the same name is already registered.
+        """
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """
+        Creates and registers a histogram.
+
+        Args:
+            name (str): The name of the metric, conventionally ending in the unit, e.g. "_seconds".
+            documentation (str): The description shown in the HELP line.
+            labelnames (Sequence[str], optional): The names of the labels. Defaults to none.
+            buckets (Sequence[float], optional): The bucket upper bounds. Defaults to LATENCY_BUCKETS.
+
+        Returns:
+            Histogram: The histogram.
+
+        Raises:
+            ValueError: If a metric with the same name is already registered.
+        """
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Renders every registered metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition, ending with a newline.
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+"""MetricsRegistry: The registry of the application's metrics."""
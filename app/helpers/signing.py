@@ -0,0 +1,40 @@
+import hashlib
+import hmac
+import time
+from typing import Optional
+
+
+def sign_upload(file_path: str, expires: int, key: str) -> str:
+    """
+    Computes the signature that authorizes an upload to a storage path until an expiry time.
+
+    Args:
+        file_path (str): The storage path the upload is written to.
+        expires (int): The UNIX timestamp after which the signature is no longer accepted.
+        key (str): The secret signing key.
+
+    Returns:
+        str: The hex-encoded HMAC-SHA256 signature.
+    """
+    return hmac.new(key.encode(), f"PUT\n{file_path}\n{expires}".encode(), hashlib.sha256).hexdigest()
+
+
+def verify_upload_signature(file_path: str, expires: int, signature: str, key: str, now: Optional[float] = None) -> bool:
+    """
+    Checks that a signature authorizes an upload to a storage path and has not expired.
+
+    Signatures are compared in constant time.
+
+    Args:
+        file_path (str): The storage path the upload is written to.
+        expires (int): The UNIX timestamp after which the signature is no longer accepted.
+        signature (str): The hex-encoded signature to check.
+        key (str): The secret signing key.
+        now (Optional[float], optional): The current UNIX timestamp. Defaults to the system time.
+
+    Returns:
+        bool: True if the signature is valid and unexpired, False otherwise.
+    """
+    if expires < (time.time() if now is None else now):
+        return False
+    return hmac.compare_digest(sign_upload(file_path, expires, key), signature)
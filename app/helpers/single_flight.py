@@ -0,0 +1,56 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution.
+
+    While a call for a key is in flight, further calls with the same key wait for its result
+    instead of starting their own. Once the call completes, the next call for the key starts
+    a new execution.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty map of in-flight calls.
+        """
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs `fn` unless a call with the same key is already in flight, in which case its result is awaited.
+
+        The shared call is shielded from cancellation, so a caller that gives up does not cancel
+        the work for the other callers waiting on it.
+
+        Args:
+            key (Hashable): The key identifying identical calls.
+            fn (Callable[[], Awaitable[T]]): A function returning the awaitable to run.
+
+        Returns:
+            T: The result of the shared call.
+
+        Raises:
+            Exception: Any exception raised by the shared call is raised to every caller.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        """
+        Returns the number of calls currently in flight.
+
+        Returns:
+            int: The number of distinct keys being executed.
+        """
+        return len(self._calls)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
@@ -0,0 +1,28 @@
+from typing import AsyncIterator
+from fastapi import UploadFile
+
+async def iter_upload_file(file: UploadFile, chunk_size: int) -> AsyncIterator[bytes]:
+    """
+    Reads an uploaded file in fixed-size chunks.
+
+    Only one chunk is held in memory at a time, which keeps the memory used by an upload
+    bounded by `chunk_size` instead of by the size of the uploaded file.
+
+    Args:
+        file (UploadFile): The uploaded file to read.
+        chunk_size (int): The maximum number of bytes to read per chunk. Must be positive.
+
+    Yields:
+        bytes: The next chunk of the file. The last chunk may be shorter than `chunk_size`.
+
+    Raises:
+        ValueError: If chunk_size is not positive.
+    """
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be positive")
+
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
@@ -0,0 +1,99 @@
+"""
+timing.py
+
+This module collects named phase timings for the request being served, to be reported in its Server-Timing
+response header.
+
+Phases are recorded into a list held in a context variable. Tasks started while serving a request inherit the
+context, so the phases of a render shared through SingleFlight are reported to the request that started it.
+Outside a request nothing is collected, and recording a phase costs a single context variable lookup.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_phases: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("phases", default=None)
+
+
+def start_timing() -> Token:
+    """
+    Starts collecting phases for the current context.
+
+    Returns:
+        Token: The token that stop_timing takes to restore the previous context.
+    """
+    return _phases.set([])
+
+
+def stop_timing(token: Token) -> List[Tuple[str, float]]:
+    """
+    Stops collecting phases for the current context.
+
+    Args:
+        token (Token): The token returned by start_timing.
+
+    Returns:
+        List[Tuple[str, float]]: The recorded (name, seconds) pairs, in the order they ended.
+    """
+    phases = _phases.get() or []
+    _phases.reset(token)
+    return phases
+
+
+def current_phases() -> List[Tuple[str, float]]:
+    """
+    Returns the phases recorded so far in the current context.
+
+    Returns:
+        List[Tuple[str, float]]: The recorded (name, seconds) pairs, or an empty list if nothing is collected.
+    """
+    return list(_phases.get() or [])
+
+
+def record_phase(name: str, seconds: float) -> None:
+    """
+    Records the duration of a phase, if phases are collected in the current context.
+
+    Args:
+        name (str): The name of the phase. Must be a valid HTTP token, e.g. "storage-read_file".
+        seconds (float): The duration of the phase.
+    """
+    phases = _phases.get()
+    if phases is not None:
+        phases.append((name, seconds))
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Records the duration of the enclosed block as a phase, including any time spent awaiting in it.
+
+    Args:
+        name (str): The name of the phase.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - start)
+
+
+def server_timing_header(phases: List[Tuple[str, float]]) -> str:
+    """
+    Formats phases as the value of a Server-Timing header.
+
+    Phases with the same name are summed, since a request may for instance check storage several times.
+
+    Args:
+        phases (List[Tuple[str, float]]): The (name, seconds) pairs.
+
+    Returns:
+        str: The header value, e.g. "storage-file_exists;dur=0.41, ffmpeg;dur=84.20", with durations in
+            milliseconds.
+    """
+    totals: Dict[str, float] = {}
+    for name, seconds in phases:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in totals.items())
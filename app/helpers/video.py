@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 def supported_video_formats() -> list:
     """
     Returns a list of supported video file formats.
@@ -53,6 +55,127 @@ def is_valid_resolution(resolution: str) -> bool:
     allowed_resolutions = supported_resolutions()
     return resolution in allowed_resolutions
 
+def master_frame_resolution(width: Optional[int] = None, height: Optional[int] = None) -> str:
+    """
+    Returns the resolution at which a video frame is kept for deriving thumbnails of other resolutions.
+
+    Thumbnails are scaled from the decoded frame, so a frame at the video's own dimensions yields the same
+    thumbnails as decoding again. Videos larger than the highest supported resolution, or whose dimensions are
+    unknown, are kept at the highest supported resolution.
+
+    Args:
+        width (Optional[int], optional): The width of the video in pixels, if known.
+        height (Optional[int], optional): The height of the video in pixels, if known.
+
+    Returns:
+        str: A resolution in the format "widthxheight".
+    """
+    def area(resolution: str) -> int:
+        frame_width, frame_height = resolution.split("x")
+        return int(frame_width) * int(frame_height)
+
+    highest = max(supported_resolutions(), key=area)
+    if width and height and width * height <= area(highest):
+        return f"{width}x{height}"
+    return highest
+
+def pregeneration_timestamps(duration: Optional[float], poster_offset: int, count: int) -> List[int]:
+    """
+    Returns the timestamps of the thumbnails pregenerated after a video is uploaded: a poster frame followed by
+    frames evenly spaced across the video.
+
+    Timestamps are whole seconds, like those of thumbnail requests, so that requests for the same frames find the
+    pregenerated thumbnails.
+
+    Args:
+        duration (Optional[float]): The length of the video in seconds, if known. Without it, only the poster
+            frame is returned.
+        poster_offset (int): The timestamp of the poster frame in seconds. Videos no longer than the offset get a
+            poster frame from their start.
+        count (int): The number of evenly spaced frames, excluding the start and end of the video.
+
+    Returns:
+        List[int]: The distinct timestamps in seconds, poster frame first.
+    """
+    if duration is None:
+        return [poster_offset]
+
+    timestamps = [poster_offset if poster_offset < duration else 0]
+    timestamps += [int(duration * index / (count + 1)) for index in range(1, count + 1)]
+    return list(dict.fromkeys(timestamps))
+
+def supported_seek_accuracies() -> list:
+    """
+    Returns a list of supported seek accuracies for thumbnail extraction.
+
+    "exact" decodes from the keyframe before the timestamp up to the exact frame at the timestamp.
+    "fast" emits the nearest keyframe at or before the timestamp, decoding keyframes only.
+
+    Returns:
+        list: A list of strings, where each string is a seek accuracy.
+    """
+    return ["exact", "fast"]
+
+def is_valid_seek_accuracy(accuracy: str) -> bool:
+    """
+    Checks if the given seek accuracy is supported.
+
+    Args:
+        accuracy (str): The seek accuracy, e.g. "fast".
+
+    Returns:
+        bool: True if the accuracy is in the list of supported seek accuracies, False otherwise.
+    """
+    return accuracy in supported_seek_accuracies()
+
+def seek_input_args(timestamp: str, accuracy: str = "exact") -> list:
+    """
+    Returns the FFmpeg input options that seek to a timestamp with the given accuracy.
+
+    The options must be placed before the `-i` of the input they apply to, so that FFmpeg seeks in the demuxer.
+
+    Args:
+        timestamp (str): The timestamp to seek to, e.g. "00:01:05".
+        accuracy (str, optional): One of the supported seek accuracies. Defaults to "exact".
+
+    Returns:
+        list: The FFmpeg arguments.
+
+    Raises:
+        ValueError: If the accuracy is not supported.
+
+    Examples:
+        >>> seek_input_args("00:00:05", "fast")
+        ['-noaccurate_seek', '-skip_frame', 'nokey', '-ss', '00:00:05']
+    """
+    if accuracy == "exact":
+        return ["-ss", timestamp]
+    if accuracy == "fast":
+        return ["-noaccurate_seek", "-skip_frame", "nokey", "-ss", timestamp]
+    raise ValueError(f"Unsupported seek accuracy: {accuracy}")
+
+def seek_output_args(accuracy: str = "exact") -> list:
+    """
+    Returns the FFmpeg output options that complete a seek with the given accuracy.
+
+    A fast seek keeps the timestamp of the keyframe it lands on, which lies before the requested
+    timestamp. Passing frame timestamps through unchanged keeps FFmpeg from dropping that frame.
+
+    Args:
+        accuracy (str, optional): One of the supported seek accuracies. Defaults to "exact".
+
+    Returns:
+        list: The FFmpeg arguments, to be placed before the output they apply to.
+
+    Raises:
+        ValueError: If the accuracy is not supported.
+    """
+    if accuracy == "exact":
+        return []
+    if accuracy == "fast":
+        return ["-fps_mode", "passthrough"]
+    raise ValueError(f"Unsupported seek accuracy: {accuracy}")
+
 def is_valid_seconds(seconds):
     if isinstance(seconds, int) and seconds >= 0:
         return True
@@ -98,3 +221,31 @@ def seconds_to_timestamp(seconds: int) -> str:
     
     # Format and return the timestamp string
     return f"{int(hours):02}:{int(minutes):02}:{int(seconds):02}"
+
+def timestamp_to_seconds(timestamp: str) -> float:
+    """
+    Converts a timestamp in the format "HH:MM:SS" to a duration in seconds.
+
+    Fractional seconds and shorter forms such as "MM:SS" or "SS" are accepted as well.
+
+    Args:
+        timestamp (str): The timestamp to convert.
+
+    Returns:
+        float: The duration in seconds.
+
+    Raises:
+        ValueError: If the timestamp is not in a supported format.
+
+    Examples:
+        >>> timestamp_to_seconds("01:01:05")
+        3665.0
+    """
+    parts = timestamp.split(":")
+    if len(parts) > 3:
+        raise ValueError(f"Unsupported timestamp format: {timestamp}")
+
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    return seconds
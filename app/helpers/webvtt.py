@@ -0,0 +1,64 @@
+import math
+from typing import Optional
+
+def seconds_to_vtt_timestamp(seconds: float) -> str:
+    """
+    Converts a duration from seconds to a WebVTT cue timestamp.
+
+    Args:
+        seconds (float): The duration in seconds. Must be non-negative.
+
+    Returns:
+        str: A timestamp in the format "HH:MM:SS.mmm".
+
+    Raises:
+        ValueError: If the input seconds is negative.
+
+    Examples:
+        >>> seconds_to_vtt_timestamp(3665.5)
+        '01:01:05.500'
+    """
+    if seconds < 0:
+        raise ValueError("Input seconds must be non-negative")
+
+    milliseconds = round(seconds * 1000)
+    hours, remainder = divmod(milliseconds, 3600 * 1000)
+    minutes, remainder = divmod(remainder, 60 * 1000)
+    seconds, milliseconds = divmod(remainder, 1000)
+    return f"{hours:02}:{minutes:02}:{seconds:02}.{milliseconds:03}"
+
+def build_sprite_vtt(sprite_url: str, interval: float, columns: int, rows: int, tile_width: int, tile_height: int, duration: Optional[float] = None) -> str:
+    """
+    Builds a WebVTT index mapping time ranges to the tiles of a sprite sheet.
+
+    Tiles are laid out row by row, and the tile at index i covers the time range [i * interval, (i + 1) * interval).
+    Each cue points into the sprite with a media fragment, e.g. "sprite.jpg#xywh=160,0,160,90". When the video is
+    shorter than the grid, cues stop at the last tile that has a frame, and the last cue ends with the video.
+
+    Args:
+        sprite_url (str): The URL of the sprite sheet, relative to the WebVTT file or absolute.
+        interval (float): The number of seconds between tiles.
+        columns (int): The number of tiles per row.
+        rows (int): The number of rows of tiles.
+        tile_width (int): The width of a tile in pixels.
+        tile_height (int): The height of a tile in pixels.
+        duration (Optional[float], optional): The length of the video in seconds, if known. Defaults to None,
+            meaning every tile of the grid gets a cue.
+
+    Returns:
+        str: The WebVTT document.
+    """
+    tiles = columns * rows
+    if duration:
+        tiles = min(tiles, math.ceil(duration / interval))
+
+    lines = ["WEBVTT", ""]
+    for index in range(tiles):
+        row, column = divmod(index, columns)
+        start = seconds_to_vtt_timestamp(index * interval)
+        end_seconds = (index + 1) * interval
+        end = seconds_to_vtt_timestamp(min(end_seconds, duration) if duration else end_seconds)
+        lines.append(f"{start} --> {end}")
+        lines.append(f"{sprite_url}#xywh={column * tile_width},{row * tile_height},{tile_width},{tile_height}")
+        lines.append("")
+    return "\n".join(lines)
@@ -0,0 +1,274 @@
+"""
+job_queue.py
+
+This module provides a durable queue of background jobs backed by SQLite.
+
+Accepted jobs are persisted before they are acknowledged, so they survive a restart of the API or of the workers.
+Workers in any number of processes claim jobs atomically and renew the lease of a claimed job while they run it,
+so a job whose worker died is claimed again once its lease expires.
+"""
+
+import json
+import os
+import time
+import uuid
+import aiosqlite
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+class JobStatus:
+    """
+    The states a job moves through: queued, then running, then succeeded or failed.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """
+    A background job and its outcome.
+
+    Attributes:
+        job_id (str): The unique identifier of the job.
+        kind (str): The kind of work the job performs, e.g. "thumbnail".
+        params (Dict[str, Any]): The parameters of the work.
+        status (str): The current JobStatus of the job.
+        result (Optional[Dict[str, Any]]): The result of the work, once the job has succeeded.
+        error (Optional[str]): The reason the job failed, if it has.
+        attempts (int): The number of times the job has been claimed by a worker.
+        created_at (float): The submission time as a UNIX timestamp.
+        updated_at (float): The time of the last status change as a UNIX timestamp.
+        claimed_at (Optional[float]): The time the job was last claimed, or its lease last renewed, as a UNIX timestamp.
+        claim_token (Optional[str]): The identifier of the current claim, while the job is running. Finishing or
+            releasing the job requires it, so a worker whose lease expired cannot overwrite the outcome of a later claim.
+    """
+    job_id: str
+    kind: str
+    params: Dict[str, Any]
+    status: str
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    attempts: int
+    created_at: float
+    updated_at: float
+    claimed_at: Optional[float]
+    claim_token: Optional[str] = None
+
+
+class JobQueue:
+    """
+    An asynchronous SQLite queue of jobs, processed in submission order.
+
+    A connection is opened per operation and the database uses write-ahead logging, so the queue can be shared
+    between event loops and processes.
+    """
+
+    COLUMNS = ("job_id", "kind", "params", "status", "result", "error", "attempts", "created_at", "updated_at", "claimed_at", "claim_token")
+    """tuple: The columns of the jobs table, in the order of the Job fields."""
+
+    def __init__(self, db_path: str, lease_seconds: float = 300):
+        """
+        Initializes the queue with the path of its SQLite database file.
+
+        Args:
+            db_path (str): The path of the SQLite database file. Missing parent directories are created.
+            lease_seconds (float, optional): Seconds after which a running job whose lease was not renewed is
+                assumed abandoned and may be claimed again. Defaults to 300.
+        """
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self._initialized = False
+
+    @asynccontextmanager
+    async def _connect(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Opens a connection to the database for the duration of the context, creating or migrating the schema on first use.
+
+        Yields:
+            aiosqlite.Connection: An open connection, closed when the context exits.
+        """
+        if not self._initialized:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        async with aiosqlite.connect(self.db_path) as db:
+            if not self._initialized:
+                await db.execute("PRAGMA journal_mode=WAL")
+                await db.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        job_id TEXT PRIMARY KEY,
+                        kind TEXT NOT NULL,
+                        params TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        result TEXT,
+                        error TEXT,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        created_at REAL NOT NULL,
+                        updated_at REAL NOT NULL,
+                        claimed_at REAL,
+                        claim_token TEXT
+                    )
+                    """
+                )
+                async with db.execute("PRAGMA table_info(jobs)") as cursor:
+                    if "claim_token" not in {row[1] for row in await cursor.fetchall()}:
+                        await db.execute("ALTER TABLE jobs ADD COLUMN claim_token TEXT")
+                await db.execute("CREATE INDEX IF NOT EXISTS jobs_status_created_at ON jobs (status, created_at)")
+                await db.commit()
+                self._initialized = True
+            yield db
+
+    @staticmethod
+    def _to_job(row: tuple) -> Job:
+        job = Job(*row)
+        job.params = json.loads(job.params)
+        job.result = json.loads(job.result) if job.result is not None else None
+        return job
+
+    async def submit(self, kind: str, params: Dict[str, Any]) -> Job:
+        """
+        Persists a new job at the end of the queue.
+
+        Args:
+            kind (str): The kind of work the job performs.
+            params (Dict[str, Any]): The JSON-serializable parameters of the work.
+
+        Returns:
+            Job: The queued job.
+        """
+        now = time.time()
+        job = Job(str(uuid.uuid4()), kind, params, JobStatus.QUEUED, None, None, 0, now, now, None)
+        async with self._connect() as db:
+            await db.execute(
+                "INSERT INTO jobs (job_id, kind, params, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job.job_id, kind, json.dumps(params), job.status, now, now)
+            )
+            await db.commit()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """
+        Looks up a job by its unique identifier.
+
+        Args:
+            job_id (str): The unique identifier of the job.
+
+        Returns:
+            Optional[Job]: The job, or None if no such job was submitted.
+        """
+        async with self._connect() as db:
+            async with db.execute(f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)) as cursor:
+                row = await cursor.fetchone()
+        return self._to_job(row) if row else None
+
+    async def claim(self) -> Optional[Job]:
+        """
+        Atomically claims the oldest job that is queued or whose lease has expired, and marks it as running.
+
+        The claim is a single UPDATE statement, so concurrent workers, including workers in other processes,
+        never claim the same job. Each claim is given a new claim token.
+
+        Returns:
+            Optional[Job]: The claimed job, or None if there is nothing to do.
+        """
+        now = time.time()
+        async with self._connect() as db:
+            async with db.execute(
+                f"""
+                UPDATE jobs SET status = ?, attempts = attempts + 1, claimed_at = ?, updated_at = ?, claim_token = ?
+                WHERE job_id = (
+                    SELECT job_id FROM jobs
+                    WHERE status = ? OR (status = ? AND claimed_at < ?)
+                    ORDER BY created_at LIMIT 1
+                )
+                RETURNING {', '.join(self.COLUMNS)}
+                """,
+                (JobStatus.RUNNING, now, now, uuid.uuid4().hex, JobStatus.QUEUED, JobStatus.RUNNING, now - self.lease_seconds)
+            ) as cursor:
+                row = await cursor.fetchone()
+            await db.commit()
+        return self._to_job(row) if row else None
+
+    async def renew(self, job_id: str, claim_token: str) -> bool:
+        """
+        Extends the lease of a running job, so that it is not claimed again while its worker is still alive.
+
+        Args:
+            job_id (str): The unique identifier of the job.
+            claim_token (str): The claim token of the job.
+
+        Returns:
+            bool: True if the lease was renewed, False if the claim is no longer held.
+        """
+        async with self._connect() as db:
+            cursor = await db.execute(
+                "UPDATE jobs SET claimed_at = ? WHERE job_id = ? AND claim_token = ? AND status = ?",
+                (time.time(), job_id, claim_token, JobStatus.RUNNING)
+            )
+            await db.commit()
+            return cursor.rowcount > 0
+
+    async def complete(self, job_id: str, claim_token: str, result: Dict[str, Any]) -> bool:
+        """
+        Marks a job as succeeded and records its result, unless it has been claimed again in the meantime.
+
+        Args:
+            job_id (str): The unique identifier of the job.
+            claim_token (str): The claim token of the job.
+            result (Dict[str, Any]): The JSON-serializable result of the work.
+
+        Returns:
+            bool: True if the outcome was recorded, False if the claim is no longer held.
+        """
+        return await self._finish(job_id, claim_token, JobStatus.SUCCEEDED, json.dumps(result), None)
+
+    async def fail(self, job_id: str, claim_token: str, error: str) -> bool:
+        """
+        Marks a job as failed and records the reason, unless it has been claimed again in the meantime.
+
+        Args:
+            job_id (str): The unique identifier of the job.
+            claim_token (str): The claim token of the job.
+            error (str): The reason the job failed.
+
+        Returns:
+            bool: True if the outcome was recorded, False if the claim is no longer held.
+        """
+        return await self._finish(job_id, claim_token, JobStatus.FAILED, None, error)
+
+    async def release(self, job_id: str, claim_token: str) -> bool:
+        """
+        Returns a running job to the queue without counting the attempt, e.g. when its worker shuts down.
+
+        Args:
+            job_id (str): The unique identifier of the job.
+            claim_token (str): The claim token of the job.
+
+        Returns:
+            bool: True if the job was returned to the queue, False if the claim is no longer held.
+        """
+        async with self._connect() as db:
+            cursor = await db.execute(
+                "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), claimed_at = NULL, claim_token = NULL, updated_at = ? "
+                "WHERE job_id = ? AND claim_token = ? AND status = ?",
+                (JobStatus.QUEUED, time.time(), job_id, claim_token, JobStatus.RUNNING)
+            )
+            await db.commit()
+            return cursor.rowcount > 0
+
+    async def _finish(self, job_id: str, claim_token: str, status: str, result: Optional[str], error: Optional[str]) -> bool:
+        async with self._connect() as db:
+            cursor = await db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, claim_token = NULL, updated_at = ? "
+                "WHERE job_id = ? AND claim_token = ? AND status = ?",
+                (status, result, error, time.time(), job_id, claim_token, JobStatus.RUNNING)
+            )
+            await db.commit()
+            return cursor.rowcount > 0
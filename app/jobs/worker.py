@@ -0,0 +1,218 @@
+"""
+worker.py
+
+This module runs queued background jobs, either as a pool of tasks inside the API process or as a standalone
+worker process sharing the same job queue.
+
+Usage:
+    python -m app.jobs.worker [--workers 4]
+"""
+
+import argparse
+import asyncio
+import signal
+from typing import Any, Dict, List, Optional
+from app.api.service.video_service import VideoService
+from app.config import get_config
+from app.helpers.ffmpeg import FFmpegBusyError
+from app.jobs.job_queue import Job, JobQueue
+
+
+async def run_job(job: Job) -> Dict[str, Any]:
+    """
+    Performs the work of a job.
+
+    Args:
+        job (Job): The job to perform.
+
+    Returns:
+        Dict[str, Any]: The result of the work.
+
+    Raises:
+        ValueError: If the kind of job is unknown.
+        Exception: Any exception raised by the work itself.
+    """
+    if job.kind == "thumbnail":
+        thumbnail_id = await VideoService.generate_thumbnail(
+            job.params["file_id"], job.params["timestamp"], job.params["resolution"], job.params.get("accuracy", "exact"),
+            job.params.get("format", "jpeg"), job.params.get("quality")
+        )
+        return {"thumbnail_id": thumbnail_id}
+
+    raise ValueError(f"Unknown job kind: {job.kind}")
+
+
+async def keep_lease(job_queue: JobQueue, job: Job) -> None:
+    """
+    Renews the lease of a running job at a third of the lease duration, until cancelled or the claim is lost.
+
+    Args:
+        job_queue (JobQueue): The queue the job was claimed from.
+        job (Job): The claimed job.
+    """
+    while True:
+        await asyncio.sleep(max(job_queue.lease_seconds / 3, 0.1))
+        try:
+            if not await job_queue.renew(job.job_id, job.claim_token):
+                return
+        except Exception as e:
+            print("Job lease renewal error:", e)
+
+
+async def process_next(job_queue: JobQueue, max_attempts: int = 3) -> bool:
+    """
+    Claims the next job from the queue, if any, performs it and records the outcome.
+
+    The lease of the job is renewed while it runs, so long jobs are not claimed by another worker. A job that
+    finds FFmpeg saturated is returned to the queue. A job that is claimed more than `max_attempts` times, because
+    its workers keep dying, is failed. If the worker is cancelled while performing a job, the job is returned to
+    the queue for another worker. The outcome is only recorded while the claim is still held.
+
+    Args:
+        job_queue (JobQueue): The queue to take the job from.
+        max_attempts (int, optional): The number of claims after which a job is failed. Defaults to 3.
+
+    Returns:
+        bool: True if a job was processed, False if the queue was empty.
+    """
+    job = await job_queue.claim()
+    if job is None:
+        return False
+
+    if job.attempts > max_attempts:
+        await job_queue.fail(job.job_id, job.claim_token, "Job was abandoned too many times")
+        return True
+
+    heartbeat = asyncio.create_task(keep_lease(job_queue, job))
+    try:
+        result = await run_job(job)
+    except asyncio.CancelledError:
+        await asyncio.shield(job_queue.release(job.job_id, job.claim_token))
+        raise
+    except FFmpegBusyError as e:
+        await job_queue.release(job.job_id, job.claim_token)
+        await asyncio.sleep(e.retry_after)
+        return True
+    except FileNotFoundError:
+        await job_queue.fail(job.job_id, job.claim_token, "Video file not found")
+        return True
+    except Exception as e:
+        await job_queue.fail(job.job_id, job.claim_token, str(e))
+        return True
+    finally:
+        heartbeat.cancel()
+
+    if not await job_queue.complete(job.job_id, job.claim_token, result):
+        print(f"Job {job.job_id} lost its claim before it completed")
+    return True
+
+
+async def run_worker(job_queue: JobQueue, poll_interval: float, max_attempts: int = 3) -> None:
+    """
+    Processes jobs until cancelled, polling the queue while it is empty.
+
+    Args:
+        job_queue (JobQueue): The queue to take jobs from.
+        poll_interval (float): Seconds to wait before checking an empty queue again.
+        max_attempts (int, optional): The number of claims after which a job is failed. Defaults to 3.
+    """
+    while True:
+        try:
+            processed = await process_next(job_queue, max_attempts)
+        except Exception as e:
+            print("Job worker error:", e)
+            processed = False
+
+        if not processed:
+            await asyncio.sleep(poll_interval)
+
+
+class WorkerPool:
+    """
+    A fixed number of worker tasks processing a job queue in the current event loop.
+    """
+
+    def __init__(self, job_queue: JobQueue, size: int, poll_interval: float, max_attempts: int = 3):
+        """
+        Initializes a stopped pool.
+
+        Args:
+            job_queue (JobQueue): The queue to take jobs from.
+            size (int): The number of jobs processed concurrently.
+            poll_interval (float): Seconds a worker waits before checking an empty queue again.
+            max_attempts (int, optional): The number of claims after which a job is failed. Defaults to 3.
+        """
+        self.job_queue = job_queue
+        self.size = size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """
+        Starts the worker tasks.
+        """
+        self._tasks = [
+            asyncio.create_task(run_worker(self.job_queue, self.poll_interval, self.max_attempts))
+            for _ in range(self.size)
+        ]
+
+    async def stop(self) -> None:
+        """
+        Cancels the worker tasks and waits for them to return their running jobs to the queue.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+def create_worker_pool(size: Optional[int] = None) -> WorkerPool:
+    """
+    Creates a worker pool for the job queue of the VideoService, configured from the application configuration.
+
+    Args:
+        size (Optional[int], optional): The number of workers. Defaults to `JOB_WORKERS`.
+
+    Returns:
+        WorkerPool: A stopped worker pool.
+    """
+    config = get_config()
+    return WorkerPool(
+        VideoService.job_queue,
+        config.JOB_WORKERS if size is None else size,
+        config.JOB_POLL_INTERVAL,
+        config.JOB_MAX_ATTEMPTS
+    )
+
+
+async def main(size: int) -> None:
+    """
+    Runs a worker pool until the process receives SIGINT or SIGTERM.
+
+    Args:
+        size (int): The number of workers.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await VideoService.storage_service.open()
+    await VideoService.video_index.initialize()
+    pool = create_worker_pool(size)
+    pool.start()
+    print(f"Processing jobs from {VideoService.job_queue.db_path} with {size} workers")
+    try:
+        await stop.wait()
+    finally:
+        await pool.stop()
+        await VideoService.video_index.close()
+        await VideoService.storage_service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=max(get_config().JOB_WORKERS, 1), help="jobs processed concurrently")
+    args = parser.parse_args()
+    asyncio.run(main(args.workers))
@@ -0,0 +1,82 @@
+"""
+backfill.py
+
+This module rebuilds video index entries for videos that already exist in storage, such as videos
+uploaded before the index was introduced.
+
+Usage:
+    python -m app.metadata.backfill
+"""
+
+import asyncio
+import mimetypes
+import os
+import time
+from dataclasses import asdict
+from typing import Optional
+from app.helpers.ffmpeg import FFmpegExecutor
+from app.helpers.video import supported_video_formats
+from app.metadata.probe import VideoMetadata, probe_video
+from app.metadata.video_index import VideoIndex, VideoRecord
+from app.storage.storage_service import StorageService
+
+
+async def backfill_video_index(storage_service: StorageService, video_index: VideoIndex, upload_dir: str, executor: Optional[FFmpegExecutor] = None) -> int:
+    """
+    Records every stored video under the upload directory in the video index.
+
+    Files whose extension is not a supported video format are skipped. Existing records are
+    replaced. Since storage does not keep the original upload time, the time of the backfill
+    is recorded instead.
+
+    When an executor is given, videos that the storage provider can expose as a seekable source
+    are probed with ffprobe and their metadata is recorded as well.
+
+    Args:
+        storage_service (StorageService): The storage service holding the uploaded videos.
+        video_index (VideoIndex): The index to populate.
+        upload_dir (str): The directory in which videos are uploaded.
+        executor (Optional[FFmpegExecutor], optional): The executor used to run ffprobe. Defaults to None, which skips probing.
+
+    Returns:
+        int: The number of videos recorded in the index.
+    """
+    formats = supported_video_formats()
+    count = 0
+    for storage_key, size in (await storage_service.list_files(upload_dir)).items():
+        file_id, extension = os.path.splitext(os.path.basename(storage_key))
+        extension = extension.lstrip('.').lower()
+        if extension not in formats:
+            continue
+
+        metadata = None
+        if executor is not None:
+            async with storage_service.open_seekable_source(storage_key) as source:
+                if source is not None:
+                    metadata = await probe_video(source, executor)
+
+        await video_index.add(VideoRecord(
+            file_id=file_id,
+            extension=extension,
+            storage_key=storage_key,
+            size=size,
+            content_type=mimetypes.guess_type(storage_key)[0],
+            uploaded_at=time.time(),
+            **asdict(metadata or VideoMetadata())
+        ))
+        count += 1
+    return count
+
+
+async def main() -> None:
+    """
+    Backfills the video index used by VideoService from its configured storage.
+    """
+    from app.api.service.video_service import VideoService
+
+    count = await backfill_video_index(VideoService.storage_service, VideoService.video_index, VideoService.UPLOAD_DIR, VideoService.ffmpeg_executor)
+    print(f"Recorded {count} videos in {VideoService.video_index.db_path}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,301 @@
+"""
+keyframes.py
+
+This module builds and reads per-video keyframe indexes, which let a thumbnail be extracted from the byte range
+of a single group of pictures (GOP) instead of the whole video.
+
+An index records, for every keyframe of the first video stream, its presentation time relative to the start of the
+video, which is what FFmpeg's -ss seeks to, and the byte range of the packets that are presented from it up to the next keyframe, along with the byte ranges of the container header.
+For MP4 and MOV files the header holds the sample tables with absolute offsets, so a file that contains only the
+header and one GOP at their original offsets can be decoded by FFmpeg as if it were the whole video.
+
+The index is stored as a compact little-endian binary file:
+
+    magic (4 bytes) | keyframe count (uint32) | header range count (uint32)
+    header ranges ((start, end) int64 pairs) | keyframe times (float64 array) | GOP starts (int64 array)
+    GOP ends (int64 array)
+"""
+
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from typing import Awaitable, Callable, List, Optional, Tuple
+from app.helpers.ffmpeg import FFmpegExecutor
+
+MAGIC = b"KFI2"
+"""bytes: Identifies a serialized keyframe index and its format version. Version 1 indexes held absolute times."""
+
+HEADER = struct.Struct("<4sII")
+"""struct.Struct: The fixed-size header of a serialized keyframe index."""
+
+CONTAINERS = ("mov", "mp4")
+"""tuple: ffprobe format names of the containers whose header lets FFmpeg decode a partial file."""
+
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+class KeyframeIndex:
+    """
+    The keyframe times and GOP byte ranges of a video, with the byte ranges of its container header.
+
+    Attributes:
+        times (array): The presentation times of the keyframes in seconds from the start of the video, in
+            ascending order.
+        starts (array): The byte offset at which each GOP starts, in the same order.
+        ends (array): The byte offset at which each GOP ends, in the same order.
+        header_ranges (List[Tuple[int, int]]): The (start, end) byte ranges of the container header.
+    """
+
+    def __init__(self, times: array, starts: array, ends: array, header_ranges: List[Tuple[int, int]]):
+        """
+        Initializes the index.
+
+        Args:
+            times (array): The presentation times of the keyframes in seconds ('d' array), in ascending order.
+            starts (array): The byte offset at which each GOP starts ('q' array), in the same order.
+            ends (array): The byte offset at which each GOP ends ('q' array), in the same order.
+            header_ranges (List[Tuple[int, int]]): The (start, end) byte ranges of the container header.
+        """
+        self.times = times
+        self.starts = starts
+        self.ends = ends
+        self.header_ranges = header_ranges
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def gop_range(self, seconds: float) -> Optional[Tuple[int, int]]:
+        """
+        Finds the byte range of the GOP that covers a timestamp with a binary search.
+
+        Args:
+            seconds (float): The timestamp in seconds from the start of the video.
+
+        Returns:
+            Optional[Tuple[int, int]]: The (start, end) byte range of the packets from the keyframe at or before the
+                timestamp up to the next keyframe, or None if the timestamp precedes the first keyframe.
+        """
+        position = bisect_right(self.times, seconds)
+        if position == 0:
+            return None
+        return self.starts[position - 1], self.ends[position - 1]
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the index.
+
+        Returns:
+            bytes: The binary representation of the index.
+        """
+        ranges = array("q", [offset for header_range in self.header_ranges for offset in header_range])
+        return b"".join((
+            HEADER.pack(MAGIC, len(self.times), len(self.header_ranges)),
+            _little_endian(ranges).tobytes(),
+            _little_endian(self.times).tobytes(),
+            _little_endian(self.starts).tobytes(),
+            _little_endian(self.ends).tobytes(),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "KeyframeIndex":
+        """
+        Deserializes an index.
+
+        Args:
+            data (bytes): The binary representation produced by to_bytes.
+
+        Returns:
+            KeyframeIndex: The index.
+
+        Raises:
+            ValueError: If the data is not a serialized keyframe index.
+        """
+        if len(data) < HEADER.size:
+            raise ValueError("Keyframe index is truncated")
+        magic, keyframe_count, range_count = HEADER.unpack_from(data)
+        if magic != MAGIC or len(data) != HEADER.size + 16 * range_count + 24 * keyframe_count:
+            raise ValueError("Invalid keyframe index")
+
+        def read(typecode: str, start: int, count: int) -> array:
+            values = array(typecode)
+            values.frombytes(data[start:start + 8 * count])
+            return _little_endian(values)
+
+        offset = HEADER.size + 16 * range_count
+        ranges = read("q", HEADER.size, 2 * range_count)
+        times = read("d", offset, keyframe_count)
+        starts = read("q", offset + 8 * keyframe_count, keyframe_count)
+        ends = read("q", offset + 16 * keyframe_count, keyframe_count)
+        return cls(times, starts, ends, list(zip(ranges[::2], ranges[1::2])))
+
+
+def supports_partial_decoding(container: Optional[str]) -> bool:
+    """
+    Checks whether FFmpeg can decode a GOP of a video from its container header and that GOP alone.
+
+    Args:
+        container (Optional[str]): The container format names reported by ffprobe, e.g. "mov,mp4,m4a,3gp,3g2,mj2".
+
+    Returns:
+        bool: True for MP4 and MOV files, False otherwise.
+    """
+    return container is not None and any(name in CONTAINERS for name in container.split(","))
+
+
+def keyframes_command(source: str) -> List[str]:
+    """
+    Builds the ffprobe command that lists the time, byte range and flags of every packet of the first video stream,
+    followed by the start time of the video.
+
+    Packets are only demuxed, not decoded.
+
+    Args:
+        source (str): A local path or URL of the video.
+
+    Returns:
+        List[str]: The command, starting with the ffprobe executable.
+    """
+    return [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,pos,size,flags:format=start_time",
+        "-of", "compact=p=0",
+        source
+    ]
+
+
+def parse_keyframes(output: str) -> Tuple[array, array, array]:
+    """
+    Groups the packets listed by keyframes_command into GOPs.
+
+    A GOP holds every packet presented from its keyframe up to the next keyframe. Since B-frames are stored after
+    the frames they reference, the packets of a GOP may extend past the position of the next keyframe, so the end
+    of each GOP is the end of the last of its packets in the file.
+
+    Packet timestamps are absolute, while FFmpeg seeks relative to the start time of the video, which is not zero
+    for e.g. videos cut from a stream, so keyframe times are made relative to the start time.
+
+    Args:
+        output (str): The output of ffprobe, one "pts_time=...|size=...|pos=...|flags=..." line per packet and a
+            "start_time=..." line.
+
+    Returns:
+        Tuple[array, array, array]: The keyframe times in seconds from the start of the video and the start and end
+            byte offsets of their GOPs, sorted by time.
+    """
+    packets = []
+    start_time = 0.0
+    for line in output.splitlines():
+        fields = dict(field.split("=", 1) for field in line.strip().split("|") if "=" in field)
+        if fields.keys() == {"start_time"}:
+            try:
+                start_time = float(fields["start_time"])
+            except ValueError:
+                # Videos without a start time report N/A
+                pass
+            continue
+        try:
+            packets.append((float(fields["pts_time"]), int(fields["pos"]), int(fields["size"]), "K" in fields.get("flags", "")))
+        except (KeyError, ValueError):
+            # Packets without a timestamp or position cannot be located
+            continue
+
+    # Rounded to the microsecond precision of ffprobe, so that a keyframe's time matches the timestamp it is at
+    packets = [(round(time - start_time, 6), position, size, keyframe) for time, position, size, keyframe in packets]
+    keyframes = sorted((time, position) for time, position, _, keyframe in packets if keyframe)
+    times = array("d", [time for time, _ in keyframes])
+    starts = array("q", [position for _, position in keyframes])
+    ends = array("q", starts)
+    for time, position, size, _ in packets:
+        gop = bisect_right(times, time) - 1
+        if gop >= 0:
+            starts[gop] = min(starts[gop], position)
+            ends[gop] = max(ends[gop], position + size)
+    return times, starts, ends
+
+
+async def scan_mp4_header(read_range: Callable[[int, int], Awaitable[bytes]], size: int) -> List[Tuple[int, int]]:
+    """
+    Finds the byte ranges of an MP4 or MOV file that FFmpeg needs besides the media data.
+
+    Every top-level box is included whole, except media data ('mdat') boxes, of which only the box header is
+    included. Only the header of each box is read.
+
+    Args:
+        read_range (Callable[[int, int], Awaitable[bytes]]): Reads the bytes from a start offset to an end offset.
+        size (int): The size of the file in bytes.
+
+    Returns:
+        List[Tuple[int, int]]: The (start, end) byte ranges, in file order.
+
+    Raises:
+        ValueError: If the file is not a well-formed sequence of boxes.
+    """
+    ranges = []
+    offset = 0
+    while offset < size:
+        header = await read_range(offset, min(offset + 16, size))
+        if len(header) < 8:
+            raise ValueError("Truncated box header")
+        box_size, box_type = struct.unpack(">I4s", header[:8])
+        header_size = 8
+        if box_size == 1:
+            if len(header) < 16:
+                raise ValueError("Truncated box header")
+            box_size = struct.unpack(">Q", header[8:16])[0]
+            header_size = 16
+        elif box_size == 0:
+            box_size = size - offset
+        if box_size < header_size:
+            raise ValueError("Invalid box size")
+
+        end = min(offset + box_size, size)
+        ranges.append((offset, offset + header_size if box_type == b"mdat" else end))
+        offset = end
+    return ranges
+
+
+async def build_keyframe_index(
+    source: str,
+    read_range: Callable[[int, int], Awaitable[bytes]],
+    size: int,
+    executor: FFmpegExecutor
+) -> Optional[KeyframeIndex]:
+    """
+    Builds the keyframe index of an MP4 or MOV video.
+
+    Args:
+        source (str): A local path or URL of the video, passed to ffprobe.
+        read_range (Callable[[int, int], Awaitable[bytes]]): Reads a byte range of the video, for the container header.
+        size (int): The size of the video in bytes.
+        executor (FFmpegExecutor): The executor that bounds the number of concurrent FFmpeg processes.
+
+    Returns:
+        Optional[KeyframeIndex]: The index, or None if the video has no keyframes or could not be scanned.
+
+    Raises:
+        FFmpegBusyError: If every FFmpeg process slot is taken and the wait queue is full.
+    """
+    returncode, stdout, stderr = await executor.run(keyframes_command(source), limit_threads=False)
+    if returncode != 0:
+        print("ffprobe failed:", stderr.decode())
+        return None
+
+    times, starts, ends = parse_keyframes(stdout.decode())
+    if not times:
+        return None
+
+    try:
+        header_ranges = await scan_mp4_header(read_range, size)
+    except ValueError as e:
+        print("Failed to scan container header:", e)
+        return None
+
+    return KeyframeIndex(times, starts, ends, header_ranges)
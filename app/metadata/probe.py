@@ -0,0 +1,120 @@
+"""
+probe.py
+
+This module extracts stream metadata from videos with ffprobe.
+"""
+
+import json
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Any, Dict, List, Optional
+from app.helpers.ffmpeg import FFmpegExecutor
+
+
+@dataclass
+class VideoMetadata:
+    """
+    Stream metadata of a video, as reported by ffprobe.
+
+    Attributes:
+        duration (Optional[float]): The length of the video in seconds.
+        codec (Optional[str]): The codec of the first video stream, e.g. "h264".
+        width (Optional[int]): The width of the first video stream in pixels.
+        height (Optional[int]): The height of the first video stream in pixels.
+        frame_rate (Optional[float]): The average frame rate of the first video stream in frames per second.
+        container (Optional[str]): The container format names, e.g. "mov,mp4,m4a,3gp,3g2,mj2".
+    """
+    duration: Optional[float] = None
+    codec: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    frame_rate: Optional[float] = None
+    container: Optional[str] = None
+
+
+def probe_command(source: str) -> List[str]:
+    """
+    Builds the ffprobe command that reports the container and first video stream of a video as JSON.
+
+    Args:
+        source (str): A local path or URL of the video.
+
+    Returns:
+        List[str]: The command, starting with the ffprobe executable.
+    """
+    return [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "format=duration,format_name:stream=codec_name,width,height,avg_frame_rate,r_frame_rate,duration",
+        "-of", "json",
+        source
+    ]
+
+
+def parse_frame_rate(rate: Optional[str]) -> Optional[float]:
+    """
+    Converts an ffprobe frame rate such as "24000/1001" to frames per second.
+
+    Args:
+        rate (Optional[str]): The frame rate as a fraction string.
+
+    Returns:
+        Optional[float]: The frame rate, or None if it is missing or unknown ("0/0").
+    """
+    try:
+        value = Fraction(rate)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    return float(value) if value > 0 else None
+
+
+def parse_probe_output(output: Dict[str, Any]) -> VideoMetadata:
+    """
+    Extracts the video metadata from the JSON output of probe_command.
+
+    Args:
+        output (Dict[str, Any]): The parsed JSON output of ffprobe.
+
+    Returns:
+        VideoMetadata: The metadata. Fields ffprobe did not report are None.
+    """
+    container = output.get("format", {})
+    streams = output.get("streams") or [{}]
+    stream = streams[0]
+
+    duration = container.get("duration") or stream.get("duration")
+    return VideoMetadata(
+        duration=float(duration) if duration not in (None, "N/A") else None,
+        codec=stream.get("codec_name"),
+        width=stream.get("width"),
+        height=stream.get("height"),
+        frame_rate=parse_frame_rate(stream.get("avg_frame_rate")) or parse_frame_rate(stream.get("r_frame_rate")),
+        container=container.get("format_name")
+    )
+
+
+async def probe_video(source: str, executor: FFmpegExecutor) -> Optional[VideoMetadata]:
+    """
+    Runs ffprobe on a video and returns its metadata.
+
+    Args:
+        source (str): A local path or URL of the video.
+        executor (FFmpegExecutor): The executor that bounds the number of concurrent FFmpeg processes.
+
+    Returns:
+        Optional[VideoMetadata]: The metadata, or None if the source could not be probed, e.g. because it is not a video.
+
+    Raises:
+        FFmpegBusyError: If every FFmpeg process slot is taken and the wait queue is full.
+    """
+    returncode, stdout, stderr = await executor.run(probe_command(source), limit_threads=False)
+    if returncode != 0:
+        print("ffprobe failed:", stderr.decode())
+        return None
+
+    try:
+        return parse_probe_output(json.loads(stdout))
+    except (ValueError, TypeError) as e:
+        print("ffprobe output could not be parsed:", e)
+        return None
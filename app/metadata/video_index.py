@@ -0,0 +1,345 @@
+"""
+video_index.py
+
+This module provides a persistent metadata index of uploaded videos backed by SQLite.
+
+Resolving a video through the index takes a single indexed read, instead of probing the storage
+provider once per supported video format. Direct uploads that have been initiated but not yet completed
+are tracked in the same database, as are the image formats each thumbnail is stored in.
+"""
+
+import asyncio
+import os
+import aiosqlite
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional
+
+
+@dataclass
+class VideoRecord:
+    """
+    Metadata describing an uploaded video.
+
+    Attributes:
+        file_id (str): The unique identifier of the video.
+        extension (str): The lowercase file extension of the video, without the leading dot.
+        storage_key (str): The path of the video in the storage provider.
+        size (int): The size of the video in bytes.
+        content_type (Optional[str]): The MIME type of the video, if known.
+        uploaded_at (float): The upload time as a UNIX timestamp.
+        duration (Optional[float]): The length of the video in seconds, if it could be probed.
+        codec (Optional[str]): The codec of the first video stream, if it could be probed.
+        width (Optional[int]): The width of the first video stream in pixels, if it could be probed.
+        height (Optional[int]): The height of the first video stream in pixels, if it could be probed.
+        frame_rate (Optional[float]): The average frame rate in frames per second, if it could be probed.
+        container (Optional[str]): The container format names reported by ffprobe, if it could be probed.
+    """
+    file_id: str
+    extension: str
+    storage_key: str
+    size: int
+    content_type: Optional[str]
+    uploaded_at: float
+    duration: Optional[float] = None
+    codec: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    frame_rate: Optional[float] = None
+    container: Optional[str] = None
+
+
+@dataclass
+class PendingUpload:
+    """
+    A direct upload that has been initiated but not yet completed.
+
+    Attributes:
+        file_id (str): The unique identifier allocated to the video.
+        file_name (str): The original name of the video file.
+        storage_key (str): The path the video is uploaded to in the storage provider.
+        size (int): The size of the video in bytes declared by the client.
+        content_type (Optional[str]): The MIME type of the video, if known.
+        upload_id (Optional[str]): The identifier of the multipart upload, if the video is uploaded in parts.
+        created_at (float): The time the upload was initiated as a UNIX timestamp.
+    """
+    file_id: str
+    file_name: str
+    storage_key: str
+    size: int
+    content_type: Optional[str]
+    upload_id: Optional[str]
+    created_at: float
+
+
+class VideoIndex:
+    """
+    An asynchronous SQLite index of uploaded videos keyed by file_id.
+
+    Once initialized, all operations share a single connection, which close releases again. Until then,
+    for example in scripts that use the index outside the application, a connection is opened per
+    operation. The database uses write-ahead logging so that readers do not block writers, including
+    those in other processes.
+    """
+
+    COLUMNS = (
+        "file_id", "extension", "storage_key", "size", "content_type", "uploaded_at",
+        "duration", "codec", "width", "height", "frame_rate", "container"
+    )
+    """tuple: The columns of the videos table, in the order of the VideoRecord fields."""
+
+    METADATA_COLUMNS = {
+        "duration": "REAL",
+        "codec": "TEXT",
+        "width": "INTEGER",
+        "height": "INTEGER",
+        "frame_rate": "REAL",
+        "container": "TEXT",
+    }
+    """dict: The probed metadata columns and their types, added to databases created before they existed."""
+
+    PENDING_COLUMNS = ("file_id", "file_name", "storage_key", "size", "content_type", "upload_id", "created_at")
+    """tuple: The columns of the pending_uploads table, in the order of the PendingUpload fields."""
+
+    def __init__(self, db_path: str):
+        """
+        Initializes the index with the path of its SQLite database file.
+
+        Args:
+            db_path (str): The path of the SQLite database file. Missing parent directories are created.
+        """
+        self.db_path = db_path
+        self._initialized = False
+        self._init_lock = asyncio.Lock()
+        self._db: Optional[aiosqlite.Connection] = None
+
+    async def _create_schema(self, db: aiosqlite.Connection) -> None:
+        """
+        Creates the tables, or adds the columns that databases created by earlier versions lack.
+
+        Args:
+            db (aiosqlite.Connection): An open connection to the database.
+        """
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS videos (
+                file_id TEXT PRIMARY KEY,
+                extension TEXT NOT NULL,
+                storage_key TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                content_type TEXT,
+                uploaded_at REAL NOT NULL
+            )
+            """
+        )
+        async with db.execute("PRAGMA table_info(videos)") as cursor:
+            existing = {row[1] for row in await cursor.fetchall()}
+        for column, column_type in self.METADATA_COLUMNS.items():
+            if column not in existing:
+                await db.execute(f"ALTER TABLE videos ADD COLUMN {column} {column_type}")
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pending_uploads (
+                file_id TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL,
+                storage_key TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                content_type TEXT,
+                upload_id TEXT,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS thumbnail_formats (
+                thumbnail_id TEXT NOT NULL,
+                image_format TEXT NOT NULL,
+                PRIMARY KEY (thumbnail_id, image_format)
+            )
+            """
+        )
+        await db.commit()
+
+    async def _ensure_schema(self) -> None:
+        """
+        Creates or migrates the schema on first use.
+
+        Concurrent first uses create the schema once, since adding the same column twice fails.
+        """
+        if not self._initialized:
+            async with self._init_lock:
+                if not self._initialized:
+                    directory = os.path.dirname(self.db_path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    async with aiosqlite.connect(self.db_path) as db:
+                        await self._create_schema(db)
+                    self._initialized = True
+
+    async def initialize(self) -> None:
+        """
+        Creates or migrates the schema and opens the connection shared by all subsequent operations.
+        """
+        await self._ensure_schema()
+        async with self._init_lock:
+            if self._db is None:
+                self._db = await aiosqlite.connect(self.db_path)
+
+    async def close(self) -> None:
+        """
+        Closes the shared connection, if one was opened by initialize.
+        """
+        async with self._init_lock:
+            db, self._db = self._db, None
+        if db is not None:
+            await db.close()
+
+    @asynccontextmanager
+    async def _connect(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Provides a connection to the database for the duration of the context.
+
+        Yields:
+            aiosqlite.Connection: The shared connection if the index was initialized, otherwise a
+                connection opened for this operation and closed when the context exits.
+        """
+        if self._db is not None:
+            try:
+                yield self._db
+            except BaseException:
+                # Do not leave a half-finished write for the next operation on the shared connection to commit
+                await self._db.rollback()
+                raise
+            return
+
+        await self._ensure_schema()
+        async with aiosqlite.connect(self.db_path) as db:
+            yield db
+
+    async def add(self, record: VideoRecord) -> None:
+        """
+        Adds a video to the index, replacing any existing record with the same file_id.
+
+        Args:
+            record (VideoRecord): The video to record.
+        """
+        placeholders = ", ".join("?" for _ in self.COLUMNS)
+        async with self._connect() as db:
+            await db.execute(
+                f"INSERT OR REPLACE INTO videos ({', '.join(self.COLUMNS)}) VALUES ({placeholders})",
+                tuple(getattr(record, column) for column in self.COLUMNS)
+            )
+            await db.commit()
+
+    async def get(self, file_id: str) -> Optional[VideoRecord]:
+        """
+        Looks up a video by its unique identifier.
+
+        Args:
+            file_id (str): The unique identifier of the video.
+
+        Returns:
+            Optional[VideoRecord]: The recorded metadata, or None if the video is not indexed.
+        """
+        async with self._connect() as db:
+            async with db.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM videos WHERE file_id = ?", (file_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+        return VideoRecord(*row) if row else None
+
+    async def remove(self, file_id: str) -> bool:
+        """
+        Removes a video from the index.
+
+        Args:
+            file_id (str): The unique identifier of the video.
+
+        Returns:
+            bool: True if a record was removed, False if the video was not indexed.
+        """
+        async with self._connect() as db:
+            cursor = await db.execute("DELETE FROM videos WHERE file_id = ?", (file_id,))
+            await db.commit()
+            return cursor.rowcount > 0
+
+    async def add_pending(self, upload: PendingUpload) -> None:
+        """
+        Records an initiated direct upload.
+
+        Args:
+            upload (PendingUpload): The upload to record.
+        """
+        placeholders = ", ".join("?" for _ in self.PENDING_COLUMNS)
+        async with self._connect() as db:
+            await db.execute(
+                f"INSERT OR REPLACE INTO pending_uploads ({', '.join(self.PENDING_COLUMNS)}) VALUES ({placeholders})",
+                tuple(getattr(upload, column) for column in self.PENDING_COLUMNS)
+            )
+            await db.commit()
+
+    async def get_pending(self, file_id: str) -> Optional[PendingUpload]:
+        """
+        Looks up an initiated direct upload by the unique identifier of its video.
+
+        Args:
+            file_id (str): The unique identifier of the video.
+
+        Returns:
+            Optional[PendingUpload]: The upload, or None if no upload of the video is pending.
+        """
+        async with self._connect() as db:
+            async with db.execute(
+                f"SELECT {', '.join(self.PENDING_COLUMNS)} FROM pending_uploads WHERE file_id = ?", (file_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+        return PendingUpload(*row) if row else None
+
+    async def remove_pending(self, file_id: str) -> bool:
+        """
+        Forgets an initiated direct upload, once it has been completed.
+
+        Args:
+            file_id (str): The unique identifier of the video.
+
+        Returns:
+            bool: True if a pending upload was removed, False if none was recorded.
+        """
+        async with self._connect() as db:
+            cursor = await db.execute("DELETE FROM pending_uploads WHERE file_id = ?", (file_id,))
+            await db.commit()
+            return cursor.rowcount > 0
+
+    async def add_thumbnail_formats(self, thumbnail_id: str, image_formats: List[str]) -> None:
+        """
+        Records image formats a thumbnail is stored in. Formats that are already recorded are kept.
+
+        Args:
+            thumbnail_id (str): The unique identifier of the thumbnail.
+            image_formats (List[str]): The image formats of the stored variants.
+        """
+        async with self._connect() as db:
+            await db.executemany(
+                "INSERT OR IGNORE INTO thumbnail_formats (thumbnail_id, image_format) VALUES (?, ?)",
+                [(thumbnail_id, image_format) for image_format in image_formats]
+            )
+            await db.commit()
+
+    async def get_thumbnail_formats(self, thumbnail_id: str) -> List[str]:
+        """
+        Looks up the image formats a thumbnail is recorded to be stored in.
+
+        Args:
+            thumbnail_id (str): The unique identifier of the thumbnail.
+
+        Returns:
+            List[str]: The recorded image formats, empty if none are recorded.
+        """
+        async with self._connect() as db:
+            async with db.execute(
+                "SELECT image_format FROM thumbnail_formats WHERE thumbnail_id = ?", (thumbnail_id,)
+            ) as cursor:
+                rows = await cursor.fetchall()
+        return [row[0] for row in rows]
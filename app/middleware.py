@@ -4,10 +4,148 @@ middlewares.py
 This module provides functions to manage and add middleware to the FastAPI application.
 """
 
+import cProfile
+import os
+import random
+import re
+import time
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.config import get_config
+from app.helpers.metrics import REGISTRY
+from app.helpers.timing import current_phases, server_timing_header, start_timing, stop_timing
 
+HTTP_REQUESTS = REGISTRY.counter("http_requests_total", "HTTP requests by method, route and status code.", ["method", "route", "status"])
+HTTP_REQUEST_DURATION = REGISTRY.histogram("http_request_duration_seconds", "Time to serve HTTP requests by method and route.", ["method", "route"])
+
+
+class RequestMetricsMiddleware:
+    """
+    Counts HTTP requests and records their latency per route.
+
+    Requests are labelled with the path template of the route that served them, e.g.
+    "/video/v1/get-thumbnail/{thumbnail_id}", so that identifiers in paths do not create a series each.
+    Requests that match no route are labelled "unmatched".
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Initializes the middleware.
+
+        Args:
+            app (ASGIApp): The application to wrap.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router records the matched route in the scope it shares with the middleware
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            HTTP_REQUESTS.labels(scope["method"], route_path, str(status_code)).inc()
+            HTTP_REQUEST_DURATION.labels(scope["method"], route_path).observe(time.perf_counter() - start)
+
+
+
+class ServerTimingMiddleware:
+    """
+    Reports where the time of each request went in a Server-Timing response header, and optionally profiles
+    requests.
+
+    The phases recorded with app.helpers.timing while serving the request, such as storage operations, the
+    wait for an FFmpeg slot and the FFmpeg run, are added to the header with the total time. Phases that end
+    after the response has started, such as streaming a file, are not included.
+
+    A request is profiled with cProfile when it is sampled at `PROFILE_SAMPLE_RATE`, or when it is sent with an
+    "X-Profile: 1" header and `PROFILE_HEADER_ENABLED` is set. The profile is written as a .pstats file to
+    `PROFILE_DIR`, which snakeviz, gprof2dot or flameprof can render as a flame graph, and its file name is
+    reported in the Server-Timing header. Only one request is profiled at a time. The profiler sees everything
+    that runs on the event loop thread meanwhile, including other requests.
+    """
+
+    _profiling = False
+
+    def __init__(self, app: ASGIApp):
+        """
+        Initializes the middleware.
+
+        Args:
+            app (ASGIApp): The application to wrap.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        config = get_config()
+        profile_name = self._profile_name(scope) if self._should_profile(scope) else None
+        profiler = None
+        if profile_name is not None:
+            ServerTimingMiddleware._profiling = True
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        start = time.perf_counter()
+        token = start_timing()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if config.SERVER_TIMING:
+                    phases = current_phases() + [("total", time.perf_counter() - start)]
+                    headers.append("Server-Timing", server_timing_header(phases))
+                if profile_name is not None:
+                    headers.append("Server-Timing", f'profile;desc="{profile_name}"')
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_timing(token)
+            if profiler is not None:
+                profiler.disable()
+                ServerTimingMiddleware._profiling = False
+                os.makedirs(config.PROFILE_DIR, exist_ok=True)
+                profiler.dump_stats(os.path.join(config.PROFILE_DIR, profile_name))
+
+    @staticmethod
+    def _should_profile(scope: Scope) -> bool:
+        """
+        Decides whether to profile a request.
+        """
+        if ServerTimingMiddleware._profiling:
+            return False
+        config = get_config()
+        if config.PROFILE_HEADER_ENABLED and Headers(scope=scope).get("x-profile") == "1":
+            return True
+        return config.PROFILE_SAMPLE_RATE > 0 and random.random() < config.PROFILE_SAMPLE_RATE
+
+    @staticmethod
+    def _profile_name(scope: Scope) -> str:
+        """
+        Names the profile of a request after its time, method and path.
+        """
+        path = re.sub(r"[^A-Za-z0-9_-]+", "_", scope["path"]).strip("_") or "root"
+        return f"{time.strftime('%Y%m%dT%H%M%S')}-{time.perf_counter_ns() % 1000000:06d}-{scope['method']}-{path[:80]}.pstats"
 
 def add_middleware(app: FastAPI) -> None:
     """
@@ -29,3 +167,6 @@ def add_middleware(app: FastAPI) -> None:
         allow_headers=["*"],
         max_age=3600
     )
+
+    app.add_middleware(RequestMetricsMiddleware)
+    app.add_middleware(ServerTimingMiddleware)
@@ -1,7 +1,11 @@
+import asyncio
+import math
 import aioboto3
+from aiobotocore.config import AioConfig
 from botocore.exceptions import ClientError
-from typing import Union
-from app.storage.storage_provider import StorageProvider
+from contextlib import AsyncExitStack
+from typing import AsyncIterator, Dict, List, Optional, Union
+from app.storage.storage_provider import StorageProvider, UploadTarget
 from app.config import get_config
 
 class AWSStorage(StorageProvider):
@@ -10,6 +14,11 @@ class AWSStorage(StorageProvider):
     
     This class provides asynchronous methods to interact with AWS S3, including
     operations for reading, writing, deleting files and checking their existence.
+
+    All operations share one long-lived S3 client with a pooled, keep-alive HTTP connector,
+    so credentials are resolved and connections are established once instead of per call.
+    The client should be opened and closed with the application lifespan via `open` and
+    `close`; it is opened lazily on first use otherwise.
     """
 
     BUCKET_NAME = get_config().BUCKET_NAME
@@ -17,6 +26,78 @@ class AWSStorage(StorageProvider):
     str: The name of the S3 bucket to interact with. Loaded from configuration.
     """
 
+    MULTIPART_PART_SIZE = get_config().S3_MULTIPART_PART_SIZE
+    """
+    int: The size in bytes of each part sent by a multipart upload. Loaded from configuration.
+    """
+
+    PRESIGNED_URL_EXPIRATION = get_config().PRESIGNED_URL_EXPIRATION
+    """
+    int: The number of seconds a presigned URL stays valid. Loaded from configuration.
+    """
+
+    PRESIGNED_PUT_MAX_SIZE = get_config().PRESIGNED_PUT_MAX_SIZE
+    """
+    int: The largest file in bytes uploaded directly with a single presigned PUT. Loaded from configuration.
+    """
+
+    MAX_PARTS = 10000
+    """
+    int: The maximum number of parts of an S3 multipart upload.
+    """
+
+    def __init__(self):
+        """
+        Initializes the storage without opening the S3 client.
+        """
+        self._client = None
+        self._exit_stack = None
+        self._lock = asyncio.Lock()
+
+    async def open(self) -> None:
+        """
+        Asynchronously opens the shared S3 client and its connection pool.
+
+        Calling this method while the client is already open has no effect.
+        """
+        async with self._lock:
+            if self._client is not None:
+                return
+
+            config = get_config()
+            client_config = AioConfig(
+                max_pool_connections=config.S3_MAX_POOL_CONNECTIONS,
+                tcp_keepalive=True,
+                connector_args={'keepalive_timeout': config.S3_KEEPALIVE_TIMEOUT}
+            )
+            exit_stack = AsyncExitStack()
+            session = aioboto3.Session()
+            self._client = await exit_stack.enter_async_context(
+                session.client('s3', endpoint_url=config.S3_ENDPOINT_URL, config=client_config)
+            )
+            self._exit_stack = exit_stack
+
+    async def close(self) -> None:
+        """
+        Asynchronously closes the shared S3 client and releases its pooled connections.
+        """
+        async with self._lock:
+            if self._exit_stack is not None:
+                await self._exit_stack.aclose()
+            self._client = None
+            self._exit_stack = None
+
+    async def _get_client(self):
+        """
+        Returns the shared S3 client, opening it first if necessary.
+
+        Returns:
+            The open aiobotocore S3 client.
+        """
+        if self._client is None:
+            await self.open()
+        return self._client
+
     async def write_file(self, file_path: str, content: Union[bytes, str]) -> bool:
         """
         Asynchronously writes a file to S3.
@@ -29,16 +110,91 @@ class AWSStorage(StorageProvider):
             bool: True if the file was written successfully, False otherwise.
         """
         try:
-            session = aioboto3.Session()
-            async with session.client('s3') as s3:
-                if isinstance(content, str):
-                    content = content.encode('utf-8')
-                await s3.put_object(Bucket=self.BUCKET_NAME, Key=file_path, Body=content)
+            s3 = await self._get_client()
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+            await s3.put_object(Bucket=self.BUCKET_NAME, Key=file_path, Body=content)
             return True
         except ClientError as e:
             print(f"Error writing file {file_path}: {str(e)}")
             return False
 
+    async def write_stream(self, file_path: str, chunks: AsyncIterator[bytes]) -> bool:
+        """
+        Asynchronously writes a file to S3 from an async iterator of chunks using a multipart upload.
+
+        Chunks are buffered until at least `MULTIPART_PART_SIZE` bytes are available and then sent
+        as one part, so memory usage is bounded by the part size. Content smaller than a single
+        part is stored with a plain `put_object` call instead.
+
+        Args:
+            file_path (str): The S3 key where the file will be stored.
+            chunks (AsyncIterator[bytes]): An async iterator yielding the content of the file in order.
+
+        Returns:
+            bool: True if the file was written successfully, False otherwise.
+        """
+        upload_id = None
+        try:
+            s3 = await self._get_client()
+            buffer = bytearray()
+            parts = []
+            try:
+                async for chunk in chunks:
+                    buffer.extend(chunk)
+                    if len(buffer) < self.MULTIPART_PART_SIZE:
+                        continue
+                    if upload_id is None:
+                        response = await s3.create_multipart_upload(Bucket=self.BUCKET_NAME, Key=file_path)
+                        upload_id = response['UploadId']
+                    part = bytes(buffer[:self.MULTIPART_PART_SIZE])
+                    del buffer[:self.MULTIPART_PART_SIZE]
+                    parts.append(await self._upload_part(s3, file_path, upload_id, len(parts) + 1, part))
+
+                if upload_id is None:
+                    await s3.put_object(Bucket=self.BUCKET_NAME, Key=file_path, Body=bytes(buffer))
+                    return True
+
+                if buffer:
+                    parts.append(await self._upload_part(s3, file_path, upload_id, len(parts) + 1, bytes(buffer)))
+                await s3.complete_multipart_upload(
+                    Bucket=self.BUCKET_NAME,
+                    Key=file_path,
+                    UploadId=upload_id,
+                    MultipartUpload={'Parts': parts}
+                )
+                return True
+            except Exception:
+                if upload_id is not None:
+                    await s3.abort_multipart_upload(Bucket=self.BUCKET_NAME, Key=file_path, UploadId=upload_id)
+                raise
+        except ClientError as e:
+            print(f"Error writing file {file_path}: {str(e)}")
+            return False
+
+    async def _upload_part(self, s3, file_path: str, upload_id: str, part_number: int, body: bytes) -> dict:
+        """
+        Uploads a single part of a multipart upload.
+
+        Args:
+            s3: An open S3 client.
+            file_path (str): The S3 key of the multipart upload.
+            upload_id (str): The identifier of the multipart upload.
+            part_number (int): The 1-based number of the part.
+            body (bytes): The content of the part.
+
+        Returns:
+            dict: The part descriptor expected by `complete_multipart_upload`.
+        """
+        response = await s3.upload_part(
+            Bucket=self.BUCKET_NAME,
+            Key=file_path,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body
+        )
+        return {'ETag': response['ETag'], 'PartNumber': part_number}
+
     async def read_file(self, file_path: str) -> bytes:
         """
         Asynchronously reads a file from S3.
@@ -50,15 +206,174 @@ class AWSStorage(StorageProvider):
             bytes: The content of the file as bytes, or an empty bytes object if an error occurred.
         """
         try:
-            session = aioboto3.Session()
-            async with session.client('s3') as s3:
-                response = await s3.get_object(Bucket=self.BUCKET_NAME, Key=file_path)
-                content = await response['Body'].read()
-                return content
+            s3 = await self._get_client()
+            response = await s3.get_object(Bucket=self.BUCKET_NAME, Key=file_path)
+            content = await response['Body'].read()
+            return content
         except ClientError as e:
             print(f"Error reading file {file_path}: {str(e)}")
             return b''
 
+    async def read_range(self, file_path: str, start: int, end: int) -> bytes:
+        """
+        Asynchronously reads a byte range of a file from S3 with a ranged GET.
+
+        Args:
+            file_path (str): The S3 key of the file to read.
+            start (int): The offset of the first byte to read.
+            end (int): The offset one past the last byte to read. Ranges past the end of the object are truncated.
+
+        Returns:
+            bytes: The content of the range, or an empty bytes object if an error occurred.
+        """
+        if end <= start:
+            return b''
+        try:
+            s3 = await self._get_client()
+            # HTTP byte ranges are inclusive of their last byte
+            response = await s3.get_object(Bucket=self.BUCKET_NAME, Key=file_path, Range=f"bytes={start}-{end - 1}")
+            return await response['Body'].read()
+        except ClientError as e:
+            print(f"Error reading range of file {file_path}: {str(e)}")
+            return b''
+
+    async def open_read_stream(self, file_path: str, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+        """
+        Asynchronously reads a file from S3 as an async iterator of chunks of the streaming response body.
+
+        Only one chunk is held in memory at a time.
+
+        Args:
+            file_path (str): The S3 key of the file to read.
+            chunk_size (int, optional): The maximum size of each chunk in bytes. Defaults to 1 MiB.
+
+        Yields:
+            bytes: The next chunk of the file. Nothing is yielded if an error occurred before the first chunk.
+        """
+        try:
+            s3 = await self._get_client()
+            response = await s3.get_object(Bucket=self.BUCKET_NAME, Key=file_path)
+        except ClientError as e:
+            print(f"Error reading file {file_path}: {str(e)}")
+            return
+
+        # Exiting the body's context releases the connection back to the pool, even if the consumer stops early
+        body = response['Body']
+        async with body:
+            async for chunk in body.iter_chunks(chunk_size):
+                yield chunk
+
+    async def get_seekable_source(self, file_path: str) -> Optional[str]:
+        """
+        Asynchronously creates a presigned GET URL for a file in S3.
+
+        S3 honours HTTP range requests, so FFmpeg can seek within the object through this URL
+        and only download the byte ranges it needs.
+
+        Args:
+            file_path (str): The S3 key of the file.
+
+        Returns:
+            Optional[str]: A presigned URL valid for `PRESIGNED_URL_EXPIRATION` seconds, or None if an error occurred.
+        """
+        try:
+            s3 = await self._get_client()
+            return await s3.generate_presigned_url(
+                'get_object',
+                Params={'Bucket': self.BUCKET_NAME, 'Key': file_path},
+                ExpiresIn=self.PRESIGNED_URL_EXPIRATION
+            )
+        except ClientError as e:
+            print(f"Error creating presigned URL for {file_path}: {str(e)}")
+            return None
+
+    async def create_upload_target(self, file_path: str, size: int, content_type: Optional[str], expires_in: int) -> Optional[UploadTarget]:
+        """
+        Asynchronously creates presigned URLs through which a client uploads a file directly to S3.
+
+        Files up to `PRESIGNED_PUT_MAX_SIZE` bytes get a single presigned PUT URL. Larger files get a multipart
+        upload with a presigned URL per part. Parts are `MULTIPART_PART_SIZE` bytes, or larger if needed to stay
+        within the S3 limit of 10,000 parts.
+
+        Args:
+            file_path (str): The S3 key the file will be stored at.
+            size (int): The size of the file in bytes.
+            content_type (Optional[str]): The MIME type of the file, which single PUTs must then send as well.
+            expires_in (int): The number of seconds the URLs stay valid.
+
+        Returns:
+            Optional[UploadTarget]: The upload URLs, or None if an error occurred.
+        """
+        try:
+            s3 = await self._get_client()
+            if size <= self.PRESIGNED_PUT_MAX_SIZE:
+                params = {'Bucket': self.BUCKET_NAME, 'Key': file_path}
+                if content_type:
+                    params['ContentType'] = content_type
+                url = await s3.generate_presigned_url('put_object', Params=params, ExpiresIn=expires_in)
+                return UploadTarget(url=url)
+
+            part_size = max(self.MULTIPART_PART_SIZE, math.ceil(size / self.MAX_PARTS))
+            create_params = {'Bucket': self.BUCKET_NAME, 'Key': file_path}
+            if content_type:
+                create_params['ContentType'] = content_type
+            response = await s3.create_multipart_upload(**create_params)
+            upload_id = response['UploadId']
+            part_urls = await asyncio.gather(*(
+                s3.generate_presigned_url(
+                    'upload_part',
+                    Params={'Bucket': self.BUCKET_NAME, 'Key': file_path, 'UploadId': upload_id, 'PartNumber': part_number},
+                    ExpiresIn=expires_in
+                )
+                for part_number in range(1, math.ceil(size / part_size) + 1)
+            ))
+            return UploadTarget(upload_id=upload_id, part_urls=list(part_urls), part_size=part_size)
+        except ClientError as e:
+            print(f"Error creating upload URLs for {file_path}: {str(e)}")
+            return None
+
+    async def complete_upload(self, file_path: str, upload_id: str, part_etags: List[str]) -> bool:
+        """
+        Asynchronously completes a multipart upload whose parts were uploaded through presigned URLs.
+
+        Args:
+            file_path (str): The S3 key of the file.
+            upload_id (str): The identifier of the multipart upload.
+            part_etags (List[str]): The ETag returned for each uploaded part, in part order.
+
+        Returns:
+            bool: True if the file was assembled successfully, False otherwise.
+        """
+        try:
+            s3 = await self._get_client()
+            await s3.complete_multipart_upload(
+                Bucket=self.BUCKET_NAME,
+                Key=file_path,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': [{'ETag': etag, 'PartNumber': number} for number, etag in enumerate(part_etags, 1)]}
+            )
+            return True
+        except ClientError as e:
+            print(f"Error completing upload of {file_path}: {str(e)}")
+            return False
+
+    async def file_size(self, file_path: str) -> Optional[int]:
+        """
+        Asynchronously returns the size of a file in S3 with a HEAD request.
+
+        Args:
+            file_path (str): The S3 key of the file.
+
+        Returns:
+            Optional[int]: The size of the file in bytes, or None if it does not exist or an error occurred.
+        """
+        try:
+            s3 = await self._get_client()
+            response = await s3.head_object(Bucket=self.BUCKET_NAME, Key=file_path)
+            return response['ContentLength']
+        except ClientError:
+            return None
+
     async def delete_file(self, file_path: str) -> bool:
         """
         Asynchronously deletes a file from S3.
@@ -70,9 +385,8 @@ class AWSStorage(StorageProvider):
             bool: True if the file was deleted successfully, False otherwise.
         """
         try:
-            session = aioboto3.Session()
-            async with session.client('s3') as s3:
-                await s3.delete_object(Bucket=self.BUCKET_NAME, Key=file_path)
+            s3 = await self._get_client()
+            await s3.delete_object(Bucket=self.BUCKET_NAME, Key=file_path)
             return True
         except ClientError as e:
             print(f"Error deleting file {file_path}: {str(e)}")
@@ -89,9 +403,8 @@ class AWSStorage(StorageProvider):
             bool: True if the file exists, False otherwise.
         """
         try:
-            session = aioboto3.Session()
-            async with session.client('s3') as s3:
-                await s3.head_object(Bucket=self.BUCKET_NAME, Key=file_path)
+            s3 = await self._get_client()
+            await s3.head_object(Bucket=self.BUCKET_NAME, Key=file_path)
             return True
         except ClientError as e:
             if e.response['Error']['Code'] == '404':
@@ -113,14 +426,36 @@ class AWSStorage(StorageProvider):
             bool: True if the directory exists, False otherwise.
         """
         try:
-            session = aioboto3.Session()
-            async with session.client('s3') as s3:
-                result = await s3.list_objects_v2(Bucket=self.BUCKET_NAME, Prefix=directory_path, MaxKeys=1)
-                return 'Contents' in result
+            s3 = await self._get_client()
+            result = await s3.list_objects_v2(Bucket=self.BUCKET_NAME, Prefix=directory_path, MaxKeys=1)
+            return 'Contents' in result
         except ClientError as e:
             print(f"Error checking if directory {directory_path} exists: {str(e)}")
             return False
 
+    async def list_files(self, directory_path: str) -> Dict[str, int]:
+        """
+        Asynchronously lists the objects stored under a directory in S3.
+
+        Args:
+            directory_path (str): The S3 key prefix of the directory to list.
+
+        Returns:
+            Dict[str, int]: A mapping of S3 keys to their sizes in bytes, or an empty dict if an error occurred.
+        """
+        prefix = directory_path.rstrip('/') + '/'
+        files = {}
+        try:
+            s3 = await self._get_client()
+            paginator = s3.get_paginator('list_objects_v2')
+            async for result in paginator.paginate(Bucket=self.BUCKET_NAME, Prefix=prefix):
+                for obj in result.get('Contents', []):
+                    files[obj['Key']] = obj['Size']
+            return files
+        except ClientError as e:
+            print(f"Error listing directory {directory_path}: {str(e)}")
+            return {}
+
     async def delete_directory(self, directory_path: str) -> bool:
         """
         Asynchronously deletes a directory from S3.
@@ -134,17 +469,16 @@ class AWSStorage(StorageProvider):
             bool: True if the directory was deleted successfully, False otherwise.
         """
         try:
-            session = aioboto3.Session()
-            async with session.client('s3') as s3:
-                objects_to_delete = []
-                paginator = s3.get_paginator('list_objects_v2')
-                async for result in paginator.paginate(Bucket=self.BUCKET_NAME, Prefix=directory_path):
-                    if 'Contents' in result:
-                        for obj in result['Contents']:
-                            objects_to_delete.append({'Key': obj['Key']})
-
-                if objects_to_delete:
-                    await s3.delete_objects(Bucket=self.BUCKET_NAME, Delete={'Objects': objects_to_delete})
+            s3 = await self._get_client()
+            objects_to_delete = []
+            paginator = s3.get_paginator('list_objects_v2')
+            async for result in paginator.paginate(Bucket=self.BUCKET_NAME, Prefix=directory_path):
+                if 'Contents' in result:
+                    for obj in result['Contents']:
+                        objects_to_delete.append({'Key': obj['Key']})
+
+            if objects_to_delete:
+                await s3.delete_objects(Bucket=self.BUCKET_NAME, Delete={'Objects': objects_to_delete})
             return True
         except ClientError as e:
             print(f"Error deleting directory {directory_path}: {str(e)}")
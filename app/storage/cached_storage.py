@@ -0,0 +1,557 @@
+import asyncio
+import os
+import uuid
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+import aiofiles
+import aiofiles.os
+from app.helpers.metrics import REGISTRY
+from app.helpers.single_flight import SingleFlight
+from app.storage.local_storage import LocalStorage
+from app.storage.storage_provider import StorageProvider, UploadTarget
+
+CACHE_LOOKUPS = REGISTRY.counter("storage_cache_lookups_total", "Lookups in the local disk cache of remote storage by result.", ["result"])
+CACHE_EVICTIONS = REGISTRY.counter("storage_cache_evictions_total", "Files evicted from the local disk cache of remote storage.")
+
+PART_SUFFIX = ".part"
+"""str: The suffix of cache files still being written, which are discarded when the cache is loaded."""
+
+class CachedStorage(StorageProvider):
+    """
+    A storage provider that keeps a local disk copy of the files of another, typically remote, provider.
+
+    Files are cached when they are written with `write_file` or `write_stream`, and when `read_file` or
+    `open_read_stream` miss the cache; concurrent misses for the same file share a single download. Cached files
+    are served from disk by `read_file`, `read_range`, `open_read_stream`, `file_size` and `file_exists`, and
+    `get_seekable_source` returns their local path, so FFmpeg and file responses read them in place. Files
+    handed out that way are pinned until `release_seekable_source`, so that they are not evicted before they are
+    opened; the cache may exceed its budget while they are. Ranged
+    reads and seekable sources of files that are not cached go to the remote provider without filling the cache,
+    since they usually need only a small part of a large video.
+
+    The cache is bounded by the total size of its files and evicts the least recently used files first. Files
+    larger than the whole budget are never cached. Deleting a file or directory through this provider also
+    removes it from the cache; files changed in the remote storage by other means are not noticed, which suits
+    this application, whose stored files never change once written.
+
+    Attributes:
+        provider (StorageProvider): The provider whose files are cached.
+        directory (str): The absolute path of the cache directory.
+        max_bytes (int): The maximum total size in bytes of the cached files.
+        current_bytes (int): The total size in bytes of the cached files.
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups that had to go to the provider.
+    """
+
+    def __init__(self, provider: StorageProvider, directory: str, max_bytes: int):
+        """
+        Initializes the cache without reading the cache directory.
+
+        Args:
+            provider (StorageProvider): The provider whose files are cached.
+            directory (str): The cache directory, created if needed. Files already in it are reused.
+            max_bytes (int): The maximum total size in bytes of the cached files.
+        """
+        self.provider = provider
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._fills = SingleFlight()
+        self._pins: Dict[str, int] = {}
+        self._loaded = False
+
+    async def open(self) -> None:
+        """
+        Opens the provider and indexes the files left in the cache directory by a previous run.
+        """
+        await self.provider.open()
+        await self._load()
+
+    async def close(self) -> None:
+        """
+        Closes the provider. The cached files are kept for the next run.
+        """
+        await self.provider.close()
+
+    async def _load(self) -> None:
+        """
+        Indexes the files in the cache directory, least recently modified first, once per instance.
+
+        Unfinished files are removed, and files beyond the byte budget are evicted.
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+
+        for _, file_path, size in sorted(await asyncio.to_thread(self._scan)):
+            self._entries[file_path] = size
+            self.current_bytes += size
+        await self._evict()
+
+    def _scan(self) -> List[Tuple[float, str, int]]:
+        """
+        Lists the files in the cache directory, removing unfinished ones.
+
+        Returns:
+            List[Tuple[float, str, int]]: The modification time, provider path and size of each file.
+        """
+        found = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                if name.endswith(PART_SUFFIX):
+                    os.remove(path)
+                    continue
+                stat = os.stat(path)
+                found.append((stat.st_mtime, os.path.relpath(path, self.directory).replace(os.sep, "/"), stat.st_size))
+        return found
+
+    def _cache_path(self, file_path: str) -> Optional[str]:
+        """
+        Returns the path of a file's copy in the cache directory.
+
+        Args:
+            file_path (str): The path of the file in the provider.
+
+        Returns:
+            Optional[str]: The path of the copy, or None if the file path would lead outside the cache directory,
+                in which case the file is not cached.
+        """
+        path = os.path.normpath(os.path.join(self.directory, file_path))
+        return path if path.startswith(self.directory + os.sep) else None
+
+    def _lookup(self, file_path: str) -> Optional[str]:
+        """
+        Looks up a file in the cache, counting a hit or a miss, and marks it as most recently used.
+
+        Args:
+            file_path (str): The path of the file in the provider.
+
+        Returns:
+            Optional[str]: The path of the cached copy, or None if the file is not cached.
+        """
+        if file_path in self._entries:
+            self._entries.move_to_end(file_path)
+            self.hits += 1
+            CACHE_LOOKUPS.labels("hit").inc()
+            return self._cache_path(file_path)
+        self.misses += 1
+        CACHE_LOOKUPS.labels("miss").inc()
+        return None
+
+    async def _remove(self, path: str) -> None:
+        try:
+            await aiofiles.os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    async def _invalidate(self, file_path: str) -> None:
+        """
+        Removes a file from the cache, if it is cached.
+
+        Args:
+            file_path (str): The path of the file in the provider.
+        """
+        size = self._entries.pop(file_path, None)
+        if size is not None:
+            self.current_bytes -= size
+            await self._remove(self._cache_path(file_path))
+
+    async def _evict(self) -> None:
+        """
+        Removes the least recently used files that are not pinned until the cached files fit in the byte budget.
+        """
+        while self.current_bytes > self.max_bytes:
+            file_path = next((file_path for file_path in self._entries if file_path not in self._pins), None)
+            if file_path is None:
+                break
+            size = self._entries.pop(file_path)
+            self.current_bytes -= size
+            CACHE_EVICTIONS.inc()
+            await self._remove(self._cache_path(file_path))
+
+    def _part_path(self, cache_path: str) -> str:
+        return f"{cache_path}.{uuid.uuid4().hex}{PART_SUFFIX}"
+
+    async def _admit(self, file_path: str, part_path: str, size: int) -> None:
+        """
+        Moves a fully written copy into place and indexes it as the most recently used file.
+
+        Args:
+            file_path (str): The path of the file in the provider.
+            part_path (str): The path the copy was written to.
+            size (int): The size of the copy in bytes.
+        """
+        await aiofiles.os.replace(part_path, self._cache_path(file_path))
+        self.current_bytes -= self._entries.pop(file_path, 0)
+        self._entries[file_path] = size
+        self.current_bytes += size
+        await self._evict()
+
+    async def _store(self, file_path: str, content: bytes) -> None:
+        """
+        Caches the content of a file that was written to the provider. Failures only leave the file uncached.
+
+        Args:
+            file_path (str): The path of the file in the provider.
+            content (bytes): The content of the file.
+        """
+        cache_path = self._cache_path(file_path)
+        if cache_path is None or len(content) > self.max_bytes:
+            return
+        part_path = self._part_path(cache_path)
+        try:
+            await aiofiles.os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            async with aiofiles.open(part_path, "wb") as f:
+                await f.write(content)
+            await self._admit(file_path, part_path, len(content))
+        except OSError as e:
+            print(f"Failed to cache file {file_path}: {str(e)}")
+            await self._remove(part_path)
+
+    async def _fill(self, file_path: str) -> Optional[str]:
+        """
+        Downloads a file from the provider into the cache, unless it is larger than the byte budget.
+
+        Args:
+            file_path (str): The path of the file in the provider.
+
+        Returns:
+            Optional[str]: The path of the cached copy, or None if the file could not be cached.
+        """
+        cache_path = self._cache_path(file_path)
+        if cache_path is None:
+            return None
+        part_path = self._part_path(cache_path)
+        size = 0
+        try:
+            await aiofiles.os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            async with aiofiles.open(part_path, "wb") as f:
+                async for chunk in self.provider.open_read_stream(file_path):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        break
+                    await f.write(chunk)
+            # Providers report a missing file as an empty stream, which is not worth caching either way
+            if size == 0 or size > self.max_bytes:
+                await self._remove(part_path)
+                return None
+            await self._admit(file_path, part_path, size)
+            return cache_path
+        except OSError as e:
+            print(f"Failed to cache file {file_path}: {str(e)}")
+            await self._remove(part_path)
+            return None
+
+    async def _lookup_or_fill(self, file_path: str) -> Optional[str]:
+        """
+        Returns the cached copy of a file, downloading it first on a miss. Concurrent misses share one download.
+
+        Args:
+            file_path (str): The path of the file in the provider.
+
+        Returns:
+            Optional[str]: The path of the cached copy, or None if the file could not be cached.
+        """
+        await self._load()
+        cache_path = self._lookup(file_path)
+        if cache_path is not None:
+            return cache_path
+        return await self._fills.do(file_path, lambda: self._fill(file_path))
+
+    async def write_file(self, file_path: str, content: Union[bytes, str]) -> bool:
+        """
+        Writes a file to the provider and, once it is written, to the cache.
+
+        Args:
+            file_path (str): The path where the file should be written.
+            content (Union[bytes, str]): The content of the file.
+
+        Returns:
+            bool: The result of the provider's write.
+        """
+        await self._load()
+        await self._invalidate(file_path)
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        result = await self.provider.write_file(file_path, content)
+        if result is not False:
+            await self._store(file_path, content)
+        return result
+
+    async def write_stream(self, file_path: str, chunks: AsyncIterator[bytes]) -> bool:
+        """
+        Writes a file to the provider from an async iterator of chunks, copying the chunks to the cache as they pass.
+
+        The copy is abandoned once it exceeds the byte budget, and kept only if the provider's write succeeds.
+
+        Args:
+            file_path (str): The path where the file should be written.
+            chunks (AsyncIterator[bytes]): An async iterator yielding the content of the file in order.
+
+        Returns:
+            bool: True if the provider wrote the file successfully, False otherwise.
+        """
+        await self._load()
+        await self._invalidate(file_path)
+        cache_path = self._cache_path(file_path)
+        if cache_path is None:
+            return await self.provider.write_stream(file_path, chunks)
+
+        part_path = self._part_path(cache_path)
+        try:
+            await aiofiles.os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            part_file = await aiofiles.open(part_path, "wb")
+        except OSError as e:
+            print(f"Failed to cache file {file_path}: {str(e)}")
+            return await self.provider.write_stream(file_path, chunks)
+
+        size = 0
+
+        async def tee() -> AsyncIterator[bytes]:
+            nonlocal size
+            async for chunk in chunks:
+                size += len(chunk)
+                if size <= self.max_bytes:
+                    await part_file.write(chunk)
+                yield chunk
+
+        try:
+            result = await self.provider.write_stream(file_path, tee())
+        except BaseException:
+            await self._remove(part_path)
+            raise
+        finally:
+            await part_file.close()
+
+        if result and size <= self.max_bytes:
+            await self._admit(file_path, part_path, size)
+        else:
+            await self._remove(part_path)
+        return result
+
+    async def read_file(self, file_path: str) -> bytes:
+        """
+        Reads a file from the cache, downloading it into the cache first on a miss.
+
+        Args:
+            file_path (str): The path of the file to read.
+
+        Returns:
+            bytes: The content of the file, read from the provider if it cannot be cached.
+        """
+        cache_path = await self._lookup_or_fill(file_path)
+        if cache_path is not None:
+            try:
+                return await LocalStorage.read_file(cache_path)
+            except FileNotFoundError:
+                # Evicted between the lookup and the read, or removed from the cache directory by other means
+                await self._invalidate(file_path)
+        return await self.provider.read_file(file_path)
+
+    async def read_range(self, file_path: str, start: int, end: int) -> bytes:
+        """
+        Reads a byte range of a file from the cache, or from the provider if the file is not cached.
+
+        Args:
+            file_path (str): The path of the file to read.
+            start (int): The offset of the first byte to read.
+            end (int): The offset one past the last byte to read.
+
+        Returns:
+            bytes: The content of the range.
+        """
+        await self._load()
+        cache_path = self._lookup(file_path)
+        if cache_path is not None:
+            try:
+                return await LocalStorage.read_range(cache_path, start, end)
+            except FileNotFoundError:
+                await self._invalidate(file_path)
+        return await self.provider.read_range(file_path, start, end)
+
+    async def open_read_stream(self, file_path: str, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+        """
+        Reads a file as an async iterator of chunks from the cache, downloading it into the cache first on a miss.
+
+        Args:
+            file_path (str): The path of the file to read.
+            chunk_size (int, optional): The maximum size of each chunk in bytes. Defaults to 1 MiB.
+
+        Yields:
+            bytes: The next chunk of the file, read from the provider if it cannot be cached.
+        """
+        cache_path = await self._lookup_or_fill(file_path)
+        if cache_path is not None:
+            try:
+                stream = await aiofiles.open(cache_path, "rb")
+            except FileNotFoundError:
+                await self._invalidate(file_path)
+                cache_path = None
+        if cache_path is None:
+            async for chunk in self.provider.open_read_stream(file_path, chunk_size):
+                yield chunk
+            return
+
+        # The open file stays readable even if the cached copy is evicted meanwhile
+        try:
+            while chunk := await stream.read(chunk_size):
+                yield chunk
+        finally:
+            await stream.close()
+
+    async def create_upload_target(self, file_path: str, size: int, content_type: Optional[str], expires_in: int) -> Optional[UploadTarget]:
+        """
+        Creates upload URLs with the provider. Files uploaded directly are cached once they are read.
+
+        Args:
+            file_path (str): The path the file will be stored at.
+            size (int): The size of the file in bytes.
+            content_type (Optional[str]): The MIME type of the file, if known.
+            expires_in (int): The number of seconds the URLs stay valid.
+
+        Returns:
+            Optional[UploadTarget]: The upload URLs of the provider.
+        """
+        await self._load()
+        await self._invalidate(file_path)
+        return await self.provider.create_upload_target(file_path, size, content_type, expires_in)
+
+    async def complete_upload(self, file_path: str, upload_id: str, part_etags: List[str]) -> bool:
+        """
+        Completes a direct multipart upload with the provider, removing any stale copy from the cache.
+
+        Args:
+            file_path (str): The path of the file.
+            upload_id (str): The identifier of the multipart upload.
+            part_etags (List[str]): The ETag returned for each uploaded part, in part order.
+
+        Returns:
+            bool: The result of the provider.
+        """
+        await self._load()
+        await self._invalidate(file_path)
+        return await self.provider.complete_upload(file_path, upload_id, part_etags)
+
+    async def file_size(self, file_path: str) -> Optional[int]:
+        """
+        Returns the size of a file from the cache index, or from the provider if the file is not cached.
+
+        Args:
+            file_path (str): The path of the file.
+
+        Returns:
+            Optional[int]: The size of the file in bytes, or None if it does not exist.
+        """
+        await self._load()
+        if self._lookup(file_path) is not None:
+            return self._entries[file_path]
+        return await self.provider.file_size(file_path)
+
+    async def get_seekable_source(self, file_path: str) -> Optional[str]:
+        """
+        Returns the local path of a cached file, or the provider's seekable source if the file is not cached.
+
+        A cached file is pinned, and not evicted, until the path is passed to `release_seekable_source`.
+
+        Args:
+            file_path (str): The path of the file.
+
+        Returns:
+            Optional[str]: A seekable path or URL, or None if the provider cannot offer one.
+        """
+        await self._load()
+        cache_path = self._lookup(file_path)
+        if cache_path is not None:
+            self._pins[file_path] = self._pins.get(file_path, 0) + 1
+            return cache_path
+        return await self.provider.get_seekable_source(file_path)
+
+    async def release_seekable_source(self, file_path: str, source: str) -> None:
+        """
+        Unpins a cached file returned by `get_seekable_source`, evicting files if the pin held the cache over its
+        budget. Sources of the provider are released with the provider.
+
+        Args:
+            file_path (str): The path of the file.
+            source (str): The source returned for the file.
+        """
+        if file_path not in self._pins or source != self._cache_path(file_path):
+            await self.provider.release_seekable_source(file_path, source)
+            return
+        self._pins[file_path] -= 1
+        if self._pins[file_path] == 0:
+            del self._pins[file_path]
+            await self._evict()
+
+    async def delete_file(self, file_path: str) -> bool:
+        """
+        Deletes a file from the cache and the provider.
+
+        Args:
+            file_path (str): The path of the file to delete.
+
+        Returns:
+            bool: The result of the provider's delete.
+        """
+        await self._load()
+        await self._invalidate(file_path)
+        return await self.provider.delete_file(file_path)
+
+    async def file_exists(self, file_path: str) -> bool:
+        """
+        Checks if a file exists, answering from the cache index when the file is cached.
+
+        Args:
+            file_path (str): The path of the file to check.
+
+        Returns:
+            bool: True if the file exists, False otherwise.
+        """
+        await self._load()
+        if self._lookup(file_path) is not None:
+            return True
+        return await self.provider.file_exists(file_path)
+
+    async def directory_exists(self, directory_path: str) -> bool:
+        """
+        Checks if a directory exists in the provider.
+
+        Args:
+            directory_path (str): The path of the directory to check.
+
+        Returns:
+            bool: True if the directory exists, False otherwise.
+        """
+        return await self.provider.directory_exists(directory_path)
+
+    async def list_files(self, directory_path: str) -> Dict[str, int]:
+        """
+        Lists the files stored under a directory in the provider.
+
+        Args:
+            directory_path (str): The path of the directory to list.
+
+        Returns:
+            Dict[str, int]: A mapping of file paths to their sizes in bytes.
+        """
+        return await self.provider.list_files(directory_path)
+
+    async def delete_directory(self, directory_path: str) -> bool:
+        """
+        Deletes a directory from the provider and removes the files under it from the cache.
+
+        Args:
+            directory_path (str): The path of the directory to delete.
+
+        Returns:
+            bool: The result of the provider's delete.
+        """
+        await self._load()
+        prefix = directory_path.rstrip("/") + "/"
+        for file_path in [file_path for file_path in self._entries if file_path.startswith(prefix)]:
+            await self._invalidate(file_path)
+        return await self.provider.delete_directory(directory_path)
@@ -1,8 +1,40 @@
 import aiofiles
 import aiofiles.os
 import os
-from typing import Union
-from app.storage.storage_provider import StorageProvider
+import time
+from typing import AsyncIterator, Dict, List, Optional, Union
+from urllib.parse import urlencode
+from app.storage.storage_provider import StorageProvider, UploadTarget
+from app.helpers.signing import sign_upload
+from app.config import get_config
+
+
+def _pread(file_path: str, start: int, length: int) -> bytes:
+    """
+    Reads up to `length` bytes at an offset of a file with positional reads, without moving a file position.
+
+    Args:
+        file_path (str): The path of the file to read from.
+        start (int): The offset of the first byte to read.
+        length (int): The number of bytes to read.
+
+    Returns:
+        bytes: The bytes read, fewer than `length` if the file ends first.
+    """
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        chunks = []
+        while length > 0:
+            chunk = os.pread(fd, length, start)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            start += len(chunk)
+            length -= len(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
 
 class LocalStorage(StorageProvider):
     """
@@ -32,7 +64,7 @@ class LocalStorage(StorageProvider):
         try:
             directory = os.path.dirname(file_path)
             if not await aiofiles.os.path.exists(directory):
-                await aiofiles.os.makedirs(directory)
+                await aiofiles.os.makedirs(directory, exist_ok=True)
 
             async with aiofiles.open(file_path, "wb") as f:
                 if isinstance(content, str):
@@ -43,6 +75,34 @@ class LocalStorage(StorageProvider):
             print(f"Failed to write file: {str(e)}")
             return False
 
+    @staticmethod
+    async def write_stream(file_path: str, chunks: AsyncIterator[bytes]) -> bool:
+        """
+        Writes content to a file at the specified file path from an async iterator of chunks.
+
+        Each chunk is appended to the file as soon as it is received, so only one chunk is held
+        in memory at a time.
+
+        Args:
+            file_path (str): The path of the file to write the content to.
+            chunks (AsyncIterator[bytes]): An async iterator yielding the content of the file in order.
+
+        Returns:
+            bool: True if the file was written successfully, False otherwise.
+        """
+        try:
+            directory = os.path.dirname(file_path)
+            if directory and not await aiofiles.os.path.exists(directory):
+                await aiofiles.os.makedirs(directory, exist_ok=True)
+
+            async with aiofiles.open(file_path, "wb") as f:
+                async for chunk in chunks:
+                    await f.write(chunk)
+            return True
+        except Exception as e:
+            print(f"Failed to write file: {str(e)}")
+            return False
+
     @staticmethod
     async def read_file(file_path: str) -> bytes:
         """
@@ -60,6 +120,119 @@ class LocalStorage(StorageProvider):
         async with aiofiles.open(file_path, "rb") as f:
             return await f.read()
 
+    @staticmethod
+    async def read_range(file_path: str, start: int, end: int) -> bytes:
+        """
+        Reads and returns a byte range of a file at the specified file path asynchronously.
+
+        Args:
+            file_path (str): The path of the file to read from.
+            start (int): The offset of the first byte to read.
+            end (int): The offset one past the last byte to read. Ranges past the end of the file are truncated.
+
+        Returns:
+            bytes: The content of the range.
+
+        Raises:
+            OSError: If there is an issue opening or reading from the file.
+        """
+        if end <= start:
+            return b""
+        # Open, read and close in a single worker thread call rather than one call per operation
+        return await aiofiles.os.wrap(_pread)(file_path, start, end - start)
+
+    @staticmethod
+    async def open_read_stream(file_path: str, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+        """
+        Reads the content of a file at the specified file path as an async iterator of chunks.
+
+        Only one chunk is held in memory at a time.
+
+        Args:
+            file_path (str): The path of the file to read from.
+            chunk_size (int, optional): The maximum size of each chunk in bytes. Defaults to 1 MiB.
+
+        Yields:
+            bytes: The next chunk of the file.
+
+        Raises:
+            OSError: If there is an issue opening or reading from the file.
+        """
+        async with aiofiles.open(file_path, "rb") as f:
+            while chunk := await f.read(chunk_size):
+                yield chunk
+
+    @staticmethod
+    async def create_upload_target(file_path: str, size: int, content_type: Optional[str], expires_in: int) -> Optional[UploadTarget]:
+        """
+        Creates a signed URL of the API's local upload endpoint (`LOCAL_UPLOAD_URL`), which writes the body of a
+        PUT request to the file.
+
+        Local files are always uploaded in a single request, whatever their size.
+
+        Args:
+            file_path (str): The path the file will be stored at.
+            size (int): The size of the file in bytes.
+            content_type (Optional[str]): The MIME type of the file. Not used.
+            expires_in (int): The number of seconds the URL stays valid.
+
+        Returns:
+            Optional[UploadTarget]: The signed upload URL.
+        """
+        config = get_config()
+        expires = int(time.time()) + expires_in
+        query = urlencode({
+            "path": file_path,
+            "expires": expires,
+            "signature": sign_upload(file_path, expires, config.UPLOAD_SIGNING_KEY)
+        })
+        return UploadTarget(url=f"{config.LOCAL_UPLOAD_URL}?{query}")
+
+    @staticmethod
+    async def complete_upload(file_path: str, upload_id: str, part_etags: List[str]) -> bool:
+        """
+        Local uploads are never split into parts, so there is no multipart upload to complete.
+
+        Args:
+            file_path (str): The path of the file.
+            upload_id (str): The identifier of the multipart upload.
+            part_etags (List[str]): The ETag returned for each uploaded part, in part order.
+
+        Returns:
+            bool: Always False.
+        """
+        return False
+
+    @staticmethod
+    async def file_size(file_path: str) -> Optional[int]:
+        """
+        Returns the size of a file without reading it.
+
+        Args:
+            file_path (str): The path of the file.
+
+        Returns:
+            Optional[int]: The size of the file in bytes, or None if it does not exist.
+        """
+        if not await aiofiles.os.path.isfile(file_path):
+            return None
+        return await aiofiles.os.path.getsize(file_path)
+
+    @staticmethod
+    async def get_seekable_source(file_path: str) -> Optional[str]:
+        """
+        Returns the absolute filesystem path of a file so that FFmpeg can open and seek within it directly.
+
+        Args:
+            file_path (str): The path of the file.
+
+        Returns:
+            Optional[str]: The absolute path of the file, or None if the file does not exist.
+        """
+        if not await aiofiles.os.path.isfile(file_path):
+            return None
+        return os.path.abspath(file_path)
+
     @staticmethod
     async def delete_file(file_path: str) -> bool:
         """
@@ -108,6 +281,28 @@ class LocalStorage(StorageProvider):
         """
         return await aiofiles.os.path.isdir(directory_path)
 
+    @staticmethod
+    async def list_files(directory_path: str) -> Dict[str, int]:
+        """
+        Lists the files stored under a directory asynchronously, including files in nested directories.
+
+        Args:
+            directory_path (str): The path of the directory to list.
+
+        Returns:
+            Dict[str, int]: A mapping of file paths to their sizes in bytes. Empty if the directory does not exist.
+        """
+        files = {}
+        if not await aiofiles.os.path.isdir(directory_path):
+            return files
+
+        for entry in await aiofiles.os.scandir(directory_path):
+            if entry.is_dir():
+                files.update(await LocalStorage.list_files(entry.path))
+            elif entry.is_file():
+                files[entry.path] = entry.stat().st_size
+        return files
+
     @staticmethod
     async def delete_directory(directory_path: str) -> bool:
         """
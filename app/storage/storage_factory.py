@@ -1,20 +1,37 @@
 import os
+from typing import Dict, Type
+from app.storage.storage_provider import StorageProvider
 from app.storage.local_storage import LocalStorage
 from app.storage.aws_storage import AWSStorage
+from app.storage.cached_storage import CachedStorage
 from app.storage.storage_service import StorageService
+from app.config import get_config
+
+STORAGE_PROVIDERS: Dict[str, Type[StorageProvider]] = {
+    "local": LocalStorage,
+    "aws": AWSStorage,
+}
+"""Dict[str, Type[StorageProvider]]: The storage providers, keyed by their STORAGE_TYPE value."""
 
 def get_storage_service() -> StorageService:
     """
     Get the appropriate storage service based on the environment configuration.
 
+    Remote providers are wrapped in a local disk cache when `STORAGE_CACHE_MAX_BYTES` is set.
+
     Returns:
         StorageService: An instance of StorageService configured with the appropriate storage provider.
+
+    Raises:
+        ValueError: If STORAGE_TYPE does not name a provider in STORAGE_PROVIDERS.
     """
     storage_type = os.getenv("STORAGE_TYPE", "local").lower()
 
-    if storage_type == "local":
-        return StorageService(LocalStorage())
-    if storage_type == "aws":
-        return StorageService(AWSStorage())
-    else:
+    provider_class = STORAGE_PROVIDERS.get(storage_type)
+    if provider_class is None:
         raise ValueError(f"Unsupported storage type: {storage_type}")
+    provider = provider_class()
+    config = get_config()
+    if storage_type != "local" and config.STORAGE_CACHE_MAX_BYTES > 0:
+        provider = CachedStorage(provider, config.STORAGE_CACHE_DIR, config.STORAGE_CACHE_MAX_BYTES)
+    return StorageService(provider)
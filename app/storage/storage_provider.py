@@ -1,5 +1,22 @@
 from abc import ABC, abstractmethod
-from typing import Union
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+@dataclass
+class UploadTarget:
+    """
+    Where a client uploads a file directly to storage, without passing it through the API.
+
+    Attributes:
+        url (Optional[str]): The URL to PUT the whole file to, for single-request uploads.
+        upload_id (Optional[str]): The identifier of the multipart upload, for multipart uploads.
+        part_urls (List[str]): The URLs to PUT each part to, in part order, for multipart uploads.
+        part_size (Optional[int]): The size in bytes of every part but the last, for multipart uploads.
+    """
+    url: Optional[str] = None
+    upload_id: Optional[str] = None
+    part_urls: List[str] = field(default_factory=list)
+    part_size: Optional[int] = None
 
 class StorageProvider(ABC):
     """
@@ -10,6 +27,20 @@ class StorageProvider(ABC):
     provide the specific details for these operations.
     """
 
+    async def open(self) -> None:
+        """
+        Acquires any long-lived resources used by the provider, such as client connection pools.
+
+        This is called once when the application starts. The default implementation does nothing.
+        """
+
+    async def close(self) -> None:
+        """
+        Releases the resources acquired by `open`.
+
+        This is called once when the application shuts down. The default implementation does nothing.
+        """
+
     @staticmethod
     @abstractmethod
     async def write_file(file_path: str, content: Union[bytes, str]):
@@ -25,6 +56,27 @@ class StorageProvider(ABC):
         """
         raise NotImplementedError
 
+    @staticmethod
+    @abstractmethod
+    async def write_stream(file_path: str, chunks: AsyncIterator[bytes]) -> bool:
+        """
+        Writes content to a file asynchronously from an async iterator of chunks.
+
+        Implementations must consume the iterator incrementally so that memory usage stays
+        bounded by the chunk size rather than by the total size of the file.
+
+        Args:
+            file_path (str): The path of the file to write the content to.
+            chunks (AsyncIterator[bytes]): An async iterator yielding the content of the file in order.
+
+        Returns:
+            bool: True if the file was written successfully, False otherwise.
+
+        Raises:
+            NotImplementedError: If this method is not implemented by the concrete class.
+        """
+        raise NotImplementedError
+
     @staticmethod
     @abstractmethod
     async def read_file(file_path: str) -> bytes:
@@ -42,6 +94,126 @@ class StorageProvider(ABC):
         """
         raise NotImplementedError
 
+    @staticmethod
+    @abstractmethod
+    async def read_range(file_path: str, start: int, end: int) -> bytes:
+        """
+        Reads and returns a byte range of a file asynchronously.
+
+        Args:
+            file_path (str): The path of the file to read from.
+            start (int): The offset of the first byte to read.
+            end (int): The offset one past the last byte to read. Ranges past the end of the file are truncated.
+
+        Returns:
+            bytes: The content of the range.
+
+        Raises:
+            NotImplementedError: If this method is not implemented by the concrete class.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    @abstractmethod
+    def open_read_stream(file_path: str, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+        """
+        Reads the content of a file as an async iterator of chunks, without loading the whole file into memory.
+
+        Args:
+            file_path (str): The path of the file to read from.
+            chunk_size (int, optional): The maximum size of each chunk in bytes. Defaults to 1 MiB.
+
+        Returns:
+            AsyncIterator[bytes]: The chunks of the file, in order.
+
+        Raises:
+            NotImplementedError: If this method is not implemented by the concrete class.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def create_upload_target(self, file_path: str, size: int, content_type: Optional[str], expires_in: int) -> Optional[UploadTarget]:
+        """
+        Creates signed URLs through which a client can upload a file directly to storage.
+
+        Args:
+            file_path (str): The path the file will be stored at.
+            size (int): The size of the file in bytes, which decides between a single and a multipart upload.
+            content_type (Optional[str]): The MIME type of the file, if known.
+            expires_in (int): The number of seconds the URLs stay valid.
+
+        Returns:
+            Optional[UploadTarget]: The upload URLs, or None if they could not be created.
+
+        Raises:
+            NotImplementedError: If this method is not implemented by the concrete class.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def complete_upload(self, file_path: str, upload_id: str, part_etags: List[str]) -> bool:
+        """
+        Assembles the parts of a multipart upload created by `create_upload_target` into the file.
+
+        Args:
+            file_path (str): The path of the file.
+            upload_id (str): The identifier of the multipart upload.
+            part_etags (List[str]): The ETag returned for each uploaded part, in part order.
+
+        Returns:
+            bool: True if the file was assembled successfully, False otherwise.
+
+        Raises:
+            NotImplementedError: If this method is not implemented by the concrete class.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    @abstractmethod
+    async def file_size(file_path: str) -> Optional[int]:
+        """
+        Returns the size of a file without reading it.
+
+        Args:
+            file_path (str): The path of the file.
+
+        Returns:
+            Optional[int]: The size of the file in bytes, or None if it does not exist.
+
+        Raises:
+            NotImplementedError: If this method is not implemented by the concrete class.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    @abstractmethod
+    async def get_seekable_source(file_path: str) -> Optional[str]:
+        """
+        Returns a location that FFmpeg can open directly and seek within, such as a local
+        filesystem path or a short-lived HTTP URL.
+
+        Args:
+            file_path (str): The path of the file to open.
+
+        Returns:
+            Optional[str]: A path or URL for the file, or None if the provider cannot offer seekable access.
+
+        Raises:
+            NotImplementedError: If this method is not implemented by the concrete class.
+        """
+        raise NotImplementedError
+
+    async def release_seekable_source(self, file_path: str, source: str) -> None:
+        """
+        Signals that a source returned by `get_seekable_source` is no longer read, e.g. once FFmpeg has exited.
+
+        Providers whose sources stay valid on their own need not implement it. The default implementation does nothing.
+
+        Args:
+            file_path (str): The path of the file.
+            source (str): The source returned for the file.
+        """
+
     @staticmethod
     @abstractmethod
     async def delete_file(file_path: str):
@@ -90,6 +262,23 @@ class StorageProvider(ABC):
         """
         raise NotImplementedError
 
+    @staticmethod
+    @abstractmethod
+    async def list_files(directory_path: str) -> Dict[str, int]:
+        """
+        Lists the files stored under a directory, including files in nested directories.
+
+        Args:
+            directory_path (str): The path of the directory to list.
+
+        Returns:
+            Dict[str, int]: A mapping of file paths to their sizes in bytes.
+
+        Raises:
+            NotImplementedError: If this method is not implemented by the concrete class.
+        """
+        raise NotImplementedError
+
     @staticmethod
     @abstractmethod
     async def delete_directory(directory_path: str) -> bool:
@@ -1,5 +1,48 @@
-from typing import Union
-from app.storage.storage_provider import StorageProvider
+import functools
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Union
+from app.helpers.metrics import REGISTRY
+from app.helpers.timing import record_phase
+from app.storage.storage_provider import StorageProvider, UploadTarget
+
+STORAGE_DURATION = REGISTRY.histogram(
+    "storage_operation_duration_seconds", "Duration of storage operations by provider, operation and outcome.", ["provider", "operation", "outcome"]
+)
+
+def instrumented(reports_failure: bool = False):
+    """
+    Records the duration and outcome of a StorageService operation in STORAGE_DURATION, and the duration as a
+    "storage-<operation>" phase of the current request.
+
+    An operation fails when it raises, or when it returns a falsy value for operations that report failure with
+    their return value instead of raising.
+
+    Args:
+        reports_failure (bool, optional): Whether the operation returns a falsy value when it fails, e.g. False.
+            Defaults to False, meaning only exceptions are failures.
+
+    Returns:
+        Callable: A decorator for async methods of StorageService.
+    """
+    def decorator(method):
+        operation = method.__name__
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await method(self, *args, **kwargs)
+                if not reports_failure or result:
+                    outcome = "ok"
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                STORAGE_DURATION.labels(self.provider_name, operation, outcome).observe(elapsed)
+                record_phase(f"storage-{operation}", elapsed)
+        return wrapper
+    return decorator
 
 class StorageService:
     """
@@ -20,7 +63,21 @@ class StorageService:
                 the StorageProvider interface, providing file storage services.
         """
         self.storage_provider = storage_provider
+        self.provider_name = type(storage_provider).__name__
+
+    async def open(self) -> None:
+        """
+        Opens the long-lived resources of the storage provider, such as connection pools.
+        """
+        await self.storage_provider.open()
+
+    async def close(self) -> None:
+        """
+        Closes the long-lived resources of the storage provider.
+        """
+        await self.storage_provider.close()
     
+    @instrumented(reports_failure=True)
     async def write_file(self, file_path: str, content: Union[bytes, str]) -> bool:
         """
         Writes content to a file at the specified path asynchronously.
@@ -33,12 +90,30 @@ class StorageService:
             bool: True if the write operation was successful, False otherwise.
         """
         try:
-            await self.storage_provider.write_file(file_path, content)
-            return True
+            return await self.storage_provider.write_file(file_path, content)
+        except Exception as e:
+            print(f"Failed to write file: {str(e)}")
+            return False
+
+    @instrumented(reports_failure=True)
+    async def write_stream(self, file_path: str, chunks: AsyncIterator[bytes]) -> bool:
+        """
+        Writes content to a file at the specified path from an async iterator of chunks.
+
+        Args:
+            file_path (str): The path where the file should be written.
+            chunks (AsyncIterator[bytes]): An async iterator yielding the content of the file in order.
+
+        Returns:
+            bool: True if the write operation was successful, False otherwise.
+        """
+        try:
+            return await self.storage_provider.write_stream(file_path, chunks)
         except Exception as e:
             print(f"Failed to write file: {str(e)}")
             return False
     
+    @instrumented()
     async def read_file(self, file_path: str) -> bytes:
         """
         Reads and returns the content of a file at the specified path asynchronously.
@@ -51,6 +126,120 @@ class StorageService:
         """
         return await self.storage_provider.read_file(file_path)
     
+    @instrumented()
+    async def read_range(self, file_path: str, start: int, end: int) -> bytes:
+        """
+        Reads and returns a byte range of a file at the specified path asynchronously.
+
+        Args:
+            file_path (str): The path of the file to read.
+            start (int): The offset of the first byte to read.
+            end (int): The offset one past the last byte to read.
+
+        Returns:
+            bytes: The content of the range.
+        """
+        return await self.storage_provider.read_range(file_path, start, end)
+
+    def open_read_stream(self, file_path: str, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+        """
+        Reads the content of a file at the specified path as an async iterator of chunks.
+
+        Args:
+            file_path (str): The path of the file to read.
+            chunk_size (int, optional): The maximum size of each chunk in bytes. Defaults to 1 MiB.
+
+        Returns:
+            AsyncIterator[bytes]: The chunks of the file, in order.
+        """
+        return self.storage_provider.open_read_stream(file_path, chunk_size)
+    
+    @instrumented()
+    async def create_upload_target(self, file_path: str, size: int, content_type: Optional[str], expires_in: int) -> Optional[UploadTarget]:
+        """
+        Creates signed URLs through which a client can upload a file directly to storage.
+
+        Args:
+            file_path (str): The path the file will be stored at.
+            size (int): The size of the file in bytes.
+            content_type (Optional[str]): The MIME type of the file, if known.
+            expires_in (int): The number of seconds the URLs stay valid.
+
+        Returns:
+            Optional[UploadTarget]: The upload URLs, or None if they could not be created.
+        """
+        return await self.storage_provider.create_upload_target(file_path, size, content_type, expires_in)
+
+    @instrumented(reports_failure=True)
+    async def complete_upload(self, file_path: str, upload_id: str, part_etags: List[str]) -> bool:
+        """
+        Assembles the parts of a direct multipart upload into the file.
+
+        Args:
+            file_path (str): The path of the file.
+            upload_id (str): The identifier of the multipart upload.
+            part_etags (List[str]): The ETag returned for each uploaded part, in part order.
+
+        Returns:
+            bool: True if the file was assembled successfully, False otherwise.
+        """
+        return await self.storage_provider.complete_upload(file_path, upload_id, part_etags)
+
+    @instrumented()
+    async def file_size(self, file_path: str) -> Optional[int]:
+        """
+        Returns the size of a file without reading it.
+
+        Args:
+            file_path (str): The path of the file.
+
+        Returns:
+            Optional[int]: The size of the file in bytes, or None if it does not exist.
+        """
+        return await self.storage_provider.file_size(file_path)
+
+    @instrumented()
+    async def get_seekable_source(self, file_path: str) -> Optional[str]:
+        """
+        Returns a path or URL that FFmpeg can open and seek within directly.
+
+        Args:
+            file_path (str): The path of the file.
+
+        Returns:
+            Optional[str]: A seekable path or URL, or None if the provider cannot offer one.
+        """
+        return await self.storage_provider.get_seekable_source(file_path)
+
+    async def release_seekable_source(self, file_path: str, source: str) -> None:
+        """
+        Signals that a source returned by `get_seekable_source` is no longer read.
+
+        Args:
+            file_path (str): The path of the file.
+            source (str): The source returned for the file.
+        """
+        await self.storage_provider.release_seekable_source(file_path, source)
+
+    @asynccontextmanager
+    async def open_seekable_source(self, file_path: str) -> AsyncIterator[Optional[str]]:
+        """
+        Provides the seekable source of a file for the duration of the context, releasing it on exit.
+
+        Args:
+            file_path (str): The path of the file.
+
+        Yields:
+            Optional[str]: A seekable path or URL, or None if the provider cannot offer one.
+        """
+        source = await self.get_seekable_source(file_path)
+        try:
+            yield source
+        finally:
+            if source is not None:
+                await self.release_seekable_source(file_path, source)
+    
+    @instrumented(reports_failure=True)
     async def delete_file(self, file_path: str) -> bool:
         """
         Deletes a file at the specified path asynchronously.
@@ -68,6 +257,7 @@ class StorageService:
             print(f"Failed to delete file: {str(e)}")
             return False
     
+    @instrumented()
     async def file_exists(self, file_path: str) -> bool:
         """
         Checks asynchronously if a file exists at the specified path.
@@ -80,6 +270,7 @@ class StorageService:
         """
         return await self.storage_provider.file_exists(file_path)
 
+    @instrumented()
     async def directory_exists(self, directory_path: str) -> bool:
         """
         Checks asynchronously if a directory exists at the specified path.
@@ -92,6 +283,20 @@ class StorageService:
         """
         return await self.storage_provider.directory_exists(directory_path)
 
+    @instrumented()
+    async def list_files(self, directory_path: str) -> Dict[str, int]:
+        """
+        Lists the files stored under a directory asynchronously.
+
+        Args:
+            directory_path (str): The path of the directory to list.
+
+        Returns:
+            Dict[str, int]: A mapping of file paths to their sizes in bytes.
+        """
+        return await self.storage_provider.list_files(directory_path)
+
+    @instrumented(reports_failure=True)
     async def delete_directory(self, directory_path: str) -> bool:
         """
         Deletes a directory at the specified path asynchronously.
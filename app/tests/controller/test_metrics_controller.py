@@ -0,0 +1,29 @@
+import os
+from fastapi.testclient import TestClient
+
+os.environ["ENV"] = "development"
+
+from app.main import app
+
+client = TestClient(app)
+
+def test_metrics():
+    """Test that the metrics endpoint reports requests per route template, with the status of each."""
+    client.get("/video/v1/get-thumbnail/nonexistent")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="GET",route="/video/v1/get-thumbnail/{thumbnail_id}",status="404"}' in response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/video/v1/get-thumbnail/{thumbnail_id}"}' in response.text
+    assert 'storage_operation_duration_seconds_count{provider="LocalStorage",operation="file_exists",outcome="ok"}' in response.text
+    assert "# TYPE ffmpeg_duration_seconds histogram" in response.text
+
+def test_metrics_unmatched_route():
+    """Test that requests matching no route share one series instead of one per path."""
+    client.get("/no/such/path")
+
+    response = client.get("/metrics")
+
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in response.text
@@ -4,10 +4,15 @@ import os
 import aiofiles.os
 from fastapi.testclient import TestClient
 from fastapi import status
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 from io import BytesIO
 import pytest
 from app.api.service.video_service import VideoService
+from app.metadata.video_index import VideoIndex, VideoRecord
+from app.helpers.ffmpeg import FFmpegBusyError
+from app.jobs.job_queue import JobStatus
+from app.jobs.worker import process_next
+from app.config import get_config
 import shutil
 
 # Set the environment variable for testing purposes.
@@ -54,6 +59,76 @@ def test_upload_video_failure(mock_upload):
     assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
     assert response.json() == {"detail": "Video upload failed"}
 
+@patch('app.api.service.video_service.VideoService.upload_video')
+def test_upload_video_busy(mock_upload):
+    mock_upload.side_effect = FFmpegBusyError(retry_after=2)
+
+    response = client.post(
+        "/video/v1/upload",
+        files={"file": ("test_video.mp4", BytesIO(b"file_content"), "video/mp4")}
+    )
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["retry-after"] == "2"
+
+def test_direct_upload():
+    with open(os.path.join("app", "tests", "resources", "test_video.mp4"), "rb") as f:
+        content = f.read()
+
+    response = client.post("/video/v1/upload/initiate", json={"filename": "clip.mp4", "size": len(content), "content_type": "video/mp4"})
+    assert response.status_code == 200
+    initiated = response.json()
+    file_id = initiated["file_id"]
+
+    try:
+        # The video cannot be registered before it is uploaded
+        response = client.post("/video/v1/upload/complete", json={"file_id": file_id})
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        # Local storage hands out a signed URL of the API's own upload endpoint
+        response = client.put(initiated["url"], content=content)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        response = client.post("/video/v1/upload/complete", json={"file_id": file_id})
+        assert response.status_code == 200
+        assert response.json() == {"filename": "clip.mp4", "file_id": file_id}
+
+        response = client.get(f"/video/v1/video/{file_id}/metadata")
+        assert response.json()["size"] == len(content)
+        assert response.json()["codec"] == "h264"
+
+        # A completed upload cannot be completed again
+        assert client.post("/video/v1/upload/complete", json={"file_id": file_id}).status_code == status.HTTP_404_NOT_FOUND
+
+        # Nor can its signed URL overwrite the registered video
+        response = client.put(initiated["url"], content=b"data")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert os.path.getsize(os.path.join(VideoService.UPLOAD_DIR, f"{file_id}.mp4")) == len(content)
+    finally:
+        VideoService.keyframe_index_cache.delete(file_id)
+        for path in (os.path.join(VideoService.UPLOAD_DIR, f"{file_id}.mp4"), VideoService.keyframe_index_path(file_id)):
+            if os.path.isfile(path):
+                os.remove(path)
+
+def test_direct_upload_unsupported_format():
+    response = client.post("/video/v1/upload/initiate", json={"filename": "notes.txt", "size": 10})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_direct_upload_invalid_signature():
+    initiated = client.post("/video/v1/upload/initiate", json={"filename": "clip.mp4", "size": 4}).json()
+    url = initiated["url"].replace("signature=", "signature=0")
+
+    response = client.put(url, content=b"data")
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert not os.path.isfile(os.path.join(VideoService.UPLOAD_DIR, f"{initiated['file_id']}.mp4"))
+
+def test_complete_unknown_upload():
+    response = client.post("/video/v1/upload/complete", json={"file_id": "nonexistent"})
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
 @pytest.fixture
 async def video_file():
     video_id = "9abe8652-f7d5-4f9e-8447-6a822a6355bc"
@@ -67,9 +142,17 @@ async def video_file():
     shutil.copy(resource_path, video_file_path)
     assert os.path.isfile(video_file_path), "The video file was not created successfully."
 
+    storage_key = os.path.join(VideoService.UPLOAD_DIR, f"{video_id}.mp4")
+    await VideoService.video_index.add(VideoRecord(
+        video_id, "mp4", storage_key, os.path.getsize(resource_path), "video/mp4", 0.0,
+        duration=11.5115, codec="h264", width=640, height=360, frame_rate=23.976, container="mov,mp4,m4a,3gp,3g2,mj2"
+    ))
+
     yield video_id
 
     # Cleanup
+    await VideoService.video_index.remove(video_id)
+    VideoService.master_frame_cache.clear()
     await aiofiles.os.remove(video_file_path)
     await aiofiles.os.removedirs(video_path)
 
@@ -91,8 +174,252 @@ async def test_generate_thumbnail(video_file):
     # Cleanup
     await aiofiles.os.remove(thumbnail_path)
 
+@pytest.mark.asyncio
+async def test_generate_thumbnail_storage_failure(video_file):
+    data = {
+        "file_id": video_file,
+        "timestamp": 1,
+        "resolution": "320x240"
+    }
+
+    # A thumbnail the storage provider failed to write must not be handed out
+    with patch.object(VideoService.storage_service.storage_provider, "write_file", AsyncMock(return_value=False)):
+        response = client.post("/video/v1/generate-thumbnail", json=data)
+
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert "thumbnail_id" not in response.json()
+
+@pytest.mark.asyncio
+async def test_generate_thumbnails(video_file):
+    data = {
+        "file_id": video_file,
+        "thumbnails": [
+            {"timestamp": 1, "resolution": "320x240"},
+            {"timestamp": 3},
+            {"timestamp": 5, "resolution": "640x480"}
+        ]
+    }
+    response = client.post("/video/v1/generate-thumbnails", json=data)
+
+    assert response.status_code == 200
+    thumbnail_ids = response.json().get("thumbnail_ids")
+    assert len(thumbnail_ids) == 3
+    for thumbnail_id in thumbnail_ids:
+        thumbnail_path = os.path.join(VideoService.THUMBNAIL_DIR, f"{thumbnail_id}.jpg")
+        assert os.path.isfile(thumbnail_path), "Thumbnail was not created successfully."
+
+        # Cleanup
+        await aiofiles.os.remove(thumbnail_path)
+
+def test_generate_thumbnails_invalid_resolution():
+    data = {
+        "file_id": "any",
+        "thumbnails": [{"timestamp": 1}, {"timestamp": 2, "resolution": "123x456"}]
+    }
+    response = client.post("/video/v1/generate-thumbnails", json=data)
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Unsupported video resolution: 123x456"}
+
+@pytest.mark.asyncio
+async def test_generate_sprite(video_file):
+    data = {
+        "file_id": video_file,
+        "interval": 2,
+        "columns": 3,
+        "rows": 2
+    }
+    response = client.post("/video/v1/generate-sprite", json=data)
+
+    assert response.status_code == 200
+    sprite_id = response.json().get("sprite_id")
+    assert sprite_id is not None
+
+    sprite_response = client.get(f"/video/v1/get-sprite/{sprite_id}.jpg")
+    assert sprite_response.status_code == 200
+    assert sprite_response.headers["content-type"] == "image/jpeg"
+
+    vtt_response = client.get(f"/video/v1/get-sprite/{sprite_id}.vtt")
+    assert vtt_response.status_code == 200
+    assert vtt_response.headers["content-type"].startswith("text/vtt")
+    assert vtt_response.text.startswith("WEBVTT")
+
+    # Cleanup
+    for extension in ("jpg", "vtt"):
+        await aiofiles.os.remove(os.path.join(VideoService.SPRITE_DIR, f"{sprite_id}.{extension}"))
+
+def test_generate_sprite_invalid_layout():
+    data = {
+        "file_id": "any",
+        "columns": 100,
+        "rows": 100
+    }
+    response = client.post("/video/v1/generate-sprite", json=data)
+
+    assert response.status_code == 400
+
+def test_get_sprite_not_found():
+    response = client.get("/video/v1/get-sprite/missing.vtt")
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Sprite not found"}
+
+@patch('app.api.service.video_service.VideoService.generate_thumbnail')
+def test_generate_thumbnail_busy(mock_generate_thumbnail):
+    mock_generate_thumbnail.side_effect = FFmpegBusyError(retry_after=2)
+    data = {
+        "file_id": "any",
+        "timestamp": 1,
+        "resolution": "320x240"
+    }
+    response = client.post("/video/v1/generate-thumbnail", json=data)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["retry-after"] == "2"
+
+def test_ffmpeg_stats():
+    response = client.get("/video/v1/ffmpeg-stats")
+
+    assert response.status_code == 200
+    assert response.json()["max_processes"] == VideoService.ffmpeg_executor.max_processes
+    assert {"running", "queued", "rejected", "mean_wait_seconds"} <= response.json().keys()
+
+@pytest.mark.asyncio
+async def test_thumbnail_job(video_file):
+    data = {
+        "file_id": video_file,
+        "timestamp": 1,
+        "resolution": "320x240"
+    }
+    response = client.post("/video/v1/jobs/generate-thumbnail", json=data)
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job_id = response.json()["job_id"]
+    assert response.json()["status"] == JobStatus.QUEUED
+
+    # Run queued jobs as a worker would, until ours has been processed
+    while client.get(f"/video/v1/jobs/{job_id}").json()["status"] == JobStatus.QUEUED:
+        assert await process_next(VideoService.job_queue)
+
+    response = client.get(f"/video/v1/jobs/{job_id}")
+    assert response.status_code == 200
+    assert response.json()["status"] == JobStatus.SUCCEEDED
+    thumbnail_id = response.json()["thumbnail_id"]
+    thumbnail_path = os.path.join(VideoService.THUMBNAIL_DIR, f"{thumbnail_id}.jpg")
+    assert os.path.isfile(thumbnail_path)
+
+    # Cleanup
+    await aiofiles.os.remove(thumbnail_path)
+
+def test_thumbnail_job_video_not_found():
+    data = {
+        "file_id": "nonexistent",
+        "timestamp": 1
+    }
+    response = client.post("/video/v1/jobs/generate-thumbnail", json=data)
+
+    assert response.status_code == 404
+
+def test_get_job_not_found():
+    response = client.get("/video/v1/jobs/nonexistent")
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Job not found"}
+
+def test_generate_thumbnail_invalid_accuracy():
+    data = {
+        "file_id": "any",
+        "timestamp": 1,
+        "accuracy": "nearest"
+    }
+    response = client.post("/video/v1/generate-thumbnail", json=data)
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Unsupported seek accuracy: nearest"}
+
+def test_generate_thumbnail_invalid_format():
+    data = {
+        "file_id": "any",
+        "timestamp": 1,
+        "format": "gif"
+    }
+    response = client.post("/video/v1/generate-thumbnail", json=data)
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Unsupported image format: gif"}
+
+def test_generate_thumbnail_invalid_quality():
+    data = {
+        "file_id": "any",
+        "timestamp": 1,
+        "quality": 0
+    }
+    response = client.post("/video/v1/generate-thumbnail", json=data)
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Unsupported quality: 0"}
+
+@pytest.mark.asyncio
+async def test_get_thumbnail_negotiates_format(video_file):
+    data = {
+        "file_id": video_file,
+        "timestamp": 1,
+        "resolution": "320x240"
+    }
+    client.post("/video/v1/generate-thumbnail", json=data)
+    response = client.post("/video/v1/generate-thumbnail", json={**data, "format": "webp", "quality": 80})
+    webp_id = response.json()["thumbnail_id"]
+    jpeg_id = client.post("/video/v1/generate-thumbnail", json={**data, "quality": 80}).json()["thumbnail_id"]
+
+    try:
+        # Both variants share the identifier, and the client's Accept header picks between them
+        assert webp_id == jpeg_id
+        response = client.get(f"/video/v1/get-thumbnail/{webp_id}", headers={"Accept": "image/webp,image/*;q=0.8"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/webp"
+        assert response.headers["etag"] == f'"{webp_id}.webp"'
+        assert response.headers["vary"] == "Accept"
+
+        response = client.get(f"/video/v1/get-thumbnail/{webp_id}", headers={"Accept": "image/jpeg"})
+        assert response.headers["content-type"] == "image/jpeg"
+        assert response.headers["etag"] == f'"{webp_id}"'
+
+        response = client.get(f"/video/v1/get-thumbnail/{webp_id}", headers={"If-None-Match": f'"{webp_id}.webp"'})
+        assert response.status_code == 304
+    finally:
+        if os.path.isdir(VideoService.THUMBNAIL_DIR):
+            shutil.rmtree(VideoService.THUMBNAIL_DIR)
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_out_of_range(video_file):
+    data = {
+        "file_id": video_file,
+        "timestamp": 9999
+    }
+    response = client.post("/video/v1/generate-thumbnail", json=data)
+
+    assert response.status_code == 400
+    assert "beyond the end of the video" in response.json()["detail"]
+
+@pytest.mark.asyncio
+async def test_get_video_metadata(video_file):
+    response = client.get(f"/video/v1/video/{video_file}/metadata")
+
+    assert response.status_code == 200
+    metadata = response.json()
+    assert metadata["file_id"] == video_file
+    assert metadata["duration"] == 11.5115
+    assert metadata["codec"] == "h264"
+    assert (metadata["width"], metadata["height"]) == (640, 360)
+
+def test_get_video_metadata_not_found():
+    response = client.get("/video/v1/video/nonexistent/metadata")
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Video file not found"}
+
 @pytest.fixture
-def thumbnail_file():
+def thumbnail_file(tmp_path):
     thumbnail_id = "84838f56-d9d7-4f54-881b-6021e34ae0e2"
     thumbnail_path = os.path.abspath(os.path.join(".", VideoService.THUMBNAIL_DIR))
     os.makedirs(thumbnail_path, exist_ok=True)
@@ -110,7 +437,9 @@ def thumbnail_file():
     
     print(f"Thumbnail file created at: {thumbnail_file_path}")
 
-    yield thumbnail_id, thumbnail_path
+    # Start from an empty index, since the copied thumbnail has no recorded formats
+    with patch.object(VideoService, "video_index", VideoIndex(os.path.join(tmp_path, "video_index.db"))):
+        yield thumbnail_id, thumbnail_path
     
     shutil.rmtree(thumbnail_path)
 
@@ -128,6 +457,83 @@ def test_get_thumbnail_success(thumbnail_file):
     assert response.headers["content-type"] == "image/jpeg"
     assert "Content-Disposition" in response.headers
 
+def test_get_thumbnail_cache_headers(thumbnail_file):
+    thumbnail_id, thumbnail_path = thumbnail_file
+
+    response = client.get(f"/video/v1/get-thumbnail/{thumbnail_id}")
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{thumbnail_id}"'
+    assert "immutable" in response.headers["cache-control"]
+
+@patch('app.api.service.video_service.VideoService.get_thumbnail')
+def test_get_thumbnail_not_modified(mock_get_thumbnail):
+    thumbnail_id = "84838f56-d9d7-4f54-881b-6021e34ae0e2"
+
+    response = client.get(f"/video/v1/get-thumbnail/{thumbnail_id}", headers={"If-None-Match": f'"{thumbnail_id}"'})
+
+    # A matching validator is answered without reading the thumbnail
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == f'"{thumbnail_id}"'
+    mock_get_thumbnail.assert_not_called()
+
+def test_get_thumbnail_not_modified_wildcard(thumbnail_file):
+    thumbnail_id, _ = thumbnail_file
+
+    response = client.get(f"/video/v1/get-thumbnail/{thumbnail_id}", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == f'"{thumbnail_id}"'
+
+def test_get_thumbnail_wildcard_not_found():
+    # "*" only matches a thumbnail that exists
+    response = client.get("/video/v1/get-thumbnail/nonexistent", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Thumbnail not found"}
+
+def test_get_thumbnail_from_file(thumbnail_file):
+    thumbnail_id, thumbnail_path = thumbnail_file
+
+    with patch.object(VideoService, "get_thumbnail") as mock_get_thumbnail:
+        response = client.get(f"/video/v1/get-thumbnail/{thumbnail_id}")
+
+    # Local thumbnails are sent from their file without being read into memory
+    assert response.status_code == 200
+    assert int(response.headers["content-length"]) == os.path.getsize(os.path.join(thumbnail_path, f"{thumbnail_id}.jpg"))
+    assert response.headers["etag"] == f'"{thumbnail_id}"'
+    mock_get_thumbnail.assert_not_called()
+
+def test_get_thumbnail_redirect():
+    thumbnail_id = "84838f56-d9d7-4f54-881b-6021e34ae0e2"
+    url = f"https://bucket.s3.amazonaws.com/thumbnails/{thumbnail_id}.jpg?X-Amz-Signature=abc"
+
+    with patch.object(get_config(), "THUMBNAIL_DELIVERY", "redirect"), \
+            patch.object(VideoService.storage_service, "get_seekable_source", return_value=url), \
+            patch.object(VideoService, "find_thumbnail_format", return_value="jpeg"), \
+            patch.object(VideoService.storage_service, "file_exists") as mock_exists:
+        response = client.get(f"/video/v1/get-thumbnail/{thumbnail_id}", follow_redirects=False)
+
+    # The variant picked by find_thumbnail_format is not checked for existence again
+    mock_exists.assert_not_called()
+    assert response.status_code == 302
+    assert response.headers["location"] == url
+    assert response.headers["cache-control"] == "no-store"
+
+def test_get_thumbnail_proxy_remote():
+    thumbnail_id = "84838f56-d9d7-4f54-881b-6021e34ae0e2"
+    url = f"https://bucket.s3.amazonaws.com/thumbnails/{thumbnail_id}.jpg?X-Amz-Signature=abc"
+
+    # By default remote thumbnails are read and proxied through the API
+    with patch.object(VideoService.storage_service, "get_seekable_source", return_value=url), \
+            patch.object(VideoService, "find_thumbnail_format", return_value="jpeg"), \
+            patch.object(VideoService, "get_thumbnail", return_value=(b"jpeg", f"{thumbnail_id}.jpg")):
+        response = client.get(f"/video/v1/get-thumbnail/{thumbnail_id}", follow_redirects=False)
+
+    assert response.status_code == 200
+    assert response.content == b"jpeg"
+
 def test_get_thumbnail_not_found():
     nonexistent_thumbnail_id = "nonexistent"
 
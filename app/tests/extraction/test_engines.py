@@ -0,0 +1,97 @@
+import io
+import os
+import subprocess
+import pytest
+from PIL import Image
+from unittest.mock import patch
+from app.config import get_config
+from app.extraction.engine_factory import get_extraction_engine
+from app.extraction.pyav_engine import PyAVEngine
+from app.extraction.subprocess_engine import SubprocessEngine, thumbnail_command
+from app.helpers.ffmpeg import FFmpegExecutor
+
+VIDEO_PATH = os.path.abspath(os.path.join("app", "tests", "resources", "test_video.mp4"))
+
+@pytest.fixture(params=[SubprocessEngine, PyAVEngine])
+def engine(request):
+    """
+    A pytest fixture that provides each extraction engine with its own executor.
+    """
+    return request.param(FFmpegExecutor(max_processes=2, max_queue=10, threads=1))
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("image_format, pillow_format", [("jpeg", "JPEG"), ("webp", "WEBP"), ("avif", "AVIF")])
+async def test_extract(engine, image_format, pillow_format):
+    """Test that every engine extracts a thumbnail of the requested resolution and format."""
+    content, frame = await engine.extract(VIDEO_PATH, "00:00:01", "320x240", image_format=image_format)
+
+    image = Image.open(io.BytesIO(content))
+    assert image.size == (320, 240)
+    assert image.format == pillow_format
+    assert frame is None
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("accuracy", ["exact", "fast"])
+async def test_extract_master_frame(engine, accuracy):
+    """Test that every engine extracts the raw RGB master frame from the same decode when asked to."""
+    _, frame = await engine.extract(VIDEO_PATH, "00:00:05", "320x240", accuracy, master_resolution="640x360")
+
+    assert len(frame) == 640 * 360 * 3
+
+@pytest.mark.asyncio
+async def test_engines_capture_the_same_frame():
+    """Test that the in-process engine captures the frame FFmpeg captures for an exact seek."""
+    executor = FFmpegExecutor(max_processes=2, max_queue=10)
+
+    _, expected = await SubprocessEngine(executor).extract(VIDEO_PATH, "00:00:03", "320x240", master_resolution="640x360")
+    _, frame = await PyAVEngine(executor).extract(VIDEO_PATH, "00:00:03", "320x240", master_resolution="640x360")
+
+    # Color conversion may differ slightly between the FFmpeg CLI and Pillow, but not the frame
+    difference = sum(abs(a - b) for a, b in zip(frame[::997], expected[::997])) / len(frame[::997])
+    assert difference < 8
+
+@pytest.mark.asyncio
+async def test_engines_capture_the_same_frame_with_start_time(tmp_path):
+    """Test that both engines seek relative to the start of a video whose timestamps do not start at zero."""
+    video_path = str(tmp_path / "offset.mp4")
+    subprocess.run([
+        "ffmpeg", "-v", "error", "-f", "lavfi", "-i", "testsrc2=duration=4:size=640x360:rate=25",
+        "-c:v", "libx264", "-g", "50", "-output_ts_offset", "0.7", video_path
+    ], check=True)
+    executor = FFmpegExecutor(max_processes=2, max_queue=10)
+
+    # Half a GOP past the keyframe at 2s, so stopping at the keyframe captures a visibly different frame
+    _, expected = await SubprocessEngine(executor).extract(video_path, "00:00:03", "320x240", master_resolution="640x360")
+    _, frame = await PyAVEngine(executor).extract(video_path, "00:00:03", "320x240", master_resolution="640x360")
+
+    difference = sum(abs(a - b) for a, b in zip(frame[::997], expected[::997])) / len(frame[::997])
+    assert difference < 8
+
+@pytest.mark.asyncio
+async def test_extract_missing_video(engine):
+    """Test that every engine raises when the video cannot be read."""
+    with pytest.raises(Exception, match="FFmpeg failed"):
+        await engine.extract("/nonexistent.mp4", "00:00:01", "320x240")
+
+def test_thumbnail_command():
+    """Test that seek options precede the input and encoder options precede the output."""
+    cmd = thumbnail_command("in.mp4", "00:00:05", "320x240", "fast", "webp", 80)
+
+    assert cmd.index("-ss") < cmd.index("-i")
+    assert cmd[-7:] == ["-c:v", "libwebp", "-quality", "80", "-f", "webp", "pipe:1"]
+
+@pytest.mark.parametrize("name, engine_class", [("subprocess", SubprocessEngine), ("pyav", PyAVEngine)])
+def test_get_extraction_engine(name, engine_class):
+    """Test that the engine is selected by the THUMBNAIL_ENGINE setting."""
+    executor = FFmpegExecutor(max_processes=1, max_queue=0)
+
+    with patch.object(get_config(), "THUMBNAIL_ENGINE", name):
+        engine = get_extraction_engine(executor)
+
+    assert isinstance(engine, engine_class)
+    assert engine.executor is executor
+
+def test_get_extraction_engine_unknown():
+    """Test that an unknown engine is rejected."""
+    with patch.object(get_config(), "THUMBNAIL_ENGINE", "gstreamer"), pytest.raises(ValueError):
+        get_extraction_engine(FFmpegExecutor(max_processes=1, max_queue=0))
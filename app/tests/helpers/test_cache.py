@@ -0,0 +1,68 @@
+from unittest.mock import patch
+from app.helpers.cache import LRUByteCache
+
+def test_get_and_set():
+    """Test that cached values are returned and lookups are counted as hits and misses."""
+    cache = LRUByteCache(max_bytes=100)
+
+    assert cache.get("a") is None
+    assert cache.set("a", b"12345")
+    assert cache.get("a") == b"12345"
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.current_bytes == 5
+
+def test_evicts_least_recently_used():
+    """Test that the least recently used entries are evicted when the byte budget is exceeded."""
+    cache = LRUByteCache(max_bytes=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    cache.get("a")
+
+    cache.set("c", b"1234")
+
+    assert cache.get("b") is None, "The least recently used entry should have been evicted"
+    assert cache.get("a") == b"1234"
+    assert cache.get("c") == b"1234"
+    assert cache.current_bytes == 8
+
+def test_rejects_values_larger_than_budget():
+    """Test that a value larger than the whole budget is not cached and does not evict other entries."""
+    cache = LRUByteCache(max_bytes=4)
+    cache.set("a", b"1234")
+
+    assert not cache.set("b", b"12345")
+    assert cache.get("a") == b"1234"
+
+def test_replacing_a_key_updates_size():
+    """Test that replacing a key accounts for the size of the new value only."""
+    cache = LRUByteCache(max_bytes=10)
+    cache.set("a", b"1234")
+    cache.set("a", b"12")
+
+    assert cache.current_bytes == 2
+    assert len(cache) == 1
+
+def test_entries_expire():
+    """Test that entries are no longer returned once their time-to-live has passed."""
+    cache = LRUByteCache(max_bytes=10, ttl=5)
+    with patch("app.helpers.cache.time.monotonic", return_value=100.0):
+        cache.set("a", b"1234")
+    with patch("app.helpers.cache.time.monotonic", return_value=104.0):
+        assert cache.get("a") == b"1234"
+    with patch("app.helpers.cache.time.monotonic", return_value=105.0):
+        assert cache.get("a") is None
+    assert cache.current_bytes == 0
+
+def test_delete_and_clear():
+    """Test that deleted and cleared entries are removed from the cache and its size."""
+    cache = LRUByteCache(max_bytes=10)
+    cache.set("a", b"12")
+    cache.set("b", b"34")
+
+    assert cache.delete("a")
+    assert not cache.delete("a")
+    assert cache.current_bytes == 2
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.current_bytes == 0
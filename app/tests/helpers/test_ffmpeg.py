@@ -0,0 +1,118 @@
+import asyncio
+from unittest.mock import patch
+from app.helpers.ffmpeg import FFmpegBusyError, FFmpegExecutor
+import pytest
+
+class FakeProcess:
+    """A stand-in for an FFmpeg process that tracks how many processes run at once."""
+
+    running = 0
+    peak = 0
+
+    def __init__(self, duration):
+        self.duration = duration
+        self.returncode = None
+
+    async def communicate(self):
+        FakeProcess.running += 1
+        FakeProcess.peak = max(FakeProcess.peak, FakeProcess.running)
+        try:
+            await asyncio.sleep(self.duration)
+        finally:
+            FakeProcess.running -= 1
+        self.returncode = 0
+        return b"out", b""
+
+@pytest.fixture
+def fake_ffmpeg():
+    FakeProcess.running = 0
+    FakeProcess.peak = 0
+
+    async def create_subprocess_exec(*args, **kwargs):
+        return FakeProcess(0.02)
+
+    with patch("asyncio.create_subprocess_exec", side_effect=create_subprocess_exec) as mock_exec:
+        yield mock_exec
+
+@pytest.mark.asyncio
+async def test_run_limits_concurrent_processes(fake_ffmpeg):
+    """Test that no more than max_processes processes run at once and the rest wait their turn."""
+    executor = FFmpegExecutor(max_processes=2, max_queue=10)
+
+    results = await asyncio.gather(*(executor.run(["ffmpeg"]) for _ in range(6)))
+
+    assert results == [(0, b"out", b"")] * 6
+    assert FakeProcess.peak == 2
+    stats = executor.stats()
+    assert stats["running"] == 0 and stats["queued"] == 0
+    assert stats["completed"] == 6
+    assert stats["max_wait_seconds"] > 0
+
+@pytest.mark.asyncio
+async def test_run_rejects_when_queue_is_full(fake_ffmpeg):
+    """Test that commands beyond the process and queue limits are rejected with a retry hint."""
+    executor = FFmpegExecutor(max_processes=1, max_queue=1, retry_after=3)
+
+    results = await asyncio.gather(*(executor.run(["ffmpeg"]) for _ in range(3)), return_exceptions=True)
+
+    assert results[0] == results[1] == (0, b"out", b"")
+    assert isinstance(results[2], FFmpegBusyError)
+    assert results[2].retry_after == 3
+    assert executor.stats()["rejected"] == 1
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue(fake_ffmpeg):
+    """Test that a command cancelled while waiting frees its queue position."""
+    executor = FFmpegExecutor(max_processes=1, max_queue=1)
+
+    running = asyncio.ensure_future(executor.run(["ffmpeg"]))
+    waiting = asyncio.ensure_future(executor.run(["ffmpeg"]))
+    await asyncio.sleep(0)
+    assert executor.queued == 1
+
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert executor.queued == 0
+
+    await running
+    assert executor.running == 0
+
+@pytest.mark.asyncio
+async def test_run_in_thread_shares_slots():
+    """Test that functions run in threads take the same slots as FFmpeg processes."""
+    executor = FFmpegExecutor(max_processes=1, max_queue=0)
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def hold_slot():
+        await executor._acquire()
+        started.set()
+        await release.wait()
+        executor._release()
+
+    holder = asyncio.create_task(hold_slot())
+    await started.wait()
+    with pytest.raises(FFmpegBusyError):
+        await executor.run_in_thread(sum, [1, 2])
+    release.set()
+    await holder
+
+    assert await executor.run_in_thread(sum, [1, 2]) == 3
+    assert executor.stats()["completed"] == 1
+
+def test_threads_are_limited_per_input():
+    """Test that the thread limit is applied to the filter graph and the decoder of every input."""
+    executor = FFmpegExecutor(max_processes=1, max_queue=0, threads=2)
+
+    assert executor._with_threads(["ffmpeg", "-ss", "1", "-i", "a.mp4", "-i", "b.mp4", "out.jpg"]) == [
+        "ffmpeg", "-filter_threads", "2", "-ss", "1", "-threads", "2", "-i", "a.mp4", "-threads", "2", "-i", "b.mp4", "out.jpg"
+    ]
+    assert FFmpegExecutor(max_processes=1, max_queue=0)._with_threads(["ffmpeg", "-i", "a.mp4"]) == ["ffmpeg", "-i", "a.mp4"]
+
+def test_invalid_limits():
+    """Test that non-positive process limits and negative queue limits are rejected."""
+    with pytest.raises(ValueError):
+        FFmpegExecutor(max_processes=0, max_queue=1)
+    with pytest.raises(ValueError):
+        FFmpegExecutor(max_processes=1, max_queue=-1)
@@ -0,0 +1,40 @@
+from app.helpers.http import accept_quality, etag_matches, rank_media_types
+import pytest
+
+@pytest.mark.parametrize("if_none_match", [
+    '"abc"',
+    'W/"abc"',
+    '"other", "abc"',
+    '*',
+])
+def test_etag_matches(if_none_match):
+    """Test that matching If-None-Match headers are recognized, including weak tags, lists and wildcards."""
+    assert etag_matches(if_none_match, '"abc"')
+
+@pytest.mark.parametrize("if_none_match", [
+    '"other"',
+    'abc',
+    '',
+])
+def test_etag_does_not_match(if_none_match):
+    """Test that If-None-Match headers listing other tags do not match."""
+    assert not etag_matches(if_none_match, '"abc"')
+
+@pytest.mark.parametrize("accept, expected", [
+    ("image/webp", 1.0),
+    ("image/*;q=0.5", 0.5),
+    ("image/webp;q=0.2, image/*", 0.2),
+    ("*/*;q=0.1", 0.1),
+    ("image/png", 0.0),
+])
+def test_accept_quality(accept, expected):
+    """Test that the most specific media range of an Accept header sets the quality of a media type."""
+    assert accept_quality(accept, "image/webp") == expected
+
+def test_rank_media_types():
+    """Test that media types are ordered by the client's preference, with ties kept in the server's order."""
+    media_types = ["image/avif", "image/webp", "image/jpeg"]
+
+    assert rank_media_types(None, media_types) == media_types
+    assert rank_media_types("image/jpeg, image/webp", media_types) == ["image/webp", "image/jpeg"]
+    assert rank_media_types("image/jpeg, image/*;q=0.5, image/avif;q=0", media_types) == ["image/jpeg", "image/webp"]
@@ -0,0 +1,55 @@
+import io
+from PIL import Image
+from app.helpers.image import image_encoder_args, is_valid_image_format, is_valid_quality, image_extension, image_content_type, pillow_save_options, resize_frame
+import pytest
+
+@pytest.mark.parametrize("image_format, valid", [
+    ("jpeg", True),
+    ("webp", True),
+    ("avif", True),
+    ("png", True),
+    ("jpg", False),
+    ("gif", False),
+])
+def test_is_valid_image_format(image_format, valid):
+    """Test that only the supported image formats are accepted."""
+    assert is_valid_image_format(image_format) == valid
+
+@pytest.mark.parametrize("quality, valid", [
+    (None, True),
+    (1, True),
+    (100, True),
+    (0, False),
+    (101, False),
+])
+def test_is_valid_quality(quality, valid):
+    """Test that qualities must be omitted or between 1 and 100."""
+    assert is_valid_quality(quality) == valid
+
+def test_image_extension_and_content_type():
+    """Test that storage extensions and content types follow the format."""
+    assert image_extension("jpeg") == "jpg"
+    assert image_content_type("jpeg") == "image/jpeg"
+    assert image_extension("webp") == "webp"
+    assert image_content_type("avif") == "image/avif"
+
+def test_image_encoder_args():
+    """Test that the quality is mapped onto the scale of each encoder."""
+    assert image_encoder_args() == ["-c:v", "mjpeg", "-f", "image2pipe"]
+    assert image_encoder_args("jpeg", 100) == ["-c:v", "mjpeg", "-q:v", "2", "-f", "image2pipe"]
+    assert image_encoder_args("jpeg", 1) == ["-c:v", "mjpeg", "-q:v", "31", "-f", "image2pipe"]
+    assert image_encoder_args("webp", 75) == ["-c:v", "libwebp", "-quality", "75", "-f", "webp"]
+    assert "-crf" in image_encoder_args("avif", 100) and "0" in image_encoder_args("avif", 100)
+    with pytest.raises(ValueError):
+        image_encoder_args("gif")
+
+@pytest.mark.parametrize("image_format", ["jpeg", "webp", "avif", "png"])
+def test_resize_frame(image_format):
+    """Test that a raw RGB frame is scaled to the requested resolution and encoded in the requested format."""
+    frame = bytes([255, 0, 0]) * 64 * 36
+
+    content = resize_frame(frame, (64, 36), "32x24", image_format, 80)
+
+    image = Image.open(io.BytesIO(content))
+    assert image.size == (32, 24)
+    assert image.format == pillow_save_options(image_format)["format"]
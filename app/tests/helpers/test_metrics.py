@@ -0,0 +1,60 @@
+import time
+from app.helpers.metrics import MetricsRegistry
+import pytest
+
+def test_counter_render():
+    """Test that counters are rendered with their HELP and TYPE lines and one line per label combination."""
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests served.", ["route"])
+
+    requests.labels("/a").inc()
+    requests.labels("/a").inc(2)
+    requests.labels('/b"c').inc()
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests served.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a"} 3',
+        'requests_total{route="/b\\"c"} 1',
+    ]
+
+def test_histogram_render():
+    """Test that histogram buckets are cumulative and include +Inf, the sum and the count."""
+    registry = MetricsRegistry()
+    duration = registry.histogram("duration_seconds", "Durations.", buckets=(0.1, 1.0))
+
+    duration.observe(0.05)
+    duration.observe(0.1)
+    duration.observe(0.5)
+    duration.observe(2.0)
+
+    lines = registry.render().splitlines()
+    assert 'duration_seconds_bucket{le="0.1"} 2' in lines
+    assert 'duration_seconds_bucket{le="1"} 3' in lines
+    assert 'duration_seconds_bucket{le="+Inf"} 4' in lines
+    assert "duration_seconds_sum 2.65" in lines
+    assert "duration_seconds_count 4" in lines
+
+def test_invalid_registrations():
+    """Test that duplicate metric names and mismatched label values are rejected."""
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests served.", ["route"])
+
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Again.")
+    with pytest.raises(ValueError):
+        counter.labels("/a", "GET")
+
+def test_observe_is_cheap():
+    """Test that recording a labelled sample on a hot path costs microseconds."""
+    registry = MetricsRegistry()
+    duration = registry.histogram("duration_seconds", "Durations.", ["provider", "operation", "outcome"])
+    samples = 100000
+
+    start = time.perf_counter()
+    for index in range(samples):
+        duration.labels("LocalStorage", "read_file", "ok").observe(index * 1e-6)
+    elapsed = time.perf_counter() - start
+
+    # A few microseconds per sample even on a slow machine, with generous headroom
+    assert elapsed / samples < 20e-6
@@ -0,0 +1,19 @@
+from app.helpers.signing import sign_upload, verify_upload_signature
+
+KEY = "test-key"
+
+def test_verify_upload_signature():
+    """Test that a signature is accepted for its path until it expires."""
+    signature = sign_upload("uploads/a.mp4", 1000, KEY)
+
+    assert verify_upload_signature("uploads/a.mp4", 1000, signature, KEY, now=999)
+    assert not verify_upload_signature("uploads/a.mp4", 1000, signature, KEY, now=1001)
+
+def test_verify_upload_signature_rejects_tampering():
+    """Test that changing the path, expiry or key invalidates a signature."""
+    signature = sign_upload("uploads/a.mp4", 1000, KEY)
+
+    assert not verify_upload_signature("uploads/b.mp4", 1000, signature, KEY, now=0)
+    assert not verify_upload_signature("uploads/a.mp4", 2000, signature, KEY, now=0)
+    assert not verify_upload_signature("uploads/a.mp4", 1000, signature, "other-key", now=0)
+    assert not verify_upload_signature("uploads/a.mp4", 1000, "0" * 64, KEY, now=0)
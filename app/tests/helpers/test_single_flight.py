@@ -0,0 +1,78 @@
+import asyncio
+from app.helpers.single_flight import SingleFlight
+import pytest
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    """Test that concurrent calls with the same key run the function once and share its result."""
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(single_flight.do("key", work) for _ in range(10)))
+
+    assert results == ["result"] * 10, "Every caller should receive the shared result"
+    assert calls == 1, "The function should only run once for concurrent calls"
+    assert single_flight.in_flight() == 0, "Completed calls should be forgotten"
+
+@pytest.mark.asyncio
+async def test_distinct_keys_run_separately():
+    """Test that calls with different keys do not share an execution."""
+    single_flight = SingleFlight()
+
+    async def work(value):
+        await asyncio.sleep(0)
+        return value
+
+    results = await asyncio.gather(single_flight.do("a", lambda: work(1)), single_flight.do("b", lambda: work(2)))
+
+    assert results == [1, 2]
+
+@pytest.mark.asyncio
+async def test_sequential_calls_run_again():
+    """Test that a new call after completion starts a new execution."""
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await single_flight.do("key", work) == 1
+    assert await single_flight.do("key", work) == 2
+
+@pytest.mark.asyncio
+async def test_exception_is_shared():
+    """Test that an exception raised by the shared call is raised to every caller."""
+    single_flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    results = await asyncio.gather(*(single_flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert single_flight.in_flight() == 0
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_call():
+    """Test that cancelling one waiter leaves the shared call running for the others."""
+    single_flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    first = asyncio.ensure_future(single_flight.do("key", work))
+    second = asyncio.ensure_future(single_flight.do("key", work))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == "result"
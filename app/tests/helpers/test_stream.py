@@ -0,0 +1,30 @@
+from io import BytesIO
+from fastapi import UploadFile
+from app.helpers.stream import iter_upload_file
+import pytest
+
+@pytest.mark.asyncio
+async def test_iter_upload_file_chunks():
+    """Test that iter_upload_file yields fixed-size chunks with a shorter final chunk."""
+    upload_file = UploadFile(filename="video.mp4", file=BytesIO(b"abcdefghij"))
+
+    chunks = [chunk async for chunk in iter_upload_file(upload_file, 4)]
+
+    assert chunks == [b"abcd", b"efgh", b"ij"], "The file should be split into chunks of at most 4 bytes"
+
+@pytest.mark.asyncio
+async def test_iter_upload_file_empty():
+    """Test that iter_upload_file yields nothing for an empty file."""
+    upload_file = UploadFile(filename="video.mp4", file=BytesIO(b""))
+
+    chunks = [chunk async for chunk in iter_upload_file(upload_file, 4)]
+
+    assert chunks == [], "An empty file should not yield any chunks"
+
+@pytest.mark.asyncio
+async def test_iter_upload_file_invalid_chunk_size():
+    """Test that iter_upload_file rejects a non-positive chunk size."""
+    upload_file = UploadFile(filename="video.mp4", file=BytesIO(b"abc"))
+
+    with pytest.raises(ValueError):
+        [chunk async for chunk in iter_upload_file(upload_file, 0)]
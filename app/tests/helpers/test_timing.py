@@ -0,0 +1,31 @@
+import asyncio
+from app.helpers.timing import phase, record_phase, server_timing_header, start_timing, stop_timing
+import pytest
+
+def test_phases_are_collected_only_while_timing():
+    """Test that phases are recorded between start_timing and stop_timing, and ignored otherwise."""
+    record_phase("ignored", 1.0)
+
+    token = start_timing()
+    record_phase("storage-read_file", 0.002)
+    with phase("ffmpeg"):
+        pass
+    phases = stop_timing(token)
+
+    assert [name for name, _ in phases] == ["storage-read_file", "ffmpeg"]
+    record_phase("ignored", 1.0)
+
+@pytest.mark.asyncio
+async def test_phases_of_child_tasks():
+    """Test that tasks started while timing record their phases for the request that started them."""
+    token = start_timing()
+    await asyncio.ensure_future(asyncio.sleep(0, record_phase("ffmpeg", 0.1)))
+    phases = stop_timing(token)
+
+    assert phases == [("ffmpeg", 0.1)]
+
+def test_server_timing_header():
+    """Test that repeated phases are summed and durations are reported in milliseconds."""
+    header = server_timing_header([("storage-file_exists", 0.001), ("ffmpeg", 0.08), ("storage-file_exists", 0.0005)])
+
+    assert header == "storage-file_exists;dur=1.50, ffmpeg;dur=80.00"
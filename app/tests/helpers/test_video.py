@@ -1,4 +1,4 @@
-from app.helpers.video import supported_video_formats, is_supported_video_format, is_valid_resolution, is_valid_seconds, seconds_to_timestamp
+from app.helpers.video import supported_video_formats, is_supported_video_format, is_valid_resolution, is_valid_seconds, seconds_to_timestamp, is_valid_seek_accuracy, seek_input_args, seek_output_args, timestamp_to_seconds, master_frame_resolution, pregeneration_timestamps
 import pytest
 
 def test_supported_video_formats():
@@ -97,3 +97,58 @@ def test_negative_seconds():
     
     with pytest.raises(ValueError):
         seconds_to_timestamp(-5)
+
+@pytest.mark.parametrize("accuracy, expected", [
+    ("exact", True),
+    ("fast", True),
+    ("nearest", False),
+    ("", False)
+])
+def test_is_valid_seek_accuracy(accuracy, expected):
+    """Test the is_valid_seek_accuracy function with supported and unsupported accuracies."""
+    assert is_valid_seek_accuracy(accuracy) == expected
+
+def test_seek_input_args():
+    """Test that exact seeks only set the position and fast seeks also decode keyframes only."""
+    assert seek_input_args("00:00:05") == ["-ss", "00:00:05"]
+    assert seek_input_args("00:00:05", "fast") == ["-noaccurate_seek", "-skip_frame", "nokey", "-ss", "00:00:05"]
+    with pytest.raises(ValueError):
+        seek_input_args("00:00:05", "nearest")
+
+def test_seek_output_args():
+    """Test that fast seeks pass frame timestamps through so the keyframe before the timestamp is kept."""
+    assert seek_output_args() == []
+    assert seek_output_args("fast") == ["-fps_mode", "passthrough"]
+    with pytest.raises(ValueError):
+        seek_output_args("nearest")
+
+@pytest.mark.parametrize("timestamp, expected", [
+    ("00:00:00", 0.0),
+    ("01:01:05", 3665.0),
+    ("00:00:01.5", 1.5),
+    ("02:03", 123.0),
+    ("42", 42.0)
+])
+def test_timestamp_to_seconds(timestamp, expected):
+    """Test that timestamps are converted to seconds."""
+    assert timestamp_to_seconds(timestamp) == expected
+
+@pytest.mark.parametrize("timestamp", ["", "1:2:3:4", "aa:bb:cc"])
+def test_timestamp_to_seconds_invalid(timestamp):
+    """Test that malformed timestamps are rejected."""
+    with pytest.raises(ValueError):
+        timestamp_to_seconds(timestamp)
+
+def test_master_frame_resolution():
+    """Test that master frames keep the video's dimensions up to the highest supported resolution."""
+    assert master_frame_resolution(640, 360) == "640x360"
+    assert master_frame_resolution(3840, 2160) == "2560x1440"
+    assert master_frame_resolution() == "2560x1440"
+
+def test_pregeneration_timestamps():
+    """Test that pregenerated frames are a poster frame followed by distinct, evenly spaced whole seconds."""
+    assert pregeneration_timestamps(100.0, 2, 4) == [2, 20, 40, 60, 80]
+    assert pregeneration_timestamps(11.5, 1, 3) == [1, 2, 5, 8]
+    assert pregeneration_timestamps(3.0, 1, 5) == [1, 0, 2]
+    assert pregeneration_timestamps(0.5, 1, 0) == [0]
+    assert pregeneration_timestamps(None, 1, 4) == [1]
@@ -0,0 +1,39 @@
+from app.helpers.webvtt import seconds_to_vtt_timestamp, build_sprite_vtt
+import pytest
+
+@pytest.mark.parametrize("seconds, expected", [
+    (0, "00:00:00.000"),
+    (9.5, "00:00:09.500"),
+    (3665.25, "01:01:05.250"),
+])
+def test_seconds_to_vtt_timestamp(seconds, expected):
+    """Test that durations are formatted as WebVTT timestamps."""
+    assert seconds_to_vtt_timestamp(seconds) == expected
+
+def test_seconds_to_vtt_timestamp_negative():
+    """Test that a negative duration is rejected."""
+    with pytest.raises(ValueError):
+        seconds_to_vtt_timestamp(-1)
+
+def test_build_sprite_vtt():
+    """Test that each tile gets a cue covering its interval and pointing at its position in the sprite."""
+    vtt = build_sprite_vtt("sprite.jpg", 5, 2, 2, 160, 90)
+
+    assert vtt.startswith("WEBVTT\n\n")
+    cues = vtt.strip().split("\n\n")[1:]
+    assert cues == [
+        "00:00:00.000 --> 00:00:05.000\nsprite.jpg#xywh=0,0,160,90",
+        "00:00:05.000 --> 00:00:10.000\nsprite.jpg#xywh=160,0,160,90",
+        "00:00:10.000 --> 00:00:15.000\nsprite.jpg#xywh=0,90,160,90",
+        "00:00:15.000 --> 00:00:20.000\nsprite.jpg#xywh=160,90,160,90",
+    ]
+
+def test_build_sprite_vtt_short_video():
+    """Test that a video shorter than the grid only gets cues for the tiles it fills, ending with the video."""
+    vtt = build_sprite_vtt("sprite.jpg", 5, 2, 2, 160, 90, duration=7.5)
+
+    cues = vtt.strip().split("\n\n")[1:]
+    assert cues == [
+        "00:00:00.000 --> 00:00:05.000\nsprite.jpg#xywh=0,0,160,90",
+        "00:00:05.000 --> 00:00:07.500\nsprite.jpg#xywh=160,0,160,90",
+    ]
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import aiosqlite
+import pytest
+from app.jobs.job_queue import JobQueue, JobStatus
+
+@pytest.fixture
+def job_queue(tmp_path):
+    """
+    A pytest fixture to provide a JobQueue backed by a database in a temporary directory.
+
+    Returns:
+        JobQueue: An empty job queue.
+    """
+    return JobQueue(os.path.join(tmp_path, "data", "jobs.db"), lease_seconds=60)
+
+@pytest.mark.asyncio
+async def test_submit_and_get(job_queue):
+    """Test that a submitted job is persisted as queued with its parameters."""
+    job = await job_queue.submit("thumbnail", {"file_id": "1234"})
+
+    stored = await job_queue.get(job.job_id)
+    assert stored == job
+    assert stored.status == JobStatus.QUEUED
+    assert stored.params == {"file_id": "1234"}
+
+@pytest.mark.asyncio
+async def test_get_missing(job_queue):
+    """Test that looking up an unknown job returns None."""
+    assert await job_queue.get("missing") is None
+
+@pytest.mark.asyncio
+async def test_claim_in_submission_order(job_queue):
+    """Test that jobs are claimed oldest first, once each, and marked as running."""
+    first = await job_queue.submit("thumbnail", {"n": 1})
+    second = await job_queue.submit("thumbnail", {"n": 2})
+
+    claimed = [await job_queue.claim(), await job_queue.claim()]
+
+    assert [job.job_id for job in claimed] == [first.job_id, second.job_id]
+    assert all(job.status == JobStatus.RUNNING and job.attempts == 1 for job in claimed)
+    assert await job_queue.claim() is None, "Running jobs should not be claimed again before their lease expires"
+
+@pytest.mark.asyncio
+async def test_claim_expired_lease(job_queue):
+    """Test that a running job whose lease has expired is claimed again."""
+    job = await job_queue.submit("thumbnail", {})
+    await job_queue.claim()
+
+    job_queue.lease_seconds = -1
+    reclaimed = await job_queue.claim()
+
+    assert reclaimed.job_id == job.job_id
+    assert reclaimed.attempts == 2
+
+@pytest.mark.asyncio
+async def test_complete_and_fail(job_queue):
+    """Test that finished jobs record their result or error and are not claimed again."""
+    await job_queue.submit("thumbnail", {})
+    await job_queue.submit("thumbnail", {})
+    succeeded = await job_queue.claim()
+    failed = await job_queue.claim()
+
+    assert await job_queue.complete(succeeded.job_id, succeeded.claim_token, {"thumbnail_id": "abcd"})
+    assert await job_queue.fail(failed.job_id, failed.claim_token, "Video file not found")
+
+    succeeded = await job_queue.get(succeeded.job_id)
+    assert succeeded.status == JobStatus.SUCCEEDED
+    assert succeeded.result == {"thumbnail_id": "abcd"}
+    failed = await job_queue.get(failed.job_id)
+    assert failed.status == JobStatus.FAILED
+    assert failed.error == "Video file not found"
+
+    job_queue.lease_seconds = -1
+    assert await job_queue.claim() is None
+
+@pytest.mark.asyncio
+async def test_release(job_queue):
+    """Test that a released job is queued again without counting the attempt."""
+    job = await job_queue.submit("thumbnail", {})
+    claimed = await job_queue.claim()
+
+    assert await job_queue.release(job.job_id, claimed.claim_token)
+
+    released = await job_queue.get(job.job_id)
+    assert released.status == JobStatus.QUEUED
+    assert released.attempts == 0
+    assert (await job_queue.claim()).job_id == job.job_id
+
+@pytest.mark.asyncio
+async def test_renew_extends_lease(job_queue):
+    """Test that renewing the lease of a running job keeps it from being claimed again."""
+    await job_queue.submit("thumbnail", {})
+    claimed = await job_queue.claim()
+
+    job_queue.lease_seconds = 0.2
+    await asyncio.sleep(0.3)
+    assert await job_queue.renew(claimed.job_id, claimed.claim_token)
+
+    assert await job_queue.claim() is None, "A renewed lease should not have expired"
+
+@pytest.mark.asyncio
+async def test_stale_claim_cannot_finish(job_queue):
+    """Test that a worker whose lease expired cannot renew, finish or release a job that was claimed again."""
+    await job_queue.submit("thumbnail", {})
+    stale = await job_queue.claim()
+    job_queue.lease_seconds = -1
+    current = await job_queue.claim()
+    assert current.claim_token != stale.claim_token
+
+    assert not await job_queue.renew(stale.job_id, stale.claim_token)
+    assert not await job_queue.complete(stale.job_id, stale.claim_token, {"thumbnail_id": "abcd"})
+    assert not await job_queue.fail(stale.job_id, stale.claim_token, "Too slow")
+    assert not await job_queue.release(stale.job_id, stale.claim_token)
+    assert (await job_queue.get(stale.job_id)).status == JobStatus.RUNNING
+
+    assert await job_queue.complete(current.job_id, current.claim_token, {"thumbnail_id": "abcd"})
+    assert (await job_queue.get(current.job_id)).result == {"thumbnail_id": "abcd"}
+
+@pytest.mark.asyncio
+async def test_migrates_existing_database(tmp_path):
+    """Test that a database created before claim tokens existed gains the column, keeping its jobs."""
+    db_path = os.path.join(tmp_path, "jobs.db")
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            "CREATE TABLE jobs (job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, status TEXT NOT NULL, "
+            "result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, "
+            "updated_at REAL NOT NULL, claimed_at REAL)"
+        )
+        await db.execute("INSERT INTO jobs VALUES ('1234', 'thumbnail', '{}', 'queued', NULL, NULL, 0, 1.0, 1.0, NULL)")
+        await db.commit()
+
+    claimed = await JobQueue(db_path).claim()
+
+    assert claimed.job_id == "1234"
+    assert claimed.claim_token is not None
+
+@pytest.mark.asyncio
+async def test_survives_reopen(job_queue):
+    """Test that queued jobs are still there for a new queue instance on the same database, e.g. after a restart."""
+    job = await job_queue.submit("thumbnail", {"file_id": "1234"})
+
+    reopened = JobQueue(job_queue.db_path)
+
+    assert (await reopened.claim()).job_id == job.job_id
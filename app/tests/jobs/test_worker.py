@@ -0,0 +1,119 @@
+import asyncio
+import os
+import pytest
+from unittest.mock import patch
+from app.helpers.ffmpeg import FFmpegBusyError
+from app.jobs.job_queue import JobQueue, JobStatus
+from app.jobs.worker import WorkerPool, process_next
+
+THUMBNAIL_PARAMS = {"file_id": "1234", "timestamp": "00:00:01", "resolution": "320x240"}
+
+@pytest.fixture
+def job_queue(tmp_path):
+    return JobQueue(os.path.join(tmp_path, "jobs.db"))
+
+@pytest.mark.asyncio
+async def test_process_next_empty(job_queue):
+    """Test that processing an empty queue reports that there was nothing to do."""
+    assert not await process_next(job_queue)
+
+@pytest.mark.asyncio
+@patch('app.api.service.video_service.VideoService.generate_thumbnail')
+async def test_process_next_success(mock_generate_thumbnail, job_queue):
+    """Test that a thumbnail job runs the thumbnail generation and records the thumbnail ID."""
+    mock_generate_thumbnail.return_value = "abcd"
+    job = await job_queue.submit("thumbnail", THUMBNAIL_PARAMS)
+
+    assert await process_next(job_queue)
+
+    mock_generate_thumbnail.assert_awaited_once_with("1234", "00:00:01", "320x240", "exact", "jpeg", None)
+    job = await job_queue.get(job.job_id)
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result == {"thumbnail_id": "abcd"}
+
+@pytest.mark.asyncio
+@patch('app.api.service.video_service.VideoService.generate_thumbnail')
+async def test_process_next_video_not_found(mock_generate_thumbnail, job_queue):
+    """Test that a job for a missing video fails with a reason."""
+    mock_generate_thumbnail.side_effect = FileNotFoundError("Video file not found")
+    job = await job_queue.submit("thumbnail", THUMBNAIL_PARAMS)
+
+    await process_next(job_queue)
+
+    job = await job_queue.get(job.job_id)
+    assert job.status == JobStatus.FAILED
+    assert job.error == "Video file not found"
+
+@pytest.mark.asyncio
+@patch('app.api.service.video_service.VideoService.generate_thumbnail')
+async def test_process_next_busy_requeues(mock_generate_thumbnail, job_queue):
+    """Test that a job finding FFmpeg saturated goes back to the queue."""
+    mock_generate_thumbnail.side_effect = FFmpegBusyError(retry_after=0)
+    job = await job_queue.submit("thumbnail", THUMBNAIL_PARAMS)
+
+    await process_next(job_queue)
+
+    job = await job_queue.get(job.job_id)
+    assert job.status == JobStatus.QUEUED
+    assert job.attempts == 0
+
+@pytest.mark.asyncio
+async def test_process_next_abandoned_too_often(job_queue):
+    """Test that a job claimed more than the maximum number of attempts is failed."""
+    job = await job_queue.submit("thumbnail", THUMBNAIL_PARAMS)
+    job_queue.lease_seconds = -1
+    await job_queue.claim()
+
+    await process_next(job_queue, max_attempts=1)
+
+    assert (await job_queue.get(job.job_id)).status == JobStatus.FAILED
+
+@pytest.mark.asyncio
+@patch('app.api.service.video_service.VideoService.generate_thumbnail')
+async def test_process_next_renews_lease(mock_generate_thumbnail, job_queue):
+    """Test that a job running longer than its lease is not claimed by another worker."""
+    job_queue.lease_seconds = 0.3
+    started = asyncio.Event()
+
+    async def generate_thumbnail(*args):
+        started.set()
+        await asyncio.sleep(0.8)
+        return "abcd"
+
+    mock_generate_thumbnail.side_effect = generate_thumbnail
+    job = await job_queue.submit("thumbnail", THUMBNAIL_PARAMS)
+
+    processing = asyncio.create_task(process_next(job_queue))
+    await started.wait()
+    await asyncio.sleep(0.5)
+    assert await job_queue.claim() is None, "The running job's lease should have been renewed"
+    await processing
+
+    job = await job_queue.get(job.job_id)
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.attempts == 1
+
+@pytest.mark.asyncio
+@patch('app.api.service.video_service.VideoService.generate_thumbnail')
+async def test_worker_pool(mock_generate_thumbnail, job_queue):
+    """Test that a worker pool processes queued jobs and returns interrupted jobs to the queue when stopped."""
+    started = asyncio.Event()
+
+    async def generate_thumbnail(file_id, timestamp, resolution, accuracy, image_format, quality):
+        if file_id == "slow":
+            started.set()
+            await asyncio.sleep(60)
+        return "abcd"
+
+    mock_generate_thumbnail.side_effect = generate_thumbnail
+    done = await job_queue.submit("thumbnail", THUMBNAIL_PARAMS)
+    interrupted = await job_queue.submit("thumbnail", {**THUMBNAIL_PARAMS, "file_id": "slow"})
+
+    pool = WorkerPool(job_queue, size=2, poll_interval=0.01)
+    pool.start()
+    await asyncio.wait_for(started.wait(), 5)
+    while (await job_queue.get(done.job_id)).status != JobStatus.SUCCEEDED:
+        await asyncio.sleep(0.01)
+    await pool.stop()
+
+    assert (await job_queue.get(interrupted.job_id)).status == JobStatus.QUEUED
@@ -0,0 +1,63 @@
+import os
+import shutil
+import pytest
+from app.helpers.ffmpeg import FFmpegExecutor
+from app.metadata.backfill import backfill_video_index
+from app.metadata.video_index import VideoIndex
+from app.storage.local_storage import LocalStorage
+from app.storage.storage_service import StorageService
+
+@pytest.mark.asyncio
+async def test_backfill_video_index(tmp_path):
+    """
+    Test that the backfill records every stored video and skips files that are not supported videos.
+
+    Args:
+        tmp_path (PosixPath): A pytest fixture that provides a temporary directory unique to the test invocation.
+    """
+    # Arrange
+    upload_dir = os.path.join(tmp_path, "uploads")
+    os.makedirs(upload_dir)
+    with open(os.path.join(upload_dir, "video-1.mp4"), "wb") as f:
+        f.write(b"a" * 10)
+    with open(os.path.join(upload_dir, "video-2.MKV"), "wb") as f:
+        f.write(b"b" * 20)
+    with open(os.path.join(upload_dir, "notes.txt"), "wb") as f:
+        f.write(b"c")
+    video_index = VideoIndex(os.path.join(tmp_path, "video_index.db"))
+
+    # Act
+    count = await backfill_video_index(StorageService(LocalStorage()), video_index, upload_dir)
+
+    # Assert
+    assert count == 2, "Only the two supported videos should be recorded"
+    first = await video_index.get("video-1")
+    assert first.storage_key == os.path.join(upload_dir, "video-1.mp4")
+    assert first.size == 10
+    assert first.content_type == "video/mp4"
+    second = await video_index.get("video-2")
+    assert second.extension == "mkv"
+    assert second.size == 20
+    assert await video_index.get("notes") is None
+
+@pytest.mark.asyncio
+async def test_backfill_video_index_probes_videos(tmp_path):
+    """
+    Test that the backfill records the probed metadata of videos when given an executor.
+
+    Args:
+        tmp_path (PosixPath): A pytest fixture that provides a temporary directory unique to the test invocation.
+    """
+    # Arrange
+    upload_dir = os.path.join(tmp_path, "uploads")
+    os.makedirs(upload_dir)
+    shutil.copy(os.path.join("app", "tests", "resources", "test_video.mp4"), os.path.join(upload_dir, "video-1.mp4"))
+    video_index = VideoIndex(os.path.join(tmp_path, "video_index.db"))
+
+    # Act
+    await backfill_video_index(StorageService(LocalStorage()), video_index, upload_dir, FFmpegExecutor(max_processes=1, max_queue=0))
+
+    # Assert
+    record = await video_index.get("video-1")
+    assert record.codec == "h264"
+    assert record.duration == pytest.approx(11.5115)
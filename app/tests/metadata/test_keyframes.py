@@ -0,0 +1,103 @@
+import os
+import pytest
+from array import array
+from app.helpers.ffmpeg import FFmpegExecutor
+from app.metadata.keyframes import KeyframeIndex, build_keyframe_index, parse_keyframes, scan_mp4_header, supports_partial_decoding
+
+VIDEO_PATH = os.path.join("app", "tests", "resources", "test_video.mp4")
+
+async def read_range(start, end):
+    with open(VIDEO_PATH, "rb") as f:
+        f.seek(start)
+        return f.read(end - start)
+
+def test_parse_keyframes():
+    """Test that packets are grouped into GOPs, including B-frames stored after the next keyframe."""
+    output = "\n".join([
+        "pts_time=0.000000|size=100|pos=48|flags=K__",
+        "pts_time=0.080000|size=10|pos=148|flags=___",
+        "pts_time=0.040000|size=10|pos=158|flags=___",
+        "pts_time=0.160000|size=50|pos=168|flags=K__",
+        "pts_time=0.120000|size=10|pos=218|flags=___",
+        "pts_time=N/A|size=10|pos=228|flags=___",
+    ])
+
+    times, starts, ends = parse_keyframes(output)
+
+    assert list(times) == [0.0, 0.16]
+    assert list(starts) == [48, 168]
+    assert list(ends) == [228, 218]
+
+def test_parse_keyframes_start_time():
+    """Test that keyframe times are made relative to the start time of the video, as FFmpeg seeks."""
+    output = "\n".join([
+        "pts_time=0.700000|size=100|pos=48|flags=K__",
+        "pts_time=1.660000|size=10|pos=148|flags=___",
+        "pts_time=1.700000|size=50|pos=158|flags=K__",
+        "start_time=0.700000",
+    ])
+
+    times, starts, ends = parse_keyframes(output)
+
+    assert list(times) == [0.0, 1.0]
+    assert list(ends) == [158, 208]
+
+def test_gop_range():
+    """Test that a timestamp maps to the GOP of the keyframe at or before it."""
+    index = KeyframeIndex(array("d", [0.0, 2.0, 4.0]), array("q", [10, 200, 300]), array("q", [200, 300, 400]), [])
+
+    assert index.gop_range(0.0) == (10, 200)
+    assert index.gop_range(3.9) == (200, 300)
+    assert index.gop_range(100.0) == (300, 400)
+    assert KeyframeIndex(array("d", [1.0]), array("q", [10]), array("q", [20]), []).gop_range(0.5) is None
+
+def test_serialization_round_trip():
+    """Test that an index survives serialization and that invalid data is rejected."""
+    index = KeyframeIndex(array("d", [0.0, 2.5]), array("q", [48, 5000]), array("q", [5000, 9000]), [(0, 32), (32, 48)])
+
+    data = index.to_bytes()
+    restored = KeyframeIndex.from_bytes(data)
+
+    assert len(data) == 12 + 2 * 16 + 2 * 24
+    assert (restored.times, restored.starts, restored.ends) == (index.times, index.starts, index.ends)
+    assert restored.header_ranges == index.header_ranges
+    with pytest.raises(ValueError):
+        KeyframeIndex.from_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        KeyframeIndex.from_bytes(b"XXXX" + data[4:])
+
+@pytest.mark.parametrize("container, expected", [
+    ("mov,mp4,m4a,3gp,3g2,mj2", True),
+    ("matroska,webm", False),
+    (None, False),
+])
+def test_supports_partial_decoding(container, expected):
+    """Test that only MP4 and MOV containers are indexed."""
+    assert supports_partial_decoding(container) == expected
+
+@pytest.mark.asyncio
+async def test_scan_mp4_header():
+    """Test that every top-level box is kept except the media data, of which only the box header is kept."""
+    ranges = await scan_mp4_header(read_range, os.path.getsize(VIDEO_PATH))
+
+    assert ranges == [(0, 32), (32, 4237), (4237, 4245), (4245, 4253)]
+
+@pytest.mark.asyncio
+async def test_scan_mp4_header_invalid():
+    """Test that a file that is not a sequence of boxes is rejected."""
+    async def read_invalid(start, end):
+        return b"\x00\x00\x00\x04free"[:end - start]
+
+    with pytest.raises(ValueError):
+        await scan_mp4_header(read_invalid, 100)
+
+@pytest.mark.asyncio
+async def test_build_keyframe_index():
+    """Test that the index of the test video locates both of its GOPs."""
+    size = os.path.getsize(VIDEO_PATH)
+    index = await build_keyframe_index(VIDEO_PATH, read_range, size, FFmpegExecutor(max_processes=1, max_queue=0))
+
+    assert list(index.times) == pytest.approx([0.0, 10.427083])
+    assert index.gop_range(5) == (4253, 1419000)
+    assert index.gop_range(11)[0] == 1419000
+    assert index.header_ranges[-1] == (4245, 4253)
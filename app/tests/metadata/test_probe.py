@@ -0,0 +1,49 @@
+import os
+import pytest
+from app.helpers.ffmpeg import FFmpegExecutor
+from app.metadata.probe import VideoMetadata, parse_frame_rate, parse_probe_output, probe_video
+
+VIDEO_PATH = os.path.join("app", "tests", "resources", "test_video.mp4")
+
+@pytest.mark.parametrize("rate, expected", [
+    ("24000/1001", 24000 / 1001),
+    ("30/1", 30.0),
+    ("0/0", None),
+    (None, None),
+    ("invalid", None),
+])
+def test_parse_frame_rate(rate, expected):
+    """Test that ffprobe frame rates are converted to frames per second, and unknown rates to None."""
+    assert parse_frame_rate(rate) == expected
+
+def test_parse_probe_output():
+    """Test that the container and first video stream are extracted from ffprobe's JSON output."""
+    output = {
+        "streams": [{"codec_name": "vp9", "width": 1280, "height": 720, "avg_frame_rate": "0/0", "r_frame_rate": "25/1"}],
+        "format": {"format_name": "matroska,webm", "duration": "61.5"}
+    }
+
+    assert parse_probe_output(output) == VideoMetadata(duration=61.5, codec="vp9", width=1280, height=720, frame_rate=25.0, container="matroska,webm")
+
+def test_parse_probe_output_without_video_stream():
+    """Test that a file without a video stream yields empty stream fields."""
+    assert parse_probe_output({"streams": [], "format": {"format_name": "mp3", "duration": "N/A"}}) == VideoMetadata(container="mp3")
+
+@pytest.mark.asyncio
+async def test_probe_video():
+    """Test that probing the test video reports its stream metadata."""
+    metadata = await probe_video(VIDEO_PATH, FFmpegExecutor(max_processes=1, max_queue=0))
+
+    assert metadata.duration == pytest.approx(11.5115)
+    assert metadata.codec == "h264"
+    assert (metadata.width, metadata.height) == (640, 360)
+    assert metadata.frame_rate == pytest.approx(23.976, abs=0.001)
+    assert "mp4" in metadata.container
+
+@pytest.mark.asyncio
+async def test_probe_video_invalid(tmp_path):
+    """Test that probing a file that is not a video returns None."""
+    path = tmp_path / "not_a_video.mp4"
+    path.write_bytes(b"Test content")
+
+    assert await probe_video(str(path), FFmpegExecutor(max_processes=1, max_queue=0)) is None
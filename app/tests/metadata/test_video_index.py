@@ -0,0 +1,153 @@
+import asyncio
+import os
+import aiosqlite
+from unittest.mock import patch
+import pytest
+from app.metadata.video_index import PendingUpload, VideoIndex, VideoRecord
+
+@pytest.fixture
+def video_index(tmp_path):
+    """
+    A pytest fixture to provide a VideoIndex backed by a database in a temporary directory.
+
+    Returns:
+        VideoIndex: An empty video index.
+    """
+    return VideoIndex(os.path.join(tmp_path, "data", "video_index.db"))
+
+def make_record(file_id: str = "1234") -> VideoRecord:
+    return VideoRecord(
+        file_id=file_id,
+        extension="mp4",
+        storage_key=os.path.join("uploads", f"{file_id}.mp4"),
+        size=1024,
+        content_type="video/mp4",
+        uploaded_at=1700000000.0
+    )
+
+@pytest.mark.asyncio
+async def test_add_and_get(video_index):
+    """Test that a recorded video can be looked up by its file_id."""
+    record = make_record()
+
+    await video_index.add(record)
+
+    assert await video_index.get(record.file_id) == record, "The stored record should match the added record"
+
+@pytest.mark.asyncio
+async def test_get_missing(video_index):
+    """Test that looking up an unknown file_id returns None."""
+    assert await video_index.get("missing") is None, "Unknown videos should not be found"
+
+@pytest.mark.asyncio
+async def test_add_replaces_existing(video_index):
+    """Test that adding a record with an existing file_id replaces the previous record."""
+    await video_index.add(make_record())
+    replacement = make_record()
+    replacement.size = 2048
+
+    await video_index.add(replacement)
+
+    assert (await video_index.get(replacement.file_id)).size == 2048, "The record should have been replaced"
+
+@pytest.mark.asyncio
+async def test_remove(video_index):
+    """Test that removing a record makes it unavailable and reports whether anything was removed."""
+    await video_index.add(make_record())
+
+    assert await video_index.remove("1234") is True
+    assert await video_index.get("1234") is None
+    assert await video_index.remove("1234") is False
+
+@pytest.mark.asyncio
+async def test_persistence(video_index):
+    """Test that records survive reopening the index from the same database file."""
+    await video_index.add(make_record())
+
+    reopened = VideoIndex(video_index.db_path)
+
+    assert await reopened.get("1234") == make_record(), "Records should persist in the database file"
+
+@pytest.mark.asyncio
+async def test_add_and_get_metadata(video_index):
+    """Test that probed metadata is stored with the record."""
+    record = make_record()
+    record.duration = 11.5
+    record.codec = "h264"
+    record.width, record.height = 640, 360
+    record.frame_rate = 23.976
+    record.container = "mov,mp4,m4a,3gp,3g2,mj2"
+
+    await video_index.add(record)
+
+    assert await video_index.get(record.file_id) == record
+
+@pytest.mark.asyncio
+async def test_migrates_existing_database(tmp_path):
+    """Test that a database created before metadata columns existed gains them, keeping its records."""
+    db_path = os.path.join(tmp_path, "video_index.db")
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            "CREATE TABLE videos (file_id TEXT PRIMARY KEY, extension TEXT NOT NULL, storage_key TEXT NOT NULL, "
+            "size INTEGER NOT NULL, content_type TEXT, uploaded_at REAL NOT NULL)"
+        )
+        await db.execute("INSERT INTO videos VALUES ('1234', 'mp4', 'uploads/1234.mp4', 1024, 'video/mp4', 1700000000.0)")
+        await db.commit()
+
+    video_index = VideoIndex(db_path)
+
+    assert await video_index.get("1234") == make_record()
+    record = make_record("5678")
+    record.duration = 30.0
+    await video_index.add(record)
+    assert (await video_index.get("5678")).duration == 30.0
+
+@pytest.mark.asyncio
+async def test_concurrent_first_use(video_index):
+    """Test that concurrent first uses of a new database create its schema once."""
+    records = [make_record(str(file_id)) for file_id in range(5)]
+
+    await asyncio.gather(*(video_index.add(record) for record in records))
+
+    assert [await video_index.get(record.file_id) for record in records] == records
+
+@pytest.mark.asyncio
+async def test_pending_uploads(video_index):
+    """Test that initiated direct uploads are recorded until they are removed, separately from videos."""
+    upload = PendingUpload("1234", "clip.mp4", os.path.join("uploads", "1234.mp4"), 2048, "video/mp4", "upload-1", 1700000000.0)
+
+    await video_index.add_pending(upload)
+
+    assert await video_index.get_pending("1234") == upload
+    assert await video_index.get("1234") is None
+    assert await video_index.remove_pending("1234") is True
+    assert await video_index.get_pending("1234") is None
+    assert await video_index.remove_pending("1234") is False
+
+@pytest.mark.asyncio
+async def test_initialize_reuses_one_connection(video_index):
+    """Test that an initialized index serves every operation from one connection until it is closed."""
+    await video_index.initialize()
+    try:
+        with patch("app.metadata.video_index.aiosqlite.connect") as mock_connect:
+            await video_index.add(make_record())
+            assert await video_index.get("1234") == make_record()
+            assert await video_index.remove("1234") is True
+
+        mock_connect.assert_not_called()
+    finally:
+        await video_index.close()
+
+    assert video_index._db is None, "Closing should release the shared connection"
+    assert await video_index.get("1234") is None, "A closed index should fall back to per-operation connections"
+
+@pytest.mark.asyncio
+async def test_add_and_get_thumbnail_formats(video_index):
+    """Test that the stored formats of a thumbnail are recorded once each and looked up by thumbnail_id."""
+    assert await video_index.get_thumbnail_formats("abcd") == []
+
+    await video_index.add_thumbnail_formats("abcd", ["jpeg", "webp"])
+    await video_index.add_thumbnail_formats("abcd", ["jpeg"])
+
+    assert sorted(await video_index.get_thumbnail_formats("abcd")) == ["jpeg", "webp"]
+    assert await video_index.get_thumbnail_formats("efgh") == []
@@ -2,8 +2,22 @@ import os
 import aiofiles.os
 import shutil
 import pytest
+import threading
+import asyncio
+import io
+import subprocess
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
 from fastapi import UploadFile
-from app.api.service.video_service import VideoService
+from PIL import Image
+from app.api.service.video_service import VideoService, TimestampOutOfRangeError
+from app.config import Config, get_config
+from app.helpers.ffmpeg import FFmpegBusyError
+from app.helpers.signing import sign_upload
+from app.metadata.video_index import VideoIndex, VideoRecord
+from app.extraction.pyav_engine import PyAVEngine
 
 # Create a fixture for the UploadFile
 @pytest.fixture
@@ -33,8 +47,129 @@ async def test_upload_video(upload_file):
     expected_file_path = os.path.join(VideoService.UPLOAD_DIR, f"{file_id}.mp4")
     assert await storage_service.file_exists(expected_file_path)
 
+    record = await VideoService.video_index.get(file_id)
+    assert record.storage_key == expected_file_path
+    assert record.extension == "mp4"
+    assert record.size == len(file_data)
+
+    await VideoService.video_index.remove(file_id)
     await storage_service.delete_file(expected_file_path)
 
+@pytest.mark.asyncio
+async def test_upload_video_stream(upload_file):
+    filename, file_data = upload_file
+
+    async def iterate_chunks():
+        for start in range(0, len(file_data), 4):
+            yield file_data[start:start + 4]
+
+    filename, file_id = await VideoService.upload_video(file_name=filename, file_data=iterate_chunks())
+
+    assert filename == "test_video.mp4"
+    assert file_id is not None
+
+    storage_service = VideoService.storage_service
+    expected_file_path = os.path.join(VideoService.UPLOAD_DIR, f"{file_id}.mp4")
+    assert await storage_service.read_file(expected_file_path) == file_data
+    assert (await VideoService.video_index.get(file_id)).size == len(file_data)
+
+    await VideoService.video_index.remove(file_id)
+    await storage_service.delete_file(expected_file_path)
+
+@pytest.mark.asyncio
+async def test_upload_video_probes_metadata():
+    with open(os.path.join("app", "tests", "resources", "test_video.mp4"), "rb") as f:
+        file_data = f.read()
+
+    filename, file_id = await VideoService.upload_video(file_name="test_video.mp4", file_data=file_data, content_type="video/mp4")
+
+    try:
+        record = await VideoService.get_video_metadata(file_id)
+        assert record.duration == pytest.approx(11.5115)
+        assert record.codec == "h264"
+        assert (record.width, record.height) == (640, 360)
+        assert record.frame_rate == pytest.approx(23.976, abs=0.001)
+        assert "mp4" in record.container
+
+        # The keyframe index is left to the first thumbnail request that reads the video from remote storage
+        assert await VideoService._get_keyframe_index(file_id) is None
+    finally:
+        await VideoService.video_index.remove(file_id)
+        await VideoService.storage_service.delete_file(os.path.join(VideoService.UPLOAD_DIR, f"{file_id}.mp4"))
+        await VideoService.storage_service.delete_file(VideoService.keyframe_index_path(file_id))
+
+@pytest.mark.asyncio
+async def test_upload_video_pregenerates_thumbnails():
+    with open(os.path.join("app", "tests", "resources", "test_video.mp4"), "rb") as f:
+        file_data = f.read()
+
+    with patch.object(Config, "PREGENERATE_THUMBNAILS", True), patch.object(Config, "PREGENERATE_FRAME_COUNT", 2):
+        _, file_id = await VideoService.upload_video(file_name="test_video.mp4", file_data=file_data, content_type="video/mp4")
+
+    try:
+        # A poster at 1s and frames at a third and two thirds of the 11.5s video are being pregenerated
+        expected = [VideoService.thumbnail_id_for(file_id, timestamp, "320x240") for timestamp in ("00:00:01", "00:00:03", "00:00:07")]
+        assert {file_name for file_name in VideoService.pregenerations} == {f"{thumbnail_id}.jpg" for thumbnail_id in expected}
+
+        # A matching request made meanwhile waits for the pregeneration instead of running FFmpeg itself
+        with patch("asyncio.create_subprocess_exec", wraps=asyncio.create_subprocess_exec) as mock_exec:
+            assert await VideoService.generate_thumbnail(file_id, "00:00:01", "320x240") == expected[0]
+            assert await VideoService.generate_thumbnail(file_id, "00:00:07", "320x240") == expected[2]
+        assert mock_exec.call_count == 1
+        assert VideoService.pregenerations == {}
+        for thumbnail_id in expected:
+            assert await VideoService.storage_service.file_exists(os.path.join(VideoService.THUMBNAIL_DIR, f"{thumbnail_id}.jpg"))
+    finally:
+        await VideoService.video_index.remove(file_id)
+        await VideoService.storage_service.delete_file(os.path.join(VideoService.UPLOAD_DIR, f"{file_id}.mp4"))
+        await VideoService.storage_service.delete_file(VideoService.keyframe_index_path(file_id))
+        if os.path.isdir(VideoService.THUMBNAIL_DIR):
+            shutil.rmtree(VideoService.THUMBNAIL_DIR)
+
+@pytest.mark.asyncio
+async def test_upload_video_not_probeable(upload_file):
+    filename, file_data = upload_file
+    filename, file_id = await VideoService.upload_video(file_name=filename, file_data=file_data)
+
+    # Files ffprobe cannot read are still recorded, without metadata
+    record = await VideoService.get_video_metadata(file_id)
+    assert record.duration is None
+    assert record.codec is None
+
+    await VideoService.video_index.remove(file_id)
+
+@pytest.mark.asyncio
+async def test_upload_video_ffmpeg_busy(upload_file):
+    filename, file_data = upload_file
+    uploads_before = await VideoService.storage_service.list_files(VideoService.UPLOAD_DIR)
+
+    # A saturated FFmpeg queue fails the upload instead of recording the video without metadata
+    with patch("app.api.service.video_service.probe_video", side_effect=FFmpegBusyError(retry_after=2)):
+        with pytest.raises(FFmpegBusyError):
+            await VideoService.upload_video(file_name=filename, file_data=file_data)
+
+    # The stored copy is deleted, since a retried upload gets a new identifier
+    assert await VideoService.storage_service.list_files(VideoService.UPLOAD_DIR) == uploads_before
+
+@pytest.mark.asyncio
+async def test_write_signed_upload_removes_partial_video():
+    file_id, target = await VideoService.initiate_upload("clip.mp4", 8)
+    upload = await VideoService.video_index.get_pending(file_id)
+    expires = int(time.time()) + 60
+    signature = sign_upload(upload.storage_key, expires, get_config().UPLOAD_SIGNING_KEY)
+
+    async def interrupted_body():
+        yield b"part"
+        raise ConnectionError("Client disconnected")
+
+    try:
+        with pytest.raises(Exception, match="Failed to save video file"):
+            await VideoService.write_signed_upload(upload.storage_key, expires, signature, interrupted_body())
+
+        assert not await VideoService.storage_service.file_exists(upload.storage_key), "The partial video should be removed"
+    finally:
+        await VideoService.video_index.remove_pending(file_id)
+
 @pytest.fixture
 async def video_file():
     video_id = "9abe8652-f7d5-4f9e-8447-6a822a6355bc"
@@ -49,9 +184,15 @@ async def video_file():
     destination = os.path.join(video_path, f"{video_id}.mp4")
     shutil.copy(source, destination)
 
+    # Register the video in the index
+    storage_key = os.path.join(VideoService.UPLOAD_DIR, f"{video_id}.mp4")
+    await VideoService.video_index.add(VideoRecord(video_id, "mp4", storage_key, os.path.getsize(source), "video/mp4", 0.0, duration=11.5115))
+
     yield video_id, video_path
 
     # Cleanup
+    await VideoService.video_index.remove(video_id)
+    VideoService.master_frame_cache.clear()
     try:
         await aiofiles.os.remove(destination)
     except FileNotFoundError:
@@ -68,8 +209,9 @@ async def test_generate_thumbnail(video_file):
         thumbnail_id = await VideoService.generate_thumbnail(video_id, timestamp, resolution)
         thumbnail_path = os.path.join(".", VideoService.THUMBNAIL_DIR, thumbnail_id + '.jpg')
 
-        # Check if thumbnail is generated
+        # Check if thumbnail is generated, and its format recorded
         assert os.path.isfile(thumbnail_path)
+        assert "jpeg" in await VideoService.video_index.get_thumbnail_formats(thumbnail_id)
     finally:
         # Cleanup
         if os.path.isdir(video_path):
@@ -77,8 +219,468 @@ async def test_generate_thumbnail(video_file):
         if os.path.isdir(VideoService.THUMBNAIL_DIR):
             shutil.rmtree(VideoService.THUMBNAIL_DIR)
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("image_format, signature", [
+    ("webp", b"WEBP"),
+    ("avif", b"ftypavif"),
+    ("png", b"PNG"),
+])
+async def test_generate_thumbnail_formats(video_file, image_format, signature):
+    video_id, video_path = video_file
+
+    try:
+        jpeg_id = await VideoService.generate_thumbnail(video_id, "00:00:01", "320x240")
+        thumbnail_id = await VideoService.generate_thumbnail(video_id, "00:00:01", "320x240", image_format=image_format)
+
+        # Formats are stored as variants of the same thumbnail, under their own extension
+        assert thumbnail_id == jpeg_id
+        file_content, file_name = await VideoService.get_thumbnail(thumbnail_id, image_format)
+        assert file_name == VideoService.thumbnail_file_name(thumbnail_id, image_format)
+        assert signature in file_content[:16]
+    finally:
+        if os.path.isdir(video_path):
+            shutil.rmtree(video_path)
+        if os.path.isdir(VideoService.THUMBNAIL_DIR):
+            shutil.rmtree(VideoService.THUMBNAIL_DIR)
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_quality(video_file):
+    video_id, video_path = video_file
+
+    try:
+        low_id = await VideoService.generate_thumbnail(video_id, "00:00:01", "320x240", quality=10)
+        high_id = await VideoService.generate_thumbnail(video_id, "00:00:01", "320x240", quality=95)
+
+        # Each quality is a thumbnail of its own, and a lower quality gives a smaller image
+        assert low_id != high_id
+        low_content, _ = await VideoService.get_thumbnail(low_id)
+        high_content, _ = await VideoService.get_thumbnail(high_id)
+        assert len(low_content) < len(high_content)
+    finally:
+        if os.path.isdir(video_path):
+            shutil.rmtree(video_path)
+        if os.path.isdir(VideoService.THUMBNAIL_DIR):
+            shutil.rmtree(VideoService.THUMBNAIL_DIR)
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_from_master_frame(video_file):
+    video_id, video_path = video_file
+
+    try:
+        with patch("asyncio.create_subprocess_exec", wraps=asyncio.create_subprocess_exec) as mock_exec:
+            small_id = await VideoService.generate_thumbnail(video_id, "00:00:01", "320x240")
+            large_id = await VideoService.generate_thumbnail(video_id, "00:00:01", "1280x720", image_format="webp")
+            other_id = await VideoService.generate_thumbnail(video_id, "00:00:01", "640x480", accuracy="fast")
+
+        # Other resolutions of a decoded timestamp are derived from its master frame, other accuracies are not
+        assert mock_exec.call_count == 2
+        assert len(VideoService.master_frame_cache) == 2
+        assert len({small_id, large_id, other_id}) == 3
+        file_content, _ = await VideoService.get_thumbnail(large_id, "webp")
+        assert Image.open(io.BytesIO(file_content)).size == (1280, 720)
+    finally:
+        if os.path.isdir(video_path):
+            shutil.rmtree(video_path)
+        if os.path.isdir(VideoService.THUMBNAIL_DIR):
+            shutil.rmtree(VideoService.THUMBNAIL_DIR)
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_pyav_engine(video_file):
+    video_id, video_path = video_file
+
+    try:
+        with patch.object(VideoService, "extraction_engine", PyAVEngine(VideoService.ffmpeg_executor)), \
+                patch("asyncio.create_subprocess_exec") as mock_exec:
+            thumbnail_id = await VideoService.generate_thumbnail(video_id, "00:00:01", "320x240", image_format="webp")
+
+        # The in-process engine renders the same thumbnail without starting FFmpeg
+        mock_exec.assert_not_called()
+        file_content, _ = await VideoService.get_thumbnail(thumbnail_id, "webp")
+        assert Image.open(io.BytesIO(file_content)).size == (320, 240)
+    finally:
+        if os.path.isdir(video_path):
+            shutil.rmtree(video_path)
+        if os.path.isdir(VideoService.THUMBNAIL_DIR):
+            shutil.rmtree(VideoService.THUMBNAIL_DIR)
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_is_idempotent(video_file):
+    video_id, video_path = video_file
+
+    try:
+        with patch("asyncio.create_subprocess_exec", wraps=asyncio.create_subprocess_exec) as mock_exec:
+            first_id = await VideoService.generate_thumbnail(video_id, "00:00:01", "320x240")
+            second_id = await VideoService.generate_thumbnail(video_id, "00:00:01", "320x240")
+            other_id = await VideoService.generate_thumbnail(video_id, "00:00:02", "320x240")
+
+        # Identical requests share a thumbnail and only the first one runs FFmpeg
+        assert first_id == second_id
+        assert other_id != first_id
+        assert mock_exec.call_count == 2
+    finally:
+        if os.path.isdir(video_path):
+            shutil.rmtree(video_path)
+        if os.path.isdir(VideoService.THUMBNAIL_DIR):
+            shutil.rmtree(VideoService.THUMBNAIL_DIR)
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_coalesces_concurrent_requests(video_file):
+    video_id, video_path = video_file
+
+    try:
+        with patch("asyncio.create_subprocess_exec", wraps=asyncio.create_subprocess_exec) as mock_exec:
+            thumbnail_ids = await asyncio.gather(*(VideoService.generate_thumbnail(video_id, "00:00:01", "320x240") for _ in range(5)))
+
+        assert len(set(thumbnail_ids)) == 1
+        assert mock_exec.call_count == 1
+    finally:
+        if os.path.isdir(video_path):
+            shutil.rmtree(video_path)
+        if os.path.isdir(VideoService.THUMBNAIL_DIR):
+            shutil.rmtree(VideoService.THUMBNAIL_DIR)
+
+@pytest.mark.asyncio
+async def test_generate_thumbnails(video_file):
+    video_id, video_path = video_file
+
+    try:
+        thumbnails = [("00:00:01", "320x240"), ("00:00:05", "640x480"), ("00:00:01", "320x240"), ("00:00:09", "320x240")]
+        with patch("asyncio.create_subprocess_exec", wraps=asyncio.create_subprocess_exec) as mock_exec:
+            thumbnail_ids = await VideoService.generate_thumbnails(video_id, thumbnails)
+
+        # Every thumbnail is rendered by a single FFmpeg process and returned in request order
+        assert mock_exec.call_count == 1
+        assert thumbnail_ids == [VideoService.thumbnail_id_for(video_id, timestamp, resolution) for timestamp, resolution in thumbnails]
+        for thumbnail_id in set(thumbnail_ids):
+            thumbnail_path = os.path.join(".", VideoService.THUMBNAIL_DIR, thumbnail_id + '.jpg')
+            with open(thumbnail_path, "rb") as f:
+                assert f.read(2) == b"\xff\xd8"
+            assert "jpeg" in await VideoService.video_index.get_thumbnail_formats(thumbnail_id)
+
+        # Thumbnails that already exist are not rendered again
+        with patch("asyncio.create_subprocess_exec", wraps=asyncio.create_subprocess_exec) as mock_exec:
+            assert await VideoService.generate_thumbnail(video_id, "00:00:05", "640x480") == thumbnail_ids[1]
+            assert await VideoService.generate_thumbnails(video_id, thumbnails) == thumbnail_ids
+        assert mock_exec.call_count == 0
+    finally:
+        if os.path.isdir(video_path):
+            shutil.rmtree(video_path)
+        if os.path.isdir(VideoService.THUMBNAIL_DIR):
+            shutil.rmtree(VideoService.THUMBNAIL_DIR)
+
+@pytest.mark.asyncio
+async def test_generate_thumbnails_not_indexed():
+    with pytest.raises(FileNotFoundError):
+        await VideoService.generate_thumbnails("not-indexed", [("00:00:01", "320x240")])
+
+def jpeg_size(content):
+    """Returns the (width, height) of a baseline JPEG image from its SOF0 segment."""
+    start = content.index(b"\xff\xc0")
+    return int.from_bytes(content[start + 7:start + 9], "big"), int.from_bytes(content[start + 5:start + 7], "big")
+
+@pytest.mark.asyncio
+async def test_generate_sprite(video_file):
+    video_id, video_path = video_file
+
+    try:
+        with patch("asyncio.create_subprocess_exec", wraps=asyncio.create_subprocess_exec) as mock_exec:
+            sprite_id = await VideoService.generate_sprite(video_id, interval=2, columns=3, rows=2, tile_width=160, tile_height=90)
+            assert await VideoService.generate_sprite(video_id, interval=2, columns=3, rows=2, tile_width=160, tile_height=90) == sprite_id
+
+        # The sheet is rendered by a single FFmpeg process, once
+        assert mock_exec.call_count == 1
+
+        sprite = await VideoService.get_sprite(f"{sprite_id}.jpg")
+        assert jpeg_size(sprite) == (3 * 160, 2 * 90)
+
+        vtt = (await VideoService.get_sprite(f"{sprite_id}.vtt")).decode()
+        assert vtt.startswith("WEBVTT")
+        assert f"00:00:02.000 --> 00:00:04.000\n{sprite_id}.jpg#xywh=160,0,160,90" in vtt
+        # The last cue ends with the 11.5s video
+        assert vtt.rstrip().endswith(f"00:00:10.000 --> 00:00:11.512\n{sprite_id}.jpg#xywh=320,90,160,90")
+
+        # A grid longer than the video gets no cues for the tiles past its end
+        sprite_id = await VideoService.generate_sprite(video_id, interval=2, columns=4, rows=2, tile_width=160, tile_height=90)
+        vtt = (await VideoService.get_sprite(f"{sprite_id}.vtt")).decode()
+        assert vtt.count(" --> ") == 6
+        assert vtt.rstrip().endswith(f"00:00:10.000 --> 00:00:11.512\n{sprite_id}.jpg#xywh=160,90,160,90")
+    finally:
+        if os.path.isdir(video_path):
+            shutil.rmtree(video_path)
+        if os.path.isdir(VideoService.SPRITE_DIR):
+            shutil.rmtree(VideoService.SPRITE_DIR)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("file_name", ["missing.jpg", "../uploads/video.mp4", "sprite.png"])
+async def test_get_sprite_not_found(file_name):
+    with pytest.raises(FileNotFoundError):
+        await VideoService.get_sprite(file_name)
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_fast_seek(video_file):
+    video_id, video_path = video_file
+
+    try:
+        exact_id = await VideoService.generate_thumbnail(video_id, "00:00:05", "320x240")
+        fast_id = await VideoService.generate_thumbnail(video_id, "00:00:05", "320x240", accuracy="fast")
+
+        # Fast thumbnails are distinct from exact ones, which keep their identifiers
+        assert fast_id != exact_id
+        assert VideoService.thumbnail_id_for(video_id, "00:00:05", "320x240") == exact_id
+
+        # The test video has keyframes at 0s and 10.4s, so a fast seek to 5s yields the first keyframe
+        fast_content, _ = await VideoService.get_thumbnail(fast_id)
+        exact_content, _ = await VideoService.get_thumbnail(exact_id)
+        assert jpeg_size(fast_content) == (320, 240)
+        assert fast_content != exact_content
+    finally:
+        if os.path.isdir(video_path):
+            shutil.rmtree(video_path)
+        if os.path.isdir(VideoService.THUMBNAIL_DIR):
+            shutil.rmtree(VideoService.THUMBNAIL_DIR)
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_out_of_range(video_file):
+    video_id, video_path = video_file
+
+    try:
+        with patch("asyncio.create_subprocess_exec", wraps=asyncio.create_subprocess_exec) as mock_exec:
+            with pytest.raises(TimestampOutOfRangeError):
+                await VideoService.generate_thumbnail(video_id, "00:00:12", "320x240")
+            with pytest.raises(TimestampOutOfRangeError):
+                await VideoService.generate_thumbnails(video_id, [("00:00:01", "320x240"), ("02:46:39", "320x240")])
+
+        # The timestamps are rejected from the recorded duration, without running FFmpeg
+        assert mock_exec.call_count == 0
+    finally:
+        if os.path.isdir(video_path):
+            shutil.rmtree(video_path)
+
+@pytest.mark.asyncio
+async def test_get_video_metadata_not_indexed():
+    with pytest.raises(FileNotFoundError):
+        await VideoService.get_video_metadata("not-indexed")
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_not_indexed():
+    with pytest.raises(FileNotFoundError):
+        await VideoService.generate_thumbnail("not-indexed", "00:00:01", "320x240")
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """
+    A static file handler supporting single HTTP byte ranges, standing in for S3 presigned URLs.
+
+    The start offset of every requested range is recorded on the server so tests can check
+    whether FFmpeg seeked within the video instead of reading it from the beginning.
+    """
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path) or "Range" not in self.headers:
+            return super().send_head()
+
+        size = os.path.getsize(path)
+        start, end = self.headers["Range"].split("=", 1)[1].split("-")
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+        self.server.range_starts.append(start)
+
+        f = open(path, "rb")
+        f.seek(start)
+        self.send_response(206)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        return f
+
+    def copyfile(self, source, outputfile):
+        try:
+            super().copyfile(source, outputfile)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
 @pytest.fixture
-async def thumbnail_file():
+def http_video_server(video_file):
+    video_id, video_path = video_file
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(RangeRequestHandler, directory=video_path))
+    server.range_starts = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield video_id, video_path, server
+
+    server.shutdown()
+    server.server_close()
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_from_http_source(http_video_server):
+    video_id, video_path, server = http_video_server
+    url = f"http://127.0.0.1:{server.server_address[1]}/{video_id}.mp4"
+
+    try:
+        # The test video has a keyframe at 10.43s, so a thumbnail at 11s can skip almost the whole file
+        with patch.object(VideoService.storage_service, "get_seekable_source", return_value=url):
+            thumbnail_id = await VideoService.generate_thumbnail(video_id, "00:00:11", "320x240")
+        thumbnail_path = os.path.join(".", VideoService.THUMBNAIL_DIR, thumbnail_id + '.jpg')
+
+        # FFmpeg should have seeked over HTTP rather than downloading the video from the start
+        assert os.path.isfile(thumbnail_path)
+        assert max(server.range_starts) > 1_000_000
+    finally:
+        if os.path.isdir(video_path):
+            shutil.rmtree(video_path)
+        if os.path.isdir(VideoService.THUMBNAIL_DIR):
+            shutil.rmtree(VideoService.THUMBNAIL_DIR)
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_without_seekable_source(video_file):
+    video_id, video_path = video_file
+
+    try:
+        with patch.object(VideoService.storage_service, "get_seekable_source", return_value=None):
+            thumbnail_id = await VideoService.generate_thumbnail(video_id, "00:00:01", "320x240")
+        thumbnail_path = os.path.join(".", VideoService.THUMBNAIL_DIR, thumbnail_id + '.jpg')
+
+        # The video should be spooled to a temporary file when no seekable source is available
+        assert os.path.isfile(thumbnail_path)
+    finally:
+        if os.path.isdir(video_path):
+            shutil.rmtree(video_path)
+        if os.path.isdir(VideoService.THUMBNAIL_DIR):
+            shutil.rmtree(VideoService.THUMBNAIL_DIR)
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_from_keyframe_index(video_file):
+    video_id, video_path = video_file
+    record = await VideoService.video_index.get(video_id)
+
+    try:
+        thumbnail_id = await VideoService.generate_thumbnail(video_id, "00:00:11", "320x240")
+        thumbnail_path = os.path.join(".", VideoService.THUMBNAIL_DIR, thumbnail_id + '.jpg')
+        with open(thumbnail_path, "rb") as f:
+            expected = f.read()
+        os.remove(thumbnail_path)
+        VideoService.master_frame_cache.clear()
+
+        assert await VideoService._build_keyframe_index(video_id, record.storage_key, record.size) is not None
+        read_range = VideoService.storage_service.read_range
+        with patch.object(VideoService.storage_service, "get_seekable_source", return_value=None), \
+                patch.object(VideoService.storage_service, "open_read_stream") as read_stream, \
+                patch.object(VideoService.storage_service, "read_range", wraps=read_range) as ranges:
+            assert await VideoService.generate_thumbnail(video_id, "00:00:11", "320x240") == thumbnail_id
+
+        # Only the header and the last GOP are fetched, never the whole video, and the frame is the same
+        read_stream.assert_not_called()
+        assert sum(call.args[2] - call.args[1] for call in ranges.call_args_list) < record.size / 5
+        with open(thumbnail_path, "rb") as f:
+            assert f.read() == expected
+    finally:
+        VideoService.keyframe_index_cache.delete(video_id)
+        if os.path.isdir(video_path):
+            shutil.rmtree(video_path)
+        if os.path.isdir(VideoService.THUMBNAIL_DIR):
+            shutil.rmtree(VideoService.THUMBNAIL_DIR)
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_builds_keyframe_index_lazily(video_file):
+    video_id, video_path = video_file
+    record = await VideoService.video_index.get(video_id)
+    record.container = "mov,mp4,m4a,3gp,3g2,mj2"
+    await VideoService.video_index.add(record)
+
+    try:
+        # Videos on local disk are opened in place and never indexed
+        await VideoService.generate_thumbnail(video_id, "00:00:01", "320x240")
+        assert VideoService.keyframe_index_builds == {}
+
+        # The first request reading the video from remote storage reads it whole and starts building the index
+        read_stream = VideoService.storage_service.open_read_stream
+        with patch.object(VideoService.storage_service, "get_seekable_source", return_value=None), \
+                patch.object(VideoService.storage_service, "open_read_stream", wraps=read_stream) as reads:
+            with patch.object(VideoService, "schedule_keyframe_index", wraps=VideoService.schedule_keyframe_index) as schedule:
+                await VideoService.generate_thumbnail(video_id, "00:00:05", "320x240")
+            schedule.assert_called_once()
+            if video_id in VideoService.keyframe_index_builds:
+                await VideoService.keyframe_index_builds[video_id]
+
+            # Later requests fetch a single GOP
+            reads.reset_mock()
+            await VideoService.generate_thumbnail(video_id, "00:00:11", "320x240")
+            reads.assert_not_called()
+        assert list((await VideoService._get_keyframe_index(video_id)).times) == pytest.approx([0.0, 10.427083])
+    finally:
+        VideoService.keyframe_index_cache.delete(video_id)
+        if os.path.isdir(video_path):
+            shutil.rmtree(video_path)
+        if os.path.isdir(VideoService.THUMBNAIL_DIR):
+            shutil.rmtree(VideoService.THUMBNAIL_DIR)
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_from_keyframe_index_with_start_time():
+    video_id = "0f3e7c1a-5b7d-4a51-9a0e-6c2f1d8b9e47"
+    video_path = os.path.join(VideoService.UPLOAD_DIR, f"{video_id}.mp4")
+    os.makedirs(VideoService.UPLOAD_DIR, exist_ok=True)
+    # Keyframes every second, with timestamps starting at 0.7s as in videos cut from a stream
+    subprocess.run([
+        "ffmpeg", "-v", "error", "-y", "-f", "lavfi", "-i", "testsrc=duration=6:size=320x240:rate=25",
+        "-c:v", "libx264", "-g", "25", "-bf", "2", "-output_ts_offset", "0.7", video_path
+    ], check=True)
+    size = os.path.getsize(video_path)
+    await VideoService.video_index.add(VideoRecord(video_id, "mp4", video_path, size, "video/mp4", 0.0, duration=6.0))
+
+    try:
+        index = await VideoService._build_keyframe_index(video_id, video_path, size)
+        assert list(index.times) == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+
+        # Timestamps on keyframes and on the last frame before them
+        timestamps = ["00:00:02", "00:00:01.96", "00:00:04", "00:00:03.96"]
+        expected = []
+        for timestamp in timestamps:
+            content, _ = await VideoService._extract_thumbnail(await VideoService.video_index.get(video_id), timestamp, "320x240", "exact", "jpeg", None)
+            expected.append(content)
+
+        read_range = VideoService.storage_service.read_range
+        with patch.object(VideoService.storage_service, "get_seekable_source", return_value=None), \
+                patch.object(VideoService.storage_service, "open_read_stream") as read_stream, \
+                patch.object(VideoService.storage_service, "read_range", wraps=read_range):
+            for timestamp, content in zip(timestamps, expected):
+                assert (await VideoService._extract_thumbnail(await VideoService.video_index.get(video_id), timestamp, "320x240", "exact", "jpeg", None))[0] == content
+
+        # Every frame was found in the GOP fetched for it, without falling back to the whole video
+        read_stream.assert_not_called()
+    finally:
+        await VideoService.video_index.remove(video_id)
+        VideoService.keyframe_index_cache.delete(video_id)
+        shutil.rmtree(VideoService.UPLOAD_DIR)
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_from_keyframe_index_falls_back_to_whole_video(video_file):
+    video_id, video_path = video_file
+    record = await VideoService.video_index.get(video_id)
+    expected, _ = await VideoService._extract_thumbnail(record, "00:00:11", "320x240", "exact", "jpeg", None)
+
+    try:
+        # An index whose GOPs do not match the video, as built before keyframe times were made relative
+        assert await VideoService._build_keyframe_index(video_id, record.storage_key, record.size) is not None
+        index = await VideoService._get_keyframe_index(video_id)
+        index.times[1] = 20.0
+        VideoService.keyframe_index_cache.set(video_id, index.to_bytes())
+
+        with patch.object(VideoService.storage_service, "get_seekable_source", return_value=None):
+            content, _ = await VideoService._extract_thumbnail(record, "00:00:11", "320x240", "exact", "jpeg", None)
+
+        assert content == expected
+    finally:
+        VideoService.keyframe_index_cache.delete(video_id)
+        await VideoService.storage_service.delete_file(VideoService.keyframe_index_path(video_id))
+
+@pytest.fixture
+async def thumbnail_file(tmp_path):
     try:
         thumbnail_id = "84838f56-d9d7-4f54-881b-6021e34ae0e2"
         thumbnail_path = os.path.join(".", VideoService.THUMBNAIL_DIR)
@@ -92,7 +694,9 @@ async def thumbnail_file():
         destination = os.path.join(thumbnail_path, f"{thumbnail_id}.jpg")
         shutil.copy(source, destination)
 
-        yield thumbnail_id
+        # Start from an empty index, since the copied thumbnail has no recorded formats
+        with patch.object(VideoService, "video_index", VideoIndex(os.path.join(tmp_path, "video_index.db"))):
+            yield thumbnail_id
 
     except Exception as e:
         print(f"An error occurred: {str(e)}")
@@ -106,3 +710,58 @@ async def test_get_thumbnail(thumbnail_file):
     file_content, file_name = await VideoService.get_thumbnail(thumbnail_id)
     assert file_name == f"{thumbnail_id}.jpg", "File name should match the expected value"
     assert file_content, "File content should not be empty"
+
+@pytest.mark.asyncio
+async def test_get_thumbnail_uses_cache(thumbnail_file):
+    thumbnail_id = thumbnail_file
+    VideoService.thumbnail_cache.clear()
+
+    first_content, _ = await VideoService.get_thumbnail(thumbnail_id)
+    with patch.object(VideoService.storage_service, "read_file") as mock_read:
+        second_content, _ = await VideoService.get_thumbnail(thumbnail_id)
+
+    assert second_content == first_content
+    mock_read.assert_not_called()
+    VideoService.thumbnail_cache.clear()
+
+@pytest.mark.asyncio
+async def test_get_thumbnail_location(thumbnail_file):
+    thumbnail_id = thumbnail_file
+    url = f"https://bucket.s3.amazonaws.com/thumbnails/{thumbnail_id}.jpg"
+
+    # Local thumbnails are located by file path, remote ones by URL only when allowed
+    location = await VideoService.get_thumbnail_location(thumbnail_id)
+    assert location == os.path.abspath(os.path.join(VideoService.THUMBNAIL_DIR, f"{thumbnail_id}.jpg"))
+    assert await VideoService.get_thumbnail_location("nonexistent") is None
+    with patch.object(VideoService.storage_service, "get_seekable_source", return_value=url):
+        assert await VideoService.get_thumbnail_location(thumbnail_id) is None
+        assert await VideoService.get_thumbnail_location(thumbnail_id, allow_url=True) == url
+
+@pytest.mark.asyncio
+async def test_find_thumbnail_format(thumbnail_file):
+    thumbnail_id = thumbnail_file
+    webp_path = os.path.join(VideoService.THUMBNAIL_DIR, f"{thumbnail_id}.webp")
+    shutil.copy(os.path.join(VideoService.THUMBNAIL_DIR, f"{thumbnail_id}.jpg"), webp_path)
+
+    # The client's preference wins, ties go to the smaller format, and a stored variant is served regardless
+    assert await VideoService.find_thumbnail_format(thumbnail_id) == "webp"
+    assert await VideoService.find_thumbnail_format(thumbnail_id, "image/jpeg, image/webp;q=0.5") == "jpeg"
+    assert await VideoService.find_thumbnail_format(thumbnail_id, "image/avif, image/*;q=0.8") == "webp"
+    assert await VideoService.find_thumbnail_format(thumbnail_id, "application/json") == "webp"
+    with pytest.raises(FileNotFoundError):
+        await VideoService.find_thumbnail_format("nonexistent")
+
+@pytest.mark.asyncio
+async def test_find_thumbnail_format_uses_recorded_formats(thumbnail_file):
+    thumbnail_id = thumbnail_file
+
+    # Thumbnails without recorded formats are probed once, and the formats found are recorded
+    assert await VideoService.find_thumbnail_format(thumbnail_id) == "jpeg"
+    assert await VideoService.video_index.get_thumbnail_formats(thumbnail_id) == ["jpeg"]
+
+    await VideoService.video_index.add_thumbnail_formats(thumbnail_id, ["webp"])
+    with patch.object(VideoService.storage_service, "file_exists") as mock_exists:
+        assert await VideoService.find_thumbnail_format(thumbnail_id) == "webp"
+        assert await VideoService.find_thumbnail_format(thumbnail_id, "image/jpeg") == "jpeg"
+
+    mock_exists.assert_not_called()
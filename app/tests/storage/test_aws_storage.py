@@ -0,0 +1,74 @@
+import math
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.storage.aws_storage import AWSStorage
+
+@pytest.fixture
+def aws_environment(monkeypatch):
+    """
+    A pytest fixture that provides dummy AWS settings, so clients can be created without real credentials.
+    """
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+@pytest.mark.asyncio
+async def test_open_shares_client(aws_environment):
+    """
+    Test that opening the storage creates one shared client that is reused until the storage is closed.
+    """
+    storage = AWSStorage()
+
+    await storage.open()
+    client = await storage._get_client()
+    await storage.open()
+
+    assert await storage._get_client() is client, "Opening an open storage should keep the existing client"
+
+    await storage.close()
+    assert storage._client is None, "Closing the storage should release the client"
+
+@pytest.mark.asyncio
+async def test_get_client_opens_lazily(aws_environment):
+    """
+    Test that the shared client is opened on first use when the storage was not opened explicitly.
+    """
+    storage = AWSStorage()
+
+    client = await storage._get_client()
+
+    assert client is not None
+    assert client.meta.config.max_pool_connections > 1, "The shared client should use a connection pool"
+    await storage.close()
+
+@pytest.mark.asyncio
+async def test_create_upload_target_single_put(aws_environment):
+    """
+    Test that files up to the single PUT limit get one presigned PUT URL, signed for their content type.
+    """
+    storage = AWSStorage()
+
+    target = await storage.create_upload_target("uploads/a.mp4", storage.PRESIGNED_PUT_MAX_SIZE, "video/mp4", 600)
+
+    assert "uploads/a.mp4" in target.url and "Signature=" in target.url
+    assert target.upload_id is None and target.part_urls == []
+    await storage.close()
+
+@pytest.mark.asyncio
+async def test_create_upload_target_multipart(aws_environment):
+    """
+    Test that larger files get a multipart upload with one presigned URL per part.
+    """
+    storage = AWSStorage()
+    client = await storage._get_client()
+    size = storage.PRESIGNED_PUT_MAX_SIZE + 1
+
+    with patch.object(client, "create_multipart_upload", AsyncMock(return_value={"UploadId": "upload-1"})):
+        target = await storage.create_upload_target("uploads/a.mp4", size, None, 600)
+
+    assert target.url is None
+    assert target.upload_id == "upload-1"
+    assert target.part_size == storage.MULTIPART_PART_SIZE
+    assert len(target.part_urls) == math.ceil(size / storage.MULTIPART_PART_SIZE)
+    assert "partNumber=2" in target.part_urls[1] and "uploadId=upload-1" in target.part_urls[1]
+    await storage.close()
@@ -0,0 +1,222 @@
+import asyncio
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.config import Config
+from app.storage.aws_storage import AWSStorage
+from app.storage.cached_storage import CachedStorage
+from app.storage.local_storage import LocalStorage
+from app.storage.storage_factory import get_storage_service
+
+@pytest.fixture
+def remote(tmp_path, monkeypatch):
+    """
+    Provides a LocalStorage rooted in a temporary directory, standing in for remote storage, whose stream reads
+    are counted.
+
+    Args:
+        tmp_path (PosixPath): A pytest fixture that provides a temporary directory unique to the test invocation.
+        monkeypatch (MonkeyPatch): A pytest fixture for changing the working directory.
+    """
+    remote_dir = tmp_path / "remote"
+    remote_dir.mkdir()
+    monkeypatch.chdir(remote_dir)
+    provider = LocalStorage()
+    provider.open_read_stream = MagicMock(wraps=LocalStorage.open_read_stream)
+    return provider
+
+async def iter_chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+@pytest.mark.asyncio
+async def test_write_file_is_written_through(remote, tmp_path):
+    """
+    Test that a written file is stored by the provider and then served from the cache without reading the provider.
+    """
+    # Arrange
+    cache = CachedStorage(remote, str(tmp_path / "cache"), 1024)
+
+    # Act
+    result = await cache.write_file("thumbnails/a.jpg", b"thumbnail")
+    content = await cache.read_file("thumbnails/a.jpg")
+    source = await cache.get_seekable_source("thumbnails/a.jpg")
+
+    # Assert
+    assert result is True
+    assert await LocalStorage.read_file("thumbnails/a.jpg") == b"thumbnail"
+    assert content == b"thumbnail"
+    assert source == str(tmp_path / "cache" / "thumbnails" / "a.jpg")
+    assert await cache.file_size("thumbnails/a.jpg") == 9
+    remote.open_read_stream.assert_not_called()
+    assert cache.hits == 3 and cache.misses == 0
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_download_once(remote, tmp_path):
+    """
+    Test that concurrent reads of a file that is not cached share a single download, and later reads hit the cache.
+    """
+    # Arrange
+    await LocalStorage.write_file("uploads/video.mp4", b"video" * 100)
+    cache = CachedStorage(remote, str(tmp_path / "cache"), 1024)
+
+    # Act
+    contents = await asyncio.gather(*(cache.read_file("uploads/video.mp4") for _ in range(5)))
+    chunks = [chunk async for chunk in cache.open_read_stream("uploads/video.mp4", 128)]
+
+    # Assert
+    assert contents == [b"video" * 100] * 5
+    assert b"".join(chunks) == b"video" * 100
+    remote.open_read_stream.assert_called_once()
+    assert cache.misses == 5 and cache.hits == 1
+    assert cache.current_bytes == 500
+
+@pytest.mark.asyncio
+async def test_least_recently_used_files_are_evicted(remote, tmp_path):
+    """
+    Test that adding a file beyond the byte budget evicts the least recently used files first.
+    """
+    # Arrange
+    cache = CachedStorage(remote, str(tmp_path / "cache"), 10)
+    await cache.write_file("t/a", b"aaaa")
+    await cache.write_file("t/b", b"bbbb")
+    await cache.read_file("t/a")
+
+    # Act
+    await cache.write_file("t/c", b"cccc")
+
+    # Assert
+    assert list(cache._entries) == ["t/a", "t/c"]
+    assert cache.current_bytes == 8
+    assert not os.path.exists(tmp_path / "cache" / "t/b")
+    assert await cache.read_file("t/b") == b"bbbb", "Evicted files are read from the provider again"
+
+@pytest.mark.asyncio
+async def test_seekable_sources_are_not_evicted_while_in_use(remote, tmp_path):
+    """
+    Test that a cached file handed out as a seekable source survives eviction until it is released, while reads
+    of it run concurrently with writes that push the cache over its budget.
+    """
+    # Arrange
+    cache = CachedStorage(remote, str(tmp_path / "cache"), 10)
+    await cache.write_file("t/a", b"aaaa")
+    await cache.write_file("t/b", b"bbbb")
+    source = await cache.get_seekable_source("t/a")
+
+    async def read_source() -> bytes:
+        # Stands in for FFmpeg or a file response opening the source after other requests ran
+        await asyncio.sleep(0.01)
+        with open(source, "rb") as f:
+            return f.read()
+
+    async def write_files() -> None:
+        await cache.write_file("t/c", b"cccc")
+        await cache.write_file("t/d", b"dddd")
+
+    # Act
+    content, _ = await asyncio.gather(read_source(), write_files())
+
+    # Assert
+    assert content == b"aaaa"
+    assert list(cache._entries) == ["t/a", "t/d"], "The least recently used file that is not pinned is evicted"
+
+    # Once released, the file is evicted as usual
+    await cache.release_seekable_source("t/a", source)
+    await cache.write_file("t/e", b"eeee")
+    assert list(cache._entries) == ["t/d", "t/e"]
+    assert not os.path.exists(source)
+
+@pytest.mark.asyncio
+async def test_files_larger_than_the_budget_are_not_cached(remote, tmp_path):
+    """
+    Test that files larger than the whole byte budget are passed through without being cached.
+    """
+    # Arrange
+    cache = CachedStorage(remote, str(tmp_path / "cache"), 4)
+
+    # Act
+    written = await cache.write_stream("uploads/large.mp4", iter_chunks(b"abc", b"def"))
+    content = await cache.read_file("uploads/large.mp4")
+
+    # Assert
+    assert written is True
+    assert content == b"abcdef"
+    assert cache.current_bytes == 0
+    assert os.listdir(tmp_path / "cache" / "uploads") == []
+
+@pytest.mark.asyncio
+async def test_write_stream_is_written_through(remote, tmp_path):
+    """
+    Test that a file written from chunks is cached as the chunks pass to the provider.
+    """
+    # Arrange
+    cache = CachedStorage(remote, str(tmp_path / "cache"), 1024)
+
+    # Act
+    written = await cache.write_stream("uploads/video.mp4", iter_chunks(b"abc", b"def"))
+
+    # Assert
+    assert written is True
+    assert await LocalStorage.read_file("uploads/video.mp4") == b"abcdef"
+    assert await cache.read_range("uploads/video.mp4", 2, 5) == b"cde"
+    remote.open_read_stream.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_delete_invalidates_cached_copies(remote, tmp_path):
+    """
+    Test that deleting a file or a directory removes the cached copies along with the provider's files.
+    """
+    # Arrange
+    cache = CachedStorage(remote, str(tmp_path / "cache"), 1024)
+    await cache.write_file("thumbnails/a.jpg", b"a")
+    await cache.write_file("sprites/b.jpg", b"b")
+
+    # Act
+    deleted = await cache.delete_file("thumbnails/a.jpg")
+    await cache.delete_directory("sprites")
+
+    # Assert
+    assert deleted is True
+    assert cache.current_bytes == 0
+    assert not await cache.file_exists("thumbnails/a.jpg")
+    assert not os.path.exists(tmp_path / "cache" / "thumbnails" / "a.jpg")
+    assert not os.path.exists(tmp_path / "cache" / "sprites" / "b.jpg")
+
+@pytest.mark.asyncio
+async def test_open_reuses_the_cache_directory(remote, tmp_path):
+    """
+    Test that opening the cache indexes the files a previous run left in the cache directory and discards
+    unfinished ones.
+    """
+    # Arrange
+    cache_dir = tmp_path / "cache"
+    (cache_dir / "thumbnails").mkdir(parents=True)
+    (cache_dir / "thumbnails" / "a.jpg").write_bytes(b"cached")
+    (cache_dir / "thumbnails" / "b.jpg.0123.part").write_bytes(b"partial")
+    cache = CachedStorage(remote, str(cache_dir), 1024)
+
+    # Act
+    await cache.open()
+
+    # Assert
+    assert await cache.read_file("thumbnails/a.jpg") == b"cached"
+    assert cache.current_bytes == 6
+    assert os.listdir(cache_dir / "thumbnails") == ["a.jpg"]
+
+def test_get_storage_service_wraps_remote_storage_in_cache(tmp_path):
+    """
+    Test that get_storage_service wraps AWSStorage in a CachedStorage when a cache budget is configured.
+    """
+    # Arrange
+    os.environ["STORAGE_TYPE"] = "aws"
+
+    # Act
+    with patch.object(Config, "STORAGE_CACHE_MAX_BYTES", 1024), patch.object(Config, "STORAGE_CACHE_DIR", str(tmp_path)):
+        storage_service = get_storage_service()
+    del os.environ["STORAGE_TYPE"]
+
+    # Assert
+    assert isinstance(storage_service.storage_provider, CachedStorage)
+    assert isinstance(storage_service.storage_provider.provider, AWSStorage)
+    assert storage_service.storage_provider.max_bytes == 1024
@@ -55,6 +55,43 @@ async def test_read_file(tmp_path):
     assert read_content == file_content
     assert await LocalStorage.file_exists(file_location)
 
+@pytest.mark.asyncio
+async def test_read_range(tmp_path):
+    """
+    Test the read_range method to ensure it returns only the requested bytes, truncated at the end of the file.
+
+    Args:
+        tmp_path (PosixPath): A pytest fixture that provides a temporary directory unique to the test invocation.
+    """
+    # Arrange
+    file_location = os.path.join(tmp_path, "test_file.txt")
+    async with aiofiles.open(file_location, "wb") as f:
+        await f.write(b"Hello, World!")
+
+    # Act / Assert
+    assert await LocalStorage.read_range(file_location, 7, 12) == b"World"
+    assert await LocalStorage.read_range(file_location, 7, 100) == b"World!"
+    assert await LocalStorage.read_range(file_location, 5, 5) == b""
+
+@pytest.mark.asyncio
+async def test_open_read_stream(tmp_path):
+    """
+    Test the open_read_stream method to ensure it yields the file content in chunks of at most the chunk size.
+
+    Args:
+        tmp_path (PosixPath): A pytest fixture that provides a temporary directory unique to the test invocation.
+    """
+    # Arrange
+    file_location = os.path.join(tmp_path, "test_file.txt")
+    async with aiofiles.open(file_location, "wb") as f:
+        await f.write(b"Hello, World!")
+
+    # Act
+    chunks = [chunk async for chunk in LocalStorage.open_read_stream(file_location, chunk_size=5)]
+
+    # Assert
+    assert chunks == [b"Hello", b", Wor", b"ld!"]
+
 @pytest.mark.asyncio
 async def test_delete_file(tmp_path):
     """
@@ -145,3 +182,74 @@ async def test_delete_directory(tmp_path):
     assert result is True
     assert not os.path.exists(directory_location)
     assert not await LocalStorage.directory_exists(directory_location)
+
+@pytest.mark.asyncio
+async def test_write_stream(tmp_path):
+    """
+    Test the write_stream method to ensure it writes every chunk to a file in order.
+
+    This test checks if the file is created, including any missing parent directories, and that its content is
+    the concatenation of the chunks yielded by the iterator.
+
+    Args:
+        tmp_path (PosixPath): A pytest fixture that provides a temporary directory unique to the test invocation.
+    """
+    # Arrange
+    chunks = [b"Hello", b", ", b"World!"]
+    file_location = os.path.join(tmp_path, "nested", "test_file.txt")
+
+    async def iterate_chunks():
+        for chunk in chunks:
+            yield chunk
+
+    # Act
+    result = await LocalStorage.write_stream(file_location, iterate_chunks())
+
+    # Assert
+    assert result is True
+    async with aiofiles.open(file_location, "rb") as f:
+        saved_content = await f.read()
+    assert saved_content == b"Hello, World!"
+
+@pytest.mark.asyncio
+async def test_get_seekable_source(tmp_path):
+    """
+    Test the get_seekable_source method to ensure it returns an absolute path for existing files only.
+
+    Args:
+        tmp_path (PosixPath): A pytest fixture that provides a temporary directory unique to the test invocation.
+    """
+    # Arrange
+    existing_file = os.path.join(tmp_path, "existing_file.mp4")
+    non_existing_file = os.path.join(tmp_path, "non_existing_file.mp4")
+    async with aiofiles.open(existing_file, "wb") as f:
+        await f.write(b"Hello, World!")
+
+    # Act / Assert
+    assert await LocalStorage.get_seekable_source(existing_file) == os.path.abspath(existing_file)
+    assert await LocalStorage.get_seekable_source(non_existing_file) is None
+
+@pytest.mark.asyncio
+async def test_list_files(tmp_path):
+    """
+    Test the list_files method to ensure it lists nested files with their sizes.
+
+    Args:
+        tmp_path (PosixPath): A pytest fixture that provides a temporary directory unique to the test invocation.
+    """
+    # Arrange
+    directory = os.path.join(tmp_path, "directory")
+    os.makedirs(os.path.join(directory, "nested"))
+    top_file = os.path.join(directory, "top.txt")
+    nested_file = os.path.join(directory, "nested", "nested.txt")
+    async with aiofiles.open(top_file, "wb") as f:
+        await f.write(b"Hello")
+    async with aiofiles.open(nested_file, "wb") as f:
+        await f.write(b"Hello, World!")
+
+    # Act
+    files = await LocalStorage.list_files(directory)
+
+    # Assert
+    assert files == {top_file: 5, nested_file: 13}
+    assert await LocalStorage.list_files(os.path.join(tmp_path, "missing")) == {}
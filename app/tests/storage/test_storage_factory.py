@@ -1,8 +1,10 @@
 import os
 import pytest
+from app.storage.aws_storage import AWSStorage
 from app.storage.local_storage import LocalStorage
+from app.storage.storage_provider import StorageProvider
 from app.storage.storage_service import StorageService
-from app.storage.storage_factory import get_storage_service
+from app.storage.storage_factory import STORAGE_PROVIDERS, get_storage_service
 
 def test_get_storage_service_local():
     """
@@ -45,3 +47,27 @@ def test_get_storage_service_default():
     # Assert
     assert isinstance(storage_service, StorageService), "The returned object should be an instance of StorageService"
     assert isinstance(storage_service.storage_provider, LocalStorage), "The storage provider should be an instance of LocalStorage"
+
+def test_get_storage_service_aws():
+    """
+    Test if the get_storage_service function returns a StorageService instance configured with AWSStorage when
+    the STORAGE_TYPE environment variable is set to "aws", in any case.
+    """
+    # Arrange
+    os.environ["STORAGE_TYPE"] = "AWS"
+
+    # Act
+    storage_service = get_storage_service()
+    del os.environ["STORAGE_TYPE"]
+
+    # Assert
+    assert isinstance(storage_service.storage_provider, AWSStorage), "The storage provider should be an instance of AWSStorage"
+
+def test_storage_providers_registry():
+    """
+    Test if every registered storage provider implements the StorageProvider interface.
+    """
+    # Assert
+    assert set(STORAGE_PROVIDERS) == {"local", "aws"}, "Every storage type should be registered"
+    for provider_class in STORAGE_PROVIDERS.values():
+        assert issubclass(provider_class, StorageProvider), "Registered providers should implement StorageProvider"
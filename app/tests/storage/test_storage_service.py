@@ -1,5 +1,6 @@
 import pytest
 import os
+from app.helpers.metrics import REGISTRY
 from app.storage.local_storage import LocalStorage
 from app.storage.storage_service import StorageService
 
@@ -35,6 +36,24 @@ async def test_write_file(storage_service, tmp_path):
     assert file_path.read_bytes() == content, "Content of the file should match the written content"
     assert await storage_service.file_exists(file_path), "File should exist after writing"
 
+@pytest.mark.asyncio
+async def test_write_file_failure(storage_service, tmp_path):
+    """
+    Test to ensure that a write the storage provider reports as failed is reported as failed by the StorageService.
+
+    Args:
+        storage_service (StorageService): An instance of StorageService for file operations.
+        tmp_path (PosixPath): A pytest fixture that provides a temporary directory unique to the test invocation.
+    """
+    # Act
+    # The path is an existing directory, so LocalStorage cannot open it for writing
+    result = await storage_service.write_file(tmp_path, b"Hello, World!")
+
+    # Assert
+    assert result is False, "Writing file should fail"
+    assert 'storage_operation_duration_seconds_count{provider="LocalStorage",operation="write_file",outcome="error"}' in REGISTRY.render(), \
+        "The failed write should be recorded as an error"
+
 @pytest.mark.asyncio
 async def test_read_file(storage_service, tmp_path):
     """
@@ -55,6 +74,29 @@ async def test_read_file(storage_service, tmp_path):
     # Assert
     assert read_content == content, "Read content should match the original content"
 
+@pytest.mark.asyncio
+async def test_read_range_and_stream(storage_service, tmp_path):
+    """
+    Test to ensure that byte ranges and chunked streams are read correctly using the StorageService with LocalStorage.
+
+    Args:
+        storage_service (StorageService): An instance of StorageService for file operations.
+        tmp_path (PosixPath): A pytest fixture that provides a temporary directory unique to the test invocation.
+    """
+    # Arrange
+    file_path = tmp_path / "test_file.txt"
+    content = b"Hello, World!"
+    file_path.write_bytes(content)
+
+    # Act
+    read_range = await storage_service.read_range(file_path, 0, 5)
+    chunks = [chunk async for chunk in storage_service.open_read_stream(file_path, chunk_size=4)]
+
+    # Assert
+    assert read_range == b"Hello", "Range should contain only the requested bytes"
+    assert b"".join(chunks) == content, "Stream should yield the whole content in order"
+    assert max(len(chunk) for chunk in chunks) <= 4, "Chunks should not exceed the chunk size"
+
 @pytest.mark.asyncio
 async def test_delete_file(storage_service, tmp_path):
     """
@@ -133,3 +175,26 @@ async def test_delete_directory(storage_service, tmp_path):
     # Assert
     assert result is True, "Directory deletion should be successful"
     assert not directory_path.exists(), "Directory should not exist after deletion"
+
+@pytest.mark.asyncio
+async def test_write_stream(storage_service, tmp_path):
+    """
+    Test to ensure that a file is written correctly from chunks using the StorageService with LocalStorage.
+    
+    Args:
+        storage_service (StorageService): An instance of StorageService for file operations.
+        tmp_path (PosixPath): A pytest fixture that provides a temporary directory unique to the test invocation.
+    """
+    # Arrange
+    file_path = tmp_path / "test_file.txt"
+
+    async def iterate_chunks():
+        yield b"Hello, "
+        yield b"World!"
+
+    # Act
+    result = await storage_service.write_stream(str(file_path), iterate_chunks())
+
+    # Assert
+    assert result is True, "Writing file should be successful"
+    assert file_path.read_bytes() == b"Hello, World!", "Content of the file should match the written chunks"
@@ -0,0 +1,26 @@
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+from app.api.service.video_service import VideoService
+from app.factory import create_app
+
+def test_lifespan_opens_and_closes_storage():
+    """
+    Test that the application lifespan opens the shared storage on startup and closes it on shutdown.
+    """
+    with patch.object(VideoService.storage_service, "open", new=AsyncMock()) as mock_open, \
+            patch.object(VideoService.storage_service, "close", new=AsyncMock()) as mock_close:
+        with TestClient(create_app()):
+            mock_open.assert_awaited_once()
+            mock_close.assert_not_awaited()
+        mock_close.assert_awaited_once()
+
+def test_lifespan_opens_and_closes_video_index():
+    """
+    Test that the application lifespan opens the shared video index connection on startup and closes it on shutdown.
+    """
+    with patch.object(VideoService.video_index, "initialize", new=AsyncMock()) as mock_initialize, \
+            patch.object(VideoService.video_index, "close", new=AsyncMock()) as mock_close:
+        with TestClient(create_app()):
+            mock_initialize.assert_awaited_once()
+            mock_close.assert_not_awaited()
+        mock_close.assert_awaited_once()
@@ -0,0 +1,52 @@
+import os
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from app.config import get_config
+from app.factory import create_app
+
+client = TestClient(create_app())
+
+def test_server_timing_header():
+    """
+    Test that responses report the phases recorded while serving them and the total time.
+    """
+    response = client.get("/video/v1/get-thumbnail/nonexistent")
+
+    assert response.status_code == 404
+    phases = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+    assert "storage-file_exists" in phases
+    assert phases[-1] == "total"
+
+def test_server_timing_disabled():
+    """
+    Test that the Server-Timing header can be turned off.
+    """
+    with patch.object(get_config(), "SERVER_TIMING", False):
+        response = client.get("/video/v1/get-thumbnail/nonexistent")
+
+    assert "server-timing" not in response.headers
+
+def test_profile_by_header(tmp_path):
+    """
+    Test that a request sent with X-Profile is profiled when enabled, and its profile written to the profile directory.
+    """
+    with patch.object(get_config(), "PROFILE_DIR", str(tmp_path)):
+        response = client.get("/video/v1/ffmpeg-stats", headers={"X-Profile": "1"})
+        assert not os.listdir(tmp_path), "Profiling by header should be off by default"
+
+        with patch.object(get_config(), "PROFILE_HEADER_ENABLED", True):
+            response = client.get("/video/v1/ffmpeg-stats", headers={"X-Profile": "1"})
+
+    profiles = os.listdir(tmp_path)
+    assert len(profiles) == 1 and profiles[0].endswith(".pstats")
+    assert f'profile;desc="{profiles[0]}"' in response.headers["server-timing"]
+
+def test_profile_sampling(tmp_path):
+    """
+    Test that requests are profiled at the configured sample rate.
+    """
+    with patch.object(get_config(), "PROFILE_DIR", str(tmp_path)), patch.object(get_config(), "PROFILE_SAMPLE_RATE", 1.0):
+        client.get("/video/v1/ffmpeg-stats")
+        client.get("/video/v1/ffmpeg-stats")
+
+    assert len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,6 @@
+"""
+Benchmarks for the video thumbnail generator backend.
+
+Each module can be run with `python -m benchmarks.<module>` from the repository root. Benchmarks that
+exercise AWSStorage run against a local moto S3 server, see `benchmarks.s3_server`.
+"""
@@ -0,0 +1,116 @@
+"""
+engines.py
+
+Compares the throughput and latency of the thumbnail extraction engines: the subprocess engine, which runs an
+FFmpeg process per thumbnail, and the PyAV engine, which decodes in-process. Both extract the same random
+timestamps of a short synthetic video, with the given number of extractions in flight, through an executor
+with as many slots as there are cores.
+
+Usage:
+    python -m benchmarks.engines [--duration 10] [--gop 30] [--size 640x360] [--samples 200] [--concurrency 8]
+        [--format jpeg] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from app.extraction.extraction_engine import ExtractionEngine
+from app.extraction.pyav_engine import PyAVEngine
+from app.extraction.subprocess_engine import SubprocessEngine
+from app.helpers.ffmpeg import FFmpegExecutor
+from app.helpers.video import seconds_to_timestamp
+from benchmarks.seek import generate_video
+from benchmarks.stats import summarize
+
+
+async def measure(engine: ExtractionEngine, path: str, timestamps: List[int], concurrency: int, image_format: str) -> Tuple[List[float], float]:
+    """
+    Extracts a thumbnail at each timestamp, keeping a fixed number of extractions in flight.
+
+    Args:
+        engine (ExtractionEngine): The engine to benchmark.
+        path (str): The path of the video.
+        timestamps (List[int]): The timestamps in seconds.
+        concurrency (int): The number of extractions in flight.
+        image_format (str): The image format of the thumbnails.
+
+    Returns:
+        Tuple[List[float], float]: The latency of each extraction and the total elapsed time, in seconds.
+    """
+    pending = list(timestamps)
+    samples = []
+
+    async def worker() -> None:
+        while pending:
+            timestamp = pending.pop()
+            start = time.perf_counter()
+            await engine.extract(path, seconds_to_timestamp(timestamp), "320x240", image_format=image_format)
+            samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - start
+
+
+async def run(duration: int, gop: int, size: str, samples: int, concurrency: int, image_format: str) -> Dict[str, Dict[str, float]]:
+    """
+    Benchmarks every engine on the same random timestamps of a synthetic video.
+
+    Args:
+        duration (int): The length of the synthetic video in seconds.
+        gop (int): The number of frames between keyframes.
+        size (str): The frame size of the synthetic video.
+        samples (int): The number of thumbnails extracted per engine.
+        concurrency (int): The number of extractions in flight.
+        image_format (str): The image format of the thumbnails.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Latency summaries and throughput in thumbnails per second, keyed by engine.
+    """
+    timestamps = [random.Random(seed).randrange(duration) for seed in range(samples)]
+    executor = FFmpegExecutor(os.cpu_count() or 1, samples, threads=1)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "synthetic.mp4")
+        generate_video(path, duration, gop, size)
+        for engine in (SubprocessEngine(executor), PyAVEngine(executor)):
+            # One untimed extraction so every engine starts with the video in the page cache
+            await measure(engine, path, timestamps[:1], 1, image_format)
+            latencies, elapsed = await measure(engine, path, timestamps, concurrency, image_format)
+            results[engine.name] = {**summarize(latencies), "throughput": len(latencies) / elapsed}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=int, default=10, help="length of the synthetic video in seconds")
+    parser.add_argument("--gop", type=int, default=30, help="frames between keyframes")
+    parser.add_argument("--size", default="640x360", help="frame size of the synthetic video")
+    parser.add_argument("--samples", type=int, default=200, help="thumbnails extracted per engine")
+    parser.add_argument("--concurrency", type=int, default=8, help="extractions in flight")
+    parser.add_argument("--format", default="jpeg", help="image format of the thumbnails")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.duration, args.gop, args.size, args.samples, args.concurrency, args.format))
+
+    print(f"{'engine':<12} {'req/s':>9} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for engine, summary in results.items():
+        print(f"{engine:<12} {summary['throughput']:>9.1f} {summary['mean_ms']:>9.2f} {summary['p50_ms']:>9.2f} {summary['p99_ms']:>9.2f} {summary['max_ms']:>9.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "duration": args.duration, "gop": args.gop, "size": args.size, "samples": args.samples,
+                "concurrency": args.concurrency, "format": args.format, "results": results
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
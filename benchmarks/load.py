@@ -0,0 +1,221 @@
+"""
+load.py
+
+Load-tests the application end to end: synthetic videos are uploaded through /upload, thumbnails are generated
+at random timestamps in the three smallest supported resolutions through /generate-thumbnail, and the generated
+thumbnails are fetched through /get-thumbnail, each phase with a fixed number of requests in flight. Requests go through the ASGI app
+in-process, with real FFmpeg and real storage: LocalStorage in a temporary directory, or AWSStorage against a
+local S3 stand-in.
+
+Each endpoint is reported with its throughput and latency percentiles, along with the peak resident set size of
+the benchmark process and of the FFmpeg processes it ran. With --baseline, the results are compared against an
+earlier run's JSON output and the process exits with status 1 if any endpoint got slower by more than the
+tolerance.
+
+Usage:
+    python -m benchmarks.load [--storage local] [--engine subprocess] [--videos 4] [--duration 30] [--size 1280x720]
+        [--codec libx264] [--gop 60] [--requests 200] [--concurrency 16] [--output results.json]
+        [--baseline baseline.json] [--tolerance 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.seek import generate_video
+from benchmarks.s3_server import create_bucket, s3_server
+from benchmarks.stats import find_regressions, summarize
+
+
+async def drive(requests: List[Callable[[], Awaitable[httpx.Response]]], concurrency: int) -> Dict[str, object]:
+    """
+    Sends requests with a fixed number in flight and summarizes their latencies and status codes.
+
+    Args:
+        requests (List[Callable[[], Awaitable[httpx.Response]]]): Functions that each send one request.
+        concurrency (int): The number of requests in flight.
+
+    Returns:
+        Dict[str, object]: The latency summary in milliseconds, the throughput in requests per second, the
+            number of responses per status code and the responses themselves, in request order.
+    """
+    pending = list(enumerate(requests))
+    pending.reverse()
+    samples = []
+    responses: List[httpx.Response] = [None] * len(requests)
+
+    async def worker() -> None:
+        while pending:
+            index, send = pending.pop()
+            start = time.perf_counter()
+            responses[index] = await send()
+            samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    statuses: Dict[str, int] = {}
+    for response in responses:
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+    return {
+        **summarize(samples),
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "statuses": statuses,
+        "responses": responses,
+    }
+
+
+def peak_rss_mb() -> Tuple[float, float]:
+    """
+    Returns the peak resident set size of this process and of its largest terminated child, such as an FFmpeg
+    process.
+
+    Returns:
+        Tuple[float, float]: The peak resident set sizes of the process and of its children, in MiB.
+    """
+    # ru_maxrss is reported in KiB on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale,
+    )
+
+
+async def run(paths: List[str], duration: int, requests: int, concurrency: int) -> Dict[str, Dict[str, object]]:
+    """
+    Uploads the videos, then generates and fetches thumbnails of them through the application.
+
+    The application is imported here, so the storage and engine configuration set in the environment by the
+    caller applies to it.
+
+    Args:
+        paths (List[str]): The paths of the synthetic videos to upload.
+        duration (int): The length of the videos in seconds.
+        requests (int): The number of requests sent to /generate-thumbnail and to /get-thumbnail.
+        concurrency (int): The number of requests in flight.
+
+    Returns:
+        Dict[str, Dict[str, object]]: The results of each endpoint, keyed by endpoint.
+    """
+    from app.factory import create_app
+    from app.helpers.video import supported_resolutions
+
+    app = create_app()
+    resolutions = sorted(supported_resolutions(), key=lambda resolution: [int(value) for value in resolution.split("x")])[:3]
+    rng = random.Random(0)
+    results = {}
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(app=app, base_url="http://benchmark", timeout=None) as client:
+            def upload(path: str) -> Callable[[], Awaitable[httpx.Response]]:
+                async def send() -> httpx.Response:
+                    with open(path, "rb") as f:
+                        return await client.post("/video/v1/upload", files={"file": (os.path.basename(path), f, "video/mp4")})
+                return send
+
+            results["upload"] = await drive([upload(path) for path in paths], concurrency)
+            file_ids = [response.json()["file_id"] for response in results["upload"]["responses"] if response.status_code == 200]
+            if not file_ids:
+                raise RuntimeError("No video was uploaded")
+
+            def generate(file_id: str, timestamp: int, resolution: str) -> Callable[[], Awaitable[httpx.Response]]:
+                body = {"file_id": file_id, "timestamp": timestamp, "resolution": resolution}
+                return lambda: client.post("/video/v1/generate-thumbnail", json=body)
+
+            results["generate-thumbnail"] = await drive([
+                generate(rng.choice(file_ids), rng.randrange(duration), rng.choice(resolutions)) for _ in range(requests)
+            ], concurrency)
+            thumbnail_ids = sorted({
+                response.json()["thumbnail_id"] for response in results["generate-thumbnail"]["responses"] if response.status_code == 200
+            })
+            if not thumbnail_ids:
+                raise RuntimeError("No thumbnail was generated")
+
+            def get(thumbnail_id: str) -> Callable[[], Awaitable[httpx.Response]]:
+                return lambda: client.get(f"/video/v1/get-thumbnail/{thumbnail_id}")
+
+            results["get-thumbnail"] = await drive([get(thumbnail_ids[i % len(thumbnail_ids)]) for i in range(requests)], concurrency)
+
+    for result in results.values():
+        del result["responses"]
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--storage", choices=["local", "aws"], default="local", help="storage provider to run against")
+    parser.add_argument("--engine", choices=["subprocess", "pyav"], default="subprocess", help="thumbnail extraction engine")
+    parser.add_argument("--videos", type=int, default=4, help="number of synthetic videos uploaded")
+    parser.add_argument("--duration", type=int, default=30, help="length of the synthetic videos in seconds")
+    parser.add_argument("--size", default="1280x720", help="frame size of the synthetic videos")
+    parser.add_argument("--codec", default="libx264", help="FFmpeg encoder of the synthetic videos, e.g. libx265 or libvpx-vp9")
+    parser.add_argument("--gop", type=int, default=60, help="frames between keyframes")
+    parser.add_argument("--requests", type=int, default=200, help="requests sent to each thumbnail endpoint")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare the results against this earlier JSON output")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="relative slowdown allowed before a result counts as a regression")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    os.environ["STORAGE_TYPE"] = args.storage
+    os.environ["THUMBNAIL_ENGINE"] = args.engine
+    with tempfile.TemporaryDirectory() as directory:
+        # Videos, thumbnails and the SQLite state are stored relative to the working directory
+        os.chdir(directory)
+        paths = []
+        for index in range(args.videos):
+            paths.append(os.path.join(directory, f"synthetic_{index}.mp4"))
+            generate_video(paths[-1], args.duration, args.gop, args.size, args.codec)
+
+        if args.storage == "aws":
+            from app.storage.aws_storage import AWSStorage
+
+            with s3_server() as endpoint:
+                asyncio.run(create_bucket(endpoint, AWSStorage.BUCKET_NAME))
+                endpoints = asyncio.run(run(paths, args.duration, args.requests, args.concurrency))
+        else:
+            endpoints = asyncio.run(run(paths, args.duration, args.requests, args.concurrency))
+
+    rss, children_rss = peak_rss_mb()
+    results = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "tolerance")},
+        "endpoints": endpoints,
+        "peak_rss_mb": rss,
+        "peak_child_rss_mb": children_rss,
+    }
+
+    print(f"{'endpoint':<20} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  statuses")
+    for name, summary in endpoints.items():
+        print(f"{name:<20} {summary['throughput_rps']:>8.1f} {summary['p50_ms']:>9.2f} {summary['p95_ms']:>9.2f} {summary['p99_ms']:>9.2f}  {summary['statuses']}")
+    print(f"peak RSS {rss:.1f} MiB, largest child process {children_rss:.1f} MiB")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
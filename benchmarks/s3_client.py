@@ -0,0 +1,124 @@
+"""
+s3_client.py
+
+Compares the per-request latency of S3 operations using a new session and client per call,
+as AWSStorage used to do, against the shared pooled client AWSStorage keeps for the app lifespan.
+
+Usage:
+    python -m benchmarks.s3_client [--iterations 200] [--size 65536] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import aioboto3
+
+from app.config import get_config
+from app.storage.aws_storage import AWSStorage
+from benchmarks.s3_server import create_bucket, s3_server
+from benchmarks.stats import summarize
+
+KEY = "benchmarks/s3_client/object.bin"
+
+
+class PerCallClient:
+    """
+    Performs S3 operations by creating a new session and client for every call.
+    """
+
+    def __init__(self, bucket_name: str):
+        self.bucket_name = bucket_name
+
+    async def file_exists(self, file_path: str) -> bool:
+        async with aioboto3.Session().client("s3", endpoint_url=get_config().S3_ENDPOINT_URL) as s3:
+            await s3.head_object(Bucket=self.bucket_name, Key=file_path)
+        return True
+
+    async def read_file(self, file_path: str) -> bytes:
+        async with aioboto3.Session().client("s3", endpoint_url=get_config().S3_ENDPOINT_URL) as s3:
+            response = await s3.get_object(Bucket=self.bucket_name, Key=file_path)
+            return await response["Body"].read()
+
+    async def write_file(self, file_path: str, content: bytes) -> bool:
+        async with aioboto3.Session().client("s3", endpoint_url=get_config().S3_ENDPOINT_URL) as s3:
+            await s3.put_object(Bucket=self.bucket_name, Key=file_path, Body=content)
+        return True
+
+
+async def measure(operation: Callable[[], Awaitable], iterations: int) -> List[float]:
+    """
+    Runs an operation sequentially and records the latency of each call.
+
+    Args:
+        operation (Callable[[], Awaitable]): The operation to run.
+        iterations (int): The number of calls to time.
+
+    Returns:
+        List[float]: The latency of each call in seconds.
+    """
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await operation()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def run(iterations: int, size: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Benchmarks head, read and write operations with both client strategies.
+
+    Args:
+        iterations (int): The number of calls to time per operation and strategy.
+        size (int): The size in bytes of the object that is read and written.
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, float]]]: Latency summaries keyed by strategy and operation.
+    """
+    content = os.urandom(size)
+    pooled = AWSStorage()
+    await pooled.open()
+    try:
+        await pooled.write_file(KEY, content)
+        results = {}
+        for name, client in (("per_call", PerCallClient(AWSStorage.BUCKET_NAME)), ("pooled", pooled)):
+            # One untimed call per strategy so both start from a warm interpreter and server
+            await client.file_exists(KEY)
+            results[name] = {
+                "head": summarize(await measure(lambda: client.file_exists(KEY), iterations)),
+                "read": summarize(await measure(lambda: client.read_file(KEY), iterations)),
+                "write": summarize(await measure(lambda: client.write_file(KEY, content), iterations)),
+            }
+        return results
+    finally:
+        await pooled.delete_file(KEY)
+        await pooled.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200, help="calls timed per operation and strategy")
+    parser.add_argument("--size", type=int, default=64 * 1024, help="object size in bytes")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    with s3_server() as endpoint:
+        asyncio.run(create_bucket(endpoint, AWSStorage.BUCKET_NAME))
+        results = asyncio.run(run(args.iterations, args.size))
+
+    print(f"{'strategy':<10} {'operation':<10} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for strategy, operations in results.items():
+        for operation, summary in operations.items():
+            print(f"{strategy:<10} {operation:<10} {summary['mean_ms']:>9.2f} {summary['p50_ms']:>9.2f} {summary['p99_ms']:>9.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"iterations": args.iterations, "size": args.size, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
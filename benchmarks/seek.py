@@ -0,0 +1,111 @@
+"""
+seek.py
+
+Compares the latency of extracting a thumbnail with exact seeking, which decodes from the keyframe before the
+timestamp up to the timestamp, against fast seeking, which decodes only the nearest keyframe. A synthetic video
+with long keyframe intervals is generated first, since the difference grows with the distance between keyframes.
+
+Usage:
+    python -m benchmarks.seek [--duration 600] [--gop 300] [--size 1280x720] [--samples 20] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import tempfile
+import time
+from typing import Dict, List
+
+from app.extraction.subprocess_engine import thumbnail_command
+from app.helpers.video import seconds_to_timestamp, supported_seek_accuracies
+from benchmarks.stats import summarize
+
+
+def generate_video(path: str, duration: int, gop: int, size: str, codec: str = "libx264") -> None:
+    """
+    Encodes a synthetic 30 fps test pattern video.
+
+    Args:
+        path (str): The path of the MP4 file to write.
+        duration (int): The length of the video in seconds.
+        gop (int): The number of frames between keyframes.
+        size (str): The frame size, e.g. "1280x720".
+        codec (str, optional): The FFmpeg video encoder, e.g. "libx265" or "libvpx-vp9". Defaults to "libx264".
+    """
+    subprocess.run([
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={size}:rate=30",
+        "-t", str(duration),
+        "-c:v", codec, *(["-preset", "ultrafast"] if codec in ("libx264", "libx265") else []), "-pix_fmt", "yuv420p",
+        "-g", str(gop), "-keyint_min", str(gop), "-sc_threshold", "0",
+        path
+    ], check=True)
+
+
+def measure(path: str, timestamps: List[int], accuracy: str) -> List[float]:
+    """
+    Extracts a thumbnail at each timestamp and records the latency of each extraction.
+
+    Args:
+        path (str): The path of the video.
+        timestamps (List[int]): The timestamps in seconds.
+        accuracy (str): The seek accuracy to use.
+
+    Returns:
+        List[float]: The latency of each extraction in seconds.
+    """
+    samples = []
+    for timestamp in timestamps:
+        cmd = thumbnail_command(path, seconds_to_timestamp(timestamp), "320x240", accuracy)
+        start = time.perf_counter()
+        subprocess.run(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(duration: int, gop: int, size: str, samples: int) -> Dict[str, Dict[str, float]]:
+    """
+    Benchmarks every seek accuracy on the same random timestamps of a synthetic video.
+
+    Args:
+        duration (int): The length of the synthetic video in seconds.
+        gop (int): The number of frames between keyframes.
+        size (str): The frame size of the synthetic video.
+        samples (int): The number of thumbnails extracted per accuracy.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Latency summaries keyed by seek accuracy.
+    """
+    timestamps = [random.Random(seed).randrange(duration) for seed in range(samples)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "synthetic.mp4")
+        generate_video(path, duration, gop, size)
+        # One untimed extraction so both accuracies start with the video in the page cache
+        measure(path, timestamps[:1], "exact")
+        return {accuracy: summarize(measure(path, timestamps, accuracy)) for accuracy in supported_seek_accuracies()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=int, default=600, help="length of the synthetic video in seconds")
+    parser.add_argument("--gop", type=int, default=300, help="frames between keyframes")
+    parser.add_argument("--size", default="1280x720", help="frame size of the synthetic video")
+    parser.add_argument("--samples", type=int, default=20, help="thumbnails extracted per accuracy")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.duration, args.gop, args.size, args.samples)
+
+    print(f"{'accuracy':<10} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for accuracy, summary in results.items():
+        print(f"{accuracy:<10} {summary['mean_ms']:>9.2f} {summary['p50_ms']:>9.2f} {summary['p95_ms']:>9.2f} {summary['max_ms']:>9.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"duration": args.duration, "gop": args.gop, "size": args.size, "samples": args.samples, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+stats.py
+
+Helpers for summarizing latency samples collected by the benchmarks and comparing results against a baseline.
+"""
+
+import math
+from typing import Dict, List, Sequence
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """
+    Returns a percentile of the samples using the nearest-rank method.
+
+    Args:
+        samples (Sequence[float]): The samples to summarize. Must not be empty.
+        fraction (float): The percentile as a fraction between 0 and 1, e.g. 0.99 for p99.
+
+    Returns:
+        float: The sample at the requested rank.
+    """
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """
+    Summarizes latency samples given in seconds.
+
+    Args:
+        samples (Sequence[float]): The latency samples in seconds.
+
+    Returns:
+        Dict[str, float]: The sample count and the mean, p50, p95, p99 and maximum latencies in milliseconds.
+    """
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean_ms": sum(samples) / len(samples) * 1000,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def find_regressions(results: Dict, baseline: Dict, tolerance: float, path: str = "") -> List[str]:
+    """
+    Compares benchmark results against a baseline with the same layout, such as an earlier run's JSON output.
+
+    Nested dictionaries are compared key by key. Values whose key ends in "_rps" are better when higher, and
+    values whose key ends in "_ms" or "_mb" are better when lower; other values and keys missing from either
+    side are ignored.
+
+    Args:
+        results (Dict): The results of the current run.
+        baseline (Dict): The results of the baseline run.
+        tolerance (float): The relative change allowed before a value counts as a regression, e.g. 0.1 for 10%.
+        path (str, optional): The dotted path of the dictionaries, used in the descriptions. Defaults to "".
+
+    Returns:
+        List[str]: A description of each regression, e.g. "upload.p95_ms: 12.00 -> 15.50 (+29.2%)".
+    """
+    regressions = []
+    for key, value in results.items():
+        if key not in baseline:
+            continue
+        name = f"{path}.{key}" if path else key
+        expected = baseline[key]
+        if isinstance(value, dict) and isinstance(expected, dict):
+            regressions += find_regressions(value, expected, tolerance, name)
+            continue
+        if not isinstance(value, (int, float)) or not isinstance(expected, (int, float)) or expected <= 0:
+            continue
+
+        change = (value - expected) / expected
+        if (key.endswith("_rps") and change < -tolerance) or (key.endswith(("_ms", "_mb")) and change > tolerance):
+            regressions.append(f"{name}: {expected:.2f} -> {value:.2f} ({change:+.1%})")
+    return regressions
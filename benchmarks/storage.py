@@ -0,0 +1,276 @@
+"""
+storage.py
+
+Measures the per-operation cost of every StorageProvider method, for each provider registered in
+STORAGE_PROVIDERS, across object sizes and numbers of calls in flight. LocalStorage runs in a temporary directory
+and AWSStorage against a local moto S3 server.
+
+Each operation is called the given number of times per size and concurrency level, with every call in flight
+working on its own object, and is reported with its latency percentiles, calls per second and, for operations
+that move the whole object, MiB per second. Setup a call needs, such as writing the object a delete_file call
+removes, is not timed. delete_directory is timed on a directory whose object was deleted, since LocalStorage
+only deletes empty directories. complete_upload is only timed where create_upload_target returns a multipart upload,
+e.g. above PRESIGNED_PUT_MAX_SIZE on S3; its parts are uploaded through the presigned URLs beforehand.
+
+Objects are generated in memory, and reads keep a copy per call in flight, so sizes up to 1GB need several GiB
+of memory at higher concurrency levels.
+
+Usage:
+    python -m benchmarks.storage [--providers local,aws] [--sizes 4KB,64KB,1MB,16MB] [--concurrency 1,8]
+        [--iterations 20] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.storage.storage_factory import STORAGE_PROVIDERS
+from app.storage.storage_provider import StorageProvider
+from benchmarks.s3_server import create_bucket, s3_server
+from benchmarks.stats import summarize
+
+ROOT = "benchmarks/storage"
+"""str: The directory the benchmark's objects are written under."""
+
+CHUNK_SIZE = 1024 * 1024
+"""int: The chunk size of write_stream and open_read_stream calls."""
+
+RANGE_SIZE = 64 * 1024
+"""int: The number of bytes read by read_range calls, from the middle of the object."""
+
+UNITS = {"GB": 1024 ** 3, "MB": 1024 ** 2, "KB": 1024, "B": 1}
+
+Call = Callable[[], Awaitable]
+Setup = Callable[[StorageProvider, str, bytes], Awaitable[Optional[Call]]]
+
+
+def parse_size(size: str) -> int:
+    """
+    Parses a size with an optional binary unit, e.g. "4KB" or "1GB".
+
+    Args:
+        size (str): The size.
+
+    Returns:
+        int: The size in bytes.
+    """
+    size = size.strip().upper()
+    for unit, factor in UNITS.items():
+        if size.endswith(unit):
+            return int(float(size[:-len(unit)]) * factor)
+    return int(size)
+
+
+async def iter_chunks(content: bytes) -> AsyncIterator[bytes]:
+    """
+    Yields the content in chunks of CHUNK_SIZE bytes, as write_stream receives an upload.
+    """
+    view = memoryview(content)
+    for offset in range(0, len(content), CHUNK_SIZE):
+        yield bytes(view[offset:offset + CHUNK_SIZE])
+
+
+async def consume(chunks: AsyncIterator[bytes]) -> None:
+    """
+    Reads an async iterator of chunks to the end, discarding them.
+    """
+    async for _ in chunks:
+        pass
+
+
+def timed(call: Callable[[StorageProvider, str, bytes], Awaitable]) -> Setup:
+    """
+    Wraps a call that needs no setup.
+
+    Args:
+        call (Callable[[StorageProvider, str, bytes], Awaitable]): A function of the provider, the object's path
+            and its content, returning the awaitable to time.
+
+    Returns:
+        Setup: The setup function of the operation.
+    """
+    async def setup(provider: StorageProvider, path: str, content: bytes) -> Optional[Call]:
+        return lambda: call(provider, path, content)
+    return setup
+
+
+async def setup_delete_file(provider: StorageProvider, path: str, content: bytes) -> Optional[Call]:
+    await provider.write_file(path, content)
+    return lambda: provider.delete_file(path)
+
+
+async def setup_delete_directory(provider: StorageProvider, path: str, content: bytes) -> Optional[Call]:
+    # LocalStorage only deletes empty directories, so every provider is timed deleting an emptied one
+    await provider.write_file(path, content)
+    await provider.delete_file(path)
+    return lambda: provider.delete_directory(os.path.dirname(path))
+
+
+async def setup_complete_upload(provider: StorageProvider, path: str, content: bytes) -> Optional[Call]:
+    target = await provider.create_upload_target(path, len(content), None, 300)
+    if target is None or not target.part_urls:
+        return None
+    etags = []
+    async with httpx.AsyncClient(timeout=None) as client:
+        for number, url in enumerate(target.part_urls):
+            response = await client.put(url, content=content[number * target.part_size:(number + 1) * target.part_size])
+            response.raise_for_status()
+            etags.append(response.headers["ETag"])
+    return lambda: provider.complete_upload(path, target.upload_id, etags)
+
+
+OPERATIONS: Dict[str, Setup] = {
+    "write_file": timed(lambda provider, path, content: provider.write_file(path, content)),
+    "write_stream": timed(lambda provider, path, content: provider.write_stream(path, iter_chunks(content))),
+    "file_size": timed(lambda provider, path, content: provider.file_size(path)),
+    "file_exists": timed(lambda provider, path, content: provider.file_exists(path)),
+    "get_seekable_source": timed(lambda provider, path, content: provider.get_seekable_source(path)),
+    "read_file": timed(lambda provider, path, content: provider.read_file(path)),
+    "read_range": timed(lambda provider, path, content: provider.read_range(path, len(content) // 2, len(content) // 2 + RANGE_SIZE)),
+    "open_read_stream": timed(lambda provider, path, content: consume(provider.open_read_stream(path, CHUNK_SIZE))),
+    "directory_exists": timed(lambda provider, path, content: provider.directory_exists(os.path.dirname(path))),
+    "list_files": timed(lambda provider, path, content: provider.list_files(os.path.dirname(path))),
+    "create_upload_target": timed(lambda provider, path, content: provider.create_upload_target(path, len(content), None, 300)),
+    "complete_upload": setup_complete_upload,
+    "delete_file": setup_delete_file,
+    "delete_directory": setup_delete_directory,
+}
+"""Dict[str, Setup]: The setup function of each StorageProvider method, in the order they are benchmarked."""
+
+STREAMING_OPERATIONS = {"write_file", "write_stream", "read_file", "open_read_stream"}
+"""set: The operations that transfer the whole object, reported with their MiB per second as well."""
+
+
+async def measure(provider: StorageProvider, setup: Setup, size: int, content: bytes, concurrency: int, iterations: int) -> Optional[Dict[str, float]]:
+    """
+    Calls an operation the given number of times, with a fixed number of calls in flight on separate objects.
+
+    Args:
+        provider (StorageProvider): The provider to benchmark.
+        setup (Setup): The setup function of the operation.
+        size (int): The size of the objects.
+        content (bytes): The content of the objects.
+        concurrency (int): The number of calls in flight.
+        iterations (int): The total number of calls.
+
+    Returns:
+        Optional[Dict[str, float]]: The latency summary and throughput, or None if the provider does not support
+            the operation at this size.
+    """
+    remaining = [iterations]
+    samples: List[float] = []
+    busy = [0.0]
+
+    async def worker(index: int) -> None:
+        path = f"{ROOT}/{size}/{index}/object.bin"
+        await provider.write_file(path, content)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            call = await setup(provider, path, content)
+            if call is None:
+                return
+            start = time.perf_counter()
+            await call()
+            samples.append(time.perf_counter() - start)
+            busy[0] += samples[-1]
+
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    if not samples:
+        return None
+    # Setup is excluded from the elapsed time by scaling the time spent in calls to the number in flight
+    elapsed = busy[0] / min(concurrency, len(samples))
+    return {**summarize(samples), "throughput_rps": len(samples) / elapsed}
+
+
+async def run_provider(provider: StorageProvider, sizes: List[int], concurrency_levels: List[int], iterations: int, operations: List[str]) -> Dict:
+    """
+    Benchmarks every operation of a provider at every size and concurrency level.
+
+    Args:
+        provider (StorageProvider): The provider to benchmark.
+        sizes (List[int]): The object sizes in bytes.
+        concurrency_levels (List[int]): The numbers of calls in flight.
+        iterations (int): The number of calls per operation, size and concurrency level.
+        operations (List[str]): The names of the operations to benchmark.
+
+    Returns:
+        Dict: The summaries keyed by size, concurrency level and operation.
+    """
+    results = {}
+    await provider.open()
+    try:
+        for size in sizes:
+            content = os.urandom(size)
+            results[str(size)] = {}
+            for concurrency in concurrency_levels:
+                summaries = {}
+                for name in operations:
+                    summary = await measure(provider, OPERATIONS[name], size, content, concurrency, iterations)
+                    if summary is None:
+                        continue
+                    if name in STREAMING_OPERATIONS:
+                        summary["throughput_mb_per_s"] = summary["throughput_rps"] * size / (1024 * 1024)
+                    summaries[name] = summary
+                    print(f"{type(provider).__name__:<14} {size:>11} {concurrency:>4} {name:<22} {summary['p50_ms']:>9.2f} {summary['p99_ms']:>9.2f} {summary['throughput_rps']:>9.1f}")
+                results[str(size)][str(concurrency)] = summaries
+            del content
+        return results
+    finally:
+        for path in await provider.list_files(ROOT):
+            await provider.delete_file(path)
+        await provider.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--providers", default=",".join(STORAGE_PROVIDERS), help="comma-separated storage types from STORAGE_PROVIDERS")
+    parser.add_argument("--sizes", default="4KB,64KB,1MB,16MB", help="comma-separated object sizes, e.g. 4KB,1MB,1GB")
+    parser.add_argument("--concurrency", default="1,8", help="comma-separated numbers of calls in flight")
+    parser.add_argument("--iterations", type=int, default=20, help="calls per operation, size and concurrency level")
+    parser.add_argument("--operations", default=",".join(OPERATIONS), help="comma-separated StorageProvider methods")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    providers = [name.strip().lower() for name in args.providers.split(",")]
+    unknown = [name for name in providers if name not in STORAGE_PROVIDERS]
+    if unknown:
+        parser.error(f"unknown providers {unknown}, expected some of {list(STORAGE_PROVIDERS)}")
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    concurrency_levels = [int(level) for level in args.concurrency.split(",")]
+    operations = [name.strip() for name in args.operations.split(",")]
+    unknown = [name for name in operations if name not in OPERATIONS]
+    if unknown:
+        parser.error(f"unknown operations {unknown}, expected some of {list(OPERATIONS)}")
+    output = os.path.abspath(args.output) if args.output else None
+
+    def run(name: str) -> Dict:
+        return asyncio.run(run_provider(STORAGE_PROVIDERS[name](), sizes, concurrency_levels, args.iterations, operations))
+
+    print(f"{'provider':<14} {'size':>11} {'conc':>4} {'operation':<22} {'p50 ms':>9} {'p99 ms':>9} {'calls/s':>9}")
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        # Local providers store paths relative to the working directory
+        os.chdir(directory)
+        for name in providers:
+            if name == "aws":
+                with s3_server() as endpoint:
+                    asyncio.run(create_bucket(endpoint, STORAGE_PROVIDERS[name].BUCKET_NAME))
+                    results[name] = run(name)
+            else:
+                results[name] = run(name)
+
+    if output:
+        with open(output, "w") as f:
+            json.dump({
+                "sizes": sizes, "concurrency": concurrency_levels, "iterations": args.iterations, "results": results
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()